@@ -0,0 +1,48 @@
+"""Password KDF cost vs login latency, and what the verified-session cache saves.
+
+    python bench_auth.py
+"""
+import argparse
+import tempfile
+from pathlib import Path
+from src.auth import KDF, Authenticator, SessionCache
+from src.bench import Bench
+from src.db import apply_schema, connect
+
+SETTINGS = [
+    KDF("scrypt", n=2 ** 12),
+    KDF("scrypt", n=2 ** 14),
+    KDF("scrypt", n=2 ** 15),
+    KDF("pbkdf2", iterations=100_000),
+    KDF("pbkdf2", iterations=600_000),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    bench = Bench("auth")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "auth.db")
+        apply_schema(db_path)
+        for kdf in SETTINGS:
+            stored, salt = kdf.hash("s3cret")
+            with connect(db_path) as conn:
+                conn.execute("DELETE FROM user")
+                conn.execute("INSERT INTO user (username, password_hash, salt, role) VALUES ('u', ?, ?, 'STAFF')",
+                             (stored, salt))
+                conn.commit()
+            cold = Authenticator(db_path, kdf, cache=SessionCache(max_size=0))
+            bench.run(f"login.{kdf.params()}", lambda: cold.authenticate("u", "s3cret"), args.repeat)
+            warm = Authenticator(db_path, kdf, cache=SessionCache())
+            warm.authenticate("u", "s3cret")
+            bench.run(f"login.cached.{kdf.params()}", lambda: warm.authenticate("u", "s3cret"), args.repeat * 100)
+    if not args.no_save:
+        bench.save()
+
+
+if __name__ == "__main__":
+    main()
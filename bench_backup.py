@@ -0,0 +1,93 @@
+"""Online backup throughput and its impact on concurrent write latency.
+
+A writer process inserts passengers in a loop while backups run with different
+pages-per-step / sleep settings; the baseline is the same writer with no backup.
+
+    python bench_backup.py --scale 100k
+"""
+import argparse
+import shutil
+import sqlite3
+import tempfile
+import time
+from multiprocessing import get_context
+from pathlib import Path
+from src.backup import backup, verify_backup
+from src.bench import Bench
+from bench_scale import dataset
+
+SETTINGS = [(-1, 0.0), (1024, 0.0), (256, 0.005), (64, 0.01)]
+
+
+def _writer(db_path, stop, started, out):
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    latencies, i = [], 0
+    started.set()
+    while not stop.is_set():
+        t = time.perf_counter()
+        conn.execute("INSERT INTO passenger (name, email) VALUES (?, ?)", ("Bench", f"bench.{time.time_ns()}.{i}@x"))
+        conn.commit()
+        latencies.append(time.perf_counter() - t)
+        i += 1
+    conn.close()
+    out.put(latencies)
+
+
+def _with_writer(db_path, fn):
+    """Run fn() while a writer process inserts; return (fn result, writer latencies)."""
+    ctx = get_context("spawn")
+    stop, started, out = ctx.Event(), ctx.Event(), ctx.Queue()
+    proc = ctx.Process(target=_writer, args=(db_path, stop, started, out))
+    proc.start()
+    started.wait()
+    try:
+        result = fn()
+    finally:
+        stop.set()
+    latencies = sorted(out.get())
+    proc.join()
+    return result, latencies
+
+
+def _pct(values, q):
+    return round(values[min(int(len(values) * q), len(values) - 1)] * 1000, 3) if values else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="100k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline-seconds", type=float, default=2.0)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    bench = Bench("backup", scale=args.scale)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "live.db")
+        shutil.copy(dataset(args.scale, args.seed), db_path)
+
+        _, latencies = _with_writer(db_path, lambda: time.sleep(args.baseline_seconds))
+        bench.record("writer[no backup]", writes=len(latencies),
+                     writes_per_s=round(len(latencies) / args.baseline_seconds, 1),
+                     p50_ms=_pct(latencies, 0.5), p99_ms=_pct(latencies, 0.99), max_ms=_pct(latencies, 1.0))
+
+        for pages, sleep in SETTINGS:
+            for compress in (False, True):
+                dest = str(Path(tmp) / f"backup_{pages}_{sleep}.db") + (".gz" if compress else "")
+                manifest, latencies = _with_writer(db_path, lambda: backup(dest, db_path, pages, sleep))
+                assert verify_backup(dest)["ok"], dest
+                bench.record(
+                    f"backup[pages={pages},sleep={sleep},gz={int(compress)}]",
+                    seconds=manifest["seconds"], mb_per_s=manifest["mb_per_s"], steps=manifest["steps"],
+                    restarts=manifest["restarts"], fallback=manifest["single_step_fallback"],
+                    ratio=round(manifest["bytes"] / manifest["compressed_bytes"], 2),
+                    writes=len(latencies), p50_ms=_pct(latencies, 0.5), p99_ms=_pct(latencies, 0.99),
+                    max_ms=_pct(latencies, 1.0)
+                )
+    if not args.no_save:
+        bench.save()
+
+
+if __name__ == "__main__":
+    main()
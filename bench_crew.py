@@ -0,0 +1,81 @@
+"""Crew rostering benchmarks: conflict sweep and duty-time compliance at roster scale.
+
+    python bench_crew.py                                  # quick run
+    python bench_crew.py --crew 50000 --assignments 5000000
+"""
+import argparse
+import os
+import random
+from datetime import datetime, timedelta
+from src.bench import Bench
+from src.config import BASE_DIR
+from src.crew_compliance import CrewCompliance
+from src.crew_scheduling import CrewScheduler
+from src.db import apply_schema, connect
+
+DATA_DIR = BASE_DIR / "bench_data"
+TEAM = 4
+
+
+def build_roster_db(path, crew, assignments, seed=42):
+    """Teams of four crew fly a shared chain of flights with randomised turn times."""
+    rng = random.Random(seed)
+    apply_schema(path)
+    teams = max(1, crew // TEAM)
+    legs = max(1, assignments // (teams * TEAM))
+    with connect(path) as conn:
+        conn.execute("PRAGMA synchronous = OFF;")
+        conn.executemany("INSERT INTO airport (id, code, name, city, country) VALUES (?, ?, ?, ?, ?)",
+                         [(1, "AAA", "A", "A", "UK"), (2, "BBB", "B", "B", "UK")])
+        conn.execute("INSERT INTO aircraft (id, model, capacity) VALUES (1, 'Bench', 180)")
+        conn.executemany("INSERT INTO crew_member (id, name, role) VALUES (?, ?, ?)",
+                         ((i, f"Crew {i}", "Cabin Crew") for i in range(1, teams * TEAM + 1)))
+        flight_id = 0
+        for team in range(teams):
+            clock = datetime(2025, 1, 1) + timedelta(minutes=rng.randint(0, 1440))
+            flights, crew_rows = [], []
+            for leg in range(legs):
+                flight_id += 1
+                block = timedelta(minutes=rng.randint(60, 540))
+                flights.append((flight_id, f"CR{flight_id}", 1 + leg % 2, 2 - leg % 2,
+                                clock.isoformat(timespec="seconds"),
+                                (clock + block).isoformat(timespec="seconds"), 1, 100.0))
+                crew_rows.extend((team * TEAM + k + 1, flight_id, "Cabin Service") for k in range(TEAM))
+                clock += block + timedelta(minutes=rng.choice((30, 60, 600, 720, 900, 2880)))
+            conn.executemany("""INSERT INTO flight (id, code, departure_airport_id, arrival_airport_id,
+                                departure_time, arrival_time, aircraft_id, base_price)
+                                VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", flights)
+            conn.executemany("INSERT INTO crew_assignment (crew_member_id, flight_id, duty) VALUES (?, ?, ?)",
+                             crew_rows)
+        conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--crew", type=int, default=2000)
+    parser.add_argument("--assignments", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    path = DATA_DIR / f"crew_{args.crew}_{args.assignments}.db"
+    if not path.exists():
+        DATA_DIR.mkdir(exist_ok=True)
+        build_roster_db(str(path), args.crew, args.assignments)
+
+    bench = Bench("crew", scale=f"{args.crew}x{args.assignments}")
+    bench.run("find_conflicts", CrewScheduler(str(path)).find_conflicts, args.repeat)
+    compliance = CrewCompliance(str(path))
+    serial = bench.run("compliance.workers=1", lambda: compliance.check(workers=1), args.repeat)
+    cores = os.cpu_count() or 1
+    parallel = bench.run(f"compliance.workers={cores}", lambda: compliance.check(workers=cores), args.repeat)
+    if "median" in serial and "median" in parallel:
+        bench.record("compliance.speedup", cores=cores,
+                     speedup=round(serial["median"] / parallel["median"], 2),
+                     violations=len(compliance.check()))
+    if not args.no_save:
+        bench.save()
+
+
+if __name__ == "__main__":
+    main()
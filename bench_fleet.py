@@ -0,0 +1,84 @@
+"""Fleet rotation benchmarks: fleet-check sweep and fleet-plan repair over a full season.
+
+Builds a season of continuous aircraft rotations, then swaps the tail on a
+share of legs (--faults) so the planner has broken rotations to repair, with a
+few spare aircraft to repair them with.
+
+    python bench_fleet.py                                 # 200 aircraft x 1000 legs
+    python bench_fleet.py --aircraft 400 --legs 500 --faults 0.02
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from src.bench import Bench
+from src.config import BASE_DIR
+from src.db import apply_schema, connect
+from src.fleet import FleetPlanner
+
+DATA_DIR = BASE_DIR / "bench_data"
+AIRPORTS = 150
+CAPACITIES = (180, 220, 396)
+# The built season starts here; fleet-plan is timed as of this date so no leg counts as departed
+SEASON_START = datetime(2025, 1, 1)
+
+
+def build_season_db(path, aircraft, legs, faults, spares, seed=42):
+    """Each aircraft flies a continuous rotation; `faults` of the legs then move to another tail."""
+    rng = random.Random(seed)
+    apply_schema(path)
+    with connect(path) as conn:
+        conn.execute("PRAGMA synchronous = OFF;")
+        conn.executemany("INSERT INTO airport (id, code, name, city, country) VALUES (?, ?, ?, ?, ?)",
+                         ((i, f"X{chr(65 + i // 26)}{chr(65 + i % 26)}", f"Airport {i}", f"City {i}", "UK") for i in range(1, AIRPORTS + 1)))
+        conn.executemany("INSERT INTO aircraft (id, model, capacity) VALUES (?, ?, ?)",
+                         ((i, f"Bench #{i:05d}", CAPACITIES[i % len(CAPACITIES)])
+                          for i in range(1, aircraft + spares + 1)))
+        flights, flight_id = [], 0
+        for tail in range(1, aircraft + 1):
+            at = rng.randint(1, AIRPORTS)
+            clock = SEASON_START + timedelta(minutes=rng.randint(0, 1440))
+            for _ in range(legs):
+                dest = rng.randint(1, AIRPORTS - 1)
+                dest += dest >= at
+                block = timedelta(minutes=rng.randint(60, 600))
+                flight_id += 1
+                flights.append([flight_id, f"FL{flight_id:07d}", at, dest, clock.isoformat(timespec="seconds"),
+                                (clock + block).isoformat(timespec="seconds"), tail, 100.0])
+                at, clock = dest, clock + block + timedelta(minutes=rng.randint(45, 180))
+        for row in rng.sample(flights, int(len(flights) * faults)):
+            row[6] = rng.randint(1, aircraft)
+        conn.executemany("""INSERT INTO flight (id, code, departure_airport_id, arrival_airport_id,
+                            departure_time, arrival_time, aircraft_id, base_price)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", flights)
+        conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--aircraft", type=int, default=200)
+    parser.add_argument("--legs", type=int, default=1000, help="Legs per aircraft")
+    parser.add_argument("--faults", type=float, default=0.01, help="Share of legs moved to a random tail")
+    parser.add_argument("--spares", type=int, default=10, help="Aircraft with no legs of their own")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    path = DATA_DIR / f"fleet_{args.aircraft}x{args.legs}_f{args.faults}_s{args.spares}.db"
+    if not path.exists():
+        DATA_DIR.mkdir(exist_ok=True)
+        build_season_db(str(path), args.aircraft, args.legs, args.faults, args.spares)
+
+    bench = Bench("fleet", scale=f"{args.aircraft}x{args.legs}", faults=args.faults)
+    planner = FleetPlanner(str(path))
+    bench.run("fleet-check", planner.check, args.repeat)
+    bench.run("fleet-plan", lambda: planner.plan(now=SEASON_START), args.repeat)
+    result = planner.plan(now=SEASON_START)
+    bench.record("plan", legs=result["legs"], issues_before=result["issues_before"],
+                 issues_after=result["issues_after"], reassigned=result["reassigned"],
+                 unresolved=result["unresolved"])
+    if not args.no_save:
+        bench.save()
+
+
+if __name__ == "__main__":
+    main()
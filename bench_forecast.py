@@ -0,0 +1,46 @@
+"""Booking-curve forecast: fit and batch-score timings, backtest error per model.
+
+score() is also timed on --flights synthetic flights (the real upcoming
+flights repeated), since bench_scale datasets have far fewer than 100k flights.
+
+    python bench_forecast.py --scale 100k --as-of 2025-06-01 --flights 100000
+"""
+import argparse
+import itertools
+from src.bench import Bench
+from src.forecast import MODELS, DemandForecaster
+from bench_scale import dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="100k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--as-of", default="2025-06-01")
+    parser.add_argument("--flights", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    forecaster = DemandForecaster(dataset(args.scale, args.seed))
+    bench = Bench("forecast", scale=args.scale, as_of=args.as_of)
+    bench.run("fit", lambda: forecaster.fit(args.as_of), args.repeat)
+    for model in MODELS:
+        bench.run(f"forecast[{model}]", lambda: forecaster.forecast(args.as_of, model), args.repeat)
+        result = forecaster.backtest(args.as_of, model)
+        bench.record(f"backtest[{model}]", **{k: v for k, v in result.items() if k not in ("as_of", "model")})
+
+    upcoming = [(f.flight_id, f.code, f.route, f.departure_time, f.days_out, f.booked, f.capacity)
+                for f in forecaster.forecast(args.as_of)]
+    synthetic = list(itertools.islice(itertools.cycle(upcoming), args.flights))
+    for model in MODELS:
+        timing = bench.run(f"score[{model}, {len(synthetic)} flights]", lambda: forecaster.score(synthetic, model),
+                           args.repeat, flights=len(synthetic))
+        if timing.get("median"):
+            print(f"{'':<60} {len(synthetic) / timing['median']:,.0f} flights/s")
+    if not args.no_save:
+        bench.save()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Hold/confirm throughput on one hot flight with many concurrent processes.
+
+Every worker holds seats on the same flight, confirms most of them and abandons
+the rest; demand exceeds the cabin so the tail of the run hits sold-out. The
+no-oversell guarantee itself is tested in test_seat_holds.py.
+
+    python bench_holds.py --processes 8 --attempts 400 --capacity 1000
+"""
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+from multiprocessing import get_context
+from pathlib import Path
+from src.bench import Bench
+from src.dal import DAL
+from src.db import apply_schema
+from src.seat_holds import SeatHoldManager, SoldOut, class_capacity
+
+
+def _setup(db_path, capacity, passengers):
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    dal.create_airport("HOT", "Hot", "Hot", "UK")
+    dal.create_airport("SUN", "Sun", "Sun", "ES")
+    dal.create_aircraft("Hot", capacity)
+    dal.create_flight("HOT1", 1, 2, "2030-07-01T08:00:00", "2030-07-01T11:00:00", 1, 120.0)
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany("INSERT INTO passenger (name, email) VALUES (?, ?)",
+                         ((f"P{i}", f"p{i}@example.com") for i in range(passengers)))
+
+
+def _worker(db_path, worker, attempts, abandon_rate):
+    rng = random.Random(worker)
+    holds = SeatHoldManager(db_path)
+    stats = dict(held=0, confirmed=0, abandoned=0, sold_out=0, latencies=[])
+    for i in range(attempts):
+        passenger_id = worker * attempts + i + 1
+        started = time.perf_counter()
+        try:
+            booking_id = holds.hold(passenger_id, 1, "ECONOMY", 120.0)
+        except SoldOut:
+            stats["sold_out"] += 1
+            continue
+        stats["held"] += 1
+        if rng.random() < abandon_rate:
+            holds.release(booking_id)
+            stats["abandoned"] += 1
+        else:
+            holds.confirm(booking_id)
+            stats["confirmed"] += 1
+        stats["latencies"].append(time.perf_counter() - started)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--attempts", type=int, default=400, help="hold attempts per process")
+    parser.add_argument("--capacity", type=int, default=1000)
+    parser.add_argument("--abandon-rate", type=float, default=0.2)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    bench = Bench("holds", processes=args.processes, capacity=args.capacity)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "holds.db")
+        _setup(db_path, args.capacity, args.processes * args.attempts)
+
+        started = time.perf_counter()
+        with get_context("spawn").Pool(args.processes) as pool:
+            results = pool.starmap(_worker, [(db_path, w, args.attempts, args.abandon_rate)
+                                             for w in range(args.processes)])
+        elapsed = time.perf_counter() - started
+
+        with sqlite3.connect(db_path) as conn:
+            booked = conn.execute("SELECT COUNT(*) FROM booking WHERE status IN ('HELD','BOOKED')").fetchone()[0]
+            taken = conn.execute("SELECT taken FROM seat_inventory WHERE flight_id=1 AND class='ECONOMY'").fetchone()[0]
+
+    totals = {key: sum(r[key] for r in results) for key in ("held", "confirmed", "abandoned", "sold_out")}
+    latencies = sorted(l for r in results for l in r["latencies"])
+    limit = class_capacity(args.capacity, "ECONOMY")
+
+    bench.record(
+        "hold_confirm",
+        seconds=round(elapsed, 3),
+        holds_per_s=round(totals["held"] / elapsed, 1),
+        p50_ms=round(latencies[len(latencies) // 2] * 1000, 2) if latencies else None,
+        p99_ms=round(latencies[int(len(latencies) * 0.99)] * 1000, 2) if latencies else None,
+        booked=booked, cabin=limit, inventory=taken, **totals
+    )
+    print(f"{totals['held']} holds ({totals['confirmed']} confirmed, {totals['abandoned']} abandoned), "
+          f"{totals['sold_out']} sold out in {elapsed:.2f}s -> {totals['held'] / elapsed:,.0f} holds/s")
+    print(f"cabin {limit}, booked {booked}, seat_inventory {taken}")
+    if not args.no_save:
+        bench.save()
+
+
+if __name__ == "__main__":
+    main()
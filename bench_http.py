@@ -0,0 +1,153 @@
+"""HTTP API load test: latency percentiles and requests/s for a mixed workload.
+
+The server runs in its own process(es) on a scratch copy of a bench_scale
+dataset; client threads hold keep-alive connections and pick endpoints from
+MIX. Searches, reports and list calls log in as a STAFF user.
+
+    python bench_http.py --scale 100k --clients 8 --threads 8 --seconds 20
+"""
+import argparse
+import base64
+import http.client
+import json
+import random
+import sqlite3
+import threading
+import time
+from multiprocessing import get_context
+from pathlib import Path
+from src.auth import Authenticator
+from src.bench import Bench
+from src.dal import DAL
+from src.server import serve
+from bench_scale import dataset
+
+# (endpoint label, weight); labels map to requests in _request()
+MIX = [("quote", 40), ("itinerary", 20), ("search", 15), ("book", 10), ("hold_confirm", 10), ("report", 5)]
+STAFF = ("bench-staff", "bench-staff-password")
+
+
+def _scratch(db_path):
+    scratch = Path(db_path).with_suffix(".http.db")
+    with sqlite3.connect(db_path) as src, sqlite3.connect(scratch) as dst:
+        src.backup(dst)
+    with sqlite3.connect(scratch) as conn:  # generated seasons are fixed; move this one into the future
+        days = conn.execute("SELECT CAST(julianday('now') - julianday(MIN(departure_time)) AS INTEGER) + 1 "
+                            "FROM flight").fetchone()[0]
+        if days and days > 0:
+            conn.execute("""UPDATE flight SET departure_time = strftime('%Y-%m-%dT%H:%M:%S', departure_time, ?),
+                                              arrival_time = strftime('%Y-%m-%dT%H:%M:%S', arrival_time, ?)""",
+                         (f"+{days} days", f"+{days} days"))
+    auth = Authenticator(str(scratch))
+    DAL(str(scratch)).create_user(STAFF[0], *auth.hash_password(STAFF[1]), "STAFF")
+    return str(scratch)
+
+
+def _request(conn, label, rng, ids, staff):
+    flight, passenger = rng.choice(ids["flights"]), rng.choice(ids["passengers"])
+    if label == "quote":
+        return conn.request("GET", f"/quote?flight={flight}&class=ECONOMY")
+    if label == "itinerary":
+        return conn.request("GET", f"/passengers/{passenger}/itinerary?when=upcoming")
+    if label == "search":
+        return conn.request("GET", f"/passengers/search?q={rng.choice(ids['names'])}", headers=staff)
+    if label == "report":
+        return conn.request("GET", "/reports/top-routes?limit=10", headers=staff)
+    body = json.dumps(dict(passenger_id=passenger, flight_id=flight, **{"class": "ECONOMY"}))
+    path = "/holds" if label == "hold_confirm" else "/bookings"
+    return conn.request("POST", path, body, {"Content-Type": "application/json"})
+
+
+def _client(port, seconds, seed, ids, results):
+    rng = random.Random(seed)
+    labels, weights = zip(*MIX)
+    staff = {"Authorization": "Basic " + base64.b64encode(":".join(STAFF).encode()).decode()}
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        label = rng.choices(labels, weights)[0]
+        started = time.perf_counter()
+        _request(conn, label, rng, ids, staff)
+        response = conn.getresponse()
+        payload = response.read()
+        if label == "hold_confirm" and response.status == 201:
+            booking_id = json.loads(payload)["booking_id"]
+            conn.request("POST", f"/bookings/{booking_id}/confirm")
+            response = conn.getresponse()
+            response.read()
+        results.append((label, response.status, time.perf_counter() - started))
+    conn.close()
+
+
+def _wait_for(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not come up")
+
+
+def _percentile(sorted_values, q):
+    return round(sorted_values[min(int(len(sorted_values) * q), len(sorted_values) - 1)] * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="100k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=8, help="Server worker threads per process")
+    parser.add_argument("--processes", type=int, default=1, help="Pre-forked server processes")
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    db_path = _scratch(dataset(args.scale, args.seed))
+    with sqlite3.connect(db_path) as conn:
+        ids = dict(
+            flights=[r[0] for r in conn.execute("SELECT id FROM flight ORDER BY random() LIMIT 1000")],
+            passengers=[r[0] for r in conn.execute("SELECT id FROM passenger ORDER BY random() LIMIT 1000")],
+            names=[r[0].split()[0].lower() for r in conn.execute("SELECT name FROM passenger LIMIT 200")],
+        )
+
+    server = get_context("fork").Process(
+        target=serve, args=(db_path, "127.0.0.1", args.port, args.threads, args.processes), daemon=True)
+    server.start()
+    try:
+        _wait_for(args.port)
+        results = []
+        clients = [threading.Thread(target=_client, args=(args.port, args.seconds, i, ids, results))
+                   for i in range(args.clients)]
+        started = time.perf_counter()
+        for t in clients:
+            t.start()
+        for t in clients:
+            t.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.join()
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+
+    bench = Bench("http", scale=args.scale, clients=args.clients, threads=args.threads, processes=args.processes)
+    for label in [label for label, _ in MIX] + ["all"]:
+        latencies = sorted(l for name, _, l in results if label in (name, "all"))
+        if not latencies:
+            continue
+        errors = sum(1 for name, status, _ in results if label in (name, "all") and status >= 500)
+        bench.record(f"http[{label}]", requests=len(latencies), rps=round(len(latencies) / elapsed, 1),
+                     p50_ms=_percentile(latencies, 0.50), p99_ms=_percentile(latencies, 0.99),
+                     server_errors=errors)
+    if not args.no_save:
+        bench.save()
+
+
+if __name__ == "__main__":
+    main()
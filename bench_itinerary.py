@@ -0,0 +1,59 @@
+"""Passenger itinerary latency as the booking table grows.
+
+Compares DAL.get_passenger_itinerary (one indexed join) with the old way of
+stitching list_bookings(), list_flights() and list_airports() in Python.
+
+    python bench_itinerary.py --scales 10k,100k,1m
+"""
+import argparse
+import sqlite3
+from src.bench import Bench
+from src.dal import DAL
+from src.datagen import SCALES
+from bench_scale import dataset
+
+
+def stitched_itinerary(dal, passenger_id):
+    flights = {f.id: f for f in dal.list_flights()}
+    airports = {a.id: a.code for a in dal.list_airports()}
+    legs = []
+    for b in dal.list_bookings():
+        if b.passenger_id == passenger_id:
+            f = flights[b.flight_id]
+            legs.append((b, f, airports[f.departure_airport_id], airports[f.arrival_airport_id]))
+    return sorted(legs, key=lambda leg: leg[1].departure_time)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="10k,100k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--stitched-up-to", default="100k", help="Skip the slow baseline above this scale")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    scales = args.scales.split(",")
+    for scale in scales:
+        db_path = dataset(scale, args.seed)
+        dal = DAL(db_path)
+        with sqlite3.connect(db_path) as conn:
+            by_activity = conn.execute(
+                "SELECT passenger_id, COUNT(*) AS n FROM booking GROUP BY passenger_id ORDER BY n").fetchall()
+        passengers = {"median": by_activity[len(by_activity) // 2], "busiest": by_activity[-1]}
+        bench = Bench("itinerary", scale=scale)
+        for label, (passenger_id, bookings) in passengers.items():
+            result = bench.run(f"itinerary[{label}]", lambda: dal.get_passenger_itinerary(passenger_id),
+                               args.repeat, bookings=bookings)
+            bench.run(f"itinerary_upcoming[{label}]",
+                      lambda: dal.get_passenger_itinerary(passenger_id, "upcoming"), args.repeat)
+            if SCALES[scale] <= SCALES[args.stitched_up_to]:
+                baseline = bench.run(f"stitched[{label}]", lambda: stitched_itinerary(dal, passenger_id), 3)
+                if result.get("min") and baseline.get("min"):
+                    bench.record(f"speedup[{label}]", speedup=round(baseline["min"] / result["min"], 1))
+        if not args.no_save:
+            bench.save()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Schedule-change notifications: set-based fan-out against a per-flight loop, and
+delivery throughput to the memory and file sinks, with and without failures.
+
+Runs on a scratch copy of a bench_scale dataset; --flights flights are retimed
+by 30 minutes through flight updates, so the trigger fills the queue the same
+way a schedule sync would.
+
+    python bench_notifications.py --scale 100k --flights 500
+"""
+import argparse
+import json
+import random
+import sqlite3
+from pathlib import Path
+from src.bench import Bench
+from src.db import apply_schema
+from src.notifications import FileSink, MemorySink, NotificationPipeline
+from bench_scale import dataset
+
+
+def retime(db_path: str, count: int, seed: int = 42) -> None:
+    with sqlite3.connect(db_path) as conn:
+        ids = [flight_id for flight_id, in conn.execute("SELECT id FROM flight")]
+        conn.executemany("""UPDATE flight SET departure_time = datetime(departure_time, '+30 minutes'),
+                            arrival_time = datetime(arrival_time, '+30 minutes') WHERE id = ?""",
+                         [(flight_id,) for flight_id in random.Random(seed).sample(ids, min(count, len(ids)))])
+
+
+def per_flight_fan_out(db_path: str) -> int:
+    """Baseline: for each queued change, look up its passengers and insert their messages one by one."""
+    queued = 0
+    with sqlite3.connect(db_path) as conn:
+        changes = conn.execute("SELECT MIN(seq), flight_id FROM schedule_change GROUP BY flight_id").fetchall()
+        for seq, flight_id in changes:
+            code, dep, arr = conn.execute("SELECT code, departure_time, arrival_time FROM flight WHERE id = ?",
+                                          (flight_id,)).fetchone()
+            for passenger_id, email, ticket_no in conn.execute("""
+                SELECT p.id, p.email, t.ticket_no FROM booking b
+                JOIN ticket t ON t.booking_id = b.id JOIN passenger p ON p.id = b.passenger_id
+                WHERE b.flight_id = ? AND b.status = 'BOOKED'
+            """, (flight_id,)).fetchall():
+                payload = json.dumps(dict(flight=code, tickets=[ticket_no], departure_time=dep, arrival_time=arr))
+                queued += conn.execute("""INSERT OR IGNORE INTO notification_outbox
+                                          (change_seq, flight_id, passenger_id, email, payload)
+                                          VALUES (?, ?, ?, ?, ?)""",
+                                       (seq, flight_id, passenger_id, email, payload)).rowcount
+        conn.rollback()  # leave the queue and outbox for the real run
+    return queued
+
+
+def reset_outbox(db_path: str) -> None:
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE notification_outbox SET status = 'PENDING', attempts = 0, sent_at = NULL, "
+                     "last_error = NULL, next_attempt_at = '0'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="100k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--flights", type=int, default=500, help="Flights retimed before the fan-out")
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--fail-rate", type=float, default=0.2, help="Failure share for the flaky sink")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    source = dataset(args.scale, args.seed)
+    scratch = Path(source).with_suffix(".notify.db")
+    outfile = Path(source).with_suffix(".notify.jsonl")
+    with sqlite3.connect(source) as src, sqlite3.connect(scratch) as dst:
+        src.backup(dst)
+    apply_schema(str(scratch))
+    try:
+        bench = Bench("notifications", scale=args.scale, flights=args.flights, batch=args.batch)
+        retime(str(scratch), args.flights)
+        pipeline = NotificationPipeline(str(scratch))
+        bench.run("fan_out[per-flight loop]", lambda: per_flight_fan_out(str(scratch)), 1)
+        result = {}
+        bench.run("fan_out[insert-select]", lambda: result.update(pipeline.fan_out()), 1)
+        bench.record("queued", changes=result["changes"], changed_flights=result["flights"],
+                     messages=result["queued"])
+
+        for label, make_sink in (("memory", MemorySink), ("file", lambda: FileSink(str(outfile))),
+                                 (f"memory[fail {args.fail_rate}]", lambda: MemorySink(args.fail_rate, seed=1))):
+            reset_outbox(str(scratch))
+            stats = pipeline.deliver(make_sink(), batch_size=args.batch, retry_seconds=0)
+            bench.record(f"deliver[{label}]", **stats)
+        assert pipeline.stats()["pending"] == 0, "deliver() left due messages behind"
+    finally:
+        for path in (f"{scratch}", f"{scratch}-wal", f"{scratch}-shm", outfile):
+            Path(path).unlink(missing_ok=True)
+    if not args.no_save:
+        bench.save()
+
+
+if __name__ == "__main__":
+    main()
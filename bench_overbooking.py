@@ -0,0 +1,80 @@
+"""Overbooking optimizer: show-rate pass, recommend/apply over every upcoming flight,
+and what the booking-limit lookup adds to each booking.
+
+Runs on a scratch copy of a bench_scale dataset. Bookings are timed once with
+no stored limits (hard cabin capacity) and once after apply().
+
+    python bench_overbooking.py --scale 100k --as-of 2025-06-01 --bookings 2000
+"""
+import argparse
+import itertools
+import sqlite3
+from pathlib import Path
+from src.bench import Bench
+from src.dal import DAL
+from src.db import apply_schema
+from src.overbooking import OverbookingOptimizer, booking_limit
+from src.seat_holds import SeatHoldManager, SoldOut
+from bench_scale import dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="100k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--as-of", default="2025-06-01")
+    parser.add_argument("--bookings", type=int, default=2000, help="Bookings timed with and without limits")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    source = dataset(args.scale, args.seed)
+    scratch = Path(source).with_suffix(".overbook.db")
+    with sqlite3.connect(source) as src, sqlite3.connect(scratch) as dst:
+        src.backup(dst)
+    apply_schema(str(scratch))
+    try:
+        bench = Bench("overbooking", scale=args.scale, as_of=args.as_of)
+        optimizer = OverbookingOptimizer(str(scratch))
+        bench.run("show_rates", lambda: optimizer.show_rates(args.as_of), args.repeat)
+
+        def cold():
+            booking_limit.cache_clear()
+            return optimizer.recommend(args.as_of)
+
+        bench.run("recommend[cold limits]", cold, args.repeat)
+        bench.run("recommend[warm limits]", lambda: optimizer.recommend(args.as_of), args.repeat)
+        bench.run("apply", lambda: optimizer.apply(args.as_of), args.repeat)
+        limits = optimizer.recommend(args.as_of)
+        bench.record("limits", cabins=len(limits), overbooked=sum(1 for r in limits if r.overbook),
+                     extra_seats=sum(r.overbook for r in limits))
+
+        dal, holds = DAL(str(scratch)), SeatHoldManager(str(scratch))
+        flights = itertools.cycle(sorted({r.flight_id for r in limits}))
+        counter = itertools.count()
+
+        def book_batch():
+            done = 0
+            for _ in range(args.bookings):
+                n = next(counter)
+                passenger = dal.create_passenger("Bench Overbook", f"overbook{n}@bench.invalid")
+                try:
+                    holds.book(passenger, next(flights), "ECONOMY", 100.0)
+                    done += 1
+                except SoldOut:
+                    pass
+            return done
+
+        optimizer.clear()
+        bench.run(f"book[{args.bookings}, capacity]", book_batch, 1, bookings=args.bookings)
+        optimizer.apply(args.as_of)
+        bench.run(f"book[{args.bookings}, limits]", book_batch, 1, bookings=args.bookings)
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{scratch}{suffix}").unlink(missing_ok=True)
+    if not args.no_save:
+        bench.save()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Connection profile matrix: every DAL/Analytics read plus a write mix under each db.PROFILES entry.
+
+Profiles with a non-default page_size get their own dataset generated at that page size.
+
+    python bench_profiles.py --scale 100k
+"""
+import argparse
+import itertools
+import sqlite3
+from pathlib import Path
+from src import db
+from src.analytics import Analytics
+from src.bench import Bench
+from src.dal import DAL
+from src.datagen import generate
+from bench_scale import DATA_DIR, read_benchmarks
+
+
+def dataset(scale, seed, page_size):
+    path = DATA_DIR / f"airline_{scale}_s{seed}_p{page_size}.db"
+    if not path.exists():
+        DATA_DIR.mkdir(exist_ok=True)
+        generate(str(path), scale, seed)
+    return str(path)
+
+
+def write_benchmarks(bench, dal, repeat):
+    n = itertools.count()
+    flight_id = dal.list_flights()[0].id
+    bench.run("create_passenger", lambda: dal.create_passenger("Bench", f"profile{next(n)}@example.com"), repeat)
+    bench.run("create_booking", lambda: dal.create_booking(
+        dal.create_passenger("Bench", f"profile{next(n)}@example.com"), flight_id, "ECONOMY", 100.0), repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="100k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--profiles", default=",".join(db.PROFILES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    for profile in args.profiles.split(","):
+        db.set_profile(profile)
+        page_size = db.PROFILES[profile].get("page_size", 4096)
+        path = dataset(args.scale, args.seed, page_size)
+        bench = Bench("profiles", scale=args.scale, profile=profile, page_size=page_size)
+        read_benchmarks(bench, DAL(path), Analytics(path), args.repeat)
+        scratch = Path(path).with_suffix(".scratch.db")
+        with sqlite3.connect(path) as src, sqlite3.connect(scratch) as dst:
+            src.backup(dst)
+        write_benchmarks(bench, DAL(str(scratch)), args.repeat * 20)
+        scratch.unlink()
+        for suffix in ("-wal", "-shm"):
+            Path(f"{scratch}{suffix}").unlink(missing_ok=True)
+        if not args.no_save:
+            bench.save()
+
+
+if __name__ == "__main__":
+    main()
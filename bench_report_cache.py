@@ -0,0 +1,61 @@
+"""Report cache: uncached vs cached latency, and hit rate for a dashboard poll loop with interleaved writes.
+
+    python bench_report_cache.py --scale 100k --polls 200 --write-every 10
+"""
+import argparse
+import itertools
+import sqlite3
+from pathlib import Path
+from src.bench import Bench
+from src.dal import DAL
+from src.db import apply_schema
+from src.report_cache import ReportCache
+from bench_scale import dataset
+
+DASHBOARD = [(name, dict(limit=10)) for name in ("top-passengers", "revenue-rankings", "route-load-factors")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="100k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--polls", type=int, default=200)
+    parser.add_argument("--write-every", type=int, default=10, help="Create a passenger every N polls")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    source = dataset(args.scale, args.seed)
+    scratch = Path(source).with_suffix(".cache.db")
+    with sqlite3.connect(source) as src, sqlite3.connect(scratch) as dst:
+        src.backup(dst)
+    apply_schema(str(scratch))  # bench datasets are generated without the version triggers
+    try:
+        bench = Bench("report_cache", scale=args.scale)
+        cache = ReportCache(str(scratch), path=None)
+        for name, kwargs in DASHBOARD:
+            bench.run(f"uncached[{name}]", lambda: (cache.clear(), cache.run(name, **kwargs)), args.repeat)
+            cache.run(name, **kwargs)
+            bench.run(f"cached[{name}]", lambda: cache.run(name, **kwargs), args.repeat * 100)
+
+        # passenger inserts only invalidate reports that read the passenger table
+        dal, n = DAL(str(scratch)), itertools.count()
+        cache.clear()
+        for poll in range(args.polls):
+            if poll % args.write_every == 0:
+                dal.create_passenger("Bench", f"cache{next(n)}@example.com")
+            for name, kwargs in DASHBOARD:
+                cache.run(name, **kwargs)
+        stats = cache.stats()
+        bench.record("poll_loop", polls=args.polls, write_every=args.write_every,
+                     **{k: stats[k] for k in ("hits", "misses", "stale", "hit_rate")})
+        print(stats)
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{scratch}{suffix}").unlink(missing_ok=True)
+    if not args.no_save:
+        bench.save()
+
+
+if __name__ == "__main__":
+    main()
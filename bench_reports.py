@@ -0,0 +1,59 @@
+"""Parallel report fan-out: serial vs process pool, with and without flight-id sharding.
+
+Every parallel result is checked against the serial one before timings are recorded.
+
+    python bench_reports.py --scale 100k --workers 1 2 4 --shards 1 4
+"""
+import argparse
+import os
+from src.bench import Bench
+from src.reports import REPORTS, ParallelReports
+from bench_scale import dataset
+
+
+def _same_ranking(name, a, b):
+    """Compare the ranked values of two results; ties may come back in either order."""
+    order = REPORTS[name].order
+    if len(a) != len(b):
+        return False
+    for x, y in zip(a, b):
+        u, v = getattr(x, order), getattr(y, order)
+        if isinstance(u, float) or isinstance(v, float):
+            if abs(u - v) > 1e-6 * max(1.0, abs(u)):
+                return False
+        elif u != v:
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="100k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    db_path = str(dataset(args.scale, args.seed))
+    bench = Bench("reports", scale=args.scale, cores=os.cpu_count())
+    limit = 1000
+    serial = ParallelReports(db_path).run_serial(limit=limit)
+    base = bench.run("serial", lambda: ParallelReports(db_path).run_serial(limit=limit), args.repeat)
+    for workers in args.workers:
+        for shards in args.shards:
+            reports = ParallelReports(db_path, workers, shards)
+            result = reports.run(limit=limit)
+            mismatched = [name for name in REPORTS if not _same_ranking(name, result[name], serial[name])]
+            assert not mismatched, f"parallel results differ from serial: {mismatched}"
+            timing = bench.run(f"parallel[w={workers},s={shards}]", lambda: reports.run(limit=limit), args.repeat,
+                               workers=workers, shards=shards)
+            timing["speedup"] = round(base["min"] / timing["min"], 2) if timing.get("min") else None
+            print(f"{'':<60} speedup x{timing['speedup']} on {os.cpu_count()} cores")
+    if not args.no_save:
+        bench.save()
+
+
+if __name__ == "__main__":
+    main()
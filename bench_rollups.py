@@ -0,0 +1,56 @@
+"""Revenue rollup: strftime GROUP BY over booking vs series cut from revenue_daily.
+
+Runs on a scratch copy of a bench_scale dataset (the rollup is backfilled
+first); the monthly series is checked against Analytics.revenue_by_month.
+
+    python bench_rollups.py --scale 100k
+"""
+import argparse
+import sqlite3
+from pathlib import Path
+from src.analytics import Analytics
+from src.bench import Bench
+from src.db import apply_schema
+from src.rollups import GRANULARITIES, RevenueRollup
+from bench_scale import dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="100k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--window", type=int, default=3)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    source = dataset(args.scale, args.seed)
+    scratch = Path(source).with_suffix(".rollup.db")
+    with sqlite3.connect(source) as src, sqlite3.connect(scratch) as dst:
+        src.backup(dst)
+    apply_schema(str(scratch))
+    try:
+        bench = Bench("rollups", scale=args.scale)
+        rollup = RevenueRollup(str(scratch))
+        bench.run("rebuild", rollup.rebuild, 1)
+
+        exact = {r.month: r.total_revenue for r in Analytics(str(scratch)).revenue_by_month()}
+        series = {p.period: p.revenue for p in rollup.series("month") if p.bookings}
+        assert exact.keys() == series.keys() and all(abs(exact[m] - series[m]) < 0.01 for m in exact), \
+            "monthly rollup differs from revenue_by_month"
+
+        bench.run("exact[revenue_by_month]", Analytics(str(scratch)).revenue_by_month, args.repeat)
+        bench.run("cold[month]", lambda: RevenueRollup(str(scratch)).series("month"), args.repeat)
+        for granularity in GRANULARITIES:
+            bench.run(f"warm[{granularity}]", lambda: rollup.series(granularity, window=args.window, yoy=True),
+                      args.repeat * 20, window=args.window)
+        bench.run("warm[month,class=FIRST]", lambda: rollup.series("month", ticket_class="FIRST"), args.repeat * 20)
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{scratch}{suffix}").unlink(missing_ok=True)
+    if not args.no_save:
+        bench.save()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Bytes per row of DAL results: per-row dicts (the old DAL) vs NamedTuple records.
+
+    python bench_rows.py --scale 100k
+"""
+import argparse
+import sqlite3
+import tracemalloc
+from bench_scale import dataset
+from src.bench import Bench
+from src.dal import DAL
+
+QUERIES = {
+    "list_passengers": "SELECT id, name, email FROM passenger",
+    "list_flights": """SELECT id, code, departure_airport_id, arrival_airport_id,
+                              departure_time, arrival_time, aircraft_id, base_price FROM flight""",
+    "list_bookings": """SELECT b.id, b.passenger_id, b.flight_id, b.status, b.booked_at, b.price,
+                               t.ticket_no, t.seat_no, t.class
+                        FROM booking b LEFT JOIN ticket t ON b.id = t.booking_id""",
+    "list_tickets": "SELECT id, booking_id, ticket_no, seat_no, class FROM ticket",
+}
+
+
+def measure(fn):
+    tracemalloc.start()
+    rows = fn()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="10k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    path = dataset(args.scale, args.seed)
+    dal = DAL(path)
+    bench = Bench("rows", scale=args.scale)
+    for name, sql in QUERIES.items():
+        def as_dicts():
+            with sqlite3.connect(path) as conn:
+                cur = conn.execute(sql)
+                keys = [d[0] for d in cur.description]
+                return [dict(zip(keys, row)) for row in cur.fetchall()]
+
+        dict_bytes, n = measure(as_dicts)
+        record_bytes, _ = measure(getattr(dal, name))
+        bench.record(name, rows=n,
+                     dict_bytes_per_row=round(dict_bytes / max(n, 1), 1),
+                     record_bytes_per_row=round(record_bytes / max(n, 1), 1),
+                     saving=f"{1 - record_bytes / max(dict_bytes, 1):.0%}")
+        bench.run(f"{name}.records", getattr(dal, name), 3)
+    if not args.no_save:
+        bench.save()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Time every DAL CRUD/report method and Analytics query against generated datasets.
+
+    python bench_scale.py --scales 10k,1m,10m
+    python -m src.bench --base <old commit>     # compare with an earlier run
+"""
+import argparse
+import itertools
+import sqlite3
+import string
+from pathlib import Path
+from src.analytics import Analytics
+from src.bench import Bench
+from src.config import BASE_DIR
+from src.dal import DAL
+from src.datagen import generate
+
+DATA_DIR = BASE_DIR / "bench_data"
+
+
+def dataset(scale, seed):
+    """Generated databases are cached per scale/seed, they take a while at 10m."""
+    path = DATA_DIR / f"airline_{scale}_s{seed}.db"
+    if not path.exists():
+        DATA_DIR.mkdir(exist_ok=True)
+        generate(str(path), scale, seed)
+    return str(path)
+
+
+def crud_benchmarks(bench, dal, repeat):
+    n = itertools.count()
+    airport_id = dal.list_airports()[0].id
+    other_airport_id = dal.list_airports()[1].id
+    aircraft_id = dal.list_aircraft()[0].id
+    passenger_id = dal.create_passenger("Bench Anchor", "bench.anchor@example.com")
+    flight_id = dal.create_flight("BENCH0", airport_id, other_airport_id,
+                                  "2030-01-01T08:00:00", "2030-01-01T10:00:00", aircraft_id, 100.0)
+    crew_id = dal.create_crew_member("Bench Crew", "Pilot")
+
+    # Passenger
+    bench.run("create_passenger", lambda: dal.create_passenger("Bench", f"bench{next(n)}@example.com"), repeat)
+    bench.run("update_passenger", lambda: dal.update_passenger(passenger_id, name=f"Bench {next(n)}"), repeat)
+    bench.run("delete_passenger",
+              lambda: dal.delete_passenger(dal.create_passenger("Gone", f"gone{next(n)}@example.com")), repeat)
+    # Airport / aircraft
+    taken = {a.code for a in dal.list_airports()}
+    free_codes = ("".join(c) for c in itertools.product(string.ascii_uppercase, repeat=3) if "".join(c) not in taken)
+    bench.run("create_airport", lambda: dal.create_airport(next(free_codes), "Bench", "Bench", "UK"), repeat)
+    bench.run("update_airport", lambda: dal.update_airport(airport_id, city=f"City {next(n)}"), repeat)
+    bench.run("create_aircraft", lambda: dal.create_aircraft(f"Bench {next(n)}", 100), repeat)
+    bench.run("update_aircraft", lambda: dal.update_aircraft(aircraft_id, capacity=100 + next(n) % 50), repeat)
+    # Flight
+    bench.run("create_flight", lambda: dal.create_flight(
+        f"BENCH{next(n)}", airport_id, other_airport_id,
+        "2030-01-02T08:00:00", "2030-01-02T10:00:00", aircraft_id, 120.0), repeat)
+    bench.run("update_flight", lambda: dal.update_flight(flight_id, base_price=100.0 + next(n)), repeat)
+    # Booking + ticket
+    bench.run("create_booking", lambda: dal.create_booking(
+        dal.create_passenger("Booker", f"booker{next(n)}@example.com"), flight_id, "ECONOMY", 99.0), repeat)
+    bench.run("update_booking", lambda: dal.update_booking(1, price=100.0 + next(n)), repeat)
+    bench.run("update_ticket", lambda: dal.update_ticket(1, seat_no=f"{next(n) % 30 + 1}A"), repeat)
+    # Crew
+    bench.run("create_crew_member", lambda: dal.create_crew_member("Bench", "Cabin Crew"), repeat)
+    bench.run("create_crew_assignment", lambda: dal.create_crew_assignment(
+        crew_id, dal.create_flight(f"BENCHC{next(n)}", airport_id, other_airport_id,
+                                   "2030-01-03T08:00:00", "2030-01-03T10:00:00", aircraft_id, 1.0),
+        "Captain"), repeat)
+
+
+def read_benchmarks(bench, dal, analytics, repeat):
+    for name in ("list_passengers", "list_airports", "list_aircraft", "list_flights", "list_bookings",
+                 "list_tickets", "list_crew_members", "list_crew_assignments"):
+        bench.run(name, getattr(dal, name), repeat)
+    for name in ("top_passengers", "revenue_rankings", "route_load_factors"):
+        bench.run(name, getattr(dal, name), repeat)
+    for name in ("top_routes", "revenue_by_month", "load_factor", "revenue_by_flight"):
+        bench.run(f"analytics.{name}", getattr(analytics, name), repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="10k", help="Comma separated, e.g. 10k,1m,10m")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    for scale in args.scales.split(","):
+        path = dataset(scale, args.seed)
+        # reads of millions of rows are slow enough that one run is representative
+        repeat = args.repeat if scale in ("10k", "100k") else 1
+        bench = Bench("scale", scale=scale, seed=args.seed)
+        read_benchmarks(bench, DAL(path), Analytics(path), repeat)
+        # CRUD runs on a scratch copy so the cached dataset stays pristine
+        scratch = Path(path).with_suffix(".scratch.db")
+        with sqlite3.connect(path) as src, sqlite3.connect(scratch) as dst:
+            src.backup(dst)
+        crud_benchmarks(bench, DAL(str(scratch)), args.repeat)
+        scratch.unlink()
+        if not args.no_save:
+            bench.save()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Schedule sync: export, diff and apply a season file with a small share of changes,
+against reloading every flight.
+
+Uses the bench_fleet season (no faults) on a scratch copy; the changed file
+has --changes of its flights updated, dropped or added in equal parts.
+
+    python bench_schedule.py --aircraft 200 --legs 1000 --changes 0.01
+"""
+import argparse
+import csv
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+from src.bench import Bench
+from src.schedule import COLUMNS, ScheduleSync, read_schedule
+from bench_fleet import DATA_DIR, build_season_db
+
+
+def changed_file(source: str, target: str, share: float, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    rows = [list(row) for row in read_schedule(source).values()]
+    picked = rng.sample(range(len(rows)), int(len(rows) * share))
+    third = len(picked) // 3
+    for i in picked[:third]:  # retime by 15 minutes
+        for col in (3, 4):
+            rows[i][col] = (datetime.fromisoformat(rows[i][col]) + timedelta(minutes=15)).isoformat()
+    added = [[f"NW{n:07d}"] + rows[i][1:] for n, i in enumerate(picked[third:2 * third])]
+    dropped = set(picked[2 * third:])
+    with open(target, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(COLUMNS)
+        writer.writerows(row for i, row in enumerate(rows) if i not in dropped)
+        writer.writerows(added)
+
+
+def full_reload(db_path: str, path: str) -> int:
+    """Baseline: replace every flight from the file in one transaction."""
+    rows = list(read_schedule(path).values())
+    with sqlite3.connect(db_path) as conn:
+        airports = dict(conn.execute("SELECT code, id FROM airport"))
+        conn.execute("DELETE FROM flight")
+        conn.executemany("""INSERT INTO flight (code, departure_airport_id, arrival_airport_id, departure_time,
+                            arrival_time, aircraft_id, base_price) VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                         [(code, airports[o], airports[d], dep, arr, aircraft, price)
+                          for code, o, d, dep, arr, aircraft, price in rows])
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--aircraft", type=int, default=200)
+    parser.add_argument("--legs", type=int, default=1000, help="Legs per aircraft")
+    parser.add_argument("--changes", type=float, default=0.01, help="Share of flights changed in the new file")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    source = DATA_DIR / f"fleet_{args.aircraft}x{args.legs}_f0.0_s0.db"
+    if not source.exists():
+        DATA_DIR.mkdir(exist_ok=True)
+        build_season_db(str(source), args.aircraft, args.legs, 0.0, 0)
+    scratch = source.with_suffix(".schedule.db")
+    base, changed = source.with_suffix(".csv"), source.with_suffix(".changed.csv")
+    with sqlite3.connect(source) as src, sqlite3.connect(scratch) as dst:
+        src.backup(dst)
+    try:
+        bench = Bench("schedule", scale=f"{args.aircraft}x{args.legs}", changes=args.changes)
+        sync = ScheduleSync(str(scratch))
+        bench.run("export", lambda: sync.export(str(base)), 1)
+        changed_file(str(base), str(changed), args.changes)
+        bench.run("read_schedule", lambda: read_schedule(str(changed)), 3)
+        bench.run("sync[dry-run]", lambda: sync.sync(str(changed), dry_run=True), 3)
+        result = {}
+        bench.run("sync[apply]", lambda: result.update(sync.sync(str(changed), limit=0)), 1)
+        bench.record("change set", **{k: result[k] for k in ("inserted", "updated", "deleted", "unchanged")})
+        again = sync.sync(str(changed), dry_run=True)
+        assert again["inserted"] == again["updated"] == again["deleted"] == 0, "second sync still sees changes"
+        bench.run("full reload", lambda: full_reload(str(scratch), str(changed)), 1)
+    finally:
+        for path in (f"{scratch}", f"{scratch}-wal", f"{scratch}-shm", base, changed):
+            Path(path).unlink(missing_ok=True)
+    if not args.no_save:
+        bench.save()
+
+
+if __name__ == "__main__":
+    main()
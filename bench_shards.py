@@ -0,0 +1,76 @@
+"""Aggregate booking throughput as the same data is split over more shards.
+
+Each run splits a bench_scale dataset into N shard files, then W writer
+processes book random passengers onto random flights for a fixed time. With
+one file every commit queues for the same write lock; with N files writers
+only contend when they hit the same shard.
+
+    python bench_shards.py --scale 100k --shards 1,2,4,8 --writers 8 --seconds 10
+"""
+import argparse
+import random
+import shutil
+import sqlite3
+import time
+from multiprocessing import get_context
+from src.bench import Bench
+from src.sharding import ShardedDAL, split
+from bench_scale import DATA_DIR, dataset
+
+
+def _writer(root, seconds, seed, passengers, flights):
+    rng = random.Random(seed)
+    dal = ShardedDAL(root)
+    booked = duplicates = 0
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            dal.create_booking(rng.choice(passengers), rng.choice(flights), "ECONOMY", 100.0)
+        except sqlite3.IntegrityError:  # passenger already on that flight
+            duplicates += 1
+            continue
+        booked += 1
+        latencies.append(time.perf_counter() - started)
+    return booked, duplicates, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="10k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--shards", default="1,2,4,8")
+    parser.add_argument("--key", default="region")
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    source = dataset(args.scale, args.seed)
+    with sqlite3.connect(source) as conn:
+        passengers = [row[0] for row in conn.execute("SELECT id FROM passenger")]
+        flights = [row[0] for row in conn.execute("SELECT id FROM flight")]
+    bench = Bench("shards", scale=args.scale, key=args.key, writers=args.writers)
+    for count in map(int, args.shards.split(",")):
+        root = DATA_DIR / f"shards_{args.scale}_{count}"
+        shutil.rmtree(root, ignore_errors=True)
+        layout = split(source, str(root), count, args.key)
+        with get_context("spawn").Pool(args.writers) as pool:
+            results = pool.starmap(_writer, [(str(root), args.seconds, w, passengers, flights)
+                                             for w in range(args.writers)])
+        booked = sum(r[0] for r in results)
+        latencies = sorted(l for r in results for l in r[2])
+        largest = max(s["flights"] for s in layout["shards"]) / len(flights)
+        bench.record(f"bookings[{count}]", shards=count, bookings=booked,
+                     bookings_per_s=round(booked / args.seconds, 1),
+                     p50_ms=round(latencies[len(latencies) // 2] * 1000, 2) if latencies else None,
+                     p99_ms=round(latencies[int(len(latencies) * 0.99)] * 1000, 2) if latencies else None,
+                     largest_shard_share=round(largest, 2), duplicates=sum(r[1] for r in results))
+        shutil.rmtree(root)
+    if not args.no_save:
+        bench.save()
+
+
+if __name__ == "__main__":
+    main()
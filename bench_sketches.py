@@ -0,0 +1,85 @@
+"""Approximate vs exact analytics: query latency, top-k recall, count error and sketch size.
+
+Runs on a scratch copy of a bench_scale dataset; also times folding a batch
+of new bookings into the sketches.
+
+    python bench_sketches.py --scale 100k --limit 10 --bookings 2000
+"""
+import argparse
+import itertools
+import sqlite3
+import statistics
+from pathlib import Path
+from src.analytics import Analytics
+from src.approx import ApproxAnalytics
+from src.bench import Bench
+from src.dal import DAL
+from src.db import apply_schema
+from bench_scale import dataset
+
+
+def _accuracy(exact, approx, key, value):
+    """Recall of the exact top-k keys, and mean relative error of the estimates for keys in both."""
+    truth = {key(r): value(r) for r in exact}
+    estimates = {key(r): value(r) for r in approx}
+    shared = [k for k in truth if k in estimates]
+    errors = [abs(estimates[k] - truth[k]) / truth[k] for k in shared if truth[k]]
+    return dict(recall=round(len(shared) / len(truth), 3) if truth else None,
+                mean_rel_error=round(statistics.fmean(errors), 4) if errors else 0.0,
+                max_rel_error=round(max(errors), 4) if errors else 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="100k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--bookings", type=int, default=2000, help="New bookings folded in by the refresh timing")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    source = dataset(args.scale, args.seed)
+    scratch = Path(source).with_suffix(".sketch.db")
+    with sqlite3.connect(source) as src, sqlite3.connect(scratch) as dst:
+        src.backup(dst)
+    apply_schema(str(scratch))  # bench datasets are generated without the sketch triggers
+    try:
+        bench = Bench("sketches", scale=args.scale, limit=args.limit)
+        dal, analytics, approx = DAL(str(scratch)), Analytics(str(scratch)), ApproxAnalytics(str(scratch))
+        bench.run("rebuild", approx.rebuild, 1)
+
+        cases = [
+            ("top_routes", lambda: analytics.top_routes(args.limit), lambda: approx.top_routes(args.limit),
+             lambda r: r.route, lambda r: r.bookings),
+            ("top_passengers", lambda: dal.top_passengers(args.limit), lambda: approx.top_passengers(args.limit),
+             lambda r: r.id, lambda r: r.total_bookings),
+            ("distinct_passengers", lambda: analytics.distinct_passengers(args.limit),
+             lambda: approx.distinct_passengers(args.limit),
+             lambda r: (r.route, r.month), lambda r: r.passengers),
+            ("distinct_passengers_all_months", lambda: analytics.distinct_passengers(args.limit, by_month=False),
+             lambda: approx.distinct_passengers(args.limit, by_month=False),
+             lambda r: r.route, lambda r: r.passengers),
+        ]
+        for name, exact_fn, approx_fn, key, value in cases:
+            exact_t = bench.run(f"exact[{name}]", exact_fn, args.repeat)
+            approx_t = bench.run(f"approx[{name}]", approx_fn, args.repeat * 20)
+            bench.record(f"accuracy[{name}]", speedup=round(exact_t["median"] / approx_t["median"], 1),
+                         **_accuracy(exact_fn(), approx_fn(), key, value))
+
+        flights = [f.id for f in dal.list_flights()[:200]]
+        n = itertools.count()
+        for i in range(args.bookings):
+            passenger_id = dal.create_passenger("Bench", f"sketch{next(n)}@example.com")
+            dal.create_booking(passenger_id, flights[i % len(flights)], "ECONOMY", 100.0)
+        bench.run(f"refresh[{args.bookings} bookings]", approx.refresh, 1)
+        bench.record("size", **{k: v for k, v in approx.stats().items() if k not in ("seq", "pending_deltas")})
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{scratch}{suffix}").unlink(missing_ok=True)
+    if not args.no_save:
+        bench.save()
+
+
+if __name__ == "__main__":
+    main()
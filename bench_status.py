@@ -0,0 +1,79 @@
+"""Report queries on a mostly dead booking table, with and without the live-booking partial indexes.
+
+Work is measured as SQLite VM steps (via a progress handler) alongside wall time.
+
+    python bench_status.py --scale 100k
+"""
+import argparse
+import sqlite3
+from pathlib import Path
+from src.analytics import Analytics
+from src.bench import Bench
+from src.config import BASE_DIR
+from src import dal as dal_module
+from src.dal import DAL
+from src.datagen import Generator, SCALES
+
+DATA_DIR = BASE_DIR / "bench_data"
+PARTIAL_INDEXES = ("idx_booking_live_flight", "idx_booking_live_passenger", "idx_booking_live_booked_at")
+
+
+def vm_steps(fn):
+    """Run fn() while counting VM instructions on every connection sqlite3 opens."""
+    steps = [0]
+    original = sqlite3.connect
+
+    def counting_connect(*args, **kwargs):
+        conn = original(*args, **kwargs)
+        conn.set_progress_handler(lambda: steps.__setitem__(0, steps[0] + 1) or 0, 1000)
+        return conn
+
+    # the DAL imported connect by name, so patch that reference as well
+    sqlite3.connect = dal_module.connect = counting_connect
+    try:
+        fn()
+    finally:
+        sqlite3.connect = dal_module.connect = original
+    return steps[0] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="100k")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    path = DATA_DIR / f"airline_{args.scale}_dead80.db"
+    if not path.exists():
+        DATA_DIR.mkdir(exist_ok=True)
+        bookings = SCALES[args.scale] if args.scale in SCALES else int(args.scale)
+        Generator(bookings, cancel_rate=0.5, expired_rate=0.3).write(str(path))
+
+    dal, analytics = DAL(str(path)), Analytics(str(path))
+    queries = {
+        "top_passengers": dal.top_passengers,
+        "revenue_rankings": dal.revenue_rankings,
+        "route_load_factors": dal.route_load_factors,
+        "analytics.top_routes": analytics.top_routes,
+        "analytics.revenue_by_month": analytics.revenue_by_month,
+        "analytics.load_factor": analytics.load_factor,
+        "analytics.revenue_by_flight": analytics.revenue_by_flight,
+    }
+    bench = Bench("status", scale=args.scale)
+    for variant in ("partial", "none"):
+        if variant == "none":
+            with sqlite3.connect(path) as conn:
+                for name in PARTIAL_INDEXES:
+                    conn.execute(f"DROP INDEX IF EXISTS {name}")
+        for name, fn in queries.items():
+            result = bench.run(f"{name}[{variant}]", fn, args.repeat)
+            result["vm_steps"] = vm_steps(fn)
+            print(f"{'':<60} vm steps {result['vm_steps']:,}")
+    Path(path).unlink()  # indexes were dropped, regenerate next time
+    if not args.no_save:
+        bench.save()
+
+
+if __name__ == "__main__":
+    main()
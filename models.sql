@@ -42,10 +42,11 @@ CREATE TABLE IF NOT EXISTS booking (
   id           INTEGER PRIMARY KEY AUTOINCREMENT,
   passenger_id INTEGER NOT NULL REFERENCES passenger(id) ON DELETE RESTRICT,
   flight_id    INTEGER NOT NULL REFERENCES flight(id) ON DELETE RESTRICT,
-  status       TEXT NOT NULL CHECK (status IN ('BOOKED','CANCELLED')),
+  -- lifecycle: HELD -> BOOKED -> CANCELLED -> REFUNDED, HELD -> EXPIRED/CANCELLED
+  status       TEXT NOT NULL CHECK (status IN ('HELD','BOOKED','CANCELLED','REFUNDED','EXPIRED')),
   booked_at    TEXT NOT NULL DEFAULT (datetime('now')),
   price        REAL NOT NULL CHECK (price >= 0),
-  UNIQUE(passenger_id, flight_id) -- no duplicate bookings per passenger
+  hold_expires_at TEXT -- set while status = 'HELD'
 );
 
 CREATE TABLE IF NOT EXISTS ticket (
@@ -70,6 +71,650 @@ CREATE TABLE IF NOT EXISTS crew_assignment (
   UNIQUE(crew_member_id, flight_id) -- avoid duplicate assignment
 );
 
+-- ==========================
+-- Named sequences (ticket numbers are reserved from here in blocks)
+-- ==========================
+CREATE TABLE IF NOT EXISTS sequence (
+  name       TEXT PRIMARY KEY,
+  next_value INTEGER NOT NULL CHECK (next_value > 0)
+);
+
+-- ==========================
+-- Pricing: booked seats per flight, kept current by triggers
+-- ==========================
+CREATE TABLE IF NOT EXISTS fare_bucket (
+  flight_id    INTEGER PRIMARY KEY REFERENCES flight(id) ON DELETE CASCADE,
+  booked_seats INTEGER NOT NULL DEFAULT 0 CHECK (booked_seats >= 0)
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_fare_bucket_flight_insert
+AFTER INSERT ON flight
+BEGIN
+  INSERT OR IGNORE INTO fare_bucket (flight_id, booked_seats) VALUES (NEW.id, 0);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fare_bucket_ticket_insert
+AFTER INSERT ON ticket
+BEGIN
+  INSERT INTO fare_bucket (flight_id, booked_seats)
+  SELECT flight_id, 1 FROM booking WHERE id = NEW.booking_id AND status IN ('HELD','BOOKED')
+  ON CONFLICT (flight_id) DO UPDATE SET booked_seats = booked_seats + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fare_bucket_ticket_delete
+AFTER DELETE ON ticket
+BEGIN
+  UPDATE fare_bucket SET booked_seats = MAX(booked_seats - 1, 0)
+  WHERE flight_id = (SELECT flight_id FROM booking WHERE id = OLD.booking_id AND status IN ('HELD','BOOKED'));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fare_bucket_booking_status
+AFTER UPDATE OF status ON booking
+WHEN (OLD.status IN ('HELD','BOOKED')) <> (NEW.status IN ('HELD','BOOKED'))
+BEGIN
+  UPDATE fare_bucket
+  SET booked_seats = MAX(booked_seats
+      + (CASE WHEN NEW.status IN ('HELD','BOOKED') THEN 1 ELSE -1 END)
+        * (SELECT COUNT(*) FROM ticket WHERE booking_id = NEW.id), 0)
+  WHERE flight_id = NEW.flight_id;
+END;
+
+-- ==========================
+-- Seat inventory: seats held or booked per flight and cabin class
+-- ==========================
+CREATE TABLE IF NOT EXISTS seat_inventory (
+  flight_id INTEGER NOT NULL REFERENCES flight(id) ON DELETE CASCADE,
+  class     TEXT NOT NULL CHECK (class IN ('ECONOMY','BUSINESS','FIRST')),
+  taken     INTEGER NOT NULL DEFAULT 0 CHECK (taken >= 0),
+  PRIMARY KEY (flight_id, class)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_seat_inventory_ticket_insert
+AFTER INSERT ON ticket
+BEGIN
+  INSERT INTO seat_inventory (flight_id, class, taken)
+  SELECT flight_id, NEW.class, 1 FROM booking WHERE id = NEW.booking_id AND status IN ('HELD','BOOKED')
+  ON CONFLICT (flight_id, class) DO UPDATE SET taken = taken + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_seat_inventory_ticket_delete
+AFTER DELETE ON ticket
+BEGIN
+  UPDATE seat_inventory SET taken = MAX(taken - 1, 0)
+  WHERE class = OLD.class
+    AND flight_id = (SELECT flight_id FROM booking WHERE id = OLD.booking_id AND status IN ('HELD','BOOKED'));
+END;
+
+-- a ticket moved to another cabin or booking frees its old seat and takes one in the new cabin
+CREATE TRIGGER IF NOT EXISTS trg_seat_inventory_ticket_update
+AFTER UPDATE OF class, booking_id ON ticket
+WHEN OLD.class IS NOT NEW.class OR OLD.booking_id IS NOT NEW.booking_id
+BEGIN
+  UPDATE seat_inventory SET taken = MAX(taken - 1, 0)
+  WHERE class = OLD.class
+    AND flight_id = (SELECT flight_id FROM booking WHERE id = OLD.booking_id AND status IN ('HELD','BOOKED'));
+  INSERT INTO seat_inventory (flight_id, class, taken)
+  SELECT flight_id, NEW.class, 1 FROM booking WHERE id = NEW.booking_id AND status IN ('HELD','BOOKED')
+  ON CONFLICT (flight_id, class) DO UPDATE SET taken = taken + 1;
+END;
+
+-- status changes on the same flight; a booking moved to another flight is handled by the trigger below
+DROP TRIGGER IF EXISTS trg_seat_inventory_booking_status;
+CREATE TRIGGER trg_seat_inventory_booking_status
+AFTER UPDATE OF status ON booking
+WHEN (OLD.status IN ('HELD','BOOKED')) <> (NEW.status IN ('HELD','BOOKED')) AND OLD.flight_id = NEW.flight_id
+BEGIN
+  UPDATE seat_inventory
+  SET taken = MAX(taken
+      + (CASE WHEN NEW.status IN ('HELD','BOOKED') THEN 1 ELSE -1 END)
+        * (SELECT COUNT(*) FROM ticket WHERE booking_id = NEW.id AND ticket.class = seat_inventory.class), 0)
+  WHERE flight_id = NEW.flight_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_seat_inventory_booking_flight
+AFTER UPDATE OF flight_id ON booking
+WHEN OLD.flight_id <> NEW.flight_id
+BEGIN
+  UPDATE seat_inventory
+  SET taken = MAX(taken - (SELECT COUNT(*) FROM ticket WHERE booking_id = OLD.id AND ticket.class = seat_inventory.class), 0)
+  WHERE OLD.status IN ('HELD','BOOKED') AND flight_id = OLD.flight_id;
+  INSERT INTO seat_inventory (flight_id, class, taken)
+  SELECT NEW.flight_id, class, COUNT(*) FROM ticket WHERE booking_id = NEW.id AND NEW.status IN ('HELD','BOOKED')
+  GROUP BY class
+  ON CONFLICT (flight_id, class) DO UPDATE SET taken = taken + excluded.taken;
+END;
+
+-- ==========================
+-- Overbooking: bookings accepted per flight and cabin when above capacity (written by OverbookingOptimizer.apply)
+-- ==========================
+CREATE TABLE IF NOT EXISTS overbooking_limit (
+  flight_id     INTEGER NOT NULL REFERENCES flight(id) ON DELETE CASCADE,
+  class         TEXT NOT NULL CHECK (class IN ('ECONOMY','BUSINESS','FIRST')),
+  booking_limit INTEGER NOT NULL CHECK (booking_limit >= 0),
+  PRIMARY KEY (flight_id, class)
+) WITHOUT ROWID;
+
+-- Limits are seat counts for the aircraft they were computed for: a tail swap or a capacity
+-- change drops them, so the cabin falls back to hard capacity until the next overbooking --apply
+CREATE TRIGGER IF NOT EXISTS trg_overbooking_limit_flight_aircraft
+AFTER UPDATE OF aircraft_id ON flight
+WHEN OLD.aircraft_id IS NOT NEW.aircraft_id
+BEGIN
+  DELETE FROM overbooking_limit WHERE flight_id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_overbooking_limit_aircraft_capacity
+AFTER UPDATE OF capacity ON aircraft
+WHEN OLD.capacity IS NOT NEW.capacity
+BEGIN
+  DELETE FROM overbooking_limit WHERE flight_id IN (SELECT id FROM flight WHERE aircraft_id = NEW.id);
+END;
+
+-- ==========================
+-- Revenue rollup: live (BOOKED) revenue and bookings per booking day, flight and cabin class
+-- ==========================
+CREATE TABLE IF NOT EXISTS revenue_daily (
+  day       TEXT NOT NULL, -- date(booking.booked_at)
+  flight_id INTEGER NOT NULL REFERENCES flight(id) ON DELETE CASCADE,
+  class     TEXT NOT NULL CHECK (class IN ('ECONOMY','BUSINESS','FIRST')),
+  revenue   REAL NOT NULL DEFAULT 0,
+  bookings  INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (day, flight_id, class)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_revenue_daily_ticket_insert
+AFTER INSERT ON ticket
+BEGIN
+  INSERT INTO revenue_daily (day, flight_id, class, revenue, bookings)
+  SELECT date(booked_at), flight_id, NEW.class, price, 1 FROM booking WHERE id = NEW.booking_id AND status = 'BOOKED'
+  ON CONFLICT (day, flight_id, class) DO UPDATE
+  SET revenue = revenue + excluded.revenue, bookings = bookings + 1;
+END;
+
+-- a ticket deleted by the booking's ON DELETE CASCADE finds no booking here; the booking trigger below counts it
+CREATE TRIGGER IF NOT EXISTS trg_revenue_daily_ticket_delete
+AFTER DELETE ON ticket
+BEGIN
+  UPDATE revenue_daily
+  SET revenue = revenue - (SELECT price FROM booking WHERE id = OLD.booking_id), bookings = bookings - 1
+  WHERE class = OLD.class
+    AND (day, flight_id) = (SELECT date(booked_at), flight_id FROM booking WHERE id = OLD.booking_id AND status = 'BOOKED');
+END;
+
+-- a ticket moved to another cabin or booking: its fare leaves the old row and joins the new one
+CREATE TRIGGER IF NOT EXISTS trg_revenue_daily_ticket_update
+AFTER UPDATE OF class, booking_id ON ticket
+WHEN OLD.class IS NOT NEW.class OR OLD.booking_id IS NOT NEW.booking_id
+BEGIN
+  UPDATE revenue_daily
+  SET revenue = revenue - (SELECT price FROM booking WHERE id = OLD.booking_id), bookings = bookings - 1
+  WHERE class = OLD.class
+    AND (day, flight_id) = (SELECT date(booked_at), flight_id FROM booking WHERE id = OLD.booking_id AND status = 'BOOKED');
+  INSERT INTO revenue_daily (day, flight_id, class, revenue, bookings)
+  SELECT date(booked_at), flight_id, NEW.class, price, 1 FROM booking WHERE id = NEW.booking_id AND status = 'BOOKED'
+  ON CONFLICT (day, flight_id, class) DO UPDATE
+  SET revenue = revenue + excluded.revenue, bookings = bookings + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_revenue_daily_booking_delete
+BEFORE DELETE ON booking
+WHEN OLD.status = 'BOOKED'
+BEGIN
+  UPDATE revenue_daily SET revenue = revenue - OLD.price, bookings = bookings - 1
+  WHERE day = date(OLD.booked_at) AND flight_id = OLD.flight_id
+    AND class IN (SELECT class FROM ticket WHERE booking_id = OLD.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_revenue_daily_booking_update
+AFTER UPDATE OF status, price, booked_at, flight_id ON booking
+WHEN OLD.status = 'BOOKED' OR NEW.status = 'BOOKED'
+BEGIN
+  UPDATE revenue_daily SET revenue = revenue - OLD.price, bookings = bookings - 1
+  WHERE OLD.status = 'BOOKED' AND day = date(OLD.booked_at) AND flight_id = OLD.flight_id
+    AND class IN (SELECT class FROM ticket WHERE booking_id = OLD.id);
+  INSERT INTO revenue_daily (day, flight_id, class, revenue, bookings)
+  SELECT date(NEW.booked_at), NEW.flight_id, class, NEW.price, 1 FROM ticket WHERE booking_id = NEW.id AND NEW.status = 'BOOKED'
+  ON CONFLICT (day, flight_id, class) DO UPDATE
+  SET revenue = revenue + excluded.revenue, bookings = bookings + 1;
+END;
+
+-- ==========================
+-- Booking lifecycle (mirrors booking_lifecycle.TRANSITIONS)
+-- ==========================
+CREATE TRIGGER IF NOT EXISTS trg_booking_status_transition
+BEFORE UPDATE OF status ON booking
+WHEN NEW.status <> OLD.status AND NOT (
+     (OLD.status = 'HELD'      AND NEW.status IN ('BOOKED','CANCELLED','EXPIRED'))
+  OR (OLD.status = 'BOOKED'    AND NEW.status IN ('CANCELLED','REFUNDED'))
+  OR (OLD.status = 'CANCELLED' AND NEW.status = 'REFUNDED'))
+BEGIN
+  SELECT RAISE(ABORT, 'invalid booking status transition');
+END;
+
+-- ==========================
+-- Passenger search: external-content FTS5 index over passenger(name, email)
+-- ==========================
+CREATE VIRTUAL TABLE IF NOT EXISTS passenger_fts USING fts5(
+  name, email,
+  content = 'passenger', content_rowid = 'id',
+  prefix = '2 3' -- short prefix queries ("sa*", "mal*") read a prefix index instead of scanning terms
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_passenger_fts_insert
+AFTER INSERT ON passenger
+BEGIN
+  INSERT INTO passenger_fts (rowid, name, email) VALUES (NEW.id, NEW.name, NEW.email);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_passenger_fts_delete
+AFTER DELETE ON passenger
+BEGIN
+  INSERT INTO passenger_fts (passenger_fts, rowid, name, email) VALUES ('delete', OLD.id, OLD.name, OLD.email);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_passenger_fts_update
+AFTER UPDATE OF name, email ON passenger
+BEGIN
+  INSERT INTO passenger_fts (passenger_fts, rowid, name, email) VALUES ('delete', OLD.id, OLD.name, OLD.email);
+  INSERT INTO passenger_fts (rowid, name, email) VALUES (NEW.id, NEW.name, NEW.email);
+END;
+
+-- ==========================
+-- Change data capture: append-only log of row changes for downstream consumers
+-- ==========================
+CREATE TABLE IF NOT EXISTS change_log (
+  seq        INTEGER PRIMARY KEY AUTOINCREMENT, -- monotonic, never reused after compaction
+  table_name TEXT NOT NULL,
+  op         TEXT NOT NULL CHECK (op IN ('INSERT','UPDATE','DELETE')),
+  row_id     INTEGER NOT NULL,
+  data       TEXT NOT NULL, -- JSON row image (after the change; before it for DELETE)
+  changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+-- last sequence number each named consumer has processed
+CREATE TABLE IF NOT EXISTS change_consumer (
+  name       TEXT PRIMARY KEY,
+  last_seq   INTEGER NOT NULL DEFAULT 0,
+  updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+-- capture triggers (UPDATE triggers skip statements that change nothing)
+CREATE TRIGGER IF NOT EXISTS trg_cdc_booking_insert
+AFTER INSERT ON booking
+BEGIN
+  INSERT INTO change_log (table_name, op, row_id, data)
+  VALUES ('booking', 'INSERT', NEW.id, json_object(
+    'id', NEW.id, 'passenger_id', NEW.passenger_id, 'flight_id', NEW.flight_id,
+    'status', NEW.status, 'booked_at', NEW.booked_at, 'price', NEW.price,
+    'hold_expires_at', NEW.hold_expires_at));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_cdc_booking_update
+AFTER UPDATE ON booking
+WHEN OLD.passenger_id IS NOT NEW.passenger_id OR OLD.flight_id IS NOT NEW.flight_id OR OLD.status IS NOT NEW.status
+  OR OLD.booked_at IS NOT NEW.booked_at OR OLD.price IS NOT NEW.price OR OLD.hold_expires_at IS NOT NEW.hold_expires_at
+BEGIN
+  INSERT INTO change_log (table_name, op, row_id, data)
+  VALUES ('booking', 'UPDATE', NEW.id, json_object(
+    'id', NEW.id, 'passenger_id', NEW.passenger_id, 'flight_id', NEW.flight_id,
+    'status', NEW.status, 'booked_at', NEW.booked_at, 'price', NEW.price,
+    'hold_expires_at', NEW.hold_expires_at));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_cdc_booking_delete
+AFTER DELETE ON booking
+BEGIN
+  INSERT INTO change_log (table_name, op, row_id, data)
+  VALUES ('booking', 'DELETE', OLD.id, json_object(
+    'id', OLD.id, 'passenger_id', OLD.passenger_id, 'flight_id', OLD.flight_id,
+    'status', OLD.status, 'booked_at', OLD.booked_at, 'price', OLD.price,
+    'hold_expires_at', OLD.hold_expires_at));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_cdc_flight_insert
+AFTER INSERT ON flight
+BEGIN
+  INSERT INTO change_log (table_name, op, row_id, data)
+  VALUES ('flight', 'INSERT', NEW.id, json_object(
+    'id', NEW.id, 'code', NEW.code, 'departure_airport_id', NEW.departure_airport_id,
+    'arrival_airport_id', NEW.arrival_airport_id, 'departure_time', NEW.departure_time, 'arrival_time', NEW.arrival_time,
+    'aircraft_id', NEW.aircraft_id, 'base_price', NEW.base_price));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_cdc_flight_update
+AFTER UPDATE ON flight
+WHEN OLD.code IS NOT NEW.code OR OLD.departure_airport_id IS NOT NEW.departure_airport_id OR OLD.arrival_airport_id IS NOT NEW.arrival_airport_id
+  OR OLD.departure_time IS NOT NEW.departure_time OR OLD.arrival_time IS NOT NEW.arrival_time OR OLD.aircraft_id IS NOT NEW.aircraft_id
+  OR OLD.base_price IS NOT NEW.base_price
+BEGIN
+  INSERT INTO change_log (table_name, op, row_id, data)
+  VALUES ('flight', 'UPDATE', NEW.id, json_object(
+    'id', NEW.id, 'code', NEW.code, 'departure_airport_id', NEW.departure_airport_id,
+    'arrival_airport_id', NEW.arrival_airport_id, 'departure_time', NEW.departure_time, 'arrival_time', NEW.arrival_time,
+    'aircraft_id', NEW.aircraft_id, 'base_price', NEW.base_price));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_cdc_flight_delete
+AFTER DELETE ON flight
+BEGIN
+  INSERT INTO change_log (table_name, op, row_id, data)
+  VALUES ('flight', 'DELETE', OLD.id, json_object(
+    'id', OLD.id, 'code', OLD.code, 'departure_airport_id', OLD.departure_airport_id,
+    'arrival_airport_id', OLD.arrival_airport_id, 'departure_time', OLD.departure_time, 'arrival_time', OLD.arrival_time,
+    'aircraft_id', OLD.aircraft_id, 'base_price', OLD.base_price));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_cdc_passenger_insert
+AFTER INSERT ON passenger
+BEGIN
+  INSERT INTO change_log (table_name, op, row_id, data)
+  VALUES ('passenger', 'INSERT', NEW.id, json_object(
+    'id', NEW.id, 'name', NEW.name, 'email', NEW.email));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_cdc_passenger_update
+AFTER UPDATE ON passenger
+WHEN OLD.name IS NOT NEW.name OR OLD.email IS NOT NEW.email
+BEGIN
+  INSERT INTO change_log (table_name, op, row_id, data)
+  VALUES ('passenger', 'UPDATE', NEW.id, json_object(
+    'id', NEW.id, 'name', NEW.name, 'email', NEW.email));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_cdc_passenger_delete
+AFTER DELETE ON passenger
+BEGIN
+  INSERT INTO change_log (table_name, op, row_id, data)
+  VALUES ('passenger', 'DELETE', OLD.id, json_object(
+    'id', OLD.id, 'name', OLD.name, 'email', OLD.email));
+END;
+
+-- Retention: entries older than max_age_seconds are pruned on the write path, read or not,
+-- so the log stays bounded even when nobody runs compact-changes (NULL keeps everything).
+-- Every 1000th entry deletes up to 2000 of the oldest, a short primary-key range.
+CREATE TABLE IF NOT EXISTS change_log_retention (
+  id              INTEGER PRIMARY KEY CHECK (id = 1),
+  max_age_seconds INTEGER CHECK (max_age_seconds > 0)
+);
+
+INSERT OR IGNORE INTO change_log_retention (id, max_age_seconds) VALUES (1, 7 * 86400);
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_retention
+AFTER INSERT ON change_log
+WHEN NEW.seq % 1000 = 0
+BEGIN
+  DELETE FROM change_log
+  WHERE seq IN (SELECT seq FROM change_log ORDER BY seq LIMIT 2000)
+    AND changed_at < (SELECT strftime('%Y-%m-%dT%H:%M:%f', 'now', '-' || max_age_seconds || ' seconds')
+                      FROM change_log_retention WHERE id = 1);
+END;
+
+-- ==========================
+-- Data versions: per-table change counters for the report cache and the crew scheduler
+-- ==========================
+CREATE TABLE IF NOT EXISTS data_version (
+  table_name TEXT PRIMARY KEY,
+  version    INTEGER NOT NULL DEFAULT 0
+);
+
+-- '*epoch' is random per database file, so a regenerated database never reuses old versions
+INSERT OR IGNORE INTO data_version (table_name, version) VALUES
+  ('*epoch', abs(random())),
+  ('airport', 0),
+  ('aircraft', 0),
+  ('passenger', 0),
+  ('flight', 0),
+  ('booking', 0),
+  ('ticket', 0),
+  ('crew_assignment', 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_version_airport_insert
+AFTER INSERT ON airport
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'airport';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_airport_update
+AFTER UPDATE ON airport
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'airport';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_airport_delete
+AFTER DELETE ON airport
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'airport';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_aircraft_insert
+AFTER INSERT ON aircraft
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'aircraft';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_aircraft_update
+AFTER UPDATE ON aircraft
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'aircraft';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_aircraft_delete
+AFTER DELETE ON aircraft
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'aircraft';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_passenger_insert
+AFTER INSERT ON passenger
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'passenger';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_passenger_update
+AFTER UPDATE ON passenger
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'passenger';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_passenger_delete
+AFTER DELETE ON passenger
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'passenger';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_flight_insert
+AFTER INSERT ON flight
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'flight';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_flight_update
+AFTER UPDATE ON flight
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'flight';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_flight_delete
+AFTER DELETE ON flight
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'flight';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_booking_insert
+AFTER INSERT ON booking
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'booking';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_booking_update
+AFTER UPDATE ON booking
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'booking';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_booking_delete
+AFTER DELETE ON booking
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'booking';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_ticket_insert
+AFTER INSERT ON ticket
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'ticket';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_ticket_update
+AFTER UPDATE ON ticket
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'ticket';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_ticket_delete
+AFTER DELETE ON ticket
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'ticket';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_crew_assignment_insert
+AFTER INSERT ON crew_assignment
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'crew_assignment';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_crew_assignment_update
+AFTER UPDATE ON crew_assignment
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'crew_assignment';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_crew_assignment_delete
+AFTER DELETE ON crew_assignment
+BEGIN
+  UPDATE data_version SET version = version + 1 WHERE table_name = 'crew_assignment';
+END;
+
+-- ==========================
+-- Sketches: persisted approximate-analytics state and the booking deltas not yet folded in
+-- ==========================
+CREATE TABLE IF NOT EXISTS sketch (
+  name       TEXT PRIMARY KEY,
+  data       BLOB NOT NULL,        -- zlib-compressed sketch
+  seq        INTEGER NOT NULL,     -- last sketch_delta.seq folded into this row
+  updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+-- +1 when a booking becomes BOOKED, -1 when it stops being BOOKED. Deltas are only queued
+-- once sketches exist (the first approx-report builds them from booking), so databases
+-- that never use approximate reports pay one lookup on sketch per booking write and nothing else.
+CREATE TABLE IF NOT EXISTS sketch_delta (
+  seq          INTEGER PRIMARY KEY AUTOINCREMENT,
+  passenger_id INTEGER NOT NULL,
+  flight_id    INTEGER NOT NULL,
+  delta        INTEGER NOT NULL
+);
+
+DROP TRIGGER IF EXISTS trg_sketch_booking_insert;
+CREATE TRIGGER trg_sketch_booking_insert
+AFTER INSERT ON booking
+WHEN NEW.status = 'BOOKED' AND EXISTS (SELECT 1 FROM sketch)
+BEGIN
+  INSERT INTO sketch_delta (passenger_id, flight_id, delta) VALUES (NEW.passenger_id, NEW.flight_id, 1);
+END;
+
+DROP TRIGGER IF EXISTS trg_sketch_booking_update;
+CREATE TRIGGER trg_sketch_booking_update
+AFTER UPDATE OF status, passenger_id, flight_id ON booking
+WHEN (OLD.status = 'BOOKED' OR NEW.status = 'BOOKED') AND EXISTS (SELECT 1 FROM sketch)
+BEGIN
+  INSERT INTO sketch_delta (passenger_id, flight_id, delta)
+  SELECT OLD.passenger_id, OLD.flight_id, -1 WHERE OLD.status = 'BOOKED'
+  UNION ALL
+  SELECT NEW.passenger_id, NEW.flight_id, 1 WHERE NEW.status = 'BOOKED';
+END;
+
+DROP TRIGGER IF EXISTS trg_sketch_booking_delete;
+CREATE TRIGGER trg_sketch_booking_delete
+AFTER DELETE ON booking
+WHEN OLD.status = 'BOOKED' AND EXISTS (SELECT 1 FROM sketch)
+BEGIN
+  INSERT INTO sketch_delta (passenger_id, flight_id, delta) VALUES (OLD.passenger_id, OLD.flight_id, -1);
+END;
+
+-- Sketches nobody refreshes are dropped once 100000 deltas are waiting: queuing stops and the
+-- next approx-report rebuilds from booking. Checked every 1000th delta (refresh's own 0 delta is exempt).
+CREATE TRIGGER IF NOT EXISTS trg_sketch_delta_cap
+AFTER INSERT ON sketch_delta
+WHEN NEW.seq % 1000 = 0 AND NEW.delta <> 0 AND NEW.seq - (SELECT MAX(seq) FROM sketch) > 100000
+BEGIN
+  DELETE FROM sketch;
+  DELETE FROM sketch_delta;
+END;
+
+-- ==========================
+-- Passenger notifications: schedule changes queued by trigger, fanned out to an outbox
+-- ==========================
+-- one row per changed flight, holding its image before the first change since the last fan-out:
+-- later changes only move the flight further from that image, so they add nothing and the
+-- queue never holds more rows than there are flights, however long notify goes unrun
+CREATE TABLE IF NOT EXISTS schedule_change (
+  seq                  INTEGER PRIMARY KEY AUTOINCREMENT,
+  flight_id            INTEGER NOT NULL,
+  code                 TEXT NOT NULL,
+  departure_airport_id INTEGER NOT NULL,
+  arrival_airport_id   INTEGER NOT NULL,
+  departure_time       TEXT NOT NULL,
+  arrival_time         TEXT NOT NULL,
+  changed_at           TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_schedule_change_flight ON schedule_change (flight_id);
+
+DROP TRIGGER IF EXISTS trg_schedule_change_flight_update;
+CREATE TRIGGER trg_schedule_change_flight_update
+AFTER UPDATE OF code, departure_airport_id, arrival_airport_id, departure_time, arrival_time ON flight
+WHEN (OLD.code IS NOT NEW.code OR OLD.departure_airport_id IS NOT NEW.departure_airport_id
+  OR OLD.arrival_airport_id IS NOT NEW.arrival_airport_id OR OLD.departure_time IS NOT NEW.departure_time
+  OR OLD.arrival_time IS NOT NEW.arrival_time)
+  AND NOT EXISTS (SELECT 1 FROM schedule_change WHERE flight_id = OLD.id)
+BEGIN
+  INSERT INTO schedule_change (flight_id, code, departure_airport_id, arrival_airport_id, departure_time, arrival_time)
+  VALUES (OLD.id, OLD.code, OLD.departure_airport_id, OLD.arrival_airport_id, OLD.departure_time, OLD.arrival_time);
+END;
+
+-- a deleted flight with booked passengers is a change too (fanned out as a cancellation);
+-- one nobody is booked on leaves nothing to tell, so its queued change goes with it
+CREATE TRIGGER IF NOT EXISTS trg_schedule_change_flight_delete
+AFTER DELETE ON flight
+BEGIN
+  DELETE FROM schedule_change
+  WHERE flight_id = OLD.id AND NOT EXISTS (SELECT 1 FROM booking WHERE flight_id = OLD.id AND status = 'BOOKED');
+  INSERT INTO schedule_change (flight_id, code, departure_airport_id, arrival_airport_id, departure_time, arrival_time)
+  SELECT OLD.id, OLD.code, OLD.departure_airport_id, OLD.arrival_airport_id, OLD.departure_time, OLD.arrival_time
+  WHERE NOT EXISTS (SELECT 1 FROM schedule_change WHERE flight_id = OLD.id)
+    AND EXISTS (SELECT 1 FROM booking WHERE flight_id = OLD.id AND status = 'BOOKED');
+END;
+
+-- messages waiting for (or done with) delivery; one per schedule change and passenger
+CREATE TABLE IF NOT EXISTS notification_outbox (
+  id              INTEGER PRIMARY KEY AUTOINCREMENT,
+  change_seq      INTEGER NOT NULL,
+  flight_id       INTEGER NOT NULL,
+  passenger_id    INTEGER NOT NULL,
+  email           TEXT NOT NULL,
+  payload         TEXT NOT NULL, -- JSON message
+  status          TEXT NOT NULL DEFAULT 'PENDING' CHECK (status IN ('PENDING','SENT','FAILED')),
+  attempts        INTEGER NOT NULL DEFAULT 0,
+  next_attempt_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+  last_error      TEXT,
+  created_at      TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+  sent_at         TEXT,
+  UNIQUE(change_seq, passenger_id) -- fanning the same change out twice queues nothing new
+);
+
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_due
+  ON notification_outbox (next_attempt_at) WHERE status = 'PENDING';
+
 -- ==========================
 -- Simple RBAC (authentication/authorisation)
 -- ==========================
@@ -81,20 +726,68 @@ CREATE TABLE IF NOT EXISTS user (
   role          TEXT NOT NULL CHECK (role IN ('ADMIN','STAFF','CUSTOMER'))
 );
 
+-- Short-lived login sessions for the CLI: `login` issues a token, later calls present it
+-- instead of a password. Only a SHA-256 of the token is stored.
+CREATE TABLE IF NOT EXISTS user_session (
+  token_hash TEXT PRIMARY KEY,
+  user_id    INTEGER NOT NULL REFERENCES user(id) ON DELETE CASCADE,
+  expires_at TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_user_session_user ON user_session (user_id);
+
+-- A new password, role or name ends every session the user had open
+CREATE TRIGGER IF NOT EXISTS trg_user_session_revoke
+AFTER UPDATE OF username, password_hash, role ON user
+WHEN NEW.username IS NOT OLD.username OR NEW.password_hash IS NOT OLD.password_hash OR NEW.role IS NOT OLD.role
+BEGIN
+  DELETE FROM user_session WHERE user_id = NEW.id;
+END;
+
+-- the FK cascade only runs on connections with foreign_keys on, and the DAL's are not
+CREATE TRIGGER IF NOT EXISTS trg_user_session_user_delete
+AFTER DELETE ON user
+BEGIN
+  DELETE FROM user_session WHERE user_id = OLD.id;
+END;
+
 -- ==========================
 -- Indexes (performance)
 -- ==========================
 CREATE INDEX IF NOT EXISTS idx_flight_dep_arr_date
   ON flight (departure_airport_id, arrival_airport_id, date(departure_time));
 
+-- per-aircraft timelines (fleet-check / fleet-plan) read legs in this order
+CREATE INDEX IF NOT EXISTS idx_flight_aircraft_departure
+  ON flight (aircraft_id, departure_time);
+
 CREATE INDEX IF NOT EXISTS idx_booking_passenger
   ON booking (passenger_id);
 
 CREATE INDEX IF NOT EXISTS idx_booking_flight
   ON booking (flight_id, passenger_id);
 
-CREATE INDEX IF NOT EXISTS idx_ticket_booking
-  ON ticket (booking_id);
+-- one live (held or booked) booking per passenger and flight
+CREATE UNIQUE INDEX IF NOT EXISTS uq_booking_active_passenger_flight
+  ON booking (passenger_id, flight_id) WHERE status IN ('HELD','BOOKED');
+
+-- partial indexes: reports only ever read live bookings
+-- (status is repeated as a column so the planner treats them as covering)
+CREATE INDEX IF NOT EXISTS idx_booking_live_flight
+  ON booking (flight_id, price, status) WHERE status = 'BOOKED';
+
+CREATE INDEX IF NOT EXISTS idx_booking_live_passenger
+  ON booking (passenger_id, status) WHERE status = 'BOOKED';
+
+CREATE INDEX IF NOT EXISTS idx_booking_live_booked_at
+  ON booking (booked_at, price, status) WHERE status = 'BOOKED';
+
+CREATE INDEX IF NOT EXISTS idx_booking_hold_expiry
+  ON booking (hold_expires_at) WHERE status = 'HELD';
+
+-- covering: itinerary lookups read tickets straight from the index; also serves booking_id lookups
+CREATE INDEX IF NOT EXISTS idx_ticket_booking_itinerary
+  ON ticket (booking_id, ticket_no, seat_no, class);
 
 CREATE INDEX IF NOT EXISTS idx_crew_assignment_flight
   ON crew_assignment (flight_id);
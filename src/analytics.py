@@ -1,67 +1,89 @@
-from typing import Iterable, Dict
-from .db import connect
+from typing import List, Optional, Tuple
+from .db import connect, flight_range_filter
 from .config import DB_PATH
+from .records import RouteVolume, MonthRevenue, FlightLoadFactor, FlightRevenueTotal, RouteDistinct, fetch_all
 
 
 class Analytics:
-    def __init__(self, db_path: str = DB_PATH):
+    def __init__(self, db_path: str = DB_PATH, read_only: bool = False):
         self.db_path = db_path
+        self.read_only = read_only
 
     # 1. Top routes by passenger volume
-    def top_routes(self, limit: int = 5) -> Iterable[Dict]:
-        with connect(self.db_path) as conn:
-            rows = conn.execute("""
+    def top_routes(self, limit: int = 5, flight_range: Optional[Tuple[int, int]] = None) -> List[RouteVolume]:
+        in_range, params = flight_range_filter("b.flight_id", flight_range)
+        with connect(self.db_path, self.read_only) as conn:
+            return fetch_all(conn, RouteVolume, f"""
                 SELECT dep.code || ' → ' || arr.code AS route,
                        COUNT(b.id) AS bookings
                 FROM booking b
                 JOIN flight f ON b.flight_id = f.id
                 JOIN airport dep ON dep.id = f.departure_airport_id
                 JOIN airport arr ON arr.id = f.arrival_airport_id
-                WHERE b.status = 'BOOKED'
+                WHERE b.status = 'BOOKED' AND {in_range}
                 GROUP BY route
                 ORDER BY bookings DESC
                 LIMIT ?
-            """, (limit,)).fetchall()
-            return [dict(r) for r in rows]
+            """, params + (limit,))
 
     # 2. Monthly revenue totals
-    def revenue_by_month(self) -> Iterable[Dict]:
-        with connect(self.db_path) as conn:
-            rows = conn.execute("""
+    def revenue_by_month(self, flight_range: Optional[Tuple[int, int]] = None) -> List[MonthRevenue]:
+        in_range, params = flight_range_filter("flight_id", flight_range)
+        with connect(self.db_path, self.read_only) as conn:
+            return fetch_all(conn, MonthRevenue, f"""
                 SELECT strftime('%Y-%m', booked_at) AS month,
                        SUM(price) AS total_revenue
                 FROM booking
-                WHERE status = 'BOOKED'
+                WHERE status = 'BOOKED' AND {in_range}
                 GROUP BY month
                 ORDER BY month ASC
-            """).fetchall()
-            return [dict(r) for r in rows]
+            """, params)
 
     # 3. Load factor per flight (booked seats / capacity)
-    def load_factor(self) -> Iterable[Dict]:
-        with connect(self.db_path) as conn:
-            rows = conn.execute("""
+    def load_factor(self, flight_range: Optional[Tuple[int, int]] = None) -> List[FlightLoadFactor]:
+        in_range, params = flight_range_filter("f.id", flight_range)
+        with connect(self.db_path, self.read_only) as conn:
+            return fetch_all(conn, FlightLoadFactor, f"""
                 SELECT f.code AS flight,
                        COALESCE(COUNT(t.id) * 1.0 / a.capacity, 0) AS load_factor
                 FROM flight f
                 JOIN aircraft a ON f.aircraft_id = a.id
                 LEFT JOIN booking b ON f.id = b.flight_id AND b.status='BOOKED'
                 LEFT JOIN ticket t ON b.id = t.booking_id
+                WHERE {in_range}
                 GROUP BY f.id
                 ORDER BY load_factor DESC
-            """).fetchall()
-            return [dict(r) for r in rows]
+            """, params)
 
     # 4. Revenue by flight
-    def revenue_by_flight(self) -> Iterable[Dict]:
-        with connect(self.db_path) as conn:
-            rows = conn.execute("""
+    def revenue_by_flight(self, flight_range: Optional[Tuple[int, int]] = None) -> List[FlightRevenueTotal]:
+        in_range, params = flight_range_filter("b.flight_id", flight_range)
+        with connect(self.db_path, self.read_only) as conn:
+            return fetch_all(conn, FlightRevenueTotal, f"""
                 SELECT f.code AS flight,
                        SUM(b.price) AS revenue
                 FROM booking b
                 JOIN flight f ON b.flight_id = f.id
-                WHERE b.status = 'BOOKED'
+                WHERE b.status = 'BOOKED' AND {in_range}
                 GROUP BY f.code
                 ORDER BY revenue DESC
-            """).fetchall()
-            return [dict(r) for r in rows]
+            """, params)
+
+    # 5. Distinct passengers per route and departure month
+    def distinct_passengers(self, limit: int = 10, month: Optional[str] = None,
+                            by_month: bool = True) -> List[RouteDistinct]:
+        month_column = "strftime('%Y-%m', f.departure_time)" if by_month or month else "NULL"
+        with connect(self.db_path, self.read_only) as conn:
+            return fetch_all(conn, RouteDistinct, f"""
+                SELECT dep.code || ' → ' || arr.code AS route,
+                       {month_column} AS month,
+                       COUNT(DISTINCT b.passenger_id) AS passengers
+                FROM booking b
+                JOIN flight f ON b.flight_id = f.id
+                JOIN airport dep ON dep.id = f.departure_airport_id
+                JOIN airport arr ON arr.id = f.arrival_airport_id
+                WHERE b.status = 'BOOKED' AND (? IS NULL OR strftime('%Y-%m', f.departure_time) = ?)
+                GROUP BY route, month
+                ORDER BY passengers DESC, route, month
+                LIMIT ?
+            """, (month, month, limit))
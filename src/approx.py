@@ -0,0 +1,256 @@
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+from .config import DB_PATH, SKETCH_WIDTH, SKETCH_DEPTH, SKETCH_HEAVY_HITTERS, SKETCH_HLL_PRECISION
+from .db import bare_connect as connect
+from .records import PassengerBookings, RouteDistinct, RouteVolume
+from .sketches import HeavyHitters, HyperLogLog, pack_blob, unpack_blob
+
+# Triggers in models.sql that queue booking deltas into sketch_delta
+DELTA_TRIGGERS = ("trg_sketch_booking_insert", "trg_sketch_booking_update", "trg_sketch_booking_delete")
+
+# Reports with a sketch-backed estimate (approx-report)
+APPROX_REPORTS = ("top-routes", "top-passengers", "distinct-passengers")
+
+_ROUTE = "dep.code || ' → ' || arr.code"
+
+
+def drop_delta_triggers(conn) -> None:
+    """Remove the sketch_delta triggers (bulk loads); apply_schema() puts them back."""
+    for name in DELTA_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+class ApproxAnalytics:
+    """Approximate top routes, top passengers and distinct passengers per route and month.
+
+    Booking triggers queue +1/-1 deltas in sketch_delta once the sketches have
+    first been built (and stop if 100000 deltas pile up unrefreshed, leaving the
+    next refresh to rebuild); refresh() folds them
+    into Count-Min heavy hitters (routes, passengers) and per route/month
+    HyperLogLogs, and persists the touched sketches in the same transaction
+    that deletes the deltas. Queries refresh first, so they see every
+    committed booking without aggregating the booking table.
+
+    Distinct counts only grow: a passenger whose booking is cancelled stays
+    counted until rebuild(). rebuild() also picks up flights moved to another
+    route, since a flight's route and month are cached when first seen.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, capacity: int = SKETCH_HEAVY_HITTERS, width: int = SKETCH_WIDTH,
+                 depth: int = SKETCH_DEPTH, precision: int = SKETCH_HLL_PRECISION):
+        self.db_path = db_path
+        self.shape = dict(capacity=capacity, width=width, depth=depth)
+        self.precision = precision
+        self._reset()
+        self._flights: Dict[int, Tuple[str, str]] = {}  # flight id -> (route, departure month)
+        self._lock = threading.Lock()
+
+    def _reset(self):
+        self.routes = HeavyHitters(**self.shape)
+        self.passengers = HeavyHitters(**self.shape)
+        self.distinct: Dict[str, Dict[str, HyperLogLog]] = {}
+        self._unions: Dict[str, HyperLogLog] = {}  # route -> union over months, dropped when the route changes
+        self.seq: Optional[int] = None  # last delta folded into the in-memory sketches
+
+    # ----------------------------
+    # Maintenance
+    # ----------------------------
+    def refresh(self) -> int:
+        """Fold pending booking deltas into the sketches; returns how many were applied."""
+        with self._lock:
+            conn = connect(self.db_path, timeout=30, isolation_level=None)
+            try:
+                stored, pending = conn.execute(
+                    "SELECT (SELECT MAX(seq) FROM sketch), EXISTS(SELECT 1 FROM sketch_delta)").fetchone()
+                if stored is not None and not pending and stored == self.seq:
+                    return 0  # nothing new and nobody else has refreshed: no write lock needed
+                conn.execute("BEGIN IMMEDIATE")
+                if not self._load(conn):
+                    self._build(conn)
+                    conn.execute("COMMIT")
+                    return 0
+                deltas = conn.execute(
+                    "SELECT seq, passenger_id, flight_id, delta FROM sketch_delta ORDER BY seq").fetchall()
+                if deltas:
+                    self._apply(conn, deltas)
+                conn.execute("COMMIT")
+                return len(deltas)
+            finally:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                conn.close()
+
+    def rebuild(self) -> Dict:
+        """Recompute every sketch from the booking table and drop pending deltas."""
+        with self._lock:
+            conn = connect(self.db_path, timeout=30, isolation_level=None)
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                self._build(conn)
+                conn.execute("COMMIT")
+            finally:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                conn.close()
+        return self.stats()
+
+    def stats(self) -> Dict:
+        with connect(self.db_path) as conn:
+            stored = conn.execute("SELECT COUNT(*), COALESCE(SUM(length(data)), 0) FROM sketch").fetchone()
+            pending = conn.execute("SELECT COUNT(*) FROM sketch_delta").fetchone()[0]
+        return dict(seq=self.seq, bookings=self.routes.sketch.total, routes=len(self.distinct),
+                    route_months=sum(len(months) for months in self.distinct.values()),
+                    sketches=stored[0], stored_bytes=stored[1], pending_deltas=pending,
+                    width=self.shape["width"], depth=self.shape["depth"], heavy_hitters=self.shape["capacity"],
+                    hll_precision=self.precision)
+
+    # ----------------------------
+    # Reports
+    # ----------------------------
+    def top_routes(self, limit: int = 5) -> List[RouteVolume]:
+        self.refresh()
+        return [RouteVolume(route, count) for route, count in self.routes.top(limit)]
+
+    def top_passengers(self, limit: int = 10) -> List[PassengerBookings]:
+        self.refresh()
+        top = self.passengers.top(limit)
+        with connect(self.db_path) as conn:
+            names = {row[0]: row[1:] for row in conn.execute(
+                "SELECT id, name, email FROM passenger WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps([passenger_id for passenger_id, _ in top]),))}
+        return [PassengerBookings(passenger_id, *names.get(passenger_id, (None, None)), count)
+                for passenger_id, count in top]
+
+    def distinct_passengers(self, limit: int = 10, month: Optional[str] = None,
+                            by_month: bool = True) -> List[RouteDistinct]:
+        """Routes ranked by distinct passengers, per departure month or (by_month=False) over all months."""
+        self.refresh()
+        rows = []
+        for route, months in self.distinct.items():
+            if month is not None:
+                if month in months:
+                    rows.append(RouteDistinct(route, month, months[month].count()))
+            elif by_month:
+                rows.extend(RouteDistinct(route, m, hll.count()) for m, hll in months.items())
+            else:
+                rows.append(RouteDistinct(route, None, self._union(route).count()))
+        rows.sort(key=lambda r: (-r.passengers, r.route, r.month or ""))
+        return rows[:limit]
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+    def _load(self, conn) -> bool:
+        """Pick up sketch rows written since self.seq (by us or another process); False if there are none."""
+        rows = conn.execute("SELECT name, data, seq FROM sketch WHERE seq > ?",
+                            (-1 if self.seq is None else self.seq,)).fetchall()
+        if not rows:
+            # nothing newer; but if the rows are gone (dropped for lack of refreshes) ours are stale too
+            return self.seq is not None and conn.execute("SELECT EXISTS(SELECT 1 FROM sketch)").fetchone()[0]
+        if self.seq is None or any(name == "*build" for name, _, _ in rows):
+            self._reset()
+        for name, data, seq in rows:
+            if name == "routes":
+                self.routes = HeavyHitters.from_bytes(data)
+            elif name == "passengers":
+                self.passengers = HeavyHitters.from_bytes(data)
+            elif name.startswith("distinct:"):
+                route = name[len("distinct:"):]
+                self.distinct[route] = self._months_from_bytes(data)
+                self._unions.pop(route, None)
+            self.seq = max(self.seq or 0, seq)
+        return True
+
+    def _build(self, conn) -> None:
+        self._reset()
+        for route, count in conn.execute(f"""
+            SELECT {_ROUTE}, COUNT(*) FROM booking b
+            JOIN flight f ON f.id = b.flight_id
+            JOIN airport dep ON dep.id = f.departure_airport_id
+            JOIN airport arr ON arr.id = f.arrival_airport_id
+            WHERE b.status = 'BOOKED' GROUP BY 1
+        """):
+            self.routes.add(route, count)
+        for passenger_id, count in conn.execute(
+                "SELECT passenger_id, COUNT(*) FROM booking WHERE status = 'BOOKED' GROUP BY passenger_id"):
+            self.passengers.add(passenger_id, count)
+        for route, month, passenger_id in conn.execute(f"""
+            SELECT DISTINCT {_ROUTE}, strftime('%Y-%m', f.departure_time), b.passenger_id FROM booking b
+            JOIN flight f ON f.id = b.flight_id
+            JOIN airport dep ON dep.id = f.departure_airport_id
+            JOIN airport arr ON arr.id = f.arrival_airport_id
+            WHERE b.status = 'BOOKED'
+        """):
+            self._hll(route, month).add(passenger_id)
+        # a throwaway delta moves sqlite_sequence on, so every reader sees the rebuild as new rows
+        conn.execute("INSERT INTO sketch_delta (passenger_id, flight_id, delta) VALUES (0, 0, 0)")
+        self.seq = conn.execute("SELECT MAX(seq) FROM sketch_delta").fetchone()[0]
+        conn.execute("DELETE FROM sketch_delta")
+        conn.execute("DELETE FROM sketch")
+        self._flights.clear()
+        self._save(conn, self.distinct, build=True)
+
+    def _apply(self, conn, deltas) -> None:
+        self._locate(conn, {flight_id for _, _, flight_id, _ in deltas})
+        touched = set()
+        for _, passenger_id, flight_id, delta in deltas:
+            self.passengers.add(passenger_id, delta)
+            located = self._flights.get(flight_id)
+            if located is None:
+                continue  # flight already deleted
+            route, month = located
+            self.routes.add(route, delta)
+            if delta > 0:
+                self._hll(route, month).add(passenger_id)
+                touched.add(route)
+        self.seq = deltas[-1][0]
+        conn.execute("DELETE FROM sketch_delta WHERE seq <= ?", (self.seq,))
+        self._save(conn, touched)
+
+    def _locate(self, conn, flight_ids) -> None:
+        missing = [flight_id for flight_id in flight_ids if flight_id not in self._flights]
+        if missing:
+            self._flights.update((row[0], row[1:]) for row in conn.execute(f"""
+                SELECT f.id, {_ROUTE}, strftime('%Y-%m', f.departure_time) FROM flight f
+                JOIN airport dep ON dep.id = f.departure_airport_id
+                JOIN airport arr ON arr.id = f.arrival_airport_id
+                WHERE f.id IN (SELECT value FROM json_each(?))
+            """, (json.dumps(missing),)))
+
+    def _union(self, route) -> HyperLogLog:
+        union = self._unions.get(route)
+        if union is None:
+            union = self._unions[route] = HyperLogLog(self.precision)
+            for hll in self.distinct[route].values():
+                union.merge(hll)
+        return union
+
+    def _hll(self, route, month) -> HyperLogLog:
+        self._unions.pop(route, None)
+        months = self.distinct.setdefault(route, {})
+        if month not in months:
+            months[month] = HyperLogLog(self.precision)
+        return months[month]
+
+    def _save(self, conn, routes, build=False) -> None:
+        rows = [("routes", self.routes.to_bytes()), ("passengers", self.passengers.to_bytes())]
+        rows += [(f"distinct:{route}", self._months_to_bytes(self.distinct[route])) for route in routes]
+        if build:
+            rows.append(("*build", b""))  # tells other processes to drop what they hold before loading
+        conn.executemany("""
+            INSERT INTO sketch (name, data, seq) VALUES (?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET data = excluded.data, seq = excluded.seq,
+                                             updated_at = strftime('%Y-%m-%dT%H:%M:%f', 'now')
+        """, [(name, data, self.seq) for name, data in rows])
+
+    def _months_to_bytes(self, months: Dict[str, HyperLogLog]) -> bytes:
+        return pack_blob(dict(precision=self.precision, months=list(months)),
+                     b"".join(bytes(hll.registers) for hll in months.values()))
+
+    @staticmethod
+    def _months_from_bytes(blob: bytes) -> Dict[str, HyperLogLog]:
+        header, payload = unpack_blob(blob)
+        size = 1 << header["precision"]
+        return {month: HyperLogLog(header["precision"], payload[i * size:(i + 1) * size])
+                for i, month in enumerate(header["months"])}
@@ -0,0 +1,194 @@
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from .db import connect
+from .config import (DB_PATH, AUTH_KDF, SCRYPT_N, SCRYPT_R, SCRYPT_P, PBKDF2_ITERATIONS,
+                     AUTH_CACHE_TTL, AUTH_CACHE_SIZE, AUTH_SESSION_TTL)
+
+
+class KDF:
+    """Tunable password hashing. Hashes are stored as 'scheme$params$hex'."""
+
+    def __init__(self, scheme: str = AUTH_KDF, n: int = SCRYPT_N, r: int = SCRYPT_R, p: int = SCRYPT_P,
+                 iterations: int = PBKDF2_ITERATIONS):
+        if scheme not in ("scrypt", "pbkdf2"):
+            raise ValueError(f"Unknown KDF {scheme}")
+        self.scheme = scheme
+        self.n, self.r, self.p = n, r, p
+        self.iterations = iterations
+
+    def params(self) -> str:
+        if self.scheme == "scrypt":
+            return f"scrypt${self.n}${self.r}${self.p}"
+        return f"pbkdf2${self.iterations}"
+
+    def hash(self, password: str, salt: Optional[bytes] = None) -> Tuple[str, bytes]:
+        salt = salt or os.urandom(16)
+        return f"{self.params()}${derive(self.params(), password, salt).hex()}", salt
+
+
+def derive(params: str, password: str, salt: bytes) -> bytes:
+    parts = params.split("$")
+    if parts[0] == "scrypt":
+        n, r, p = (int(x) for x in parts[1:4])
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                              maxmem=256 * n * r + 1024 * 1024, dklen=32)
+    if parts[0] == "pbkdf2":
+        return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, int(parts[1]))
+    raise ValueError(f"Unknown password hash scheme {parts[0]}")
+
+
+def verify_password(password: str, stored, salt) -> bool:
+    """Check a password against any hash format this project has written."""
+    if isinstance(stored, bytes) and len(stored) == 32:
+        # legacy test seed: sha256(salt bytes + password) digest
+        expected = hashlib.sha256(salt + password.encode()).digest()
+        return hmac.compare_digest(stored, expected)
+    if isinstance(stored, bytes):
+        stored = stored.decode()
+    if "$" not in stored:
+        # legacy Services._hash_password: one sha256 round over password + hex salt
+        expected = hashlib.sha256((password + salt).encode()).hexdigest()
+        return hmac.compare_digest(stored, expected)
+    params, _, digest = stored.rpartition("$")
+    if isinstance(salt, str):
+        salt = bytes.fromhex(salt)
+    return hmac.compare_digest(derive(params, password, salt).hex(), digest)
+
+
+class SessionCache:
+    """Bounded LRU of recently verified logins with a short TTL.
+
+    Entries hold an HMAC of the password and the stored hash it was checked
+    against, under a per-process random key, so a cache hit costs one HMAC
+    instead of a full KDF run and no password is kept. Because the stored hash
+    is part of the tag, a password changed by any process (a new hash and salt)
+    no longer matches, without that process having to reach this cache.
+    """
+
+    def __init__(self, ttl: float = AUTH_CACHE_TTL, max_size: int = AUTH_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._key = os.urandom(32)
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def _tag(self, username: str, password: str, stored) -> bytes:
+        if isinstance(stored, str):
+            stored = stored.encode()
+        return hmac.new(self._key, f"{username}\0{password}\0".encode() + stored, hashlib.sha256).digest()
+
+    def get(self, username: str, password: str, stored) -> bool:
+        """True if this password was verified against this stored hash within the TTL."""
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry:
+                tag, expires = entry
+                if expires > time.monotonic() and hmac.compare_digest(tag, self._tag(username, password, stored)):
+                    self._entries.move_to_end(username)
+                    self.hits += 1
+                    return True
+                if expires <= time.monotonic():
+                    del self._entries[username]
+            self.misses += 1
+            return False
+
+    def put(self, username: str, password: str, stored) -> None:
+        with self._lock:
+            self._entries[username] = (self._tag(username, password, stored), time.monotonic() + self.ttl)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username: Optional[str] = None) -> None:
+        with self._lock:
+            if username is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(username, None)
+
+
+# Shared by every Authenticator in the process (e.g. all request handlers of a server)
+session_cache = SessionCache()
+
+
+class Authenticator:
+    def __init__(self, db_path: str = DB_PATH, kdf: Optional[KDF] = None,
+                 cache: Optional[SessionCache] = None):
+        self.db_path = db_path
+        self.kdf = kdf or KDF()
+        self.cache = cache if cache is not None else session_cache
+
+    def hash_password(self, password: str) -> Tuple[str, bytes]:
+        return self.kdf.hash(password)
+
+    def needs_rehash(self, stored) -> bool:
+        if isinstance(stored, bytes):
+            return True
+        return stored.rpartition("$")[0] != self.kdf.params()
+
+    def authenticate(self, username: str, password: str) -> Optional[Dict]:
+        """Return dict(id, username, role) for valid credentials, else None.
+
+        The user row is read on every call (one lookup on the username index),
+        so a cached login never outlives a password change, role change or
+        delete made by another process; only the KDF run is skipped on a hit.
+        Hashes written with other KDF parameters (or legacy schemes) are
+        upgraded in place after a successful login.
+        """
+        with connect(self.db_path) as conn:
+            row = conn.execute("SELECT id, username, password_hash, salt, role FROM user WHERE username=?",
+                               (username,)).fetchone()
+            if not row:
+                return None
+            if not self.cache.get(username, password, row[2]):
+                if not verify_password(password, row[2], row[3]):
+                    return None
+                stored = row[2]
+                if self.needs_rehash(stored):
+                    stored, new_salt = self.hash_password(password)
+                    conn.execute("UPDATE user SET password_hash=?, salt=? WHERE id=?", (stored, new_salt, row[0]))
+                    conn.commit()
+                self.cache.put(username, password, stored)
+        return dict(id=row[0], username=row[1], role=row[4])
+
+    # ----------------------------
+    # Sessions (CLI logins that outlive one process)
+    # ----------------------------
+    @staticmethod
+    def _token_hash(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def open_session(self, user_id: int, ttl: float = AUTH_SESSION_TTL) -> Tuple[str, str]:
+        """Issue a session token for a verified user; returns (token, expires_at)."""
+        token = secrets.token_urlsafe(32)
+        now = datetime.utcnow()
+        expires_at = (now + timedelta(seconds=ttl)).isoformat(timespec="seconds")
+        with connect(self.db_path) as conn:
+            conn.execute("DELETE FROM user_session WHERE expires_at <= ?", (now.isoformat(timespec="seconds"),))
+            conn.execute("INSERT INTO user_session (token_hash, user_id, expires_at) VALUES (?, ?, ?)",
+                         (self._token_hash(token), user_id, expires_at))
+            conn.commit()
+        return token, expires_at
+
+    def session_user(self, token: str) -> Optional[Dict]:
+        """dict(id, username, role) for a live session token, else None; no KDF involved."""
+        with connect(self.db_path) as conn:
+            row = conn.execute("""
+                SELECT u.id, u.username, u.role FROM user_session s JOIN user u ON u.id = s.user_id
+                WHERE s.token_hash = ? AND s.expires_at > ?
+            """, (self._token_hash(token), datetime.utcnow().isoformat(timespec="seconds"))).fetchone()
+        return dict(id=row[0], username=row[1], role=row[2]) if row else None
+
+    def close_session(self, token: str) -> bool:
+        with connect(self.db_path) as conn:
+            cur = conn.execute("DELETE FROM user_session WHERE token_hash = ?", (self._token_hash(token),))
+            conn.commit()
+            return cur.rowcount > 0
@@ -0,0 +1,218 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from .config import DB_PATH, BACKUP_PAGES_PER_STEP, BACKUP_SLEEP, BACKUP_MAX_RESTARTS, BACKUP_COMPRESS_LEVEL
+
+CHUNK = 1 << 20
+WAL_HEADER, WAL_FRAME_HEADER = 32, 24
+# Pages per checksummed block in a manifest; verify_backup() names the damaged blocks' page ranges
+VERIFY_BLOCK_PAGES = 256
+
+
+def wal_frames(db_path: str, page_size: int) -> int:
+    """Frames currently in the database's -wal file (0 when not in WAL mode or checkpointed)."""
+    wal = Path(f"{db_path}-wal")
+    if not wal.exists() or wal.stat().st_size <= WAL_HEADER:
+        return 0
+    return (wal.stat().st_size - WAL_HEADER) // (page_size + WAL_FRAME_HEADER)
+
+
+def manifest_path(backup_path: str) -> Path:
+    return Path(f"{backup_path}.json")
+
+
+def _is_compressed(path: str) -> bool:
+    return str(path).endswith(".gz")
+
+
+def _scan(path: str, block_bytes: int) -> Tuple[Optional[str], List[str]]:
+    """(sha256 of the whole database, sha256 per block) in one pass over a plain or gzip backup.
+
+    A truncated or corrupt archive gives None for the whole-file digest and the
+    digests of the blocks that could still be read.
+    """
+    digest, blocks = hashlib.sha256(), []
+    opener = gzip.open if _is_compressed(path) else open
+    try:
+        with opener(path, "rb") as f:
+            for chunk in iter(lambda: f.read(block_bytes), b""):
+                digest.update(chunk)
+                blocks.append(hashlib.sha256(chunk).hexdigest())
+    except (OSError, EOFError, zlib.error):
+        return None, blocks
+    return digest.hexdigest(), blocks
+
+
+def _table_counts(conn) -> Dict[str, int]:
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+    return {name: conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0] for name in tables}
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def _online_copy(src_path: str, dst_path: str, pages: int, sleep: float,
+                 max_restarts: int = BACKUP_MAX_RESTARTS) -> Dict:
+    """Copy src to dst with the backup API, `pages` at a time, sleeping between steps.
+
+    Between steps the source lock is released so writers keep going; if another
+    connection writes in the meantime SQLite restarts the copy, which shows up as
+    `remaining` going back up. After max_restarts the rest is copied in one step,
+    which in WAL mode holds only a read snapshot and so still does not block writers.
+    """
+    stats = dict(steps=0, restarts=0, pages=0, single_step_fallback=False)
+    last_remaining = [None]
+
+    def progress(status, remaining, total):
+        stats["steps"] += 1
+        stats["pages"] = total
+        if last_remaining[0] is not None and remaining > last_remaining[0]:
+            stats["restarts"] += 1
+            if stats["restarts"] > max_restarts:
+                raise _TooManyRestarts()
+        last_remaining[0] = remaining
+
+    src = sqlite3.connect(src_path)
+    dst = sqlite3.connect(dst_path)
+    try:
+        try:
+            src.backup(dst, pages=pages, progress=progress, sleep=sleep)
+        except _TooManyRestarts:
+            stats["single_step_fallback"] = True
+            src.backup(dst, pages=-1)
+            stats["steps"] += 1
+    finally:
+        dst.close()
+        src.close()
+    return stats
+
+
+def backup(dest: str, db_path: str = DB_PATH, pages: int = BACKUP_PAGES_PER_STEP, sleep: float = BACKUP_SLEEP,
+           compress: Optional[bool] = None, verify: bool = True) -> Dict:
+    """Take a consistent online snapshot of db_path into dest (gzip when dest ends in .gz).
+
+    Writes a JSON manifest next to the backup (checksums of the whole file and of
+    each VERIFY_BLOCK_PAGES-page block, row counts, WAL frames seen) that
+    verify_backup() and restore() check against.
+    """
+    compress = _is_compressed(dest) if compress is None else compress
+    if compress and not _is_compressed(dest):
+        dest = f"{dest}.gz"
+    started = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    finally:
+        conn.close()
+    frames_before = wal_frames(db_path, page_size)
+
+    with tempfile.TemporaryDirectory(dir=Path(dest).resolve().parent) as tmp:
+        snapshot = str(Path(tmp) / "snapshot.db")
+        stats = _online_copy(db_path, snapshot, pages, sleep)
+        copied = time.perf_counter()
+        conn = sqlite3.connect(snapshot)
+        try:
+            conn.execute("PRAGMA journal_mode=DELETE")  # a backup is a single self-contained file
+            counts = _table_counts(conn)
+            check = conn.execute("PRAGMA quick_check").fetchone()[0] if verify else None
+        finally:
+            conn.close()
+        if check not in (None, "ok"):
+            raise RuntimeError(f"Backup of {db_path} failed quick_check: {check}")
+
+        digest, blocks = hashlib.sha256(), []
+        out = gzip.open(dest, "wb", compresslevel=BACKUP_COMPRESS_LEVEL) if compress else open(dest, "wb")
+        with out, open(snapshot, "rb") as f:
+            for chunk in iter(lambda: f.read(page_size * VERIFY_BLOCK_PAGES), b""):
+                digest.update(chunk)
+                blocks.append(hashlib.sha256(chunk).hexdigest())
+                out.write(chunk)
+        size = os.path.getsize(snapshot)
+
+    elapsed = time.perf_counter() - started
+    manifest = dict(
+        source=str(db_path), backup=str(dest), created_at=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        sha256=digest.hexdigest(), block_pages=VERIFY_BLOCK_PAGES, blocks=blocks, bytes=size, compressed_bytes=os.path.getsize(dest), compressed=compress,
+        page_size=page_size, pages=stats["pages"], steps=stats["steps"], restarts=stats["restarts"],
+        single_step_fallback=stats["single_step_fallback"],
+        wal_frames_before=frames_before, wal_frames_after=wal_frames(db_path, page_size),
+        tables=counts, quick_check=check,
+        copy_seconds=round(copied - started, 3), seconds=round(elapsed, 3),
+        mb_per_s=round(size / elapsed / 1e6, 2) if elapsed else None,
+    )
+    manifest_path(dest).write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def verify_backup(backup_path: str, deep: bool = True) -> Dict:
+    """Check a backup against its manifest: checksums first, then (deep) integrity and row counts.
+
+    The file is read once, block by block; when it does not match, bad_pages lists
+    the page ranges of the blocks that differ (or could not be read), and the deep
+    checks are skipped. Manifests without block checksums get the whole-file check.
+    """
+    manifest = json.loads(manifest_path(backup_path).read_text())
+    block_pages = manifest.get("block_pages") or CHUNK // manifest["page_size"]
+    digest, blocks = _scan(backup_path, manifest["page_size"] * block_pages)
+    result = dict(backup=str(backup_path), sha256_ok=digest == manifest["sha256"])
+    if not result["sha256_ok"] and "blocks" in manifest:
+        pages = manifest["bytes"] // manifest["page_size"]
+        bad = [i for i, expected in enumerate(manifest["blocks"]) if i >= len(blocks) or blocks[i] != expected]
+        result["bad_pages"] = [(i * block_pages + 1, min((i + 1) * block_pages, pages)) for i in bad]
+    if deep and result["sha256_ok"]:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = _plain_copy(backup_path, tmp)
+            conn = sqlite3.connect(path)
+            try:
+                result["integrity_check"] = conn.execute("PRAGMA integrity_check").fetchone()[0]
+                result["tables_ok"] = _table_counts(conn) == manifest["tables"]
+            finally:
+                conn.close()
+    result["ok"] = result["sha256_ok"] and result.get("integrity_check", "ok") == "ok" and result.get("tables_ok", True)
+    return result
+
+
+def _plain_copy(backup_path: str, tmp: str) -> str:
+    """Return a path to an uncompressed copy of the backup inside tmp."""
+    if not _is_compressed(backup_path):
+        return backup_path
+    path = str(Path(tmp) / "restore.db")
+    with gzip.open(backup_path, "rb") as src, open(path, "wb") as dst:
+        shutil.copyfileobj(src, dst, CHUNK)
+    return path
+
+
+def restore(backup_path: str, db_path: str = DB_PATH, pages: int = BACKUP_PAGES_PER_STEP, sleep: float = 0.0,
+            verify: bool = True) -> Dict:
+    """Replace the contents of db_path with a backup, through the backup API so open readers stay safe."""
+    if verify and manifest_path(backup_path).exists():
+        check = verify_backup(backup_path, deep=False)
+        if not check["ok"]:
+            raise ValueError(f"Backup {backup_path} does not match its manifest")
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        stats = _online_copy(_plain_copy(backup_path, tmp), db_path, pages, sleep)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            # restored data_version counters may repeat values already seen; a new epoch makes cached reports stale
+            conn.execute("UPDATE data_version SET version = abs(random()) WHERE table_name = '*epoch'")
+            conn.commit()
+        except sqlite3.OperationalError:
+            pass  # backup taken before data_version existed
+        counts = _table_counts(conn)
+    finally:
+        conn.close()
+    return dict(backup=str(backup_path), target=str(db_path), pages=stats["pages"], steps=stats["steps"],
+                tables=counts, seconds=round(time.perf_counter() - started, 3))
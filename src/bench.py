@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from .config import BASE_DIR
+
+# Benchmark results are appended here, one JSON object per measurement
+RESULTS_PATH = os.environ.get("BENCH_RESULTS", str(BASE_DIR / "bench_results.jsonl"))
+
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit, so results can be compared across commits."""
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class Bench:
+    """Tiny pytest-benchmark style harness: time callables and persist the stats."""
+
+    def __init__(self, suite: str, results_path: str = RESULTS_PATH, **context):
+        self.suite = suite
+        self.results_path = results_path
+        self.context = context
+        self.commit = git_commit()
+        self.results: List[Dict] = []
+
+    def run(self, name: str, fn: Callable, repeat: int = 5, **extra) -> Dict:
+        """Call fn() `repeat` times and record min/median/mean wall time in seconds."""
+        timings, error = [], None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:  # record the failure instead of aborting the suite
+                error = f"{type(e).__name__}: {e}"
+                break
+            timings.append(time.perf_counter() - start)
+        result = dict(name=name, repeat=len(timings), **extra)
+        if timings:
+            result.update(
+                min=min(timings),
+                median=statistics.median(timings),
+                mean=statistics.fmean(timings),
+            )
+        if error:
+            result["error"] = error
+        return self._add(result)
+
+    def record(self, name: str, **values) -> Dict:
+        """Record a non-timing metric (throughput, bytes per row, speedup, ...)."""
+        return self._add(dict(name=name, **values))
+
+    def _add(self, result: Dict) -> Dict:
+        result = dict(
+            suite=self.suite, commit=self.commit,
+            recorded_at=datetime.utcnow().isoformat(timespec="seconds"),
+            **self.context, **result
+        )
+        self.results.append(result)
+        print(format_result(result))
+        return result
+
+    def save(self) -> None:
+        """Append this session's results to the results file."""
+        Path(self.results_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(self.results_path, "a", encoding="utf-8") as fh:
+            for result in self.results:
+                fh.write(json.dumps(result) + "\n")
+        print(f"{len(self.results)} results saved to {self.results_path}")
+
+
+def format_result(result: Dict) -> str:
+    label = " ".join(
+        str(result[k]) for k in ("suite", "scale", "name") if result.get(k) is not None
+    )
+    if "error" in result:
+        return f"{label:<60} ERROR {result['error']}"
+    if "median" in result:
+        return f"{label:<60} median {result['median'] * 1000:10.3f} ms  (min {result['min'] * 1000:.3f} ms, n={result['repeat']})"
+    metrics = {k: v for k, v in result.items()
+               if k not in ("suite", "commit", "recorded_at", "scale", "name")}
+    return f"{label:<60} {metrics}"
+
+
+def load_results(path: str = RESULTS_PATH) -> List[Dict]:
+    if not Path(path).exists():
+        return []
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def compare(base: str, head: Optional[str] = None, path: str = RESULTS_PATH,
+            suite: Optional[str] = None) -> List[Dict]:
+    """Compare median timings of two commits (latest result per benchmark wins)."""
+    head = head or git_commit()
+
+    def latest(commit):
+        rows = {}
+        for r in load_results(path):
+            if r.get("commit") == commit and "median" in r and (suite is None or r["suite"] == suite):
+                rows[(r["suite"], r.get("scale"), r["name"])] = r
+        return rows
+
+    before, after = latest(base), latest(head)
+    report = []
+    for key in sorted(before.keys() & after.keys(), key=lambda k: tuple(str(x) for x in k)):
+        b, a = before[key]["median"], after[key]["median"]
+        report.append(dict(
+            suite=key[0], scale=key[1], name=key[2],
+            base_median=b, head_median=a,
+            ratio=round(a / b, 3) if b else None
+        ))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="bench", description="Compare stored benchmark results")
+    parser.add_argument("--base", required=True, help="Baseline commit hash")
+    parser.add_argument("--head", help="Commit to compare (default: HEAD)")
+    parser.add_argument("--suite")
+    parser.add_argument("--threshold", type=float, default=1.10,
+                        help="Flag benchmarks slower than base by this ratio")
+    parser.add_argument("--results", default=RESULTS_PATH)
+    args = parser.parse_args()
+
+    for row in compare(args.base, args.head, args.results, args.suite):
+        flag = "  REGRESSION" if row["ratio"] and row["ratio"] > args.threshold else ""
+        label = " ".join(str(row[k]) for k in ("suite", "scale", "name") if row[k] is not None)
+        print(f"{label:<60} {row['base_median'] * 1000:10.3f} ms -> "
+              f"{row['head_median'] * 1000:10.3f} ms  x{row['ratio']}{flag}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+from .db import connect
+from .config import DB_PATH
+
+HELD, BOOKED, CANCELLED, REFUNDED, EXPIRED = "HELD", "BOOKED", "CANCELLED", "REFUNDED", "EXPIRED"
+
+# Statuses that occupy a seat
+ACTIVE = (HELD, BOOKED)
+
+# Allowed moves; trg_booking_status_transition in models.sql enforces the same table
+TRANSITIONS = {
+    HELD: {BOOKED, CANCELLED, EXPIRED},
+    BOOKED: {CANCELLED, REFUNDED},
+    CANCELLED: {REFUNDED},
+    REFUNDED: set(),
+    EXPIRED: set(),
+}
+
+DEFAULT_HOLD_SECONDS = 15 * 60
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+def hold_expiry(seconds: float = DEFAULT_HOLD_SECONDS, now: Optional[datetime] = None) -> str:
+    return ((now or datetime.utcnow()) + timedelta(seconds=seconds)).isoformat()
+
+
+def transition(conn, booking_id: int, new_status: str) -> Optional[str]:
+    """Move a booking to new_status on an open connection; returns the old status.
+
+    Returns None if the booking does not exist. Raises InvalidTransition for
+    moves not in TRANSITIONS (including a hold that has already expired).
+    """
+    new_status = new_status.upper()
+    if new_status not in TRANSITIONS:
+        raise InvalidTransition(f"Unknown booking status {new_status}")
+    row = conn.execute("SELECT status, hold_expires_at FROM booking WHERE id=?", (booking_id,)).fetchone()
+    if not row:
+        return None
+    old_status, expires_at = row[0], row[1]
+    if old_status == new_status:
+        return old_status
+    if old_status == HELD and new_status == BOOKED and expires_at and expires_at <= datetime.utcnow().isoformat():
+        raise InvalidTransition(f"Hold on booking {booking_id} expired at {expires_at}")
+    if new_status not in TRANSITIONS[old_status]:
+        raise InvalidTransition(f"Booking {booking_id} cannot go from {old_status} to {new_status}")
+    cur = conn.execute(
+        "UPDATE booking SET status=?, hold_expires_at=NULL WHERE id=? AND status=?",
+        (new_status, booking_id, old_status)
+    )
+    if cur.rowcount == 0:
+        raise InvalidTransition(f"Booking {booking_id} changed status concurrently")
+    return old_status
+
+
+def expire_holds(db_path: str = DB_PATH, now: Optional[datetime] = None) -> int:
+    """Expire every hold past its deadline (uses the partial index on held bookings)."""
+    with connect(db_path) as conn:
+        cur = conn.execute(
+            "UPDATE booking SET status='EXPIRED', hold_expires_at=NULL WHERE status='HELD' AND hold_expires_at <= ?",
+            ((now or datetime.utcnow()).isoformat(),)
+        )
+        conn.commit()
+        return cur.rowcount
+
+
+class HoldSweeper(threading.Thread):
+    """Background thread that expires stale holds every `interval` seconds."""
+
+    def __init__(self, db_path: str = DB_PATH, interval: float = 30.0):
+        super().__init__(name="hold-sweeper", daemon=True)
+        self.db_path = db_path
+        self.interval = interval
+        self.expired = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.expired += expire_holds(self.db_path)
+            self._stop_event.wait(self.interval)
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop_event.set()
+        self.join(timeout)
@@ -0,0 +1,172 @@
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+from .db import connect
+from .config import DB_PATH, CDC_BATCH_SIZE, CDC_POLL_INTERVAL
+from .records import Change, fetch_all
+
+# Triggers in models.sql write every insert/update/delete on these tables to change_log
+CAPTURED_TABLES = ("booking", "flight", "passenger")
+
+
+def drop_capture_triggers(conn) -> None:
+    """Remove the change_log triggers (bulk loads); apply_schema() puts them back."""
+    for table in CAPTURED_TABLES:
+        for op in ("insert", "update", "delete"):
+            conn.execute(f"DROP TRIGGER IF EXISTS trg_cdc_{table}_{op}")
+
+
+class ChangeLogGap(ValueError):
+    """Raised when entries after a reader's position were pruned before it read them."""
+
+    def __init__(self, since, first_seq):
+        self.since = since
+        self.first_seq = first_seq
+        super().__init__(f"Changes {since + 1}..{first_seq - 1} were pruned before they were read; "
+                         f"resynchronise, then continue from seq {first_seq - 1}")
+
+
+class ChangeFeed:
+    """Reader side of the change log: batched reads, a follow loop, consumer offsets and compaction.
+
+    The log keeps a retention window (change_log_retention, 7 days unless set):
+    older entries are pruned as new ones are written, whether or not every
+    consumer has read them, and compact() uses the same window by default.
+    A reader whose position fell behind the oldest retained entry gets
+    ChangeLogGap from read() and follow() instead of silently skipping ahead.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+
+    def read(self, since: int = 0, limit: int = CDC_BATCH_SIZE, conn=None) -> List[Change]:
+        """Changes with seq > since, oldest first (a primary-key range scan).
+
+        since=0 means the oldest retained entry; any later position that has been
+        pruned past raises ChangeLogGap.
+        """
+        if conn is not None:
+            return self._read(conn, since, limit)
+        with connect(self.db_path, read_only=True) as conn:
+            return self._read(conn, since, limit)
+
+    @staticmethod
+    def _read(conn, since, limit):
+        rows = fetch_all(conn, Change, """
+            SELECT seq, table_name, op, row_id, data, changed_at
+            FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?
+        """, (since, limit))
+        if since > 0 and (not rows or rows[0].seq != since + 1):
+            # seq is AUTOINCREMENT, so the only holes are the ones retention and compact() leave at the front
+            first = conn.execute("""
+                SELECT COALESCE((SELECT MIN(seq) FROM change_log),
+                                (SELECT seq + 1 FROM sqlite_sequence WHERE name = 'change_log'))
+            """).fetchone()[0]
+            if first is not None and since < first - 1:
+                raise ChangeLogGap(since, first)
+        return rows
+
+    def follow(self, since: int = 0, batch: int = CDC_BATCH_SIZE, interval: float = CDC_POLL_INTERVAL,
+               consumer: Optional[str] = None) -> Iterator[Change]:
+        """Yield changes forever, starting after `since` (or the consumer's saved offset).
+
+        Full batches are read back to back; once caught up the loop only re-queries
+        after PRAGMA data_version shows another connection has committed. A consumer's
+        offset is saved once a whole batch has been yielded, so delivery is at-least-once.
+        """
+        if consumer and not since:
+            since = self.position(consumer)
+        conn = connect(self.db_path, read_only=True)
+        try:
+            version = None
+            while True:
+                current = conn.execute("PRAGMA data_version").fetchone()[0]
+                if current != version:
+                    rows = self._read(conn, since, batch)
+                    yield from rows
+                    if rows:
+                        since = rows[-1].seq
+                        if consumer:
+                            self.commit(consumer, since)
+                    if len(rows) == batch:
+                        continue  # more waiting; don't record the version until caught up
+                    version = current
+                time.sleep(interval)
+        finally:
+            conn.close()
+
+    # ----------------------------
+    # Consumers
+    # ----------------------------
+    def position(self, consumer: str) -> int:
+        with connect(self.db_path) as conn:
+            row = conn.execute("SELECT last_seq FROM change_consumer WHERE name=?", (consumer,)).fetchone()
+            return row[0] if row else 0
+
+    def commit(self, consumer: str, seq: int) -> None:
+        """Record that `consumer` has processed everything up to and including seq."""
+        with connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT INTO change_consumer (name, last_seq) VALUES (?, ?)
+                ON CONFLICT (name) DO UPDATE
+                SET last_seq = MAX(last_seq, excluded.last_seq), updated_at = excluded.updated_at
+            """, (consumer, seq))
+            conn.commit()
+
+    def consumers(self) -> List[Dict]:
+        with connect(self.db_path) as conn:
+            return [dict(row) for row in conn.execute("SELECT name, last_seq, updated_at FROM change_consumer")]
+
+    def drop_consumer(self, consumer: str) -> bool:
+        with connect(self.db_path) as conn:
+            cur = conn.execute("DELETE FROM change_consumer WHERE name=?", (consumer,))
+            conn.commit()
+            return cur.rowcount > 0
+
+    # ----------------------------
+    # Retention
+    # ----------------------------
+    def retention(self) -> Optional[float]:
+        """Seconds entries are kept on the write path (None: kept until compacted)."""
+        with connect(self.db_path) as conn:
+            row = conn.execute("SELECT max_age_seconds FROM change_log_retention WHERE id = 1").fetchone()
+            return row[0] if row else None
+
+    def set_retention(self, seconds: Optional[float]) -> Optional[float]:
+        """Change the retention window; None or 0 keeps entries until compact() removes them."""
+        seconds = int(seconds) if seconds else None
+        with connect(self.db_path) as conn:
+            conn.execute("""INSERT INTO change_log_retention (id, max_age_seconds) VALUES (1, ?)
+                            ON CONFLICT (id) DO UPDATE SET max_age_seconds = excluded.max_age_seconds""",
+                         (seconds,))
+            conn.commit()
+        return seconds
+
+    def compact(self, keep_seconds: float = 0, max_age_seconds: Optional[float] = None) -> Dict:
+        """Delete entries every consumer has processed once they are older than keep_seconds.
+
+        Entries older than max_age_seconds (default: the retention window) go even
+        if a consumer is behind. With no registered consumers only that limit applies.
+        """
+        if max_age_seconds is None:
+            max_age_seconds = self.retention()
+        now = datetime.utcnow()
+        with connect(self.db_path) as conn:
+            low_water = conn.execute("SELECT MIN(last_seq) FROM change_consumer").fetchone()[0]
+            consumed = 0
+            if low_water is not None:
+                consumed = conn.execute(
+                    "DELETE FROM change_log WHERE seq <= ? AND changed_at < ?",
+                    (low_water, (now - timedelta(seconds=keep_seconds)).isoformat())
+                ).rowcount
+            expired = 0
+            if max_age_seconds is not None:
+                expired = conn.execute(
+                    "DELETE FROM change_log WHERE changed_at < ?",
+                    ((now - timedelta(seconds=max_age_seconds)).isoformat(),)
+                ).rowcount
+            conn.commit()
+            remaining = conn.execute("SELECT COUNT(*), MIN(seq), MAX(seq) FROM change_log").fetchone()
+        return dict(consumed_deleted=consumed, expired_deleted=expired, low_water=low_water,
+                    retention_seconds=max_age_seconds,
+                    remaining=remaining[0], first_seq=remaining[1], last_seq=remaining[2])
@@ -1,8 +1,92 @@
 import argparse
+import json
 from pprint import pprint
 from .services import Services
+from .records import to_dict
+from .booking_lifecycle import HoldSweeper
+from .reports import REPORTS
+from .server import serve
+from .sharding import SHARD_KEYS
+from .approx import APPROX_REPORTS
+from .rollups import GRANULARITIES
+from .forecast import MODELS as FORECAST_MODELS
+from .db import PROFILES, set_profile
+from .config import (BACKUP_PAGES_PER_STEP, BACKUP_SLEEP, CDC_BATCH_SIZE, CDC_POLL_INTERVAL,
+                     HTTP_HOST, HTTP_PORT, HTTP_THREADS, FLEET_MIN_TURN_MINUTES,
+                     NOTIFY_BATCH_SIZE, NOTIFY_MAX_ATTEMPTS, NOTIFY_RETRY_SECONDS, AUTH_SESSION_TTL)
 import os
 import sys
+import time
+
+
+def show(result):
+    """Print DAL/Services results; records become plain dicts only here."""
+    pprint(to_dict(result))
+
+
+def sweep_holds(svc, args):
+    if not args.interval:
+        print("Expired holds:", svc.expire_holds())
+        return
+    svc._require_role("ADMIN", "STAFF")
+    sweeper = HoldSweeper(svc.dal.db_path, args.interval)
+    sweeper.start()
+    try:
+        while sweeper.is_alive():
+            sweeper.join(args.interval)
+            print("Expired holds so far:", sweeper.expired)
+    except KeyboardInterrupt:
+        sweeper.stop()
+
+
+def run_reports(svc, args):
+    if not args.all and not args.names:
+        raise SystemExit("report: name one or more reports or pass --all")
+    unknown = set(args.names) - set(REPORTS)
+    if unknown:
+        raise SystemExit(f"report: unknown report(s) {', '.join(sorted(unknown))}")
+    names = None if args.all else args.names
+    show(svc.run_reports(names, args.limit, args.workers, args.shards))
+    if args.speedup:
+        show(svc.report_speedup(names, args.limit, args.workers, args.shards))
+
+
+def run_forecast(svc, args):
+    started = time.perf_counter()
+    result = svc.forecast(args.as_of, args.model, args.route, args.limit, args.backtest)
+    elapsed = time.perf_counter() - started
+    show(result)
+    print(f"forecast ({args.model}) took {elapsed * 1000:.1f} ms", file=sys.stderr)
+
+
+def stream_changes(svc, args):
+    def emit(change):
+        record = change._asdict()
+        record["data"] = json.loads(change.data)
+        print(json.dumps(record), flush=True)
+
+    if args.follow:
+        try:
+            for change in svc.follow_changes(args.since, args.batch, args.interval, args.consumer):
+                emit(change)
+        except KeyboardInterrupt:
+            pass
+        return
+    since = start = args.since or (svc.changefeed.position(args.consumer) if args.consumer else 0)
+    while True:
+        changes = svc.changes(since, args.batch)
+        for change in changes:
+            emit(change)
+        if changes:
+            since = changes[-1].seq
+        if len(changes) < args.batch:
+            break
+    if args.consumer and since > start:
+        svc.changefeed.commit(args.consumer, since)
+
+
+def serve_http(svc, args):
+    serve(svc.dal.db_path, args.host, args.port, args.threads, args.processes, args.verbose)
 
 
 def main():
@@ -17,6 +101,13 @@ def main():
         type=str.upper,  # normalize to uppercase
         help="Role for this session (default=CUSTOMER)"
     )
+    parser.add_argument("--user", dest="auth_user", default=os.getenv("AIRLINE_USER"),
+                        help="Log in as this user; the session takes the user's role")
+    parser.add_argument("--password", dest="auth_password", default=os.getenv("AIRLINE_PASSWORD"))
+    parser.add_argument("--session", dest="auth_session", default=os.getenv("AIRLINE_SESSION"),
+                        help="Session token from `login` (used when --user is not given)")
+    parser.add_argument("--profile", choices=sorted(PROFILES),
+                        help="Connection tuning profile (default: DB_PROFILE env or oltp)")
 
     subparsers = parser.add_subparsers(dest="command")
 
@@ -40,7 +131,12 @@ def main():
     ))
 
     p = subparsers.add_parser("list-passengers")
-    p.set_defaults(func=lambda svc, args: pprint(svc.get_passengers()))
+    p.set_defaults(func=lambda svc, args: show(svc.get_passengers()))
+
+    p = subparsers.add_parser("find-passenger", help="Full-text search by name or email (prefix matching)")
+    p.add_argument("query")
+    p.add_argument("--limit", type=int, default=20)
+    p.set_defaults(func=lambda svc, args: show(svc.find_passengers(args.query, args.limit)))
 
     # =========================================================
     # AIRPORT
@@ -56,7 +152,7 @@ def main():
     ))
 
     a = subparsers.add_parser("list-airports")
-    a.set_defaults(func=lambda svc, args: pprint(svc.get_airports()))
+    a.set_defaults(func=lambda svc, args: show(svc.get_airports()))
 
     # =========================================================
     # AIRCRAFT
@@ -70,7 +166,7 @@ def main():
     ))
 
     ac = subparsers.add_parser("list-aircraft")
-    ac.set_defaults(func=lambda svc, args: pprint(svc.get_aircraft()))
+    ac.set_defaults(func=lambda svc, args: show(svc.get_aircraft()))
 
     # =========================================================
     # FLIGHT
@@ -92,7 +188,7 @@ def main():
     ))
 
     f = subparsers.add_parser("list-flights")
-    f.set_defaults(func=lambda svc, args: pprint(svc.get_flights()))
+    f.set_defaults(func=lambda svc, args: show(svc.get_flights()))
 
     # =========================================================
     # BOOKING
@@ -102,7 +198,8 @@ def main():
     b.add_argument("--flight", type=int, required=True)
     b.add_argument("--class", dest="ticket_class",
                    choices=["ECONOMY", "BUSINESS", "FIRST"], required=True)
-    b.add_argument("--price", type=float, required=True)
+    b.add_argument("--price", type=float, required=False,
+                   help="Override the quoted fare (staff only)")
     b.add_argument("--seat", dest="seat_no", required=False,
                    help="Optional seat number (e.g. 12A)")
     b.set_defaults(func=lambda svc, args: print(
@@ -111,15 +208,52 @@ def main():
                  args.ticket_class, args.price, args.seat_no)
     ))
 
+    q = subparsers.add_parser("quote")
+    q.add_argument("--flight", dest="flight_ids", type=int, nargs="+", required=True)
+    q.add_argument("--class", dest="ticket_class",
+                   choices=["ECONOMY", "BUSINESS", "FIRST"], default="ECONOMY")
+    q.set_defaults(func=lambda svc, args: show(svc.quote(args.flight_ids, args.ticket_class)))
+
+    b = subparsers.add_parser("hold")
+    b.add_argument("--passenger", type=int, required=True)
+    b.add_argument("--flight", type=int, required=True)
+    b.add_argument("--class", dest="ticket_class",
+                   choices=["ECONOMY", "BUSINESS", "FIRST"], required=True)
+    b.add_argument("--seat", dest="seat_no", required=False)
+    b.add_argument("--minutes", type=float, default=15, help="How long the seat is held")
+    b.set_defaults(func=lambda svc, args: print(
+        "Seat held with booking id",
+        svc.hold(args.passenger, args.flight, args.ticket_class, args.seat_no, args.minutes * 60)
+    ))
+
+    for name, action in (("confirm", "confirm_booking"), ("cancel", "cancel_booking"),
+                         ("refund", "refund_booking")):
+        b = subparsers.add_parser(name)
+        b.add_argument("--booking", type=int, required=True)
+        b.set_defaults(func=lambda svc, args, action=action: show(getattr(svc, action)(args.booking)))
+
+    b = subparsers.add_parser("sweep-holds", help="Expire stale seat holds")
+    b.add_argument("--interval", type=float,
+                   help="Keep running, sweeping every N seconds (default: sweep once)")
+    b.set_defaults(func=sweep_holds)
+
     b = subparsers.add_parser("list-bookings")
-    b.set_defaults(func=lambda svc, args: pprint(svc.get_bookings()))
+    b.set_defaults(func=lambda svc, args: show(svc.get_bookings()))
+
+    b = subparsers.add_parser("itinerary", help="A passenger's trips in departure order")
+    b.add_argument("--passenger", type=int, required=True)
+    when = b.add_mutually_exclusive_group()
+    when.add_argument("--upcoming", dest="when", action="store_const", const="upcoming")
+    when.add_argument("--past", dest="when", action="store_const", const="past")
+    b.set_defaults(func=lambda svc, args: show(svc.itinerary(args.passenger, args.when)))
 
     # =========================================================
     # TICKET
     # =========================================================
     t = subparsers.add_parser("add-ticket")
     t.add_argument("--booking-id", type=int, required=True)
-    t.add_argument("--ticket-no", required=True)
+    t.add_argument("--ticket-no", required=False,
+                   help="Defaults to the next number from the ticket sequence")
     t.add_argument("--seat-no", required=True)
     t.add_argument("--class", dest="ticket_class",
                    choices=["ECONOMY", "BUSINESS", "FIRST"], required=True)
@@ -130,7 +264,7 @@ def main():
     ))
 
     t = subparsers.add_parser("list-tickets")
-    t.set_defaults(func=lambda svc, args: pprint(svc.dal.list_tickets()))
+    t.set_defaults(func=lambda svc, args: show(svc.dal.list_tickets()))
 
     # =========================================================
     # CREW MEMBER
@@ -144,7 +278,7 @@ def main():
     ))
 
     cm = subparsers.add_parser("list-crew")
-    cm.set_defaults(func=lambda svc, args: pprint(svc.get_crew_members()))
+    cm.set_defaults(func=lambda svc, args: show(svc.get_crew_members()))
 
     # =========================================================
     # CREW ASSIGNMENT
@@ -159,7 +293,67 @@ def main():
     ))
 
     ca = subparsers.add_parser("list-assignments")
-    ca.set_defaults(func=lambda svc, args: pprint(svc.get_crew_assignments()))
+    ca.set_defaults(func=lambda svc, args: show(svc.get_crew_assignments()))
+
+    ca = subparsers.add_parser("import-roster")
+    ca.add_argument("--file", required=True,
+                    help="CSV with crew_member_id,flight_id,duty columns")
+    ca.set_defaults(func=lambda svc, args: show(svc.import_crew_roster(args.file)))
+
+    ca = subparsers.add_parser("crew-conflicts")
+    ca.set_defaults(func=lambda svc, args: show(svc.crew_conflicts()))
+
+    ca = subparsers.add_parser("crew-compliance")
+    ca.add_argument("--max-block-hours", type=float, default=60.0,
+                    help="Maximum block hours in any rolling 7 days")
+    ca.add_argument("--min-rest-hours", type=float, default=10.0)
+    ca.add_argument("--workers", type=int, help="Processes to use (default: all cores)")
+    ca.set_defaults(func=lambda svc, args: show(svc.check_crew_compliance(
+        args.max_block_hours, args.min_rest_hours, args.workers)))
+
+    fl = subparsers.add_parser("fleet-check", help="Overlapping legs, short turns and broken aircraft rotations")
+    fl.add_argument("--from", dest="start", help="First departure date to check")
+    fl.add_argument("--to", dest="end", help="Check departures before this date")
+    fl.add_argument("--aircraft-id", type=int)
+    fl.add_argument("--min-turn", type=float, default=FLEET_MIN_TURN_MINUTES, help="Minimum ground time in minutes")
+    fl.set_defaults(func=lambda svc, args: show(svc.fleet_check(args.start, args.end, args.aircraft_id, args.min_turn)))
+
+    fl = subparsers.add_parser("fleet-plan", help="Reassign tails so every aircraft rotation is flyable")
+    fl.add_argument("--from", dest="start",
+                    help="Leave legs departing before this date alone (default and earliest: now)")
+    fl.add_argument("--to", dest="end", help="Plan departures before this date")
+    fl.add_argument("--min-turn", type=float, default=FLEET_MIN_TURN_MINUTES, help="Minimum ground time in minutes")
+    fl.add_argument("--apply", action="store_true", help="Write the reassignments (admin)")
+    fl.set_defaults(func=lambda svc, args: show(svc.fleet_plan(args.start, args.end, args.apply, args.min_turn)))
+
+    sc = subparsers.add_parser("schedule-export", help="Write flights to a schedule CSV")
+    sc.add_argument("--file", required=True)
+    sc.add_argument("--from", dest="start", help="First departure date to export")
+    sc.add_argument("--to", dest="end", help="Export departures before this date")
+    sc.set_defaults(func=lambda svc, args: show(svc.export_schedule(args.file, args.start, args.end)))
+
+    sc = subparsers.add_parser("schedule-sync", help="Apply a schedule CSV as inserts, updates and deletes by code")
+    sc.add_argument("--file", required=True,
+                    help="CSV with code,origin,destination,departure_time,arrival_time,aircraft_id,base_price")
+    sc.add_argument("--dry-run", action="store_true", help="Report the change set without writing it")
+    sc.add_argument("--no-delete", action="store_true", help="Keep flights that are missing from the file")
+    sc.add_argument("--limit", type=int, default=50, help="Changes to list (0 = all)")
+    sc.set_defaults(func=lambda svc, args: show(svc.sync_schedule(
+        args.file, args.dry_run, not args.no_delete, args.limit)))
+
+    nt = subparsers.add_parser("notify", help="Notify booked passengers of schedule changes")
+    nt.add_argument("--sink", default="file", help="file[:PATH] (JSON lines) or memory[:FAIL_RATE]")
+    nt.add_argument("--batch", type=int, default=NOTIFY_BATCH_SIZE, help="Messages per sink call")
+    nt.add_argument("--max-attempts", type=int, default=NOTIFY_MAX_ATTEMPTS)
+    nt.add_argument("--retry-seconds", type=float, default=NOTIFY_RETRY_SECONDS,
+                    help="First retry delay; doubles after each failure")
+    nt.add_argument("--no-deliver", action="store_true", help="Only queue the notifications")
+    nt.set_defaults(func=lambda svc, args: show(svc.notify(
+        args.sink, not args.no_deliver, args.batch, args.max_attempts, args.retry_seconds)))
+
+    nt = subparsers.add_parser("notification-stats", help="Outbox counts by status")
+    nt.add_argument("--retry-failed", action="store_true", help="Requeue FAILED notifications (admin)")
+    nt.set_defaults(func=lambda svc, args: show(svc.notification_stats(args.retry_failed)))
 
     # =========================================================
     # USER
@@ -173,20 +367,128 @@ def main():
         svc.add_user(args.username, args.password, args.role)
     ))
 
+    u = subparsers.add_parser("login", help="Check --user/--password and print a session token for AIRLINE_SESSION")
+    u.add_argument("--ttl", type=float, default=AUTH_SESSION_TTL, help="Session lifetime in seconds")
+    u.set_defaults(func=lambda svc, args: show(svc.login(args.ttl)))
+
+    u = subparsers.add_parser("logout", help="Revoke the --session/AIRLINE_SESSION token")
+    u.set_defaults(func=lambda svc, args: show(svc.logout(args.auth_session or "")))
+
     u = subparsers.add_parser("list-users")
-    u.set_defaults(func=lambda svc, args: pprint(svc.get_users()))
+    u.set_defaults(func=lambda svc, args: show(svc.get_users()))
 
     # =========================================================
     # REPORTS (Advanced SQL)
     # =========================================================
     tp = subparsers.add_parser("top-passengers")
-    tp.set_defaults(func=lambda svc, args: pprint(svc.top_passengers()))
+    tp.set_defaults(func=lambda svc, args: show(svc.top_passengers()))
 
     rr = subparsers.add_parser("revenue-rankings")
-    rr.set_defaults(func=lambda svc, args: pprint(svc.revenue_rankings()))
+    rr.set_defaults(func=lambda svc, args: show(svc.revenue_rankings()))
 
     lf = subparsers.add_parser("route-load-factors")
-    lf.set_defaults(func=lambda svc, args: pprint(svc.route_load()))
+    lf.set_defaults(func=lambda svc, args: show(svc.route_load()))
+
+    rp = subparsers.add_parser("report", help="Run several reports in parallel on read-only connections")
+    rp.add_argument("names", nargs="*", metavar="REPORT",
+                    help=f"one or more of: {', '.join(REPORTS)}")
+    rp.add_argument("--all", action="store_true", help="Run every report")
+    rp.add_argument("--limit", type=int, default=10)
+    rp.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    rp.add_argument("--shards", type=int, default=1, help="Split each report into this many flight-id ranges")
+    rp.add_argument("--speedup", action="store_true", help="Also time a serial run and print the speedup")
+    rp.set_defaults(func=run_reports)
+
+    rc = subparsers.add_parser("report-cache", help="Report cache hits, misses and size")
+    rc.add_argument("--clear", action="store_true", help="Drop every cached result afterwards")
+    rc.set_defaults(func=lambda svc, args: show(svc.report_cache_stats(args.clear)))
+
+    ar = subparsers.add_parser("approx-report", help="Estimate a report from incrementally maintained sketches")
+    ar.add_argument("name", choices=APPROX_REPORTS)
+    ar.add_argument("--limit", type=int, default=10)
+    ar.add_argument("--month", help="distinct-passengers: only this departure month (YYYY-MM)")
+    ar.add_argument("--all-months", dest="by_month", action="store_false",
+                    help="distinct-passengers: one row per route over every month")
+    ar.set_defaults(func=lambda svc, args: show(svc.approx_report(args.name, args.limit, args.month, args.by_month)))
+
+    rs = subparsers.add_parser("revenue-series", help="Revenue per day/week/month/quarter/year from the daily rollup")
+    rs.add_argument("--granularity", choices=GRANULARITIES, default="month")
+    rs.add_argument("--from", dest="start", help="First booking date (YYYY-MM-DD)")
+    rs.add_argument("--to", dest="end", help="Last booking date (YYYY-MM-DD)")
+    rs.add_argument("--class", dest="ticket_class", choices=["economy", "business", "first"])
+    rs.add_argument("--flight", type=int, help="Only this flight id")
+    rs.add_argument("--window", type=int, help="Add a trailing moving average over this many periods")
+    rs.add_argument("--yoy", action="store_true", help="Add the change against the same period a year earlier")
+    rs.add_argument("--rebuild", action="store_true", help="Recompute the rollup from bookings first")
+    rs.set_defaults(func=lambda svc, args: show(svc.revenue_series(
+        args.granularity, args.start, args.end, args.ticket_class, args.flight, args.window, args.yoy, args.rebuild)))
+
+    fc = subparsers.add_parser("forecast", help="Forecast final load factor of upcoming flights from booking curves")
+    fc.add_argument("--as-of", help="Forecast as if it were this date (default: now)")
+    fc.add_argument("--model", choices=FORECAST_MODELS, default="pickup")
+    fc.add_argument("--route", help='Only this route, e.g. "LHR → JFK"')
+    fc.add_argument("--limit", type=int, default=20)
+    fc.add_argument("--backtest", action="store_true", help="Score the forecast against the bookings made since")
+    fc.set_defaults(func=run_forecast)
+
+    ob = subparsers.add_parser("overbooking", help="Booking limits above capacity from historical show rates")
+    ob.add_argument("--as-of", help="Treat flights departing after this date as upcoming (default: now)")
+    ob.add_argument("--route", help='Only this route, e.g. "LHR → JFK"')
+    ob.add_argument("--limit", type=int, default=20)
+    ob.add_argument("--risk", type=float, help="Max chance of more shows than seats (default: OVERBOOK_RISK)")
+    ob.add_argument("--max", dest="max_overbook", type=float, help="Max share above capacity (default: OVERBOOK_MAX)")
+    ob.add_argument("--apply", action="store_true", help="Store the limits for every upcoming flight (admin)")
+    ob.add_argument("--clear", action="store_true", help="Drop every stored limit (admin)")
+    ob.set_defaults(func=lambda svc, args: show(svc.overbooking(
+        args.as_of, args.route, args.limit, args.risk, args.max_overbook, args.apply, args.clear)))
+
+    sk = subparsers.add_parser("sketch-stats", help="Sketch sizes and pending booking deltas")
+    sk.add_argument("--rebuild", action="store_true", help="Recompute every sketch from the booking table")
+    sk.set_defaults(func=lambda svc, args: show(svc.sketch_stats(args.rebuild)))
+
+    # =========================================================
+    # BACKUP / RESTORE
+    # =========================================================
+    bk = subparsers.add_parser("backup", help="Online snapshot via the SQLite backup API")
+    bk.add_argument("dest", help="Backup file; a .gz suffix compresses it")
+    bk.add_argument("--pages", type=int, default=BACKUP_PAGES_PER_STEP, help="Pages copied per step")
+    bk.add_argument("--sleep", type=float, default=BACKUP_SLEEP, help="Seconds to pause between steps")
+    bk.add_argument("--compress", action="store_true", help="gzip the backup (appends .gz)")
+    bk.add_argument("--no-verify", dest="verify", action="store_false")
+    bk.set_defaults(func=lambda svc, args: show(
+        svc.backup(args.dest, args.pages, args.sleep, args.compress or None, args.verify)))
+
+    bk = subparsers.add_parser("verify-backup")
+    bk.add_argument("path")
+    bk.set_defaults(func=lambda svc, args: show(svc.verify_backup(args.path)))
+
+    bk = subparsers.add_parser("restore", help="Replace the database with a backup")
+    bk.add_argument("path")
+    bk.add_argument("--pages", type=int, default=BACKUP_PAGES_PER_STEP)
+    bk.add_argument("--sleep", type=float, default=0.0)
+    bk.add_argument("--no-verify", dest="verify", action="store_false")
+    bk.set_defaults(func=lambda svc, args: show(svc.restore(args.path, args.pages, args.sleep, args.verify)))
+
+    # =========================================================
+    # CHANGE DATA CAPTURE
+    # =========================================================
+    ch = subparsers.add_parser("changes", help="Print booking/flight/passenger changes as JSON lines")
+    ch.add_argument("--since", type=int, default=0, help="Start after this sequence number")
+    ch.add_argument("--follow", action="store_true", help="Keep streaming new changes")
+    ch.add_argument("--batch", type=int, default=CDC_BATCH_SIZE)
+    ch.add_argument("--interval", type=float, default=CDC_POLL_INTERVAL, help="Idle poll interval (seconds)")
+    ch.add_argument("--consumer", help="Resume from and save this consumer's offset")
+    ch.set_defaults(func=stream_changes)
+
+    ch = subparsers.add_parser("compact-changes", help="Delete change log entries every consumer has read")
+    ch.add_argument("--keep-hours", type=float, default=0.0, help="Keep consumed entries this long")
+    ch.add_argument("--max-age-hours", type=float,
+                    help="Delete anything older, consumed or not (default: the retention window)")
+    ch.add_argument("--retention-hours", type=float,
+                    help="Set the window writes prune the log to (default 168; 0 keeps everything)")
+    ch.set_defaults(func=lambda svc, args: show(svc.compact_changes(
+        args.keep_hours * 3600, args.max_age_hours * 3600 if args.max_age_hours is not None else None,
+        args.retention_hours * 3600 if args.retention_hours is not None else None)))
 
     # =========================================================
     # MONGO (Hybrid NoSQL)
@@ -195,43 +497,88 @@ def main():
     lp.add_argument("--passenger-id", type=int, required=True)
     lp.add_argument("--tier", default="Bronze")
     lp.add_argument("--points", type=int, default=0)
-    lp.set_defaults(func=lambda svc, args: pprint(
+    lp.set_defaults(func=lambda svc, args: show(
         svc.add_loyalty_profile(args.passenger_id, args.tier, args.points)
     ))
 
     lp = subparsers.add_parser("list-loyalty")
-    lp.set_defaults(func=lambda svc, args: pprint(svc.get_loyalty_profiles()))
+    lp.set_defaults(func=lambda svc, args: show(svc.get_loyalty_profiles()))
 
     fb = subparsers.add_parser("add-feedback")
     fb.add_argument("--passenger-id", type=int, required=True)
     fb.add_argument("--comment", required=True)
-    fb.set_defaults(func=lambda svc, args: pprint(
+    fb.set_defaults(func=lambda svc, args: show(
         svc.add_feedback(args.passenger_id, args.comment)
     ))
 
     up = subparsers.add_parser("update-loyalty")
     up.add_argument("--passenger-id", type=int, required=True)
     up.add_argument("--points", type=int, required=True)
-    up.set_defaults(func=lambda svc, args: pprint(
+    up.set_defaults(func=lambda svc, args: show(
         svc.update_loyalty_points(args.passenger_id, args.points)
     ))
 
     dl = subparsers.add_parser("delete-loyalty")
     dl.add_argument("--passenger-id", type=int, required=True)
-    dl.set_defaults(func=lambda svc, args: pprint(
+    dl.set_defaults(func=lambda svc, args: show(
         svc.delete_loyalty_profile(args.passenger_id)
     ))
 
+    # =========================================================
+    # SHARDING
+    # =========================================================
+    ss = subparsers.add_parser("shard-split", help="Copy this database into a sharded directory")
+    ss.add_argument("--root", required=True, help="Directory for catalog.db and the shard files")
+    ss.add_argument("--shards", type=int, required=True)
+    ss.add_argument("--key", choices=SHARD_KEYS, default="region",
+                    help="Shard flights by departure country (region) or departure month")
+    ss.set_defaults(func=lambda svc, args: show(svc.split_shards(args.root, args.shards, args.key)))
+
+    sr = subparsers.add_parser("shard-rebalance", help="Change shard count or key, moving only affected flights")
+    sr.add_argument("--root", required=True)
+    sr.add_argument("--shards", type=int)
+    sr.add_argument("--key", choices=SHARD_KEYS)
+    sr.set_defaults(func=lambda svc, args: show(svc.rebalance_shards(args.root, args.shards, args.key)))
+
+    st = subparsers.add_parser("shard-status", help="Flights, bookings and file size per shard")
+    st.add_argument("--root", required=True)
+    st.set_defaults(func=lambda svc, args: show(svc.shard_status(args.root)))
+
+    sp = subparsers.add_parser("shard-report", help="Run reports across every shard and merge the results")
+    sp.add_argument("--root", required=True)
+    sp.add_argument("names", nargs="*", metavar="REPORT", help=f"one or more of: {', '.join(REPORTS)}")
+    sp.add_argument("--limit", type=int, default=10)
+    sp.set_defaults(func=lambda svc, args: show(svc.shard_reports(args.root, args.names or None, args.limit)))
+
+    # =========================================================
+    # HTTP API
+    # =========================================================
+    sv = subparsers.add_parser("serve", help="Serve a JSON API over HTTP (Basic auth maps to users)")
+    sv.add_argument("--host", default=HTTP_HOST)
+    sv.add_argument("--port", type=int, default=HTTP_PORT)
+    sv.add_argument("--threads", type=int, default=HTTP_THREADS, help="Worker threads per process")
+    sv.add_argument("--processes", type=int, default=1, help="Pre-forked processes sharing the port")
+    sv.add_argument("--verbose", action="store_true", help="Log every request")
+    sv.set_defaults(func=serve_http)
+
     # =========================================================
     # Parse
     # =========================================================
     args = parser.parse_args()
+    if args.profile:
+        set_profile(args.profile)
 
     # Initialize services with role
     svc = Services(mongo_uri=mongo_uri, current_user_role=args.role)
 
     if hasattr(args, "func"):
         try:
+            if args.auth_user:
+                svc.authenticate(args.auth_user, args.auth_password or "")
+            elif args.command == "login":
+                raise PermissionError("login needs --user and --password")
+            elif args.auth_session and args.command != "logout":
+                svc.resume_session(args.auth_session)
             args.func(svc, args)
         except PermissionError as e:
             print(f"Permission denied: {e}")
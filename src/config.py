@@ -7,5 +7,70 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # SQLite database file path
 DB_PATH = os.environ.get("DB_PATH", str(BASE_DIR / "airline.db"))
 
+# Connection tuning profile (see db.PROFILES): oltp, reporting, bulk-load or default
+DB_PROFILE = os.environ.get("DB_PROFILE", "oltp")
+
 # SQL schema file path
 SCHEMA_PATH = os.environ.get("SCHEMA_PATH", str(BASE_DIR / "models.sql"))
+
+# Password hashing: "scrypt" (memory-hard, default) or "pbkdf2"
+AUTH_KDF = os.environ.get("AUTH_KDF", "scrypt")
+SCRYPT_N = int(os.environ.get("SCRYPT_N", 2 ** 14))
+SCRYPT_R = int(os.environ.get("SCRYPT_R", 8))
+SCRYPT_P = int(os.environ.get("SCRYPT_P", 1))
+PBKDF2_ITERATIONS = int(os.environ.get("PBKDF2_ITERATIONS", 600_000))
+
+# Verified-login cache (per process)
+AUTH_CACHE_TTL = float(os.environ.get("AUTH_CACHE_TTL", 300))
+AUTH_CACHE_SIZE = int(os.environ.get("AUTH_CACHE_SIZE", 1024))
+# Lifetime of a CLI session token issued by `login`
+AUTH_SESSION_TTL = float(os.environ.get("AUTH_SESSION_TTL", 3600))
+
+# Ticket numbers: 3-digit airline prefix + 10-digit serial + mod-7 check digit
+TICKET_PREFIX = os.environ.get("TICKET_PREFIX", "999")
+TICKET_BLOCK_SIZE = int(os.environ.get("TICKET_BLOCK_SIZE", 1000))
+
+# Online backups: pages copied per backup step and seconds slept between steps
+BACKUP_PAGES_PER_STEP = int(os.environ.get("BACKUP_PAGES_PER_STEP", 256))
+BACKUP_SLEEP = float(os.environ.get("BACKUP_SLEEP", 0.005))
+# Restarts caused by concurrent writes before the rest is copied in a single step
+BACKUP_MAX_RESTARTS = int(os.environ.get("BACKUP_MAX_RESTARTS", 10))
+BACKUP_COMPRESS_LEVEL = int(os.environ.get("BACKUP_COMPRESS_LEVEL", 6))
+
+# Change data capture: rows per read and idle poll interval for `changes --follow`
+CDC_BATCH_SIZE = int(os.environ.get("CDC_BATCH_SIZE", 500))
+CDC_POLL_INTERVAL = float(os.environ.get("CDC_POLL_INTERVAL", 1.0))
+
+# HTTP API (serve)
+HTTP_HOST = os.environ.get("HTTP_HOST", "127.0.0.1")
+HTTP_PORT = int(os.environ.get("HTTP_PORT", 8080))
+HTTP_THREADS = int(os.environ.get("HTTP_THREADS", 8))
+
+# Report result cache: entries kept, and a JSON file to persist them across runs ("" = memory only)
+REPORT_CACHE_SIZE = int(os.environ.get("REPORT_CACHE_SIZE", 256))
+REPORT_CACHE_PATH = os.environ.get("REPORT_CACHE_PATH", "")
+
+# Approximate analytics: Count-Min shape, heavy-hitter candidates kept, HyperLogLog precision (2**p registers)
+SKETCH_WIDTH = int(os.environ.get("SKETCH_WIDTH", 2048))
+SKETCH_DEPTH = int(os.environ.get("SKETCH_DEPTH", 4))
+SKETCH_HEAVY_HITTERS = int(os.environ.get("SKETCH_HEAVY_HITTERS", 256))
+SKETCH_HLL_PRECISION = int(os.environ.get("SKETCH_HLL_PRECISION", 10))
+
+# Overbooking: max chance of more shows than seats, max share above capacity, bookings a route needs for its own rate
+OVERBOOK_RISK = float(os.environ.get("OVERBOOK_RISK", 0.05))
+OVERBOOK_MAX = float(os.environ.get("OVERBOOK_MAX", 0.15))
+OVERBOOK_MIN_HISTORY = int(os.environ.get("OVERBOOK_MIN_HISTORY", 30))
+
+# Fleet planning: minimum ground time between two legs flown by the same aircraft
+FLEET_MIN_TURN_MINUTES = float(os.environ.get("FLEET_MIN_TURN_MINUTES", 30))
+
+# Schedule sync: flights written per transaction when applying a schedule diff
+SCHEDULE_CHUNK = int(os.environ.get("SCHEDULE_CHUNK", 5000))
+
+# Passenger notifications: messages per sink call, attempts before a message is FAILED,
+# first retry delay (doubling after each failure), claim lease, and the file sink's default path
+NOTIFY_BATCH_SIZE = int(os.environ.get("NOTIFY_BATCH_SIZE", 500))
+NOTIFY_MAX_ATTEMPTS = int(os.environ.get("NOTIFY_MAX_ATTEMPTS", 5))
+NOTIFY_RETRY_SECONDS = float(os.environ.get("NOTIFY_RETRY_SECONDS", 30))
+NOTIFY_LEASE_SECONDS = float(os.environ.get("NOTIFY_LEASE_SECONDS", 60))
+NOTIFY_FILE = os.environ.get("NOTIFY_FILE", "notifications.jsonl")
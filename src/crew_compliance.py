@@ -0,0 +1,121 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from .db import connect
+from .config import DB_PATH
+
+# Default duty limits
+MAX_BLOCK_HOURS_7D = 60.0
+MIN_REST_HOURS = 10.0
+# Gaps shorter than this are a turn within one duty period, not a rest
+DUTY_BREAK_HOURS = 3.0
+
+WINDOW_SECONDS = 7 * 24 * 3600
+
+# Below this many crew members the work is done in-process
+PARALLEL_MIN_CREW = 2000
+
+ROSTER_SQL = """
+    SELECT ca.crew_member_id, f.id, f.departure_time, f.arrival_time
+    FROM crew_assignment ca
+    JOIN flight f ON f.id = ca.flight_id
+    {where}
+    ORDER BY ca.crew_member_id, f.departure_time
+"""
+
+
+def check_roster(crew_member_id: int, legs: List[Tuple[float, float, int]],
+                 max_block_hours_7d: float, min_rest_hours: float) -> List[Dict]:
+    """Check one crew member's legs, (start, end, flight_id) sorted by start, in linear time.
+
+    Rolling 7-day block time uses prefix sums over a sliding window start pointer.
+    Rest is checked between duty periods: gaps under DUTY_BREAK_HOURS are turns.
+    """
+    violations = []
+    prefix = [0.0]
+    for start, end, _ in legs:
+        prefix.append(prefix[-1] + (end - start))
+    limit = max_block_hours_7d * 3600
+    min_rest = min_rest_hours * 3600
+    duty_break = min(DUTY_BREAK_HOURS, min_rest_hours) * 3600
+    lo = 0
+    for i, (start, end, flight_id) in enumerate(legs):
+        if i:
+            rest = start - legs[i - 1][1]
+            rule = "overlap" if rest < 0 else "min_rest" if duty_break <= rest < min_rest else None
+            if rule:
+                violations.append(dict(
+                    crew_member_id=crew_member_id, rule=rule, flight_id=flight_id,
+                    previous_flight_id=legs[i - 1][2],
+                    value=round(rest / 3600, 2), limit=min_rest_hours
+                ))
+        while legs[lo][0] <= start - WINDOW_SECONDS:
+            lo += 1
+        block = prefix[i + 1] - prefix[lo]
+        if block > limit:
+            violations.append(dict(
+                crew_member_id=crew_member_id, rule="max_block_hours_7d", flight_id=flight_id,
+                window_start_flight_id=legs[lo][2],
+                value=round(block / 3600, 2), limit=max_block_hours_7d
+            ))
+    return violations
+
+
+def _ts(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _check_rows(rows, max_block_hours_7d, min_rest_hours) -> List[Dict]:
+    violations, crew, legs = [], None, []
+    for crew_member_id, flight_id, dep, arr in rows:
+        if crew_member_id != crew:
+            if legs:
+                violations.extend(check_roster(crew, legs, max_block_hours_7d, min_rest_hours))
+            crew, legs = crew_member_id, []
+        legs.append((_ts(dep), _ts(arr), flight_id))
+    if legs:
+        violations.extend(check_roster(crew, legs, max_block_hours_7d, min_rest_hours))
+    return violations
+
+
+def _check_crew_range(db_path: str, lo: int, hi: int, max_block_hours_7d: float,
+                      min_rest_hours: float) -> List[Dict]:
+    """Worker: read and check crew ids in [lo, hi) over its own read-only connection."""
+    with connect(db_path, read_only=True) as conn:
+        rows = conn.execute(ROSTER_SQL.format(where="WHERE ca.crew_member_id >= ? AND ca.crew_member_id < ?"),
+                            (lo, hi))
+        return _check_rows(rows, max_block_hours_7d, min_rest_hours)
+
+
+class CrewCompliance:
+    def __init__(self, db_path: str = DB_PATH, max_block_hours_7d: float = MAX_BLOCK_HOURS_7D,
+                 min_rest_hours: float = MIN_REST_HOURS):
+        self.db_path = db_path
+        self.max_block_hours_7d = max_block_hours_7d
+        self.min_rest_hours = min_rest_hours
+
+    def check(self, workers: Optional[int] = None) -> List[Dict]:
+        """Return every duty-limit violation, fanning crew id ranges out to a process pool."""
+        with connect(self.db_path) as conn:
+            lo, hi, crew = conn.execute(
+                "SELECT MIN(crew_member_id), MAX(crew_member_id), COUNT(DISTINCT crew_member_id) FROM crew_assignment"
+            ).fetchone()
+            if lo is None:
+                return []
+            workers = workers or os.cpu_count() or 1
+            if workers == 1 or crew < PARALLEL_MIN_CREW:
+                return _check_rows(conn.execute(ROSTER_SQL.format(where="")),
+                                   self.max_block_hours_7d, self.min_rest_hours)
+
+        # several ranges per worker keeps the pool busy when crew sizes are skewed
+        parts = workers * 4
+        step = -(-(hi - lo + 1) // parts)
+        bounds = [(start, min(start + step, hi + 1)) for start in range(lo, hi + 1, step)]
+        violations = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_check_crew_range, self.db_path, a, b,
+                                   self.max_block_hours_7d, self.min_rest_hours) for a, b in bounds]
+            for future in futures:
+                violations.extend(future.result())
+        return violations
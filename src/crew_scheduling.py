@@ -0,0 +1,283 @@
+import bisect
+import csv
+import heapq
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from .db import connect
+from .config import DB_PATH
+from .records import CrewAssignment
+
+# data_version counters the cached rosters and flight times depend on, in table_name order
+_VERSIONS = """SELECT version FROM data_version
+               WHERE table_name IN ('*epoch', 'crew_assignment', 'flight') ORDER BY table_name"""
+
+
+class RosterConflict(ValueError):
+    """Raised when an assignment overlaps a flight the crew member already works."""
+
+    def __init__(self, crew_member_id, flight_id, conflicts):
+        self.crew_member_id = crew_member_id
+        self.flight_id = flight_id
+        self.conflicts = conflicts
+        super().__init__(
+            f"Crew member {crew_member_id} cannot work flight {flight_id}: "
+            f"overlaps flight(s) {', '.join(str(c) for c in conflicts)}"
+        )
+
+
+class IntervalIndex:
+    """Intervals sorted by start with a running max of end times (an array-backed interval tree).
+
+    overlaps() is a bisect plus a walk over the actual overlaps, so validating a
+    new interval against a crew member's roster is O(log n).
+    """
+
+    __slots__ = ("starts", "ends", "ids", "max_end")
+
+    def __init__(self):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+        self.ids: List[int] = []
+        self.max_end: List[datetime] = []
+
+    def __len__(self):
+        return len(self.starts)
+
+    def add(self, start: datetime, end: datetime, item_id: int) -> None:
+        i = bisect.bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.ids.insert(i, item_id)
+        running = self.max_end[i - 1] if i else end
+        self.max_end.insert(i, max(running, end))
+        for j in range(i + 1, len(self.max_end)):
+            if self.max_end[j] >= self.max_end[j - 1]:
+                break
+            self.max_end[j] = self.max_end[j - 1]
+
+    def overlaps(self, start: datetime, end: datetime, ignore_id: Optional[int] = None) -> List[int]:
+        """Ids of intervals overlapping [start, end) -- touching end/start is allowed."""
+        found = []
+        i = bisect.bisect_left(self.starts, end) - 1
+        while i >= 0 and self.max_end[i] > start:
+            if self.ends[i] > start and self.ids[i] != ignore_id:
+                found.append(self.ids[i])
+            i -= 1
+        return found
+
+
+def _parse(ts: str) -> datetime:
+    return datetime.fromisoformat(ts)
+
+
+class CrewScheduler:
+    """Roster validation against per-crew interval indexes and cached flight times.
+
+    The caches are checked against the flight and crew_assignment data_version
+    counters at the start of every call and dropped when any process has
+    changed either table; this scheduler's own writes patch them instead.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._indexes: Dict[int, IntervalIndex] = {}
+        self._flight_times: Dict[int, Tuple[datetime, datetime]] = {}
+        self._versions: Optional[Tuple[int, ...]] = None
+
+    # ----------------------------
+    # Index maintenance
+    # ----------------------------
+    def _sync(self, conn) -> None:
+        """Drop the caches if flight or crew_assignment changed since they were loaded."""
+        versions = tuple(v for v, in conn.execute(_VERSIONS))
+        if versions != self._versions:
+            self._indexes.clear()
+            self._flight_times.clear()
+            self._versions = versions
+
+    def _wrote(self, conn, rows: int) -> None:
+        """Account for our own uncommitted crew_assignment writes; if anything else
+        committed since _sync(), the caches cannot be trusted and are dropped."""
+        epoch, crew, flight = self._versions
+        versions = tuple(v for v, in conn.execute(_VERSIONS))
+        if versions != (epoch, crew + rows, flight):
+            self._indexes.clear()
+            self._flight_times.clear()
+        self._versions = versions
+
+    def _index(self, conn, crew_member_id: int) -> IntervalIndex:
+        """Per-crew index, loaded on first use with one query on the crew's assignments."""
+        index = self._indexes.get(crew_member_id)
+        if index is None:
+            index = IntervalIndex()
+            rows = conn.execute("""
+                SELECT f.id, f.departure_time, f.arrival_time
+                FROM crew_assignment ca
+                JOIN flight f ON f.id = ca.flight_id
+                WHERE ca.crew_member_id = ?
+            """, (crew_member_id,)).fetchall()
+            for flight_id, dep, arr in rows:
+                index.add(_parse(dep), _parse(arr), flight_id)
+            self._indexes[crew_member_id] = index
+        return index
+
+    def _times(self, conn, flight_id: int) -> Tuple[datetime, datetime]:
+        times = self._flight_times.get(flight_id)
+        if times is None:
+            row = conn.execute("SELECT departure_time, arrival_time FROM flight WHERE id=?",
+                               (flight_id,)).fetchone()
+            if not row:
+                raise ValueError(f"Flight {flight_id} not found")
+            times = self._flight_times[flight_id] = (_parse(row[0]), _parse(row[1]))
+        return times
+
+    def _prefetch_flights(self, conn, flight_ids: Iterable[int]) -> None:
+        missing = sorted({f for f in flight_ids if f not in self._flight_times})
+        for i in range(0, len(missing), 500):
+            chunk = missing[i:i + 500]
+            rows = conn.execute(
+                f"SELECT id, departure_time, arrival_time FROM flight WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            for flight_id, dep, arr in rows:
+                self._flight_times[flight_id] = (_parse(dep), _parse(arr))
+
+    # ----------------------------
+    # Validation + assignment
+    # ----------------------------
+    def conflicts_for(self, crew_member_id: int, flight_id: int) -> List[int]:
+        """Flights already assigned to the crew member that overlap flight_id."""
+        with connect(self.db_path) as conn:
+            self._sync(conn)
+            start, end = self._times(conn, flight_id)
+            return self._index(conn, crew_member_id).overlaps(start, end, ignore_id=flight_id)
+
+    def assign(self, crew_member_id: int, flight_id: int, duty: str) -> int:
+        """Validate against the crew member's roster, then create the assignment."""
+        with connect(self.db_path) as conn:
+            self._sync(conn)
+            start, end = self._times(conn, flight_id)
+            index = self._index(conn, crew_member_id)
+            clashes = index.overlaps(start, end, ignore_id=flight_id)
+            if clashes:
+                raise RosterConflict(crew_member_id, flight_id, clashes)
+            cur = conn.execute("INSERT INTO crew_assignment (crew_member_id, flight_id, duty) VALUES (?, ?, ?)",
+                               (crew_member_id, flight_id, duty))
+            self._wrote(conn, 1)
+            conn.commit()
+            if crew_member_id in self._indexes:
+                index.add(start, end, flight_id)
+            return cur.lastrowid
+
+    def update(self, assignment_id: int, crew_member_id: Optional[int] = None, flight_id: Optional[int] = None,
+               duty: Optional[str] = None) -> Optional[CrewAssignment]:
+        """Move an assignment to another crew member, flight or duty, validated like assign()."""
+        with connect(self.db_path) as conn:
+            self._sync(conn)
+            row = conn.execute("SELECT crew_member_id, flight_id, duty FROM crew_assignment WHERE id=?",
+                               (assignment_id,)).fetchone()
+            if not row:
+                return None
+            old_crew, old_flight, old_duty = row
+            new_crew, new_flight, new_duty = crew_member_id or old_crew, flight_id or old_flight, duty or old_duty
+            start, end = self._times(conn, new_flight)
+            clashes = [f for f in self._index(conn, new_crew).overlaps(start, end, ignore_id=new_flight)
+                       if not (new_crew == old_crew and f == old_flight)]  # the leg being moved away from
+            if clashes:
+                raise RosterConflict(new_crew, new_flight, clashes)
+            conn.execute("UPDATE crew_assignment SET crew_member_id=?, flight_id=?, duty=? WHERE id=?",
+                         (new_crew, new_flight, new_duty, assignment_id))
+            self._wrote(conn, 1)
+            conn.commit()
+            self._indexes.pop(old_crew, None)  # reloaded on next use
+            self._indexes.pop(new_crew, None)
+            return CrewAssignment(assignment_id, new_crew, new_flight, new_duty)
+
+    def unassign(self, assignment_id: int) -> bool:
+        """Delete an assignment and drop it from the crew member's roster."""
+        with connect(self.db_path) as conn:
+            self._sync(conn)
+            row = conn.execute("SELECT crew_member_id FROM crew_assignment WHERE id=?", (assignment_id,)).fetchone()
+            if not row:
+                return False
+            conn.execute("DELETE FROM crew_assignment WHERE id=?", (assignment_id,))
+            self._wrote(conn, 1)
+            conn.commit()
+            self._indexes.pop(row[0], None)
+            return True
+
+    def import_roster(self, rows: Iterable[Tuple[int, int, str]]) -> Dict:
+        """Bulk import (crew_member_id, flight_id, duty) rows in one transaction.
+
+        Rows are validated against the existing roster and against each other;
+        conflicting or unknown rows are rejected, the rest are inserted.
+        """
+        rows = [(int(c), int(f), d) for c, f, d in rows]
+        accepted, rejected = [], []
+        with connect(self.db_path) as conn:
+            self._sync(conn)
+            self._prefetch_flights(conn, (f for _, f, _ in rows))
+            for crew_member_id, flight_id, duty in rows:
+                if flight_id not in self._flight_times:
+                    rejected.append(dict(crew_member_id=crew_member_id, flight_id=flight_id,
+                                         reason="unknown flight"))
+                    continue
+                start, end = self._flight_times[flight_id]
+                index = self._index(conn, crew_member_id)
+                if flight_id in index.ids:
+                    rejected.append(dict(crew_member_id=crew_member_id, flight_id=flight_id,
+                                         reason="already assigned"))
+                    continue
+                clashes = index.overlaps(start, end)
+                if clashes:
+                    rejected.append(dict(crew_member_id=crew_member_id, flight_id=flight_id,
+                                         reason=f"overlaps flight(s) {clashes}"))
+                    continue
+                index.add(start, end, flight_id)
+                accepted.append((crew_member_id, flight_id, duty))
+            try:
+                conn.executemany("INSERT INTO crew_assignment (crew_member_id, flight_id, duty) VALUES (?, ?, ?)",
+                                 accepted)
+                self._wrote(conn, len(accepted))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                self._indexes.clear()  # the in-memory rosters no longer match the table
+                raise
+        return dict(imported=len(accepted), rejected=rejected)
+
+    def import_roster_csv(self, path: str) -> Dict:
+        """Import a CSV with crew_member_id, flight_id and duty columns."""
+        with open(path, newline="", encoding="utf-8") as fh:
+            reader = csv.DictReader(fh)
+            return self.import_roster((r["crew_member_id"], r["flight_id"], r["duty"]) for r in reader)
+
+    # ----------------------------
+    # Network-wide report
+    # ----------------------------
+    def find_conflicts(self) -> List[Dict]:
+        """All overlapping assignment pairs, found in one sort-and-sweep pass."""
+        conflicts = []
+        with connect(self.db_path) as conn:
+            rows = conn.execute("""
+                SELECT ca.crew_member_id, f.id, f.code, f.departure_time, f.arrival_time
+                FROM crew_assignment ca
+                JOIN flight f ON f.id = ca.flight_id
+                ORDER BY ca.crew_member_id, f.departure_time
+            """)
+            current_crew, active = None, []
+            for crew_member_id, flight_id, code, dep, arr in rows:
+                start, end = _parse(dep), _parse(arr)
+                if crew_member_id != current_crew:
+                    current_crew, active = crew_member_id, []
+                while active and active[0][0] <= start:
+                    heapq.heappop(active)
+                for other_end, other_id, other_code, other_dep in active:
+                    conflicts.append(dict(
+                        crew_member_id=crew_member_id,
+                        flight_id=other_id, flight_code=other_code, departure_time=other_dep,
+                        overlapping_flight_id=flight_id, overlapping_flight_code=code,
+                        overlapping_departure_time=dep,
+                    ))
+                heapq.heappush(active, (end, flight_id, code, dep))
+        return conflicts
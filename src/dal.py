@@ -1,12 +1,32 @@
 import sqlite3
-from sqlite3 import connect
 from datetime import datetime
-import uuid, random
+import random
+import re
+from .db import bare_connect as connect, connect as db_connect, flight_range_filter
+from .pricing import quote_flight
+from .ticketing import allocator_for
+from .booking_lifecycle import BOOKED, HELD, DEFAULT_HOLD_SECONDS, hold_expiry, transition
+from .records import (Passenger, Airport, Aircraft, Flight, Booking, Ticket, CrewMember, CrewAssignment,
+                      User, PassengerBookings, FlightRevenue, RouteLoad, ItineraryLeg, fetch_all, iter_all)
+
+# Largest match set search_passengers() will bm25-rank
+SEARCH_RANK_MAX = 2000
+
+
+def fts_query(text):
+    """Turn free text ("sara mal", "omar.khan@ex") into an FTS5 query of quoted prefix terms."""
+    terms = re.findall(r"\w+", text or "")
+    return " ".join(f'"{term}"*' for term in terms)
 
 
 class DAL:
-    def __init__(self, db_path="airline.db"):
+    def __init__(self, db_path="airline.db", read_only=False):
         self.db_path = db_path
+        self.read_only = read_only
+
+    def _report_connection(self):
+        """Reports run on a read-only, query_only connection when the DAL is opened read_only."""
+        return db_connect(self.db_path, read_only=True) if self.read_only else connect(self.db_path)
 
     # ----------------------------
     # Passenger CRUD
@@ -20,10 +40,42 @@ class DAL:
             conn.commit()
             return cur.lastrowid
 
-    def list_passengers(self):
-        with connect(self.db_path) as conn:
-            cur = conn.execute("SELECT id, name, email FROM passenger")
-            return [dict(id=row[0], name=row[1], email=row[2]) for row in cur.fetchall()]
+    def list_passengers(self, stream=False):
+        sql = "SELECT id, name, email FROM passenger"
+        if stream:
+            return iter_all(connect(self.db_path), Passenger, sql)
+        with connect(self.db_path) as conn:
+            return fetch_all(conn, Passenger, sql)
+
+    def search_passengers(self, query, limit=20):
+        """Full-text search over name and email; every word is matched as a prefix.
+
+        Results are bm25-ranked when the query is selective. Scoring costs a couple of
+        microseconds per match, so a vague query ("omar", "mal") matching more than
+        SEARCH_RANK_MAX passengers returns its first matches in id order instead.
+        """
+        match = fts_query(query)
+        if not match:
+            return []
+        with connect(self.db_path) as conn:
+            hits = conn.execute(
+                "SELECT COUNT(*) FROM (SELECT 1 FROM passenger_fts WHERE passenger_fts MATCH ? LIMIT ?)",
+                (match, SEARCH_RANK_MAX + 1)
+            ).fetchone()[0]
+            ranked = hits <= SEARCH_RANK_MAX
+            return fetch_all(conn, Passenger, f"""
+                SELECT p.id, p.name, p.email
+                FROM (SELECT rowid, rank FROM passenger_fts WHERE passenger_fts MATCH ?
+                      {"ORDER BY rank" if ranked else ""} LIMIT ?) m
+                JOIN passenger p ON p.id = m.rowid
+                {"ORDER BY m.rank" if ranked else ""}
+            """, (match, limit))
+
+    def rebuild_passenger_search(self):
+        """Re-index passenger_fts from the passenger table (backfill for older databases)."""
+        with connect(self.db_path) as conn:
+            conn.execute("INSERT INTO passenger_fts (passenger_fts) VALUES ('rebuild')")
+            conn.commit()
 
     def update_passenger(self, passenger_id, name=None, email=None):
         with connect(self.db_path) as conn:
@@ -37,7 +89,7 @@ class DAL:
                 (new_name, new_email, passenger_id)
             )
             conn.commit()
-            return dict(id=passenger_id, name=new_name, email=new_email)
+            return Passenger(passenger_id, new_name, new_email)
 
     def delete_passenger(self, passenger_id):
         with connect(self.db_path) as conn:
@@ -59,8 +111,7 @@ class DAL:
 
     def list_airports(self):
         with connect(self.db_path) as conn:
-            cur = conn.execute("SELECT * FROM airport")
-            return [dict(id=row[0], code=row[1], name=row[2], city=row[3], country=row[4]) for row in cur.fetchall()]
+            return fetch_all(conn, Airport, "SELECT id, code, name, city, country FROM airport")
 
     def update_airport(self, airport_id, code=None, name=None, city=None, country=None):
         with connect(self.db_path) as conn:
@@ -74,7 +125,7 @@ class DAL:
             conn.execute("UPDATE airport SET code=?, name=?, city=?, country=? WHERE id=?",
                          (new_code, new_name, new_city, new_country, airport_id))
             conn.commit()
-            return dict(id=airport_id, code=new_code, name=new_name, city=new_city, country=new_country)
+            return Airport(airport_id, new_code, new_name, new_city, new_country)
 
     def delete_airport(self, airport_id):
         with connect(self.db_path) as conn:
@@ -93,8 +144,7 @@ class DAL:
 
     def list_aircraft(self):
         with connect(self.db_path) as conn:
-            cur = conn.execute("SELECT * FROM aircraft")
-            return [dict(id=row[0], model=row[1], capacity=row[2]) for row in cur.fetchall()]
+            return fetch_all(conn, Aircraft, "SELECT id, model, capacity FROM aircraft")
 
     def update_aircraft(self, aircraft_id, model=None, capacity=None):
         with connect(self.db_path) as conn:
@@ -105,7 +155,7 @@ class DAL:
             new_capacity = capacity or row[2]
             conn.execute("UPDATE aircraft SET model=?, capacity=? WHERE id=?", (new_model, new_capacity, aircraft_id))
             conn.commit()
-            return dict(id=aircraft_id, model=new_model, capacity=new_capacity)
+            return Aircraft(aircraft_id, new_model, new_capacity)
 
     def delete_aircraft(self, aircraft_id):
         with connect(self.db_path) as conn:
@@ -127,15 +177,14 @@ class DAL:
             conn.commit()
             return cur.lastrowid
 
-    def list_flights(self):
+    def list_flights(self, stream=False):
+        sql = """SELECT id, code, departure_airport_id, arrival_airport_id,
+                        departure_time, arrival_time, aircraft_id, base_price
+                 FROM flight"""
+        if stream:
+            return iter_all(connect(self.db_path), Flight, sql)
         with connect(self.db_path) as conn:
-            cur = conn.execute("SELECT * FROM flight")
-            return [dict(
-                id=row[0], code=row[1],
-                departure_airport_id=row[2], arrival_airport_id=row[3],
-                departure_time=row[4], arrival_time=row[5],
-                aircraft_id=row[6], base_price=row[7]
-            ) for row in cur.fetchall()]
+            return fetch_all(conn, Flight, sql)
 
     def update_flight(self, flight_id, code=None, departure_airport_id=None, arrival_airport_id=None,
                       departure_time=None, arrival_time=None, aircraft_id=None, base_price=None):
@@ -157,9 +206,8 @@ class DAL:
                          (new_code, new_dep_airport, new_arr_airport, new_departure,
                           new_arrival, new_aircraft, new_price, flight_id))
             conn.commit()
-            return dict(id=flight_id, code=new_code, departure_airport_id=new_dep_airport,
-                        arrival_airport_id=new_arr_airport, departure_time=new_departure,
-                        arrival_time=new_arrival, aircraft_id=new_aircraft, base_price=new_price)
+            return Flight(flight_id, new_code, new_dep_airport, new_arr_airport,
+                          new_departure, new_arrival, new_aircraft, new_price)
 
     def delete_flight(self, flight_id):
         with connect(self.db_path) as conn:
@@ -170,42 +218,94 @@ class DAL:
     # ----------------------------
     # Booking + Ticket
     # ----------------------------
-    def create_booking(self, passenger_id, flight_id, ticket_class, price, seat_no=None):
+    def create_booking(self, passenger_id, flight_id, ticket_class, price=None, seat_no=None):
         with connect(self.db_path) as conn:
-            cur = conn.execute(
-                "INSERT INTO booking (passenger_id, flight_id, status, booked_at, price) VALUES (?, ?, 'CONFIRMED', ?, ?)",
-                (passenger_id, flight_id, datetime.utcnow().isoformat(), price)
-            )
-            booking_id = cur.lastrowid
-            ticket_no = str(uuid.uuid4())[:8].upper()
-            if not seat_no:
-                seat_no = f"{random.randint(1,30)}{chr(random.randint(65,70))}"
-            conn.execute(
-                "INSERT INTO ticket (booking_id, ticket_no, seat_no, class) VALUES (?, ?, ?, ?)",
-                (booking_id, ticket_no, seat_no, ticket_class)
-            )
+            booking_id = self._insert_booking(conn, passenger_id, flight_id, ticket_class, price, seat_no, BOOKED)
             conn.commit()
             return booking_id
 
-    def list_bookings(self):
+    def hold_booking(self, passenger_id, flight_id, ticket_class, price=None, seat_no=None,
+                     hold_seconds=DEFAULT_HOLD_SECONDS):
+        """Reserve a seat as HELD until confirmed, cancelled or expired by the sweeper."""
         with connect(self.db_path) as conn:
-            cur = conn.execute("""SELECT b.id, b.passenger_id, b.flight_id, b.status, b.booked_at, b.price,
-                                         t.ticket_no, t.seat_no, t.class
-                                  FROM booking b LEFT JOIN ticket t ON b.id = t.booking_id""")
-            return [dict(id=row[0], passenger_id=row[1], flight_id=row[2], status=row[3],
-                         booked_at=row[4], price=row[5], ticket_no=row[6], seat_no=row[7], ticket_class=row[8])
-                    for row in cur.fetchall()]
+            booking_id = self._insert_booking(conn, passenger_id, flight_id, ticket_class, price, seat_no,
+                                              HELD, hold_expiry(hold_seconds))
+            conn.commit()
+            return booking_id
+
+    def _insert_booking(self, conn, passenger_id, flight_id, ticket_class, price, seat_no, status,
+                        hold_expires_at=None, ticket_no=None, booking_id=None):
+        """Insert a booking and its ticket; booking_id (shards) also becomes the ticket id."""
+        if price is None:
+            price = quote_flight(conn, flight_id, ticket_class)["price"]
+        ticket_no = ticket_no or allocator_for(self.db_path).next()
+        if not seat_no:
+            seat_no = f"{random.randint(1,30)}{chr(random.randint(65,70))}"
+        ticket_id = booking_id
+        booking_id = conn.execute(
+            """INSERT INTO booking (id, passenger_id, flight_id, status, booked_at, price, hold_expires_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?) RETURNING id""",
+            (booking_id, passenger_id, flight_id, status, datetime.utcnow().isoformat(), price, hold_expires_at)
+        ).fetchone()[0]
+        conn.execute(
+            "INSERT INTO ticket (id, booking_id, ticket_no, seat_no, class) VALUES (?, ?, ?, ?, ?)",
+            (ticket_id, booking_id, ticket_no, seat_no, ticket_class)
+        )
+        return booking_id
+
+    def list_bookings(self, stream=False):
+        """All bookings with their ticket; stream=True yields them in batches instead of building a list."""
+        sql = """SELECT b.id, b.passenger_id, b.flight_id, b.status, b.booked_at, b.price,
+                        t.ticket_no, t.seat_no, t.class
+                 FROM booking b LEFT JOIN ticket t ON b.id = t.booking_id"""
+        if stream:
+            return iter_all(connect(self.db_path), Booking, sql)
+        with connect(self.db_path) as conn:
+            return fetch_all(conn, Booking, sql)
+
+    def get_passenger_itinerary(self, passenger_id, when=None, now=None):
+        """One passenger's trips in departure order; when="upcoming" or "past" splits on now.
+
+        Bookings come from idx_booking_passenger and tickets from the covering
+        idx_ticket_booking_itinerary, so the cost depends on this passenger's
+        bookings only, not on the size of the booking table.
+        """
+        if when not in (None, "upcoming", "past"):
+            raise ValueError(f"Unknown itinerary filter {when}")
+        params = [passenger_id]
+        condition = ""
+        if when:
+            condition = "AND f.departure_time >= ?" if when == "upcoming" else "AND f.departure_time < ?"
+            params.append((now or datetime.utcnow()).isoformat())
+        with connect(self.db_path) as conn:
+            return fetch_all(conn, ItineraryLeg, f"""
+                SELECT b.id, b.status, b.booked_at, b.price, t.ticket_no, t.seat_no, t.class,
+                       f.id, f.code, dep.code, arr.code, f.departure_time, f.arrival_time
+                FROM booking b
+                JOIN flight f ON f.id = b.flight_id
+                JOIN airport dep ON dep.id = f.departure_airport_id
+                JOIN airport arr ON arr.id = f.arrival_airport_id
+                LEFT JOIN ticket t ON t.booking_id = b.id
+                WHERE b.passenger_id = ? {condition}
+                ORDER BY f.departure_time {"DESC" if when == "past" else ""}, b.id
+            """, params)
 
     def update_booking(self, booking_id, status=None, price=None):
         with connect(self.db_path) as conn:
-            row = conn.execute("SELECT * FROM booking WHERE id=?", (booking_id,)).fetchone()
+            if status and transition(conn, booking_id, status) is None:
+                return None
+            row = conn.execute("SELECT id, passenger_id, flight_id, status, booked_at, price FROM booking WHERE id=?",
+                               (booking_id,)).fetchone()
             if not row:
                 return None
-            new_status = status or row[3]
             new_price = price or row[5]
-            conn.execute("UPDATE booking SET status=?, price=? WHERE id=?", (new_status, new_price, booking_id))
+            conn.execute("UPDATE booking SET price=? WHERE id=?", (new_price, booking_id))
             conn.commit()
-            return dict(id=booking_id, passenger_id=row[1], flight_id=row[2], status=new_status, price=new_price)
+            return Booking(booking_id, row[1], row[2], row[3], row[4], new_price)
+
+    def set_booking_status(self, booking_id, status):
+        """Apply a lifecycle transition (see booking_lifecycle.TRANSITIONS)."""
+        return self.update_booking(booking_id, status=status)
 
     def delete_booking(self, booking_id):
         with connect(self.db_path) as conn:
@@ -225,8 +325,7 @@ class DAL:
 
     def list_crew_members(self):
         with connect(self.db_path) as conn:
-            cur = conn.execute("SELECT * FROM crew_member")
-            return [dict(id=row[0], name=row[1], role=row[2]) for row in cur.fetchall()]
+            return fetch_all(conn, CrewMember, "SELECT id, name, role FROM crew_member")
 
     def update_crew_member(self, crew_id, name=None, role=None):
         with connect(self.db_path) as conn:
@@ -237,7 +336,7 @@ class DAL:
             new_role = role or row[2]
             conn.execute("UPDATE crew_member SET name=?, role=? WHERE id=?", (new_name, new_role, crew_id))
             conn.commit()
-            return dict(id=crew_id, name=new_name, role=new_role)
+            return CrewMember(crew_id, new_name, new_role)
 
     def delete_crew_member(self, crew_id):
         with connect(self.db_path) as conn:
@@ -257,8 +356,7 @@ class DAL:
 
     def list_crew_assignments(self):
         with connect(self.db_path) as conn:
-            cur = conn.execute("SELECT * FROM crew_assignment")
-            return [dict(id=row[0], crew_member_id=row[1], flight_id=row[2], duty=row[3]) for row in cur.fetchall()]
+            return fetch_all(conn, CrewAssignment, "SELECT id, crew_member_id, flight_id, duty FROM crew_assignment")
 
     def update_crew_assignment(self, assignment_id, crew_member_id=None, flight_id=None, duty=None):
         with connect(self.db_path) as conn:
@@ -271,7 +369,7 @@ class DAL:
             conn.execute("UPDATE crew_assignment SET crew_member_id=?, flight_id=?, duty=? WHERE id=?",
                          (new_crew, new_flight, new_duty, assignment_id))
             conn.commit()
-            return dict(id=assignment_id, crew_member_id=new_crew, flight_id=new_flight, duty=new_duty)
+            return CrewAssignment(assignment_id, new_crew, new_flight, new_duty)
 
     def delete_crew_assignment(self, assignment_id):
         with connect(self.db_path) as conn:
@@ -295,8 +393,7 @@ class DAL:
 
     def list_users(self):
             with connect(self.db_path) as conn:
-                cur = conn.execute("SELECT id, username, role FROM user")
-                return [dict(id=row[0], username=row[1], role=row[2]) for row in cur.fetchall()]
+                return fetch_all(conn, User, "SELECT id, username, role FROM user")
 
     def update_user(self, user_id, username=None, password_hash=None, salt=None, role=None):
             with connect(self.db_path) as conn:
@@ -314,7 +411,7 @@ class DAL:
                     (new_username, new_password_hash, new_salt, new_role, user_id)
                 )
                 conn.commit()
-                return dict(id=user_id, username=new_username, role=new_role)
+                return User(user_id, new_username, new_role)
 
     def delete_user(self, user_id):
             with connect(self.db_path) as conn:
@@ -326,6 +423,7 @@ class DAL:
     # Ticket CRUD
     # ----------------------------
     def create_ticket(self, booking_id, ticket_no, seat_no, ticket_class):
+        ticket_no = ticket_no or allocator_for(self.db_path).next()
         with connect(self.db_path) as conn:
             cur = conn.execute(
                 "INSERT INTO ticket (booking_id, ticket_no, seat_no, class) VALUES (?, ?, ?, ?)",
@@ -334,10 +432,12 @@ class DAL:
             conn.commit()
             return cur.lastrowid
 
-    def list_tickets(self):
+    def list_tickets(self, stream=False):
+        sql = "SELECT id, booking_id, ticket_no, seat_no, class FROM ticket"
+        if stream:
+            return iter_all(connect(self.db_path), Ticket, sql)
         with connect(self.db_path) as conn:
-            cur = conn.execute("SELECT * FROM ticket")
-            return [dict(id=row[0], booking_id=row[1], ticket_no=row[2], seat_no=row[3], ticket_class=row[4]) for row in cur.fetchall()]
+            return fetch_all(conn, Ticket, sql)
 
     def update_ticket(self, ticket_id, ticket_no=None, seat_no=None, ticket_class=None):
         with connect(self.db_path) as conn:
@@ -350,7 +450,7 @@ class DAL:
             conn.execute("UPDATE ticket SET ticket_no=?, seat_no=?, class=? WHERE id=?",
                          (new_ticket_no, new_seat_no, new_class, ticket_id))
             conn.commit()
-            return dict(id=ticket_id, booking_id=row[1], ticket_no=new_ticket_no, seat_no=new_seat_no, ticket_class=new_class)
+            return Ticket(ticket_id, row[1], new_ticket_no, new_seat_no, new_class)
 
     def delete_ticket(self, ticket_id):
         with connect(self.db_path) as conn:
@@ -362,36 +462,39 @@ class DAL:
     # Reports / Advanced Queries
     # ----------------------------
 
-    def top_passengers(self, limit=10):
-        """Return passengers ranked by most bookings"""
-        with connect(self.db_path) as conn:
-            cur = conn.execute("""
+    def top_passengers(self, limit=10, flight_range=None):
+        """Return passengers ranked by most (live) bookings"""
+        in_range, params = flight_range_filter("b.flight_id", flight_range)
+        with self._report_connection() as conn:
+            return fetch_all(conn, PassengerBookings, f"""
                 SELECT p.id, p.name, p.email, COUNT(b.id) AS total_bookings
                 FROM passenger p
                 JOIN booking b ON p.id = b.passenger_id
+                WHERE b.status = 'BOOKED' AND {in_range}
                 GROUP BY p.id, p.name, p.email
                 ORDER BY total_bookings DESC
                 LIMIT ?
-            """, (limit,))
-            return [dict(id=row[0], name=row[1], email=row[2], total_bookings=row[3]) for row in cur.fetchall()]
+            """, params + (limit,))
 
-    def revenue_rankings(self, limit=10):
-        """Return flights ranked by highest revenue"""
-        with connect(self.db_path) as conn:
-            cur = conn.execute("""
+    def revenue_rankings(self, limit=10, flight_range=None):
+        """Return flights ranked by highest revenue from live bookings"""
+        in_range, params = flight_range_filter("b.flight_id", flight_range)
+        with self._report_connection() as conn:
+            return fetch_all(conn, FlightRevenue, f"""
                 SELECT f.id, f.code, SUM(b.price) AS total_revenue, COUNT(b.id) AS total_bookings
                 FROM flight f
                 JOIN booking b ON f.id = b.flight_id
+                WHERE b.status = 'BOOKED' AND {in_range}
                 GROUP BY f.id, f.code
                 ORDER BY total_revenue DESC
                 LIMIT ?
-            """, (limit,))
-            return [dict(id=row[0], code=row[1], total_revenue=row[2], total_bookings=row[3]) for row in cur.fetchall()]
+            """, params + (limit,))
 
-    def route_load_factors(self, limit=10):
+    def route_load_factors(self, limit=10, flight_range=None):
         """Return routes ranked by load factor (booked seats ÷ aircraft capacity)"""
-        with connect(self.db_path) as conn:
-            cur = conn.execute("""
+        in_range, params = flight_range_filter("f.id", flight_range)
+        with self._report_connection() as conn:
+            return fetch_all(conn, RouteLoad, f"""
                 SELECT 
                     f.id, f.code,
                     dep.code AS departure_airport,
@@ -401,17 +504,12 @@ class DAL:
                     ROUND(CAST(COUNT(t.id) AS FLOAT) / a.capacity, 2) AS load_factor
                 FROM flight f
                 JOIN aircraft a ON f.aircraft_id = a.id
-                LEFT JOIN booking b ON f.id = b.flight_id
+                LEFT JOIN booking b ON f.id = b.flight_id AND b.status = 'BOOKED'
                 LEFT JOIN ticket t ON b.id = t.booking_id
                 JOIN airport dep ON f.departure_airport_id = dep.id
                 JOIN airport arr ON f.arrival_airport_id = arr.id
+                WHERE {in_range}
                 GROUP BY f.id, f.code, dep.code, arr.code, a.capacity
                 ORDER BY load_factor DESC
                 LIMIT ?
-            """, (limit,))
-            return [dict(
-                flight_id=row[0], flight_code=row[1],
-                departure=row[2], arrival=row[3],
-                capacity=row[4], booked_seats=row[5],
-                load_factor=row[6]
-            ) for row in cur.fetchall()]
+            """, params + (limit,))
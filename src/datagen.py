@@ -0,0 +1,280 @@
+import argparse
+import itertools
+import random
+import string
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+from .db import connect, apply_schema, bulk_load
+from .ticketing import SEQUENCE_NAME, format_ticket_no
+from .cdc import drop_capture_triggers
+from .report_cache import drop_version_triggers
+from .approx import drop_delta_triggers
+
+# Named dataset sizes, expressed as the target number of bookings
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+SEASON_START = datetime(2025, 1, 1)
+
+FLEET = [
+    ("Embraer E190", 100),
+    ("Airbus A320", 180),
+    ("Boeing 737 MAX", 210),
+    ("Boeing 787-9", 290),
+    ("Boeing 777-300ER", 396),
+]
+COUNTRIES = ["UK", "USA", "UAE", "Pakistan", "France", "Germany", "Spain", "India", "Turkey", "Qatar"]
+FIRST_NAMES = ["Adnan", "Sara", "Alice", "David", "John", "Emma", "Michael", "Fatima", "Omar", "Sophie",
+               "James", "Aisha", "Robert", "Hina", "Lucas", "Maria", "Ali", "Chloe", "Bilal", "Noah"]
+LAST_NAMES = ["Khan", "Malik", "Johnson", "Lee", "Smith", "Wilson", "Brown", "Green", "Taylor", "King",
+              "Walker", "Ahmed", "Hussain", "Martin", "Garcia", "Patel", "Shah", "Clarke", "Evans", "Ali"]
+CLASS_MIX = (("ECONOMY", 0.80, 1.0), ("BUSINESS", 0.15, 2.5), ("FIRST", 0.05, 5.0))
+CREW_DUTIES = (("Pilot", "Captain"), ("Co-Pilot", "First Officer"),
+               ("Cabin Crew", "Cabin Service"), ("Cabin Crew", "Cabin Service"))
+SEAT_LETTERS = "ABCDEF"
+
+CHUNK = 50_000
+
+
+def plan(bookings: int) -> Dict[str, int]:
+    """Derive table sizes for a target booking count."""
+    flights = max(50, bookings // 60)
+    aircraft = max(2, flights // 1000)
+    return dict(
+        bookings=bookings,
+        flights=flights,
+        aircraft=aircraft,
+        airports=min(2000, max(20, flights // 100)),
+        passengers=max(100, bookings // 4),
+        crew=aircraft * 2 * len(CREW_DUTIES),
+    )
+
+
+def _chunks(rows: Iterable, size: int = CHUNK) -> Iterator[List]:
+    it = iter(rows)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _zipf_cum_weights(n: int, alpha: float) -> List[float]:
+    """Cumulative power-law weights: rank r is picked with probability ~ 1 / r**alpha."""
+    return list(itertools.accumulate(1.0 / (r ** alpha) for r in range(1, n + 1)))
+
+
+class Generator:
+    """Deterministic synthetic dataset for the whole schema (same seed -> same rows)."""
+
+    def __init__(self, bookings: int = SCALES["10k"], seed: int = 42, activity_alpha: float = 0.7,
+                 cancel_rate: float = 0.10, expired_rate: float = 0.0, crew_conflict_rate: float = 0.001):
+        self.sizes = plan(bookings)
+        self.seed = seed
+        self.activity_alpha = activity_alpha
+        self.cancel_rate = cancel_rate
+        self.expired_rate = expired_rate
+        self.crew_conflict_rate = crew_conflict_rate
+        self.rng = random.Random(seed)
+        # filled while generating flights, needed by bookings and crew
+        self.flights: List[tuple] = []
+        self.capacity: Dict[int, int] = {}
+
+    # ----------------------------
+    # Reference data
+    # ----------------------------
+    def airports(self) -> List[tuple]:
+        codes = ["".join(c) for c in itertools.product(string.ascii_uppercase, repeat=3)]
+        self.rng.shuffle(codes)
+        rows = []
+        for i, code in enumerate(codes[:self.sizes["airports"]], start=1):
+            rows.append((i, code, f"{code} International", f"City {code}", COUNTRIES[i % len(COUNTRIES)]))
+        return rows
+
+    def aircraft(self) -> List[tuple]:
+        rows = []
+        for i in range(1, self.sizes["aircraft"] + 1):
+            model, capacity = self.rng.choice(FLEET)
+            rows.append((i, f"{model} #{i:05d}", capacity))
+            self.capacity[i] = capacity
+        return rows
+
+    def passengers(self) -> Iterator[tuple]:
+        for i in range(1, self.sizes["passengers"] + 1):
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            yield (i, f"{first} {last}", f"{first.lower()}.{last.lower()}.{i}@example.com")
+
+    # ----------------------------
+    # Schedule: each aircraft flies a continuous rotation
+    # ----------------------------
+    def generate_flights(self) -> List[tuple]:
+        n_airports = self.sizes["airports"]
+        hub_weights = _zipf_cum_weights(n_airports, 1.0)
+        airport_ids = list(range(1, n_airports + 1))
+        per_aircraft = -(-self.sizes["flights"] // self.sizes["aircraft"])
+        rows, flight_id = [], 0
+        for aircraft_id in range(1, self.sizes["aircraft"] + 1):
+            at = self.rng.choices(airport_ids, cum_weights=hub_weights)[0]
+            clock = SEASON_START + timedelta(minutes=self.rng.randint(0, 24 * 60))
+            for _ in range(per_aircraft):
+                if flight_id >= self.sizes["flights"]:
+                    break
+                dest = at
+                while dest == at:
+                    dest = self.rng.choices(airport_ids, cum_weights=hub_weights)[0]
+                block = timedelta(minutes=self.rng.randint(60, 600))
+                flight_id += 1
+                rows.append((
+                    flight_id, f"SX{flight_id:07d}", at, dest,
+                    clock.isoformat(timespec="seconds"), (clock + block).isoformat(timespec="seconds"),
+                    aircraft_id, round(self.rng.uniform(50, 900), 2)
+                ))
+                at = dest
+                clock += block + timedelta(minutes=self.rng.randint(45, 180))
+        self.flights = rows
+        return rows
+
+    # ----------------------------
+    # Bookings + tickets with power-law passenger activity
+    # ----------------------------
+    def bookings_and_tickets(self) -> Iterator[tuple]:
+        """Yield (booking_row, ticket_row) pairs, flight by flight."""
+        passenger_ids = list(range(1, self.sizes["passengers"] + 1))
+        # shuffle so the heaviest flyers are not simply the lowest ids
+        self.rng.shuffle(passenger_ids)
+        cum = _zipf_cum_weights(len(passenger_ids), self.activity_alpha)
+        per_flight = self.sizes["bookings"] / max(1, len(self.flights))
+        class_names = [c[0] for c in CLASS_MIX]
+        class_cum = list(itertools.accumulate(c[1] for c in CLASS_MIX))
+        multiplier = {c[0]: c[2] for c in CLASS_MIX}
+        booking_id, remaining = 0, self.sizes["bookings"]
+        for f in self.flights:
+            if remaining <= 0:
+                return
+            flight_id, departure, aircraft_id, base_price = f[0], f[4], f[6], f[7]
+            capacity = self.capacity[aircraft_id]
+            want = min(capacity, remaining, max(1, int(self.rng.gauss(per_flight, per_flight * 0.3))))
+            chosen = dict.fromkeys(self.rng.choices(passenger_ids, cum_weights=cum, k=want + want // 4 + 1))
+            departure_dt = datetime.fromisoformat(departure)
+            for seat, passenger_id in enumerate(itertools.islice(chosen, want)):
+                booking_id += 1
+                remaining -= 1
+                ticket_class = self.rng.choices(class_names, cum_weights=class_cum)[0]
+                booked_at = departure_dt - timedelta(minutes=int(self.rng.expovariate(1 / (30 * 24 * 60))) + 60)
+                r = self.rng.random()
+                status = ("CANCELLED" if r < self.cancel_rate
+                          else "EXPIRED" if r < self.cancel_rate + self.expired_rate else "BOOKED")
+                price = round(base_price * multiplier[ticket_class] * self.rng.uniform(0.8, 1.4), 2)
+                yield (
+                    (booking_id, passenger_id, flight_id, status, booked_at.isoformat(timespec="seconds"), price),
+                    (booking_id, format_ticket_no(booking_id),
+                     f"{seat // len(SEAT_LETTERS) + 1}{SEAT_LETTERS[seat % len(SEAT_LETTERS)]}", ticket_class)
+                )
+
+    # ----------------------------
+    # Crew rosters: two crews per aircraft, alternating every four legs
+    # ----------------------------
+    def crew_members(self) -> List[tuple]:
+        rows = []
+        for i in range(1, self.sizes["crew"] + 1):
+            role = CREW_DUTIES[(i - 1) % len(CREW_DUTIES)][0]
+            rows.append((i, f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}", role))
+        return rows
+
+    def crew_assignments(self) -> Iterator[tuple]:
+        team_size = len(CREW_DUTIES)
+        leg = {}
+        assignment_id = 0
+        for f in self.flights:
+            flight_id, aircraft_id = f[0], f[6]
+            n = leg.get(aircraft_id, 0)
+            leg[aircraft_id] = n + 1
+            team = (aircraft_id - 1) * 2 + (n // 4) % 2
+            for slot, (_, duty) in enumerate(CREW_DUTIES):
+                crew_id = team * team_size + slot + 1
+                if self.rng.random() < self.crew_conflict_rate:
+                    # occasional rostering mistake so conflict reports have something to find
+                    crew_id = self.rng.randrange(slot, self.sizes["crew"], team_size) + 1
+                assignment_id += 1
+                yield (assignment_id, crew_id, flight_id, duty)
+
+    # ----------------------------
+    # Bulk load
+    # ----------------------------
+    def write(self, db_path: str) -> Dict[str, int]:
+        """Create a fresh schema at db_path and bulk insert the whole dataset."""
+        apply_schema(db_path)
+        counts = {}
+        with connect(db_path) as conn, bulk_load(conn):
+            drop_capture_triggers(conn)  # a generated dataset starts with an empty change log
+            drop_version_triggers(conn)
+            drop_delta_triggers(conn)
+
+            def load(table, sql, rows):
+                n = 0
+                for chunk in _chunks(rows):
+                    conn.executemany(sql, chunk)
+                    n += len(chunk)
+                counts[table] = n
+
+            load("airport", "INSERT INTO airport (id, code, name, city, country) VALUES (?, ?, ?, ?, ?)",
+                 self.airports())
+            load("aircraft", "INSERT INTO aircraft (id, model, capacity) VALUES (?, ?, ?)", self.aircraft())
+            load("passenger", "INSERT INTO passenger (id, name, email) VALUES (?, ?, ?)", self.passengers())
+            load("flight", """INSERT INTO flight (id, code, departure_airport_id, arrival_airport_id,
+                                                   departure_time, arrival_time, aircraft_id, base_price)
+                              VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", self.generate_flights())
+
+            bookings = tickets = 0
+            for chunk in _chunks(self.bookings_and_tickets()):
+                conn.executemany(
+                    "INSERT INTO booking (id, passenger_id, flight_id, status, booked_at, price) VALUES (?, ?, ?, ?, ?, ?)",
+                    [b for b, _ in chunk]
+                )
+                conn.executemany(
+                    "INSERT INTO ticket (booking_id, ticket_no, seat_no, class) VALUES (?, ?, ?, ?)",
+                    [t for _, t in chunk]
+                )
+                bookings += len(chunk)
+                tickets += len(chunk)
+            counts["booking"], counts["ticket"] = bookings, tickets
+            # ticket serials above were the booking ids; new bookings continue after them
+            conn.execute("INSERT OR REPLACE INTO sequence (name, next_value) VALUES (?, ?)",
+                         (SEQUENCE_NAME, bookings + 1))
+
+            load("crew_member", "INSERT INTO crew_member (id, name, role) VALUES (?, ?, ?)", self.crew_members())
+            load("crew_assignment",
+                 "INSERT OR IGNORE INTO crew_assignment (id, crew_member_id, flight_id, duty) VALUES (?, ?, ?, ?)",
+                 self.crew_assignments())
+            conn.commit()
+            conn.execute("ANALYZE;")
+        apply_schema(db_path)  # recreate the change capture, data version and sketch triggers
+        return counts
+
+
+def generate(db_path: str, scale: str = "10k", seed: int = 42, **options) -> Dict[str, int]:
+    """Generate a dataset of a named (or numeric) scale into a new database file."""
+    bookings = SCALES[scale] if scale in SCALES else int(scale)
+    return Generator(bookings, seed=seed, **options).write(db_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="datagen", description="Generate a synthetic airline database")
+    parser.add_argument("--out", required=True, help="Path of the database file to create")
+    parser.add_argument("--scale", default="10k", help=f"One of {', '.join(SCALES)} or a booking count")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--force", action="store_true", help="Overwrite an existing file")
+    args = parser.parse_args()
+
+    out = Path(args.out)
+    if out.exists():
+        if not args.force:
+            parser.error(f"{out} already exists (use --force to overwrite)")
+        out.unlink()
+    started = datetime.now()
+    counts = generate(str(out), args.scale, args.seed)
+    print(f"Generated {counts} in {(datetime.now() - started).total_seconds():.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,135 @@
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from .config import DB_PATH, SCHEMA_PATH
+from .config import DB_PATH, SCHEMA_PATH, DB_PROFILE
 
-def connect(db_path: str = DB_PATH) -> sqlite3.Connection:
+# Per-connection PRAGMAs for each workload. page_size only takes effect when a
+# database file is created (apply_schema) or rebuilt with VACUUM.
+PROFILES = {
+    # short read/write transactions: WAL makes NORMAL sync safe, modest cache
+    "oltp": dict(synchronous="NORMAL", cache_size=-16384, temp_store="DEFAULT", mmap_size=0,
+                 page_size=4096),
+    # read-mostly report nodes: map the file, big cache, sorts and GROUP BYs in memory
+    "reporting": dict(synchronous="NORMAL", cache_size=-262144, temp_store="MEMORY", mmap_size=1 << 30,
+                      page_size=8192),
+    # one-off loads: no fsyncs until bulk_load() restores durability
+    "bulk-load": dict(synchronous="OFF", cache_size=-524288, temp_store="MEMORY", mmap_size=0,
+                      page_size=4096),
+    # SQLite's own defaults, for comparison
+    "default": dict(),
+}
+_profile = DB_PROFILE
+_pool = None
+
+def set_profile(name: str) -> None:
+    """Select the profile new connections get (default: DB_PROFILE from config/env)."""
+    global _profile
+    if name not in PROFILES:
+        raise ValueError(f"Unknown DB profile {name}; choose from {', '.join(PROFILES)}")
+    _profile = name
+
+def apply_profile(conn: sqlite3.Connection, profile: str = None) -> sqlite3.Connection:
+    for name, value in PROFILES[profile or _profile].items():
+        if name != "page_size":
+            conn.execute(f"PRAGMA {name} = {value};")
+    return conn
+
+def enable_pooling() -> None:
+    """Reuse one open connection per thread and database (for long-running servers).
+
+    Callers open connections per operation and never close them, so the same
+    thread can be handed its previous connection; call release_pooled() between
+    requests to roll back anything a failed operation left open.
+    """
+    global _pool
+    if _pool is None:
+        _pool = threading.local()
+
+def _pooled(key, open_connection):
+    if _pool is None:
+        return open_connection()
+    conns = _pool.__dict__.setdefault("conns", {})
+    conn = conns.get(key)
+    if conn is not None:
+        try:
+            conn.total_changes
+            return conn
+        except sqlite3.ProgrammingError:  # closed by its last user
+            pass
+    conn = conns[key] = open_connection()
+    return conn
+
+def release_pooled() -> None:
+    """Roll back transactions left open on this thread's pooled connections."""
+    for conn in getattr(_pool, "conns", {}).values():
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.ProgrammingError:
+            pass
+
+def bare_connect(db_path: str = DB_PATH, **kwargs) -> sqlite3.Connection:
+    """Plain tuple-row connection (as the DAL uses) with the active profile applied."""
+    if kwargs:  # custom timeout/isolation: always a private connection
+        return apply_profile(sqlite3.connect(db_path, **kwargs))
+    return _pooled(("bare", db_path), lambda: apply_profile(sqlite3.connect(db_path)))
+
+def connect(db_path: str = DB_PATH, read_only: bool = False) -> sqlite3.Connection:
     """Connect to SQLite with sensible defaults."""
+    return _pooled(("row", db_path, read_only), lambda: _connect(db_path, read_only))
+
+def _connect(db_path: str, read_only: bool) -> sqlite3.Connection:
+    if read_only:
+        conn = sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = ON;")
+        return apply_profile(conn)
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
     conn.execute("PRAGMA journal_mode = WAL;")  # better concurrency
-    return conn
+    return apply_profile(conn)
+
+@contextmanager
+def bulk_load(conn: sqlite3.Connection):
+    """Run a load under the bulk-load profile, then restore the connection's settings.
+
+    On exit the WAL is checkpointed with durability back on, so rows written
+    with synchronous=OFF are on disk before the caller carries on. If the load
+    raises, its transaction is rolled back first (synchronous cannot change
+    inside one) and the caller's exception propagates.
+    """
+    relaxed = {name: value for name, value in PROFILES["bulk-load"].items() if name != "page_size"}
+    saved = {name: conn.execute(f"PRAGMA {name};").fetchone()[0] for name in relaxed}
+    apply_profile(conn, "bulk-load")
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        for name, value in saved.items():
+            conn.execute(f"PRAGMA {name} = {value};")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+
+def flight_range_filter(column: str, flight_range=None):
+    """SQL condition and params restricting `column` to an inclusive (lo, hi) flight id range."""
+    if flight_range is None:
+        return "1", ()
+    return f"{column} BETWEEN ? AND ?", tuple(flight_range)
 
 def apply_schema(db_path: str = DB_PATH, schema_path: str = SCHEMA_PATH) -> None:
     """Apply SQL schema from file."""
     schema = Path(schema_path).read_text(encoding="utf-8")
+    page_size = PROFILES[_profile].get("page_size")
+    if page_size and not Path(db_path).exists():
+        # page size is fixed when the file is initialised, here by switching to WAL
+        conn = sqlite3.connect(db_path)
+        conn.execute(f"PRAGMA page_size = {page_size};")
+        conn.execute("PRAGMA journal_mode = WAL;")
+        conn.close()
     with connect(db_path) as conn:
         conn.executescript(schema)
     print(f"Schema applied successfully to {db_path}")
@@ -0,0 +1,221 @@
+import bisect
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from .config import DB_PATH, FLEET_MIN_TURN_MINUTES
+from .db import connect
+from .records import RotationIssue, TailChange
+from .seat_holds import CABIN_SHARE, class_capacity
+
+CLASSES = ("ECONOMY",) + tuple(CABIN_SHARE)
+
+# Rows per executemany when writing reassignments
+WRITE_CHUNK = 5000
+
+_LEGS = """
+    SELECT f.id, f.code, f.aircraft_id, dep.code, arr.code, f.departure_time, f.arrival_time
+    FROM flight f
+    JOIN airport dep ON dep.id = f.departure_airport_id
+    JOIN airport arr ON arr.id = f.arrival_airport_id
+    WHERE (:start IS NULL OR f.departure_time >= :start) AND (:end IS NULL OR f.departure_time < :end)
+      AND (:aircraft IS NULL OR f.aircraft_id = :aircraft)
+    ORDER BY f.aircraft_id, f.departure_time, f.id
+"""
+
+
+def _ts(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+def check_timeline(aircraft_id: int, legs: List[Tuple[int, str, str, float, float]],
+                   min_turn_seconds: float) -> List[RotationIssue]:
+    """Check one aircraft's legs, (flight_id, origin, destination, start, end) sorted by start.
+
+    Each leg is compared with the earlier leg that lands last, so a long leg
+    overlapping several short ones is caught in the same linear sweep.
+    """
+    issues = []
+    last = None
+    for leg in legs:
+        flight_id, origin, _, start, end = leg
+        if last is not None:
+            gap = start - last[4]
+            rule = ("overlap" if gap < 0 else "short_turn" if gap < min_turn_seconds
+                    else "continuity" if last[2] != origin else None)
+            if rule:
+                issues.append(RotationIssue(aircraft_id, rule, last[0], flight_id, round(gap / 60, 1),
+                                            last[2], origin))
+        if last is None or end >= last[4]:
+            last = leg
+    return issues
+
+
+class FleetPlanner:
+    """Aircraft rotations: per-tail timelines from flight, checked and repaired in sorted sweeps.
+
+    check() reads every leg in (aircraft, departure) order -- one pass over
+    idx_flight_aircraft_departure -- and reports overlapping legs, turns shorter
+    than the minimum ground time and legs that leave from somewhere other than
+    where the aircraft last landed. plan() walks the same legs in departure
+    order, keeping each on its aircraft when that aircraft is on the ground at
+    the right airport in time, and otherwise handing it to another tail that is
+    -- preferring one whose own rotation continues from where the leg lands, so
+    a misassigned leg goes back to its rotation instead of shifting every later
+    leg. Bookings already taken on a leg must fit the new aircraft's cabins.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, min_turn_minutes: float = FLEET_MIN_TURN_MINUTES):
+        self.db_path = db_path
+        self.min_turn = min_turn_minutes * 60
+
+    def check(self, start: Optional[str] = None, end: Optional[str] = None,
+              aircraft_id: Optional[int] = None) -> List[RotationIssue]:
+        """Every rotation problem among legs departing in [start, end)."""
+        with connect(self.db_path, read_only=True) as conn:
+            rows = conn.execute(_LEGS, dict(start=start, end=end, aircraft=aircraft_id))
+            issues, current, legs = [], None, []
+            for flight_id, _, aircraft, origin, dest, dep, arr in rows:
+                if aircraft != current:
+                    issues.extend(check_timeline(current, legs, self.min_turn))
+                    current, legs = aircraft, []
+                legs.append((flight_id, origin, dest, _ts(dep), _ts(arr)))
+            issues.extend(check_timeline(current, legs, self.min_turn))
+        return issues
+
+    def plan(self, start: Optional[str] = None, end: Optional[str] = None, apply: bool = False,
+             now: Optional[datetime] = None) -> Dict:
+        """Propose tail reassignments for legs departing in [start, end); apply=True writes them.
+
+        Legs before start are left alone; each aircraft begins the window where
+        its last earlier leg landed (or anywhere, if it has none). Departed legs
+        are never moved: start defaults to now and is never earlier than now.
+        """
+        now = (now or datetime.utcnow()).isoformat(timespec="seconds")
+        start = now if start is None or start < now else start
+        with connect(self.db_path, read_only=True) as conn:
+            legs = [(flight_id, code, aircraft, origin, dest, _ts(dep), _ts(arr), dep)
+                    for flight_id, code, aircraft, origin, dest, dep, arr
+                    in conn.execute(_LEGS, dict(start=start, end=end, aircraft=None))]
+            fleet = {aircraft: capacity for aircraft, capacity in conn.execute("SELECT id, capacity FROM aircraft")}
+            taken: Dict[int, Dict[str, int]] = {}
+            for flight_id, ticket_class, seats in conn.execute("""
+                SELECT si.flight_id, si.class, si.taken
+                FROM seat_inventory si JOIN flight f ON f.id = si.flight_id
+                WHERE si.taken > 0 AND (:start IS NULL OR f.departure_time >= :start)
+                  AND (:end IS NULL OR f.departure_time < :end)
+            """, dict(start=start, end=end)):
+                taken.setdefault(flight_id, {})[ticket_class] = seats
+            # bare columns with MAX() come from the row holding the max
+            prior = {aircraft: (code, _ts(arr)) for aircraft, code, arr in conn.execute("""
+                SELECT f.aircraft_id, arr.code, MAX(f.arrival_time)
+                FROM flight f JOIN airport arr ON arr.id = f.arrival_airport_id
+                WHERE f.departure_time < ?
+                GROUP BY f.aircraft_id
+            """, (start,))}
+
+        before = self._issues(legs, {})
+        assignment, unresolved = self._solve(legs, fleet, taken, prior)
+        changes = [TailChange(flight_id, code, f"{origin} → {dest}", dep, aircraft, assignment[flight_id])
+                   for flight_id, code, aircraft, origin, dest, _, _, dep in legs
+                   if assignment[flight_id] != aircraft]
+        after = self._issues(legs, assignment)
+        if apply and changes:
+            self._write(changes)
+        return dict(legs=len(legs), aircraft=len({leg[2] for leg in legs}), issues_before=len(before),
+                    issues_after=len(after), reassigned=len(changes), unresolved=len(unresolved),
+                    applied=bool(apply and changes), changes=changes, remaining=after)
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+    def _issues(self, legs, assignment: Dict[int, int]) -> List[RotationIssue]:
+        """check_timeline over in-memory legs under an assignment (flight id -> aircraft)."""
+        timelines: Dict[int, List] = {}
+        for flight_id, _, aircraft, origin, dest, start, end, _ in legs:
+            timelines.setdefault(assignment.get(flight_id, aircraft), []).append(
+                (flight_id, origin, dest, start, end))
+        issues = []
+        for aircraft, timeline in timelines.items():
+            timeline.sort(key=lambda leg: (leg[3], leg[0]))
+            issues.extend(check_timeline(aircraft, timeline, self.min_turn))
+        return issues
+
+    def _solve(self, legs, fleet: Dict[int, int], taken: Dict[int, Dict[str, int]], prior: Dict):
+        """Greedy interval scheduling in departure order; returns (flight id -> aircraft, unresolved ids)."""
+        turn = self.min_turn
+        cabins = {aircraft: {cls: class_capacity(capacity, cls) for cls in CLASSES}
+                  for aircraft, capacity in fleet.items()}
+        # each aircraft's own (original) legs, to judge what taking another leg would break;
+        # a leg joined to neither neighbour in its timeline is a stray (most likely itself
+        # misassigned) and is not counted as part of that aircraft's rotation
+        timelines: Dict[int, List] = {}
+        for _, _, aircraft, origin, dest, start, end, _ in legs:  # legs arrive sorted by aircraft, departure
+            timelines.setdefault(aircraft, []).append((origin, dest, start, end))
+        own_starts: Dict[int, List[float]] = {}
+        own_origins: Dict[int, List[str]] = {}
+        for aircraft, timeline in timelines.items():
+            joined = [timeline[i - 1][1] == timeline[i][0] and timeline[i - 1][3] + turn <= timeline[i][2]
+                      for i in range(1, len(timeline))]
+            starts, origins = own_starts[aircraft], own_origins[aircraft] = [], []
+            for i, (origin, _, start, _) in enumerate(timeline):
+                if len(timeline) == 1 or (i and joined[i - 1]) or (i < len(joined) and joined[i]):
+                    starts.append(start)
+                    origins.append(origin)
+
+        at: Dict[int, Optional[str]] = {}  # airport each aircraft is on the ground at (None: not yet placed)
+        ready: Dict[int, float] = {}  # when it can next depart
+        parked: Dict[Optional[str], set] = {}
+        for aircraft in fleet:
+            airport, landed = prior.get(aircraft, (None, float("-inf")))
+            at[aircraft], ready[aircraft] = airport, landed + turn
+            parked.setdefault(airport, set()).add(aircraft)
+
+        def fits(aircraft, flight_id):
+            need = taken.get(flight_id)
+            return not need or all(cabins[aircraft].get(cls, 0) >= seats for cls, seats in need.items())
+
+        def cost(candidate, aircraft, dest, start, end):
+            """Lower is better: a tail whose own next leg leaves from dest after this one lands
+            (the rotation this leg belongs to), then the leg's own tail, then spares, then tails
+            this would pull off their own next leg, latest first."""
+            starts = own_starts.get(candidate, ())
+            j = bisect.bisect_right(starts, start)
+            if j < len(starts) and own_origins[candidate][j] == dest and starts[j] >= end + turn:
+                rank = (0, starts[j])
+            elif candidate == aircraft:
+                rank = (1, 0.0)
+            elif j == len(starts):
+                rank = (2, 0.0)
+            else:
+                rank = (3, -starts[j])
+            return rank + (candidate != aircraft, fleet[candidate] != fleet[aircraft], candidate)
+
+        assignment, unresolved = {}, []
+        for flight_id, _, aircraft, origin, dest, start, end, _ in sorted(legs, key=lambda leg: (leg[5], leg[0])):
+            chosen = aircraft
+            on_time = at[aircraft] in (None, origin) and ready[aircraft] <= start
+            if not on_time or cost(aircraft, aircraft, dest, start, end)[0]:
+                candidates = [b for b in parked.get(origin, set()) | parked.get(None, set())
+                              if ready[b] <= start and (b == aircraft or fits(b, flight_id))]
+                if candidates:
+                    chosen = min(candidates, key=lambda b: cost(b, aircraft, dest, start, end))
+                else:
+                    unresolved.append(flight_id)
+            assignment[flight_id] = chosen
+            parked[at[chosen]].discard(chosen)
+            at[chosen], ready[chosen] = dest, max(ready[chosen], end + turn)
+            parked.setdefault(dest, set()).add(chosen)
+        return assignment, unresolved
+
+    def _write(self, changes: List[TailChange]) -> None:
+        """Write reassignments in one transaction, refusing if any leg moved tails since it was read."""
+        with connect(self.db_path) as conn:
+            written = 0
+            for i in range(0, len(changes), WRITE_CHUNK):
+                cur = conn.executemany("UPDATE flight SET aircraft_id = ? WHERE id = ? AND aircraft_id = ?",
+                                       [(c.to_aircraft, c.flight_id, c.from_aircraft)
+                                        for c in changes[i:i + WRITE_CHUNK]])
+                written += cur.rowcount
+            if written != len(changes):
+                conn.rollback()
+                raise ValueError("Flights were reassigned while the plan was being made; run fleet-plan again")
+            conn.commit()
@@ -0,0 +1,183 @@
+from array import array
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from .config import DB_PATH
+from .db import connect
+from .records import FlightForecast
+
+# Days before departure at which booking curves are sampled
+CHECKPOINTS = (0, 1, 2, 3, 5, 7, 10, 14, 21, 28, 35, 42, 56, 70, 90, 120, 150, 180, 270, 365)
+
+MODELS = ("pickup", "regression")
+
+# Departed flights a route needs before it gets its own model; thinner routes use the network-wide one
+MIN_HISTORY = 5
+
+_CURVE_ROWS = """
+    SELECT b.flight_id, MAX(CAST(julianday(f.departure_time) - julianday(b.booked_at) AS INTEGER), 0), COUNT(*)
+    FROM booking b JOIN flight f ON f.id = b.flight_id
+    WHERE b.status = 'BOOKED' AND b.booked_at <= :as_of AND {flights}
+    GROUP BY 1, 2
+"""
+
+
+def checkpoint_index(days_out: float) -> int:
+    """Index of the largest checkpoint not after days_out (bookings seen so far reach at least that far)."""
+    return max(bisect_right(CHECKPOINTS, days_out) - 1, 0)
+
+
+class CheckpointStats:
+    """Running sums for one (route, checkpoint): x = bookings at the checkpoint, y = final bookings."""
+
+    __slots__ = ("n", "sx", "sy", "sxx", "sxy")
+
+    def __init__(self):
+        self.n = self.sx = self.sy = self.sxx = self.sxy = 0
+
+    def add(self, x: float, y: float) -> None:
+        self.n += 1
+        self.sx += x
+        self.sy += y
+        self.sxx += x * x
+        self.sxy += x * y
+
+    def pickup(self, booked: float) -> float:
+        """Additive pickup: bookings now plus the mean bookings still to come at this checkpoint."""
+        return booked + (self.sy - self.sx) / self.n
+
+    def regression(self, booked: float) -> float:
+        """Least-squares final = a + b * bookings now; falls back to pickup when x never varied."""
+        variance = self.n * self.sxx - self.sx * self.sx
+        if variance <= 0:
+            return self.pickup(booked)
+        slope = (self.n * self.sxy - self.sx * self.sy) / variance
+        return (self.sy - slope * self.sx) / self.n + slope * booked
+
+
+class DemandForecaster:
+    """Forecast each upcoming flight's final load factor from its booking curve so far.
+
+    fit() reads the booking curves of every flight departed before as_of in one
+    grouped pass over booking (cumulative bookings at each of CHECKPOINTS) and
+    keeps per-route sums for the pickup and regression models. score() is then
+    pure arithmetic per flight, so a whole schedule is scored in one batch.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self.as_of: Optional[str] = None
+        self.routes: Dict[str, List[CheckpointStats]] = {}
+        self.network: List[CheckpointStats] = []
+        self.history = 0
+
+    def fit(self, as_of: Optional[str] = None) -> Dict:
+        as_of = as_of_timestamp(as_of)
+        with connect(self.db_path, read_only=True) as conn:
+            curves = self._curves(conn, as_of, "f.departure_time <= :as_of")
+            flights = self._flights(conn, as_of, "f.departure_time <= :as_of")
+        self.as_of = as_of
+        self.routes, self.network = {}, [CheckpointStats() for _ in CHECKPOINTS]
+        for flight_id, (route, _, _, _) in flights.items():
+            curve = curves.get(flight_id)
+            if curve is None:
+                continue
+            stats = self.routes.setdefault(route, [CheckpointStats() for _ in CHECKPOINTS])
+            final = curve[0]
+            for k, booked in enumerate(curve):
+                stats[k].add(booked, final)
+                self.network[k].add(booked, final)
+        self.history = self.network[0].n
+        return dict(as_of=as_of, history_flights=self.history, routes=len(self.routes),
+                    modelled_routes=sum(1 for stats in self.routes.values() if stats[0].n >= MIN_HISTORY))
+
+    def forecast(self, as_of: Optional[str] = None, model: str = "pickup", route: Optional[str] = None,
+                 limit: Optional[int] = None) -> List[FlightForecast]:
+        """Score every flight departing after as_of, highest forecast load factor first."""
+        as_of = as_of_timestamp(as_of)
+        if self.as_of != as_of:
+            self.fit(as_of)
+        with connect(self.db_path, read_only=True) as conn:
+            flights = self._flights(conn, as_of, "f.departure_time > :as_of")
+            curves = self._curves(conn, as_of, "f.departure_time > :as_of")
+        now = datetime.fromisoformat(as_of)
+        rows = []
+        for flight_id, (flight_route, code, departure, capacity) in flights.items():
+            if route is not None and flight_route != route:
+                continue
+            days_out = (datetime.fromisoformat(departure) - now).total_seconds() / 86400
+            rows.append((flight_id, code, flight_route, departure, days_out, curves.get(flight_id, (0,))[0], capacity))
+        scored = self.score(rows, model)
+        scored.sort(key=lambda f: (-f.load_factor, f.departure_time))
+        return scored[:limit] if limit else scored
+
+    def score(self, flights: Iterable[Tuple], model: str = "pickup") -> List[FlightForecast]:
+        """Forecast (flight_id, code, route, departure_time, days_out, booked, capacity) tuples in one batch."""
+        if model not in MODELS:
+            raise ValueError(f"Unknown model {model}; use one of {', '.join(MODELS)}")
+        if not self.history:
+            raise ValueError("No departed flights before the as-of date to learn booking curves from")
+        network = self.network
+        out = []
+        for flight_id, code, route, departure, days_out, booked, capacity in flights:
+            k = checkpoint_index(days_out)
+            stats = self.routes.get(route)
+            cell = stats[k] if stats is not None and stats[k].n >= MIN_HISTORY else network[k]
+            final = cell.pickup(booked) if model == "pickup" else cell.regression(booked)
+            final = min(max(final, booked), capacity)  # never below seats sold, never above the cabin
+            out.append(FlightForecast(flight_id, code, route, departure, round(days_out, 1), booked,
+                                      round(final, 1), capacity, round(final / capacity, 4) if capacity else 0.0))
+        return out
+
+    def backtest(self, as_of: Optional[str] = None, model: str = "pickup") -> Dict:
+        """Compare forecasts made at as_of with the bookings those flights have today."""
+        forecasts = self.forecast(as_of, model)
+        if not forecasts:
+            return dict(as_of=self.as_of, model=model, flights=0)
+        with connect(self.db_path, read_only=True) as conn:
+            actual = {flight_id: curve[0] for flight_id, curve in self._curves(
+                conn, datetime.max.isoformat(), "f.departure_time > :since", since=self.as_of).items()}
+        errors = [f.forecast - actual.get(f.flight_id, 0) for f in forecasts]
+        naive = [f.booked - actual.get(f.flight_id, 0) for f in forecasts]  # "no more bookings" baseline
+        return dict(as_of=self.as_of, model=model, flights=len(errors),
+                    mae_seats=round(sum(map(abs, errors)) / len(errors), 2),
+                    bias_seats=round(sum(errors) / len(errors), 2),
+                    naive_mae_seats=round(sum(map(abs, naive)) / len(naive), 2))
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+    @staticmethod
+    def _curves(conn, as_of: str, flights: str, **params) -> Dict[int, Sequence[int]]:
+        """flight id -> cumulative bookings at each checkpoint, from one grouped query."""
+        curves: Dict[int, array] = {}
+        width = len(CHECKPOINTS)
+        for flight_id, days_out, count in conn.execute(_CURVE_ROWS.format(flights=flights), dict(params, as_of=as_of)):
+            curve = curves.get(flight_id)
+            if curve is None:
+                curve = curves[flight_id] = array("l", bytes(array("l").itemsize * width))
+            curve[checkpoint_index(days_out)] += count
+        for curve in curves.values():  # per-bucket counts -> bookings made at least CHECKPOINTS[k] days out
+            for k in range(width - 2, -1, -1):
+                curve[k] += curve[k + 1]
+        return curves
+
+    @staticmethod
+    def _flights(conn, as_of: str, which: str) -> Dict[int, Tuple[str, str, str, int]]:
+        return {row[0]: tuple(row[1:]) for row in conn.execute(f"""
+            SELECT f.id, dep.code || ' → ' || arr.code, f.code, f.departure_time, a.capacity
+            FROM flight f
+            JOIN airport dep ON dep.id = f.departure_airport_id
+            JOIN airport arr ON arr.id = f.arrival_airport_id
+            JOIN aircraft a ON a.id = f.aircraft_id
+            WHERE {which}
+        """, dict(as_of=as_of))}
+
+
+def as_of_timestamp(as_of: Optional[str]) -> str:
+    if as_of is None:
+        return datetime.utcnow().isoformat(timespec="seconds")
+    try:
+        return datetime.fromisoformat(as_of).isoformat(timespec="seconds")
+    except ValueError:
+        raise ValueError(f"Bad as-of date {as_of!r}; use YYYY-MM-DD or YYYY-MM-DDTHH:MM") from None
@@ -1,6 +1,17 @@
 import sqlite3
+import sys
 from pathlib import Path
 
+if not __package__:  # run as a script (python src/migrate.py): import the rest of src as a package
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    __package__ = "src"
+
+from .pricing import Pricing
+from .seat_holds import SeatHoldManager
+from .rollups import RevenueRollup
+from .dal import DAL
+from .db import apply_schema
+
 DB_PATH = "airline.db"
 
 
@@ -23,12 +34,14 @@ def cleanup_duplicates(conn):
         )
     """)
 
-    # Booking duplicates
+    # Booking duplicates (only one live booking per passenger and flight)
     cur.execute("""
         DELETE FROM booking
-        WHERE id NOT IN (
+        WHERE status IN ('HELD', 'BOOKED', 'CONFIRMED')
+          AND id NOT IN (
           SELECT MIN(id)
           FROM booking
+          WHERE status IN ('HELD', 'BOOKED', 'CONFIRMED')
           GROUP BY passenger_id, flight_id
         )
     """)
@@ -47,6 +60,48 @@ def cleanup_duplicates(conn):
     print("Duplicate cleanup done.")
 
 
+def migrate_booking_lifecycle(conn):
+    """Rebuild booking with the HELD/BOOKED/CANCELLED/REFUNDED/EXPIRED lifecycle.
+
+    SQLite cannot alter a CHECK constraint, so the table is copied. Triggers
+    that read booking.status are dropped here and recreated by apply_schema.
+    """
+    sql = conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='booking'").fetchone()[0]
+    if "'HELD'" in sql:
+        return
+    conn.executescript("""
+        PRAGMA foreign_keys = OFF;
+        BEGIN TRANSACTION;
+
+        DROP TRIGGER IF EXISTS trg_fare_bucket_ticket_insert;
+        DROP TRIGGER IF EXISTS trg_fare_bucket_ticket_delete;
+        DROP INDEX IF EXISTS uq_booking_passenger_flight;
+
+        CREATE TABLE booking_new (
+          id           INTEGER PRIMARY KEY AUTOINCREMENT,
+          passenger_id INTEGER NOT NULL REFERENCES passenger(id) ON DELETE RESTRICT,
+          flight_id    INTEGER NOT NULL REFERENCES flight(id) ON DELETE RESTRICT,
+          status       TEXT NOT NULL CHECK (status IN ('HELD','BOOKED','CANCELLED','REFUNDED','EXPIRED')),
+          booked_at    TEXT NOT NULL DEFAULT (datetime('now')),
+          price        REAL NOT NULL CHECK (price >= 0),
+          hold_expires_at TEXT
+        );
+
+        INSERT INTO booking_new (id, passenger_id, flight_id, status, booked_at, price)
+        SELECT id, passenger_id, flight_id,
+               CASE status WHEN 'CONFIRMED' THEN 'BOOKED' ELSE status END,
+               booked_at, price
+        FROM booking;
+
+        DROP TABLE booking;
+        ALTER TABLE booking_new RENAME TO booking;
+
+        COMMIT;
+        PRAGMA foreign_keys = ON;
+    """)
+    print("Booking table migrated to the status lifecycle.")
+
+
 def apply_constraints_and_indexes(conn):
     cur = conn.cursor()
     cur.executescript("""
@@ -59,8 +114,8 @@ def apply_constraints_and_indexes(conn):
         CREATE UNIQUE INDEX IF NOT EXISTS uq_aircraft_model_capacity
             ON aircraft(model, capacity);
 
-        CREATE UNIQUE INDEX IF NOT EXISTS uq_booking_passenger_flight
-            ON booking(passenger_id, flight_id);
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_booking_active_passenger_flight
+            ON booking(passenger_id, flight_id) WHERE status IN ('HELD','BOOKED');
 
         CREATE UNIQUE INDEX IF NOT EXISTS uq_crew_assignment_member_flight
             ON crew_assignment(crew_member_id, flight_id);
@@ -89,8 +144,10 @@ def apply_constraints_and_indexes(conn):
         CREATE INDEX IF NOT EXISTS idx_booking_flight
           ON booking (flight_id, passenger_id);
 
-        CREATE INDEX IF NOT EXISTS idx_ticket_booking
-          ON ticket (booking_id);
+        -- superseded by the covering idx_ticket_booking_itinerary (same leading column)
+        DROP INDEX IF EXISTS idx_ticket_booking;
+        CREATE INDEX IF NOT EXISTS idx_ticket_booking_itinerary
+          ON ticket (booking_id, ticket_no, seat_no, class);
 
         CREATE INDEX IF NOT EXISTS idx_crew_assignment_flight
           ON crew_assignment (flight_id);
@@ -104,8 +161,20 @@ def apply_constraints_and_indexes(conn):
 def main():
     with connect() as conn:
         cleanup_duplicates(conn)
+        migrate_booking_lifecycle(conn)
         apply_constraints_and_indexes(conn)
 
+    # recreate triggers and partial indexes from models.sql
+    apply_schema(DB_PATH)
+
+    flights = Pricing(DB_PATH).rebuild_fare_buckets()
+    print(f"Fare buckets rebuilt for {flights} flights.")
+    DAL(DB_PATH).rebuild_passenger_search()
+    print("Passenger search index rebuilt.")
+    classes = SeatHoldManager(DB_PATH).rebuild_seat_inventory()
+    print(f"Seat inventory rebuilt for {classes} flight cabins.")
+    days = RevenueRollup(DB_PATH).rebuild()
+    print(f"Revenue rollup rebuilt ({days} day/flight/class rows).")
     print("Migration completed successfully.")
 
 
@@ -0,0 +1,211 @@
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from .config import (DB_PATH, NOTIFY_BATCH_SIZE, NOTIFY_MAX_ATTEMPTS, NOTIFY_RETRY_SECONDS, NOTIFY_LEASE_SECONDS,
+                     NOTIFY_FILE)
+from .db import bare_connect as connect
+from .records import Notification, fetch_all
+
+# Every queued change (one per flight: the image before its first change) is compared with the
+# flight as it is now and joined to the passengers booked on it through idx_booking_flight and the
+# ticket index. A flight that has since been deleted is announced as cancelled.
+_FAN_OUT = """
+    INSERT OR IGNORE INTO notification_outbox (change_seq, flight_id, passenger_id, email, payload)
+    SELECT c.seq, c.flight_id, p.id, p.email, json_object(
+             'type', CASE WHEN f.id IS NULL THEN 'flight_cancelled' ELSE 'schedule_change' END,
+             'flight', COALESCE(f.code, c.code), 'passenger', p.name,
+             'tickets', json_group_array(t.ticket_no),
+             'before', json_object('code', c.code, 'from', old_dep.code, 'to', old_arr.code,
+                                   'departure_time', c.departure_time, 'arrival_time', c.arrival_time),
+             'after', json(CASE WHEN f.id IS NOT NULL THEN json_object(
+                                'code', f.code, 'from', dep.code, 'to', arr.code,
+                                'departure_time', f.departure_time, 'arrival_time', f.arrival_time) END))
+    FROM (SELECT MIN(seq) AS seq, flight_id, code, departure_airport_id, arrival_airport_id,
+                 departure_time, arrival_time
+          FROM schedule_change WHERE seq <= ? GROUP BY flight_id) c
+    LEFT JOIN flight f ON f.id = c.flight_id
+    LEFT JOIN airport dep ON dep.id = f.departure_airport_id
+    LEFT JOIN airport arr ON arr.id = f.arrival_airport_id
+    JOIN airport old_dep ON old_dep.id = c.departure_airport_id
+    JOIN airport old_arr ON old_arr.id = c.arrival_airport_id
+    JOIN booking b ON b.flight_id = c.flight_id AND b.status = 'BOOKED'
+    JOIN ticket t ON t.booking_id = b.id
+    JOIN passenger p ON p.id = b.passenger_id
+    WHERE f.id IS NULL
+       OR c.code IS NOT f.code OR c.departure_airport_id IS NOT f.departure_airport_id
+       OR c.arrival_airport_id IS NOT f.arrival_airport_id OR c.departure_time IS NOT f.departure_time
+       OR c.arrival_time IS NOT f.arrival_time  -- changed and changed back: nothing to say
+    GROUP BY c.seq, p.id
+"""
+
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+
+def _stamp(moment: datetime) -> str:
+    return moment.isoformat(timespec="milliseconds")  # same shape as the table defaults
+
+
+class FileSink:
+    """Append each message to a JSON-lines file: the local stand-in for a mail/SMS gateway."""
+
+    def __init__(self, path: str = NOTIFY_FILE):
+        self.path = path
+
+    def send(self, messages: List[Notification]) -> Dict[int, str]:
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.writelines(json.dumps(dict(id=m.id, to=m.email, **json.loads(m.payload))) + "\n" for m in messages)
+        return {}
+
+
+class MemorySink:
+    """Keep delivered messages in a list; fail_rate fails that share of sends, to exercise retries."""
+
+    def __init__(self, fail_rate: float = 0.0, seed: Optional[int] = None):
+        self.fail_rate = fail_rate
+        self.sent: List[Notification] = []
+        self._rng = random.Random(seed)
+
+    def send(self, messages: List[Notification]) -> Dict[int, str]:
+        failed = {m.id: "simulated delivery failure" for m in messages if self._rng.random() < self.fail_rate}
+        self.sent.extend(m for m in messages if m.id not in failed)
+        return failed
+
+
+SINKS = {"file": FileSink, "memory": MemorySink}
+
+
+def sink_for(spec: str):
+    """Build a sink from "file", "file:PATH", "memory" or "memory:FAIL_RATE"."""
+    name, _, arg = spec.partition(":")
+    if name not in SINKS:
+        raise ValueError(f"Unknown sink {name}; use one of {', '.join(SINKS)}")
+    if not arg:
+        return SINKS[name]()
+    return FileSink(arg) if name == "file" else MemorySink(float(arg))
+
+
+class NotificationPipeline:
+    """Schedule-change notices: trigger-fed queue -> one fan-out join -> outbox -> pluggable sink.
+
+    Triggers on flight record the image before a flight's first passenger-visible
+    change (or its deletion, when someone is booked on it) in schedule_change;
+    later changes coalesce into that row, so the queue stays bounded by the
+    flights. fan_out() turns everything queued into outbox rows with a
+    single INSERT ... SELECT (one row per change and booked passenger, tickets
+    grouped) and clears the queue in the same transaction. deliver() claims due
+    rows a batch at a time under a short lease, hands them to the sink, and marks
+    them sent or schedules a retry with exponential backoff; a row that keeps
+    failing ends up FAILED after max_attempts. Delivery is at-least-once.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+
+    def fan_out(self) -> Dict:
+        """Queue a notification per booked passenger for every flight changed since the last run."""
+        conn = connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            changes, flights, upto = conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT flight_id), MAX(seq) FROM schedule_change").fetchone()
+            queued = 0
+            if upto is not None:
+                queued = conn.execute(_FAN_OUT, (upto,)).rowcount
+                conn.execute("DELETE FROM schedule_change WHERE seq <= ?", (upto,))
+            conn.execute("COMMIT")
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            conn.close()
+        return dict(changes=changes, flights=flights, queued=queued)
+
+    def deliver(self, sink, batch_size: int = NOTIFY_BATCH_SIZE, max_attempts: int = NOTIFY_MAX_ATTEMPTS,
+                retry_seconds: float = NOTIFY_RETRY_SECONDS, limit: Optional[int] = None) -> Dict:
+        """Send due outbox rows through sink until none are due (or limit messages were tried)."""
+        stats = dict(batches=0, sent=0, retrying=0, failed=0)
+        started = time.perf_counter()
+        tried = 0
+        while limit is None or tried < limit:
+            batch = self._claim(min(batch_size, limit - tried) if limit else batch_size)
+            if not batch:
+                break
+            try:
+                failed = sink.send(batch)
+            except Exception as e:  # a sink that raises fails the whole batch
+                failed = {m.id: f"{type(e).__name__}: {e}" for m in batch}
+            self._settle(batch, failed, max_attempts, retry_seconds, stats)
+            stats["batches"] += 1
+            tried += len(batch)
+        elapsed = time.perf_counter() - started
+        stats.update(seconds=round(elapsed, 3), per_second=round(stats["sent"] / elapsed) if elapsed else None)
+        return stats
+
+    def run(self, sink, **delivery) -> Dict:
+        return dict(fan_out=self.fan_out(), delivery=self.deliver(sink, **delivery))
+
+    def stats(self) -> Dict:
+        with connect(self.db_path) as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM notification_outbox GROUP BY status"))
+            queued = conn.execute("SELECT COUNT(*) FROM schedule_change").fetchone()[0]
+            oldest = conn.execute(
+                "SELECT MIN(created_at) FROM notification_outbox WHERE status = 'PENDING'").fetchone()[0]
+        return dict(changes_queued=queued, pending=counts.get("PENDING", 0), sent=counts.get("SENT", 0),
+                    failed=counts.get("FAILED", 0), oldest_pending=oldest)
+
+    def retry_failed(self) -> int:
+        """Put FAILED rows back in the queue with a fresh set of attempts."""
+        with connect(self.db_path) as conn:
+            cur = conn.execute("""UPDATE notification_outbox SET status = 'PENDING', attempts = 0, next_attempt_at = ?
+                                  WHERE status = 'FAILED'""", (_stamp(_now()),))
+            conn.commit()
+            return cur.rowcount
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+    def _claim(self, size: int) -> List[Notification]:
+        """Take up to size due rows and push their next attempt out by the lease, so another
+        dispatcher skips them while this one is sending."""
+        now = _now()
+        conn = connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            batch = fetch_all(conn, Notification, """
+                SELECT id, flight_id, passenger_id, email, payload, attempts FROM notification_outbox
+                WHERE status = 'PENDING' AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?
+            """, (_stamp(now), size))
+            if batch:
+                conn.execute("UPDATE notification_outbox SET next_attempt_at = ? "
+                             "WHERE id IN (SELECT value FROM json_each(?))",
+                             (_stamp(now + timedelta(seconds=NOTIFY_LEASE_SECONDS)), json.dumps([m.id for m in batch])))
+            conn.execute("COMMIT")
+            return batch
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            conn.close()
+
+    def _settle(self, batch: List[Notification], failed: Dict[int, str], max_attempts: int,
+                retry_seconds: float, stats: Dict) -> None:
+        now = _now()
+        sent = [(_stamp(now), m.id) for m in batch if m.id not in failed]
+        retries = []
+        for m in batch:
+            if m.id in failed:
+                attempts = m.attempts + 1
+                gave_up = attempts >= max_attempts
+                stats["failed" if gave_up else "retrying"] += 1
+                retries.append(("FAILED" if gave_up else "PENDING", failed[m.id][:500],
+                                _stamp(now + timedelta(seconds=retry_seconds * 2 ** (attempts - 1))), m.id))
+        with connect(self.db_path) as conn:
+            conn.executemany("""UPDATE notification_outbox SET status = 'SENT', sent_at = ?, attempts = attempts + 1
+                                WHERE id = ?""", sent)
+            conn.executemany("""UPDATE notification_outbox
+                                SET status = ?, last_error = ?, next_attempt_at = ?, attempts = attempts + 1
+                                WHERE id = ?""", retries)
+            conn.commit()
+        stats["sent"] += len(sent)
@@ -0,0 +1,146 @@
+import json
+import math
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from .config import DB_PATH, OVERBOOK_RISK, OVERBOOK_MAX, OVERBOOK_MIN_HISTORY
+from .db import connect
+from .forecast import as_of_timestamp
+from .records import OverbookingLimit
+from .seat_holds import CABIN_SHARE, class_capacity
+
+CLASSES = ("ECONOMY",) + tuple(CABIN_SHARE)
+
+# Rows per executemany when writing limits
+WRITE_CHUNK = 5000
+
+
+@lru_cache(maxsize=65536)
+def booking_limit(capacity: int, show_rate: float, risk: float, max_overbook: float) -> Tuple[int, float, float]:
+    """Largest n with P(Binomial(n, show_rate) > capacity) <= risk, at most capacity * (1 + max_overbook).
+
+    Returns (limit, P(denied boarding), expected passengers denied) at that limit.
+    Only the upper tail k = capacity+1..n is summed, so each n costs O(n - capacity).
+    """
+    if capacity <= 0 or show_rate >= 1.0:
+        return capacity, 0.0, 0.0
+    if show_rate <= 0.0:
+        return math.floor(capacity * (1 + max_overbook)), 0.0, 0.0
+    log_p, log_q = math.log(show_rate), math.log1p(-show_rate)
+    best = (capacity, 0.0, 0.0)
+    for n in range(capacity + 1, math.floor(capacity * (1 + max_overbook)) + 1):
+        log_n = math.lgamma(n + 1)
+        tail = denied = 0.0
+        for k in range(capacity + 1, n + 1):
+            pmf = math.exp(log_n - math.lgamma(k + 1) - math.lgamma(n - k + 1) + k * log_p + (n - k) * log_q)
+            tail += pmf
+            denied += (k - capacity) * pmf
+        if tail > risk:
+            break
+        best = (n, tail, denied)
+    return best[0], round(best[1], 5), round(best[2], 4)
+
+
+class OverbookingOptimizer:
+    """Per flight and cabin booking limits above capacity, from historical show rates.
+
+    The show rate of a (route, class) is the share of its bookings on departed
+    flights that were not cancelled or refunded, computed for every route in one
+    grouped pass; thin routes fall back to the class-wide rate. Each upcoming
+    flight then gets the largest limit whose chance of more shows than seats
+    stays under `risk`. apply() stores the limits in overbooking_limit, where
+    SeatHoldManager reads them with one primary-key lookup per booking. Moving a
+    flight to another aircraft, or resizing one, drops its stored limits.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, risk: float = OVERBOOK_RISK, max_overbook: float = OVERBOOK_MAX,
+                 min_history: int = OVERBOOK_MIN_HISTORY):
+        if not 0 < risk < 1:
+            raise ValueError("Denied-boarding risk must be between 0 and 1")
+        self.db_path = db_path
+        self.risk = risk
+        self.max_overbook = max_overbook
+        self.min_history = min_history
+
+    def show_rates(self, as_of: Optional[str] = None) -> Dict:
+        """{(route, class): (bookings, show rate)}, plus {(None, class): ...} network-wide."""
+        as_of = as_of_timestamp(as_of)
+        with connect(self.db_path, read_only=True) as conn:
+            rows = conn.execute("""
+                SELECT dep.code || ' → ' || arr.code, t.class,
+                       COUNT(*), SUM(b.status IN ('CANCELLED','REFUNDED'))
+                FROM booking b
+                JOIN ticket t ON t.booking_id = b.id
+                JOIN flight f ON f.id = b.flight_id
+                JOIN airport dep ON dep.id = f.departure_airport_id
+                JOIN airport arr ON arr.id = f.arrival_airport_id
+                WHERE f.departure_time <= ? AND b.status IN ('BOOKED','CANCELLED','REFUNDED')
+                GROUP BY 1, 2
+            """, (as_of,)).fetchall()
+        totals: Dict[str, List[int]] = {}
+        rates = {}
+        for route, ticket_class, bookings, cancelled in rows:
+            rates[(route, ticket_class)] = (bookings, 1 - cancelled / bookings)
+            total = totals.setdefault(ticket_class, [0, 0])
+            total[0] += bookings
+            total[1] += cancelled
+        for ticket_class, (bookings, cancelled) in totals.items():
+            rates[(None, ticket_class)] = (bookings, 1 - cancelled / bookings)
+        return rates
+
+    def recommend(self, as_of: Optional[str] = None, route: Optional[str] = None,
+                  limit: Optional[int] = None) -> List[OverbookingLimit]:
+        """Limits for every cabin of every flight departing after as_of, most overbooked first."""
+        as_of = as_of_timestamp(as_of)
+        rates = self.show_rates(as_of)
+        with connect(self.db_path, read_only=True) as conn:
+            flights = conn.execute("""
+                SELECT f.id, f.code, dep.code || ' → ' || arr.code, a.capacity
+                FROM flight f
+                JOIN airport dep ON dep.id = f.departure_airport_id
+                JOIN airport arr ON arr.id = f.arrival_airport_id
+                JOIN aircraft a ON a.id = f.aircraft_id
+                WHERE f.departure_time > ? AND (? IS NULL OR dep.code || ' → ' || arr.code = ?)
+            """, (as_of, route, route)).fetchall()
+        out = []
+        for flight_id, code, flight_route, capacity in flights:
+            for ticket_class in CLASSES:
+                seats = class_capacity(capacity, ticket_class)
+                history, show_rate = rates.get((flight_route, ticket_class), (0, 1.0))
+                if history < self.min_history:
+                    history, show_rate = rates.get((None, ticket_class), (0, 1.0))
+                show_rate = round(show_rate, 3)  # keeps the booking_limit cache small
+                n, risk, denied = booking_limit(seats, show_rate, self.risk, self.max_overbook)
+                out.append(OverbookingLimit(flight_id, code, flight_route, ticket_class, seats, show_rate,
+                                            n, n - seats, risk, denied))
+        out.sort(key=lambda r: (-r.overbook / r.capacity if r.capacity else 0, r.flight_id, r.ticket_class))
+        return out[:limit] if limit else out
+
+    def apply(self, as_of: Optional[str] = None) -> Dict:
+        """Store limits for every upcoming flight and drop limits of flights that have departed."""
+        as_of = as_of_timestamp(as_of)
+        limits = self.recommend(as_of)
+        with connect(self.db_path) as conn:
+            conn.execute("""
+                DELETE FROM overbooking_limit
+                WHERE flight_id IN (SELECT id FROM flight WHERE departure_time <= ?)
+            """, (as_of,))
+            for i in range(0, len(limits), WRITE_CHUNK):
+                conn.executemany("""
+                    INSERT INTO overbooking_limit (flight_id, class, booking_limit) VALUES (?, ?, ?)
+                    ON CONFLICT (flight_id, class) DO UPDATE SET booking_limit = excluded.booking_limit
+                """, [(r.flight_id, r.ticket_class, r.booking_limit) for r in limits[i:i + WRITE_CHUNK]])
+            conn.commit()
+        return dict(as_of=as_of, cabins=len(limits), overbooked=sum(1 for r in limits if r.overbook),
+                    extra_seats=sum(r.overbook for r in limits), risk=self.risk, max_overbook=self.max_overbook)
+
+    def clear(self, flight_ids: Optional[List[int]] = None) -> int:
+        """Remove stored limits (all, or for some flights) so those cabins go back to hard capacity."""
+        with connect(self.db_path) as conn:
+            if flight_ids is None:
+                cur = conn.execute("DELETE FROM overbooking_limit")
+            else:
+                cur = conn.execute("DELETE FROM overbooking_limit WHERE flight_id IN (SELECT value FROM json_each(?))",
+                                   (json.dumps(flight_ids),))
+            conn.commit()
+            return cur.rowcount
+
@@ -0,0 +1,114 @@
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from .db import connect
+from .config import DB_PATH
+
+CLASS_MULTIPLIER = {"ECONOMY": 1.0, "BUSINESS": 2.5, "FIRST": 5.0}
+
+# (load factor below which the bucket applies, bucket name, multiplier)
+FARE_BUCKETS = [
+    (0.50, "Q", 1.00),
+    (0.70, "M", 1.15),
+    (0.85, "H", 1.35),
+    (0.95, "Y", 1.60),
+    (float("inf"), "Z", 2.00),
+]
+
+# (minimum days before departure, multiplier) -- first match wins
+ADVANCE_PURCHASE = [
+    (60, 0.85),
+    (30, 1.00),
+    (14, 1.15),
+    (7, 1.30),
+    (0, 1.50),
+]
+
+QUOTE_SQL = """
+    SELECT f.id, f.code, f.base_price, f.departure_time, a.capacity,
+           COALESCE(fb.booked_seats, 0) AS booked_seats
+    FROM flight f
+    JOIN aircraft a ON a.id = f.aircraft_id
+    LEFT JOIN fare_bucket fb ON fb.flight_id = f.id
+"""
+
+
+def fare_bucket(load_factor: float):
+    """Return (bucket, multiplier) for a load factor."""
+    for upper, bucket, multiplier in FARE_BUCKETS:
+        if load_factor < upper:
+            return bucket, multiplier
+
+
+def advance_multiplier(days_to_departure: float) -> float:
+    for min_days, multiplier in ADVANCE_PURCHASE:
+        if days_to_departure >= min_days:
+            return multiplier
+    return ADVANCE_PURCHASE[-1][1]
+
+
+def compute_fare(base_price: float, ticket_class: str, days_to_departure: float, load_factor: float) -> Dict:
+    """Price one seat from base fare, class, advance purchase and load factor."""
+    ticket_class = ticket_class.upper()
+    if ticket_class not in CLASS_MULTIPLIER:
+        raise ValueError(f"Unknown ticket class {ticket_class}")
+    bucket, load_mult = fare_bucket(load_factor)
+    price = base_price * CLASS_MULTIPLIER[ticket_class] * advance_multiplier(days_to_departure) * load_mult
+    return dict(fare_bucket=bucket, price=round(price, 2))
+
+
+def _quote_row(row, ticket_class: str, now: datetime) -> Dict:
+    flight_id, code, base_price, departure_time, capacity, booked_seats = row
+    load = booked_seats / capacity if capacity else 1.0
+    days = (datetime.fromisoformat(departure_time) - now).total_seconds() / 86400
+    if days < 0:
+        raise ValueError(f"Flight {flight_id} ({code}) has already departed")
+    quote = dict(
+        flight_id=flight_id, code=code, ticket_class=ticket_class.upper(),
+        base_price=base_price, days_to_departure=round(days, 1),
+        booked_seats=booked_seats, capacity=capacity,
+        load_factor=round(load, 3), sold_out=booked_seats >= capacity
+    )
+    quote.update(compute_fare(base_price, ticket_class, days, load))
+    return quote
+
+
+def quote_flight(conn, flight_id: int, ticket_class: str, now: Optional[datetime] = None) -> Dict:
+    """Quote a single flight on an open connection (used inside the booking transaction)."""
+    row = conn.execute(QUOTE_SQL + " WHERE f.id = ?", (flight_id,)).fetchone()
+    if not row:
+        raise ValueError(f"Flight {flight_id} not found")
+    return _quote_row(tuple(row), ticket_class, now or datetime.utcnow())
+
+
+class Pricing:
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+
+    def quote(self, flight_ids: Iterable[int], ticket_class: str = "ECONOMY",
+              now: Optional[datetime] = None) -> List[Dict]:
+        """Quote many flights with one indexed lookup against fare_bucket (no aggregation)."""
+        ids = [int(i) for i in flight_ids]
+        now = now or datetime.utcnow()
+        with connect(self.db_path) as conn:
+            rows = conn.execute(
+                QUOTE_SQL + " WHERE f.id IN (SELECT value FROM json_each(?))",
+                (json.dumps(ids),)
+            ).fetchall()
+        by_id = {row[0]: _quote_row(tuple(row), ticket_class, now) for row in rows}
+        return [by_id[i] for i in ids if i in by_id]
+
+    def rebuild_fare_buckets(self) -> int:
+        """Recount booked seats for every flight (backfill for databases created before fare_bucket)."""
+        with connect(self.db_path) as conn:
+            conn.execute("DELETE FROM fare_bucket")
+            cur = conn.execute("""
+                INSERT INTO fare_bucket (flight_id, booked_seats)
+                SELECT f.id, COUNT(t.id)
+                FROM flight f
+                LEFT JOIN booking b ON b.flight_id = f.id AND b.status IN ('HELD','BOOKED')
+                LEFT JOIN ticket t ON t.booking_id = b.id
+                GROUP BY f.id
+            """)
+            conn.commit()
+            return cur.rowcount
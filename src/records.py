@@ -0,0 +1,258 @@
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+# Compact row types returned by DAL and Analytics. Being tuples they carry no
+# per-row __dict__ or key strings; convert with to_dict() only when printing
+# or serialising.
+
+
+class Passenger(NamedTuple):
+    id: int
+    name: str
+    email: str
+
+
+class Airport(NamedTuple):
+    id: int
+    code: str
+    name: str
+    city: str
+    country: str
+
+
+class Aircraft(NamedTuple):
+    id: int
+    model: str
+    capacity: int
+
+
+class Flight(NamedTuple):
+    id: int
+    code: str
+    departure_airport_id: int
+    arrival_airport_id: int
+    departure_time: str
+    arrival_time: str
+    aircraft_id: int
+    base_price: float
+
+
+class Booking(NamedTuple):
+    id: int
+    passenger_id: int
+    flight_id: int
+    status: str
+    booked_at: Optional[str]
+    price: float
+    ticket_no: Optional[str] = None
+    seat_no: Optional[str] = None
+    ticket_class: Optional[str] = None
+
+
+class Ticket(NamedTuple):
+    id: int
+    booking_id: int
+    ticket_no: str
+    seat_no: str
+    ticket_class: str
+
+
+class ItineraryLeg(NamedTuple):
+    booking_id: int
+    status: str
+    booked_at: str
+    price: float
+    ticket_no: Optional[str]
+    seat_no: Optional[str]
+    ticket_class: Optional[str]
+    flight_id: int
+    flight_code: str
+    departure_airport: str
+    arrival_airport: str
+    departure_time: str
+    arrival_time: str
+
+
+class CrewMember(NamedTuple):
+    id: int
+    name: str
+    role: str
+
+
+class CrewAssignment(NamedTuple):
+    id: int
+    crew_member_id: int
+    flight_id: int
+    duty: str
+
+
+class User(NamedTuple):
+    id: int
+    username: str
+    role: str
+
+
+# ----------------------------
+# Report rows
+# ----------------------------
+class PassengerBookings(NamedTuple):
+    id: int
+    name: str
+    email: str
+    total_bookings: int
+
+
+class FlightRevenue(NamedTuple):
+    id: int
+    code: str
+    total_revenue: float
+    total_bookings: int
+
+
+class RouteLoad(NamedTuple):
+    flight_id: int
+    flight_code: str
+    departure: str
+    arrival: str
+    capacity: int
+    booked_seats: int
+    load_factor: float
+
+
+class RouteVolume(NamedTuple):
+    route: str
+    bookings: int
+
+
+class MonthRevenue(NamedTuple):
+    month: str
+    total_revenue: float
+
+
+class FlightLoadFactor(NamedTuple):
+    flight: str
+    load_factor: float
+
+
+class FlightRevenueTotal(NamedTuple):
+    flight: str
+    revenue: float
+
+
+class RevenuePoint(NamedTuple):
+    period: str  # 2025-03-01, 2025-W09, 2025-03, 2025-Q1 or 2025
+    start: str
+    end: str
+    revenue: float
+    bookings: int
+    moving_avg: Optional[float]  # trailing average of revenue over the requested window
+    yoy_change: Optional[float]  # revenue vs the same period a year earlier, as a fraction
+
+
+class FlightForecast(NamedTuple):
+    flight_id: int
+    code: str
+    route: str
+    departure_time: str
+    days_out: float
+    booked: int
+    forecast: float  # expected final bookings
+    capacity: int
+    load_factor: float  # forecast / capacity
+
+
+class OverbookingLimit(NamedTuple):
+    flight_id: int
+    code: str
+    route: str
+    ticket_class: str
+    capacity: int  # seats in the cabin
+    show_rate: float  # share of bookings expected to fly
+    booking_limit: int  # bookings accepted for the cabin
+    overbook: int  # booking_limit - capacity
+    denied_risk: float  # P(more shows than seats) at the limit
+    expected_denied: float  # mean passengers denied boarding at the limit
+
+
+class RotationIssue(NamedTuple):
+    aircraft_id: int
+    rule: str  # overlap | short_turn | continuity
+    previous_flight_id: int
+    flight_id: int
+    gap_minutes: float  # previous arrival to this departure; negative when they overlap
+    arrived_at: str  # airport code the previous leg landed at
+    departs_from: str  # airport code this leg leaves from
+
+
+class TailChange(NamedTuple):
+    flight_id: int
+    code: str
+    route: str
+    departure_time: str
+    from_aircraft: int
+    to_aircraft: int
+
+
+class ScheduleChange(NamedTuple):
+    op: str  # insert | update | delete | blocked (a delete refused: bookings or crew on the flight)
+    flight_id: Optional[int]  # None for inserts
+    code: str
+    fields: str  # comma-separated columns an update changes
+
+
+class Notification(NamedTuple):
+    id: int
+    flight_id: int
+    passenger_id: int
+    email: str
+    payload: str  # JSON message
+    attempts: int  # deliveries tried so far
+
+
+class RouteDistinct(NamedTuple):
+    route: str
+    month: Optional[str]  # departure month; None when counted over all months
+    passengers: int
+
+
+class Change(NamedTuple):
+    seq: int
+    table_name: str
+    op: str
+    row_id: int
+    data: str  # JSON row image
+    changed_at: str
+
+
+def row_factory(record):
+    """sqlite3 row_factory building `record` instances straight from the row tuple."""
+    make = record._make
+    return lambda cursor, row: make(row)
+
+
+def fetch_all(conn, record, sql: str, params=()) -> List:
+    cur = conn.cursor()
+    cur.row_factory = row_factory(record)
+    return cur.execute(sql, params).fetchall()
+
+
+def iter_all(conn, record, sql: str, params=(), batch: int = 1000) -> Iterator:
+    """Like fetch_all() but yields rows `batch` at a time, for results too big to hold."""
+    cur = conn.cursor()
+    cur.row_factory = row_factory(record)
+    cur.execute(sql, params)
+    while True:
+        rows = cur.fetchmany(batch)
+        if not rows:
+            return
+        yield from rows
+
+
+def to_dict(value: Any) -> Any:
+    """Convert records (and lists/dicts of them) to plain dicts at output boundaries."""
+    if hasattr(value, "_asdict"):
+        return value._asdict()
+    if isinstance(value, list):
+        return [to_dict(v) for v in value]
+    if isinstance(value, dict):
+        return {k: to_dict(v) for k, v in value.items()}
+    return value
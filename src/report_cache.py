@@ -0,0 +1,149 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from . import records
+from .analytics import Analytics
+from .config import DB_PATH, REPORT_CACHE_SIZE, REPORT_CACHE_PATH
+from .dal import DAL
+from .db import bare_connect
+from .reports import REPORTS
+
+# Tables whose triggers in models.sql bump data_version.version on every row change
+VERSIONED_TABLES = ("airport", "aircraft", "passenger", "flight", "booking", "ticket", "crew_assignment")
+EPOCH = "*epoch"
+
+
+def drop_version_triggers(conn) -> None:
+    """Remove the data_version triggers (bulk loads); apply_schema() puts them back."""
+    for table in VERSIONED_TABLES:
+        for op in ("insert", "update", "delete"):
+            conn.execute(f"DROP TRIGGER IF EXISTS trg_version_{table}_{op}")
+
+
+class ReportCache:
+    """Bounded LRU of report results, valid while the tables they read are unchanged.
+
+    An entry is keyed by report name and arguments and tagged with the
+    data_version counters of the report's tables (see Report.tables). The
+    counters are only re-read when PRAGMA data_version shows that some other
+    connection has committed, so a hit costs one PRAGMA and a dict lookup.
+    With a path, entries are written to a JSON file and reloaded on start.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, max_size: int = REPORT_CACHE_SIZE,
+                 path: Optional[str] = REPORT_CACHE_PATH or None):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.path = path
+        self._entries: "OrderedDict[str, Tuple[List, List]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._data_version = None
+        self._versions: Optional[Dict[str, int]] = None
+        self._targets = dict(dal=DAL(db_path), analytics=Analytics(db_path))
+        self.hits = self.misses = self.stale = self.evictions = 0
+        if path:
+            self._load()
+            atexit.register(self.save)  # keep the hit/miss counters of short CLI runs
+
+    def versions(self) -> Optional[Dict[str, int]]:
+        """Per-table change counters, or None for a database without data_version."""
+        with self._lock:
+            if self._conn is None:
+                # a private connection: commits on it would not move its own data_version
+                self._conn = bare_connect(self.db_path, check_same_thread=False)
+            current = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if current != self._data_version or self._versions is None:
+                try:
+                    self._versions = dict(self._conn.execute("SELECT table_name, version FROM data_version"))
+                except sqlite3.OperationalError:
+                    return None
+                self._data_version = current
+            return self._versions
+
+    def token(self, name: str) -> Optional[List[int]]:
+        versions = self.versions()
+        if versions is None:
+            return None
+        return [versions.get(EPOCH)] + [versions.get(table) for table in REPORTS[name].tables]
+
+    def run(self, name: str, **kwargs) -> List:
+        """Report rows from the cache, or from DAL/Analytics when its tables have changed."""
+        if name not in REPORTS:
+            raise ValueError(f"Unknown report {name}")
+        key = json.dumps([name, sorted(kwargs.items())])
+        token = self.token(name)  # read before running, so a concurrent write makes the entry stale
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and token is not None and entry[0] == token:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(entry[1])
+            self.misses += 1
+            if entry is not None:
+                self.stale += 1
+        spec = REPORTS[name]
+        rows = getattr(self._targets[spec.source], spec.method)(**kwargs)
+        if token is not None:
+            with self._lock:
+                self._entries[key] = (token, rows)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            if self.path:
+                self.save()
+        return rows
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.stale = self.evictions = 0
+        if self.path:
+            self.save()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return dict(entries=len(self._entries), max_size=self.max_size, hits=self.hits, misses=self.misses,
+                        stale=self.stale, evictions=self.evictions,
+                        hit_rate=round(self.hits / lookups, 3) if lookups else None, path=self.path)
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+    def save(self) -> None:
+        """Write entries and counters to self.path (atomically, last writer wins)."""
+        with self._lock:
+            state = dict(
+                db=str(Path(self.db_path).resolve()),
+                stats=dict(hits=self.hits, misses=self.misses, stale=self.stale, evictions=self.evictions),
+                entries=[[key, token, type(rows[0]).__name__ if rows else None, [list(r) for r in rows]]
+                         for key, (token, rows) in self._entries.items()],
+            )
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(state, fh)
+        os.replace(tmp, self.path)
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                state = json.load(fh)
+        except (OSError, ValueError):
+            return
+        if state.get("db") != str(Path(self.db_path).resolve()):
+            return  # written for another database
+        stats = state.get("stats", {})
+        self.hits, self.misses = stats.get("hits", 0), stats.get("misses", 0)
+        self.stale, self.evictions = stats.get("stale", 0), stats.get("evictions", 0)
+        for key, token, type_name, rows in state.get("entries", [])[-self.max_size:]:
+            if type_name is None:
+                self._entries[key] = (token, [])
+            elif hasattr(getattr(records, type_name, None), "_make"):
+                self._entries[key] = (token, [getattr(records, type_name)._make(row) for row in rows])
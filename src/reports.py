@@ -0,0 +1,124 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from operator import attrgetter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from .db import connect
+from .config import DB_PATH
+from .dal import DAL
+from .analytics import Analytics
+
+
+class Report(NamedTuple):
+    source: str                      # "dal" or "analytics"
+    method: str
+    order: str                       # field the merged rows are sorted by
+    descending: bool = True
+    key: Optional[Tuple[str, ...]] = None  # group fields; None when shards never share a group
+    sums: Tuple[str, ...] = ()       # fields added together when shards share a group
+    limited: bool = True             # the method takes a `limit`
+    tables: Tuple[str, ...] = ()     # tables read; their data_version counters key the report cache
+
+
+REPORTS: Dict[str, Report] = {
+    "top-passengers": Report("dal", "top_passengers", "total_bookings",
+                             key=("id",), sums=("total_bookings",), tables=("passenger", "booking")),
+    "revenue-rankings": Report("dal", "revenue_rankings", "total_revenue", tables=("flight", "booking")),
+    "route-load-factors": Report("dal", "route_load_factors", "load_factor",
+                                 tables=("flight", "aircraft", "airport", "booking", "ticket")),
+    "top-routes": Report("analytics", "top_routes", "bookings", key=("route",), sums=("bookings",),
+                         tables=("booking", "flight", "airport")),
+    "revenue-by-month": Report("analytics", "revenue_by_month", "month", descending=False,
+                               key=("month",), sums=("total_revenue",), limited=False, tables=("booking",)),
+    "load-factor": Report("analytics", "load_factor", "load_factor", limited=False,
+                          tables=("flight", "aircraft", "booking", "ticket")),
+    "revenue-by-flight": Report("analytics", "revenue_by_flight", "revenue",
+                                key=("flight",), sums=("revenue",), limited=False, tables=("booking", "flight")),
+}
+
+
+def flight_shards(db_path: str, shards: int) -> List[Tuple[int, int]]:
+    """Split flight ids into `shards` inclusive ranges carrying roughly equal booked seats.
+
+    Weights come from fare_bucket, so balancing costs one scan of the flight table
+    rather than of booking.
+    """
+    with connect(db_path, read_only=True) as conn:
+        rows = conn.execute("""
+            SELECT f.id, COALESCE(fb.booked_seats, 0) + 1
+            FROM flight f LEFT JOIN fare_bucket fb ON fb.flight_id = f.id
+            ORDER BY f.id
+        """).fetchall()
+    if not rows:
+        return []
+    total = sum(weight for _, weight in rows)
+    bounds, lo, acc = [], rows[0][0], 0
+    for flight_id, weight in rows[:-1]:
+        acc += weight
+        if acc >= total * (len(bounds) + 1) / shards:
+            bounds.append((lo, flight_id))
+            lo = flight_id + 1
+    bounds.append((lo, rows[-1][0]))
+    return bounds
+
+
+def run_report(db_path: str, name: str, limit: int = 10, flight_range: Optional[Tuple[int, int]] = None) -> List:
+    """Run one report (or one flight-id shard of it) on a read-only connection."""
+    spec = REPORTS[name]
+    target = DAL(db_path, read_only=True) if spec.source == "dal" else Analytics(db_path, read_only=True)
+    kwargs = dict(flight_range=flight_range)
+    if spec.limited:
+        # shards that can share a group must return every partial group for the merge
+        kwargs["limit"] = -1 if flight_range and spec.key else limit
+    return getattr(target, spec.method)(**kwargs)
+
+
+def merge(name: str, parts: Iterable[List], limit: int = 10) -> List:
+    """Combine shard results: sum shared groups, re-sort, re-apply the limit."""
+    spec = REPORTS[name]
+    if spec.key is None:
+        rows = [row for part in parts for row in part]
+    else:
+        groups = {}
+        for part in parts:
+            for row in part:
+                key = tuple(getattr(row, field) for field in spec.key)
+                seen = groups.get(key)
+                groups[key] = row if seen is None else seen._replace(
+                    **{field: getattr(seen, field) + getattr(row, field) for field in spec.sums})
+        rows = list(groups.values())
+    rows.sort(key=attrgetter(spec.order), reverse=spec.descending)
+    return rows[:limit] if spec.limited else rows
+
+
+class ParallelReports:
+    """Fan reports out to a process pool, optionally sharding each one by flight-id range."""
+
+    def __init__(self, db_path: str = DB_PATH, workers: Optional[int] = None, shards: int = 1):
+        self.db_path = db_path
+        self.workers = workers or os.cpu_count() or 1
+        self.shards = max(shards, 1)
+
+    def run(self, names: Optional[Iterable[str]] = None, limit: int = 10) -> Dict[str, List]:
+        names = list(names or REPORTS)
+        bounds = flight_shards(self.db_path, self.shards) if self.shards > 1 else [None]
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = {name: [pool.submit(run_report, self.db_path, name, limit, b) for b in bounds]
+                       for name in names}
+            return {name: merge(name, (f.result() for f in parts), limit) for name, parts in futures.items()}
+
+    def run_serial(self, names: Optional[Iterable[str]] = None, limit: int = 10) -> Dict[str, List]:
+        return {name: run_report(self.db_path, name, limit) for name in (names or REPORTS)}
+
+    def speedup(self, names: Optional[Iterable[str]] = None, limit: int = 10) -> Dict:
+        """Time the serial and parallel runs of the same reports."""
+        names = list(names or REPORTS)
+        started = time.perf_counter()
+        self.run_serial(names, limit)
+        serial = time.perf_counter() - started
+        started = time.perf_counter()
+        self.run(names, limit)
+        parallel = time.perf_counter() - started
+        return dict(reports=len(names), workers=self.workers, shards=self.shards, cores=os.cpu_count(),
+                    serial_s=round(serial, 3), parallel_s=round(parallel, 3),
+                    speedup=round(serial / parallel, 2) if parallel else None)
@@ -0,0 +1,179 @@
+import sqlite3
+import threading
+from array import array
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+from .config import DB_PATH
+from .db import bare_connect as connect
+from .records import RevenuePoint
+
+GRANULARITIES = ("day", "week", "month", "quarter", "year")
+
+# Upper bound on days per period, for how much history a moving average may need
+_PERIOD_DAYS = dict(day=1, week=7, month=31, quarter=92, year=366)
+
+
+def period_start(day: date, granularity: str) -> date:
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+    if granularity == "month":
+        return day.replace(day=1)
+    if granularity == "quarter":
+        return date(day.year, 3 * ((day.month - 1) // 3) + 1, 1)
+    if granularity == "year":
+        return date(day.year, 1, 1)
+    raise ValueError(f"Unknown granularity {granularity}; use one of {', '.join(GRANULARITIES)}")
+
+
+def next_period(start: date, granularity: str) -> date:
+    if granularity in ("day", "week"):
+        return start + timedelta(days=_PERIOD_DAYS[granularity])
+    months = dict(month=1, quarter=3, year=12)[granularity]
+    month = start.month - 1 + months
+    return date(start.year + month // 12, month % 12 + 1, 1)
+
+
+def period_label(start: date, granularity: str) -> str:
+    if granularity == "day":
+        return start.isoformat()
+    if granularity == "week":
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    if granularity == "month":
+        return start.strftime("%Y-%m")
+    if granularity == "quarter":
+        return f"{start.year}-Q{(start.month - 1) // 3 + 1}"
+    return str(start.year)
+
+
+def _year_before(label: str) -> str:
+    """Label of the same period one year earlier ('2025-03' -> '2024-03', '2025-W05' -> '2024-W05')."""
+    return str(int(label[:4]) - 1) + label[4:]
+
+
+class RevenueRollup:
+    """Revenue series at any granularity from the revenue_daily rollup.
+
+    Triggers in models.sql keep revenue_daily (booking day x flight x class)
+    current as bookings are written. A series is cut from dense per-day arrays
+    with prefix sums, so every period, moving average and year-over-year
+    comparison costs O(1) once the arrays are loaded. The arrays are cached per
+    filter and reloaded only when the booking/ticket data_version counters move.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._days: Dict[Tuple, Tuple] = {}  # (class, flight) -> (token, first ordinal, prefix sums)
+        self._lock = threading.Lock()
+
+    def series(self, granularity: str = "month", start: Optional[str] = None, end: Optional[str] = None,
+               ticket_class: Optional[str] = None, flight_id: Optional[int] = None,
+               window: Optional[int] = None, yoy: bool = False) -> List[RevenuePoint]:
+        """Revenue and bookings for every whole period overlapping start..end (booking dates).
+
+        window adds a trailing moving average of revenue over that many periods;
+        yoy adds the change against the same period a year earlier (as a fraction).
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity {granularity}; use one of {', '.join(GRANULARITIES)}")
+        if window is not None and window < 1:
+            raise ValueError("Moving-average window must be at least 1 period")
+        first, revenue_sum, bookings_sum = self._load(ticket_class.upper() if ticket_class else None, flight_id)
+        days = len(revenue_sum) - 1
+        if not days:
+            return []
+        lo = date.fromisoformat(start) if start else date.fromordinal(first)
+        hi = date.fromisoformat(end) if end else date.fromordinal(first + days - 1)
+        if hi < lo:
+            raise ValueError(f"--to {hi} is before --from {lo}")
+
+        # reach back far enough for the first period's moving average and year-ago value
+        history = max(365 if yoy else 0, (window - 1) * _PERIOD_DAYS[granularity] if window else 0)
+
+        def total(prefix, a: int, b: int):
+            """Sum over day ordinals [a, b) from a prefix-sum array."""
+            a, b = min(max(a - first, 0), days), min(max(b - first, 0), days)
+            return prefix[b] - prefix[a]
+
+        periods = []  # (label, first day, last day, revenue, bookings) for whole calendar periods
+        cursor = period_start(lo - timedelta(days=history), granularity)
+        while cursor <= hi:
+            following = next_period(cursor, granularity)
+            a, b = cursor.toordinal(), following.toordinal()
+            periods.append((period_label(cursor, granularity), cursor, following - timedelta(days=1),
+                            total(revenue_sum, a, b), total(bookings_sum, a, b)))
+            cursor = following
+
+        by_label = {label: value for label, _, _, value, _ in periods}
+        moving = array("d", accumulate((value for _, _, _, value, _ in periods), initial=0.0))
+        points = []
+        for i, (label, a, b, value, count) in enumerate(periods):
+            if b < lo:
+                continue
+            average = None
+            if window and i + 1 >= window:
+                average = round((moving[i + 1] - moving[i + 1 - window]) / window, 2)
+            change = None
+            if yoy:
+                before = by_label.get(_year_before(label))
+                if before:
+                    change = round(value / before - 1, 4)
+            points.append(RevenuePoint(label, a.isoformat(), b.isoformat(), round(value, 2), count, average, change))
+        return points
+
+    def rebuild(self) -> int:
+        """Recompute revenue_daily from booking and ticket (backfill for older databases)."""
+        with connect(self.db_path) as conn:
+            conn.execute("DELETE FROM revenue_daily")
+            cur = conn.execute("""
+                INSERT INTO revenue_daily (day, flight_id, class, revenue, bookings)
+                SELECT date(b.booked_at), b.flight_id, t.class, SUM(b.price), COUNT(*)
+                FROM booking b JOIN ticket t ON t.booking_id = b.id
+                WHERE b.status = 'BOOKED'
+                GROUP BY 1, 2, 3
+            """)
+            conn.commit()
+        with self._lock:
+            self._days.clear()
+        return cur.rowcount
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+    def _load(self, ticket_class, flight_id):
+        """Prefix sums of dense per-day revenue and bookings for one filter, from a date ordinal."""
+        key = (ticket_class, flight_id)
+        with connect(self.db_path) as conn:
+            token = self._token(conn)
+            with self._lock:
+                cached = self._days.get(key)
+            if cached is not None and token is not None and cached[0] == token:
+                return cached[1:]
+            rows = conn.execute("""
+                SELECT day, SUM(revenue), SUM(bookings) FROM revenue_daily
+                WHERE (?1 IS NULL OR class = ?1) AND (?2 IS NULL OR flight_id = ?2)
+                GROUP BY day ORDER BY day
+            """, (ticket_class, flight_id)).fetchall()
+        if not rows:
+            return 0, array("d", [0.0]), array("q", [0])
+        first = date.fromisoformat(rows[0][0]).toordinal()
+        size = date.fromisoformat(rows[-1][0]).toordinal() - first + 1
+        revenue, bookings = array("d", bytes(8 * size)), array("q", bytes(8 * size))
+        for day, value, count in rows:
+            i = date.fromisoformat(day).toordinal() - first
+            revenue[i], bookings[i] = value, count
+        loaded = (first, array("d", accumulate(revenue, initial=0.0)), array("q", accumulate(bookings, initial=0)))
+        with self._lock:
+            self._days[key] = (token,) + loaded
+        return loaded
+
+    @staticmethod
+    def _token(conn) -> Optional[Tuple]:
+        try:
+            return tuple(conn.execute(
+                "SELECT version FROM data_version WHERE table_name IN ('*epoch', 'booking', 'ticket') ORDER BY table_name"))
+        except sqlite3.OperationalError:
+            return None  # no data_version table: never cache
@@ -0,0 +1,184 @@
+import csv
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from .config import DB_PATH, SCHEDULE_CHUNK
+from .db import bare_connect as connect
+from .records import ScheduleChange
+
+# Columns of a schedule file, in order; airports are given by IATA code
+COLUMNS = ("code", "origin", "destination", "departure_time", "arrival_time", "aircraft_id", "base_price")
+
+# Compared fields, by position in a schedule row (the code is the key)
+FIELDS = COLUMNS[1:]
+
+
+def _timestamp(value: str) -> str:
+    value = value.strip()
+    if len(value) == 19 and value[10] == "T":  # already YYYY-MM-DDTHH:MM:SS, as export() writes
+        return value
+    return datetime.fromisoformat(value).isoformat(timespec="seconds")
+
+
+def read_schedule(path: str) -> Dict[str, Tuple]:
+    """Load a schedule CSV (COLUMNS header, any order) into {code: (code, origin, destination,
+    departure, arrival, aircraft_id, price)}; bad rows and duplicate codes are errors."""
+    rows: Dict[str, Tuple] = {}
+    with open(path, newline="", encoding="utf-8") as fh:
+        reader = csv.reader(fh)
+        header = [name.strip() for name in next(reader, [])]
+        missing = [name for name in COLUMNS if name not in header]
+        if missing:
+            raise ValueError(f"Schedule {path} is missing column(s) {', '.join(missing)}")
+        code, origin, dest, dep, arr, aircraft, price = (header.index(name) for name in COLUMNS)
+        for line, record in enumerate(reader, start=2):
+            try:
+                row = (record[code].strip(), record[origin].strip().upper(), record[dest].strip().upper(),
+                       _timestamp(record[dep]), _timestamp(record[arr]),
+                       int(record[aircraft]), round(float(record[price]), 2))
+            except (IndexError, ValueError) as e:
+                raise ValueError(f"Schedule line {line}: {e}") from None
+            if row[0] in rows:
+                raise ValueError(f"Schedule line {line}: flight {row[0]} appears twice")
+            rows[row[0]] = row
+    return rows
+
+
+class ScheduleSync:
+    """Bulk schedule import/export, applied as a diff against flight by code.
+
+    sync() reads the file and the current flights (airport codes joined in) into
+    dicts keyed by code, so the diff is one pass over each side. Only the rows
+    that differ are written, SCHEDULE_CHUNK at a time, each chunk in its own
+    short write transaction so bookings are not held up by a season-sized load.
+    Deletes are limited to the span of departures the file covers, and flights
+    with bookings or crew assigned are never deleted -- they are reported as
+    blocked instead.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, chunk: int = SCHEDULE_CHUNK):
+        self.db_path = db_path
+        self.chunk = chunk
+
+    def export(self, path: str, start: Optional[str] = None, end: Optional[str] = None) -> int:
+        """Write flights departing in [start, end) to a schedule CSV; returns the row count."""
+        with connect(self.db_path) as conn, open(path, "w", newline="", encoding="utf-8") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(COLUMNS)
+            count = 0
+            for row in self._current(conn, start, end):
+                writer.writerow(row[1:])
+                count += 1
+        return count
+
+    def sync(self, path: str, dry_run: bool = False, delete: bool = True, limit: Optional[int] = 50) -> Dict:
+        """Diff a schedule file against flight and apply the inserts, updates and deletes."""
+        wanted = read_schedule(path)
+        if not wanted:
+            raise ValueError(f"Schedule {path} has no flights")
+        first = min(row[3] for row in wanted.values())
+        last = max(row[3] for row in wanted.values())
+        with connect(self.db_path) as conn:
+            airports = dict(conn.execute("SELECT code, id FROM airport"))
+            fleet = {aircraft for aircraft, in conn.execute("SELECT id FROM aircraft")}
+            current = {row[1]: row for row in self._current(conn, ordered=False)}
+
+        self._validate(wanted.values(), airports, fleet)
+        inserts, updates, changes = [], [], []
+        for code, row in wanted.items():
+            have = current.get(code)
+            if have is None:
+                inserts.append(row)
+                changes.append(ScheduleChange("insert", None, code, ""))
+            elif have[2:] != row[1:]:
+                updates.append((have[0], row))
+                changed = [name for name, old, new in zip(FIELDS, have[2:], row[1:]) if old != new]
+                changes.append(ScheduleChange("update", have[0], code, ",".join(changed)))
+        gone = [row for code, row in current.items()
+                if code not in wanted and first <= row[4] <= last] if delete else []
+        blocked = self._referenced(r[0] for r in gone) if gone else set()
+        deletes = [r for r in gone if r[0] not in blocked]
+        changes.extend(ScheduleChange("delete", r[0], r[1], "") for r in deletes)
+        changes.extend(ScheduleChange("blocked", r[0], r[1], "has bookings or crew") for r in gone if r[0] in blocked)
+
+        if not dry_run:
+            self._apply(inserts, updates, deletes, airports)
+        return dict(file_flights=len(wanted), span=f"{first} .. {last}", inserted=len(inserts),
+                    updated=len(updates), deleted=len(deletes), blocked=len(blocked),
+                    unchanged=len(wanted) - len(inserts) - len(updates), applied=not dry_run,
+                    changes=changes[:limit] if limit else changes)
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+    @staticmethod
+    def _current(conn, start: Optional[str] = None, end: Optional[str] = None,
+                 ordered: bool = True) -> Iterable[Tuple]:
+        """(id, code, origin, destination, departure, arrival, aircraft_id, price), in departure order
+        unless ordered=False (the diff does not need it and skips the sort). Times are normalised
+        the way read_schedule() normalises the file, so a flight stored as '2027-01-01 10:00'
+        exports, and diffs, as 2027-01-01T10:00:00."""
+        for row in conn.execute(f"""
+            SELECT f.id, f.code, dep.code, arr.code, f.departure_time, f.arrival_time, f.aircraft_id, f.base_price
+            FROM flight f
+            JOIN airport dep ON dep.id = f.departure_airport_id
+            JOIN airport arr ON arr.id = f.arrival_airport_id
+            WHERE (?1 IS NULL OR f.departure_time >= ?1) AND (?2 IS NULL OR f.departure_time < ?2)
+            {"ORDER BY f.departure_time, f.code" if ordered else ""}
+        """, (start, end)):
+            yield row[:4] + (_timestamp(row[4]), _timestamp(row[5]), row[6], round(row[7], 2))
+
+    @staticmethod
+    def _validate(rows: Iterable[Tuple], airports: Dict[str, int], fleet: set) -> None:
+        problems = []
+        for code, origin, dest, dep, arr, aircraft, price in rows:
+            if origin not in airports or dest not in airports:
+                problems.append(f"{code}: unknown airport {origin if origin not in airports else dest}")
+            elif origin == dest:
+                problems.append(f"{code}: departs from and arrives at {origin}")
+            if aircraft not in fleet:
+                problems.append(f"{code}: unknown aircraft {aircraft}")
+            if arr <= dep:
+                problems.append(f"{code}: arrives before it departs")
+            if price < 0:
+                problems.append(f"{code}: negative base price")
+            if len(problems) >= 10:
+                break
+        if problems:
+            raise ValueError("Schedule rejected, nothing applied: " + "; ".join(problems))
+
+    def _referenced(self, flight_ids: Iterable[int]) -> set:
+        """Flights that cannot be deleted because bookings or crew assignments point at them."""
+        ids = json.dumps(list(flight_ids))
+        with connect(self.db_path) as conn:
+            return {flight_id for flight_id, in conn.execute("""
+                SELECT value FROM json_each(?)
+                WHERE EXISTS (SELECT 1 FROM booking WHERE flight_id = value)
+                   OR EXISTS (SELECT 1 FROM crew_assignment WHERE flight_id = value)
+            """, (ids,))}
+
+    def _apply(self, inserts: List[Tuple], updates: List[Tuple[int, Tuple]], deletes: List[Tuple],
+               airports: Dict[str, int]) -> None:
+        statements = (
+            ("""INSERT INTO flight (code, departure_airport_id, arrival_airport_id, departure_time, arrival_time,
+                                   aircraft_id, base_price) VALUES (?, ?, ?, ?, ?, ?, ?)""",
+             [(code, airports[o], airports[d], dep, arr, aircraft, price)
+              for code, o, d, dep, arr, aircraft, price in inserts]),
+            ("""UPDATE flight SET departure_airport_id = ?, arrival_airport_id = ?, departure_time = ?,
+                                  arrival_time = ?, aircraft_id = ?, base_price = ? WHERE id = ?""",
+             [(airports[o], airports[d], dep, arr, aircraft, price, flight_id)
+              for flight_id, (_, o, d, dep, arr, aircraft, price) in updates]),
+            ("DELETE FROM flight WHERE id = ?", [(row[0],) for row in deletes]),
+        )
+        conn = connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA foreign_keys = ON")
+            for sql, params in statements:
+                for i in range(0, len(params), self.chunk):
+                    conn.execute("BEGIN IMMEDIATE")
+                    conn.executemany(sql, params[i:i + self.chunk])
+                    conn.execute("COMMIT")
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            conn.close()
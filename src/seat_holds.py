@@ -0,0 +1,234 @@
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from .config import DB_PATH
+from .db import bare_connect as connect
+from .dal import DAL
+from .ticketing import allocator_for
+from .booking_lifecycle import BOOKED, HELD, CANCELLED, REFUNDED, DEFAULT_HOLD_SECONDS, hold_expiry
+
+# Share of aircraft.capacity sold in each premium cabin; economy gets the rest
+CABIN_SHARE = {"FIRST": 0.05, "BUSINESS": 0.15}
+
+# How long a sold-out (flight, class) is rejected without touching the database
+SOLD_OUT_TTL = 1.0
+
+
+class SoldOut(ValueError):
+    pass
+
+
+def class_capacity(capacity: int, ticket_class: str) -> int:
+    """Seats available to one cabin class on an aircraft of the given capacity."""
+    ticket_class = ticket_class.upper()
+    premium = {cls: int(capacity * share) for cls, share in CABIN_SHARE.items()}
+    if ticket_class in premium:
+        return premium[ticket_class]
+    if ticket_class != "ECONOMY":
+        raise ValueError(f"Unknown ticket class {ticket_class}")
+    return capacity - sum(premium.values())
+
+
+class TimingWheel:
+    """Hashed timing wheel: O(1) add/cancel, expiry cost proportional to ticks elapsed.
+
+    Keys land in slot (deadline tick % slots); entries more than one revolution
+    away stay in their slot until their tick comes round.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 4096):
+        self.tick = tick
+        self.slots = slots
+        self._wheel: List[Dict] = [dict() for _ in range(slots)]
+        self._deadline: Dict = {}
+        self._cursor: Optional[int] = None
+
+    def __len__(self):
+        return len(self._deadline)
+
+    def add(self, key, expires_at: float):
+        self.cancel(key)
+        due = int(expires_at // self.tick)
+        if self._cursor is not None and due <= self._cursor:
+            due = self._cursor + 1  # already due: fire on the next advance
+        self._deadline[key] = due
+        self._wheel[due % self.slots][key] = due
+
+    def cancel(self, key) -> bool:
+        due = self._deadline.pop(key, None)
+        if due is None:
+            return False
+        del self._wheel[due % self.slots][key]
+        return True
+
+    def advance(self, now: float) -> list:
+        """Move the wheel to `now` and return every key whose deadline has passed."""
+        current = int(now // self.tick)
+        if self._cursor is None:
+            self._cursor = current - 1
+        if current <= self._cursor:
+            return []
+        if current - self._cursor >= self.slots:
+            ticks = range(self.slots)  # a full revolution or more: every slot is due
+        else:
+            ticks = range(self._cursor + 1, current + 1)
+        expired = []
+        for t in ticks:
+            slot = self._wheel[t % self.slots]
+            due_keys = [key for key, due in slot.items() if due <= current]
+            for key in due_keys:
+                del slot[key]
+                del self._deadline[key]
+            expired.extend(due_keys)
+        self._cursor = current
+        return expired
+
+
+class SeatHoldManager:
+    """Seat holds for hot flights: capacity-checked under a write lock, TTL expiry on a timing wheel.
+
+    seat_inventory (kept by triggers) gives the seats taken per flight and class
+    as one primary-key lookup, read with the aircraft's capacity in the same
+    join under the write lock, so the check-and-insert holds the lock only
+    briefly and a tail swap is seen by the very next booking. Holds placed by this process expire from the wheel; holds left by
+    other processes are expired in the same transaction when a class looks full.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, hold_seconds: float = DEFAULT_HOLD_SECONDS, tick: float = 1.0):
+        self.db_path = db_path
+        self.hold_seconds = hold_seconds
+        self.dal = DAL(db_path)
+        self.wheel = TimingWheel(tick)
+        self._sold_out: Dict[Tuple[int, str], float] = {}
+        self._lock = threading.Lock()
+
+    def hold(self, passenger_id, flight_id, ticket_class="ECONOMY", price=None, seat_no=None,
+             hold_seconds: Optional[float] = None) -> int:
+        """Hold a seat; the hold becomes a booking on confirm() or lapses after hold_seconds."""
+        seconds = self.hold_seconds if hold_seconds is None else hold_seconds
+        booking_id = self._reserve(passenger_id, flight_id, ticket_class, price, seat_no, HELD, seconds)
+        with self._lock:
+            self.wheel.add(booking_id, time.time() + seconds)
+        return booking_id
+
+    def book(self, passenger_id, flight_id, ticket_class="ECONOMY", price=None, seat_no=None) -> int:
+        """Book straight away, under the same capacity check as hold()."""
+        return self._reserve(passenger_id, flight_id, ticket_class, price, seat_no, BOOKED)
+
+    def confirm(self, booking_id):
+        """Convert a hold into a booking atomically; raises InvalidTransition if it has lapsed.
+
+        confirm/release/refund return the updated Booking, or None if there is no such booking.
+        """
+        return self._finish(booking_id, BOOKED)
+
+    def release(self, booking_id):
+        return self._finish(booking_id, CANCELLED)
+
+    def refund(self, booking_id):
+        return self._finish(booking_id, REFUNDED)
+
+    def available(self, flight_id, ticket_class="ECONOMY") -> int:
+        with connect(self.db_path) as conn:
+            limit, taken = self._cabin(conn, flight_id, ticket_class.upper())
+            return limit - taken
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Expire this process's holds that are due on the wheel."""
+        now = time.time() if now is None else now
+        with self._lock:
+            due = self.wheel.advance(now)
+        if not due:
+            return 0
+        with connect(self.db_path) as conn:
+            cur = conn.execute(
+                """UPDATE booking SET status='EXPIRED', hold_expires_at=NULL
+                   WHERE id IN (SELECT value FROM json_each(?)) AND status='HELD' AND hold_expires_at <= ?""",
+                (json.dumps(due), datetime.utcfromtimestamp(now).isoformat())
+            )
+            conn.commit()
+            return cur.rowcount
+
+    def rebuild_seat_inventory(self) -> int:
+        """Recount held and booked seats per flight and class (backfill for older databases)."""
+        with connect(self.db_path) as conn:
+            conn.execute("DELETE FROM seat_inventory")
+            cur = conn.execute("""
+                INSERT INTO seat_inventory (flight_id, class, taken)
+                SELECT b.flight_id, t.class, COUNT(*)
+                FROM booking b JOIN ticket t ON t.booking_id = b.id
+                WHERE b.status IN ('HELD','BOOKED')
+                GROUP BY b.flight_id, t.class
+            """)
+            conn.commit()
+            return cur.rowcount
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+    def _reserve(self, passenger_id, flight_id, ticket_class, price, seat_no, status, hold_seconds=None):
+        ticket_class = ticket_class.upper()
+        self.expire()
+        key = (flight_id, ticket_class)
+        if self._sold_out.get(key, 0) > time.monotonic():
+            raise SoldOut(f"Flight {flight_id} has no {ticket_class} seats left")
+        # reserve_block opens its own connection, so never allocate under our write lock
+        ticket_no = allocator_for(self.db_path).next()
+        conn = connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            limit, taken = self._cabin(conn, flight_id, ticket_class)
+            if taken >= limit:
+                conn.execute(
+                    """UPDATE booking SET status='EXPIRED', hold_expires_at=NULL
+                       WHERE flight_id=? AND status='HELD' AND hold_expires_at <= ?""",
+                    (flight_id, datetime.utcnow().isoformat())
+                )
+                if self._taken(conn, flight_id, ticket_class) >= limit:
+                    conn.execute("COMMIT")
+                    self._sold_out[key] = time.monotonic() + SOLD_OUT_TTL
+                    raise SoldOut(f"Flight {flight_id} has no {ticket_class} seats left")
+            booking_id = self.dal._insert_booking(
+                conn, passenger_id, flight_id, ticket_class, price, seat_no, status,
+                hold_expiry(hold_seconds) if status == HELD else None, ticket_no
+            )
+            conn.execute("COMMIT")
+            return booking_id
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            conn.close()
+
+    def _finish(self, booking_id, status):
+        with self._lock:
+            self.wheel.cancel(booking_id)
+        booking = self.dal.set_booking_status(booking_id, status)
+        if booking is not None and status in (CANCELLED, REFUNDED):
+            self._sold_out.clear()  # a seat may have come back
+        return booking
+
+    @staticmethod
+    def _cabin(conn, flight_id, ticket_class) -> Tuple[int, int]:
+        """(bookings the cabin may take, seats taken): its overbooking limit if one is set, else
+        its seats on the aircraft flying it now -- one join of primary-key lookups, never cached."""
+        row = conn.execute("""
+            SELECT a.capacity, ol.booking_limit, COALESCE(si.taken, 0)
+            FROM flight f
+            JOIN aircraft a ON a.id = f.aircraft_id
+            LEFT JOIN overbooking_limit ol ON ol.flight_id = f.id AND ol.class = ?2
+            LEFT JOIN seat_inventory si ON si.flight_id = f.id AND si.class = ?2
+            WHERE f.id = ?1
+        """, (flight_id, ticket_class)).fetchone()
+        if not row:
+            raise ValueError(f"Flight {flight_id} not found")
+        capacity, booking_limit, taken = row
+        return (booking_limit if booking_limit is not None else class_capacity(capacity, ticket_class)), taken
+
+    @staticmethod
+    def _taken(conn, flight_id, ticket_class) -> int:
+        row = conn.execute(
+            "SELECT taken FROM seat_inventory WHERE flight_id=? AND class=?", (flight_id, ticket_class)
+        ).fetchone()
+        return row[0] if row else 0
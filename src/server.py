@@ -0,0 +1,346 @@
+import base64
+import json
+import os
+import re
+import signal
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from types import GeneratorType
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from . import db
+from .booking_lifecycle import DEFAULT_HOLD_SECONDS
+from .config import DB_PATH, HTTP_HOST, HTTP_PORT, HTTP_THREADS
+from .records import to_dict
+from .seat_holds import SoldOut
+from .services import Services
+
+# Rows per chunk when streaming a list endpoint
+STREAM_BATCH = 500
+
+# Seconds an idle keep-alive connection may hold a worker thread
+IDLE_TIMEOUT = 5.0
+
+Route = Tuple[str, "re.Pattern", Callable]
+ROUTES: List[Route] = []
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def route(method: str, pattern: str):
+    """Register a handler(svc, params, query, body) for METHOD on a path regex."""
+    def register(handler):
+        ROUTES.append((method, re.compile(f"^{pattern}$"), handler))
+        return handler
+    return register
+
+
+def _arg(query: Dict, name: str, cast=str, default=None):
+    values = query.get(name)
+    if not values:
+        if default is None:
+            raise ValueError(f"Missing query parameter {name}")
+        return default
+    try:
+        return cast(values[0])
+    except ValueError:
+        raise ValueError(f"Bad value for {name}: {values[0]!r}") from None
+
+
+def _field(body: Dict, name: str, default=KeyError):
+    if name not in body:
+        if default is KeyError:
+            raise ValueError(f"Missing field {name}")
+        return default
+    return body[name]
+
+
+# ----------------------------
+# Routes
+# ----------------------------
+@route("GET", "/health")
+def health(svc, params, query, body):
+    return dict(status="ok", pid=os.getpid())
+
+
+@route("GET", "/passengers")
+def passengers(svc, params, query, body):
+    return svc.get_passengers(stream=True)
+
+
+@route("GET", "/passengers/search")
+def search_passengers(svc, params, query, body):
+    return svc.find_passengers(_arg(query, "q"), _arg(query, "limit", int, 20))
+
+
+@route("GET", r"/passengers/(\d+)/itinerary")
+def itinerary(svc, params, query, body):
+    when = _arg(query, "when", str, "all")
+    return svc.itinerary(int(params[0]), None if when == "all" else when)
+
+
+@route("GET", "/flights")
+def flights(svc, params, query, body):
+    return svc.get_flights(stream=True)
+
+
+@route("GET", "/quote")
+def quote(svc, params, query, body):
+    flight_ids = [int(i) for i in _arg(query, "flight").split(",")]
+    return svc.quote(flight_ids, _arg(query, "class", str, "ECONOMY").upper())
+
+
+@route("GET", "/bookings")
+def bookings(svc, params, query, body):
+    return svc.get_bookings(stream=True)
+
+
+@route("POST", "/bookings")
+def book(svc, params, query, body):
+    booking_id = svc.book(_field(body, "passenger_id"), _field(body, "flight_id"),
+                          _field(body, "class", "ECONOMY").upper(), _field(body, "price", None),
+                          _field(body, "seat_no", None))
+    return 201, dict(booking_id=booking_id)
+
+
+@route("POST", "/holds")
+def hold(svc, params, query, body):
+    booking_id = svc.hold(_field(body, "passenger_id"), _field(body, "flight_id"),
+                          _field(body, "class", "ECONOMY").upper(), _field(body, "seat_no", None),
+                          _field(body, "hold_seconds", DEFAULT_HOLD_SECONDS))
+    return 201, dict(booking_id=booking_id)
+
+
+@route("POST", r"/bookings/(\d+)/confirm")
+def confirm(svc, params, query, body):
+    return _transition(svc.confirm_booking(int(params[0])), params[0])
+
+
+@route("POST", r"/bookings/(\d+)/cancel")
+def cancel(svc, params, query, body):
+    return _transition(svc.cancel_booking(int(params[0])), params[0])
+
+
+def _transition(booking, booking_id):
+    if booking is None:
+        raise HTTPError(404, f"Booking {booking_id} not found")
+    return booking
+
+
+@route("GET", r"/reports/([a-z-]+)")
+def report(svc, params, query, body):
+    return svc.report(params[0], _arg(query, "limit", int, 10))
+
+
+# ----------------------------
+# Server
+# ----------------------------
+class Handler(BaseHTTPRequestHandler):
+    """Dispatches to ROUTES with one Services object per worker thread.
+
+    The session role is reset on every request: anonymous callers are
+    CUSTOMERs, HTTP Basic credentials log in as that user.
+    """
+
+    protocol_version = "HTTP/1.1"  # keep-alive, chunked list responses
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    timeout = IDLE_TIMEOUT
+    _local = threading.local()
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def log_request(self, code="-", size="-"):
+        if self.server.verbose:
+            super().log_request(code, size)
+
+    def _services(self) -> Services:
+        svc = getattr(self._local, "svc", None)
+        if svc is None:
+            svc = self._local.svc = Services(self.server.db_path)
+        svc.current_role, svc.current_user = "CUSTOMER", None
+        return svc
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        try:
+            body = self._body()  # always consume it, or the next keep-alive request is misread
+            handler, params = self._match(method, url.path)
+            svc = self._services()
+            self._login(svc)
+            result = handler(svc, params, parse_qs(url.query), body)
+            status = 200
+            if type(result) is tuple:  # (status, payload); records are tuple subclasses
+                status, result = result
+            if isinstance(result, GeneratorType):
+                self._send_stream(status, result)
+            else:
+                self._send_json(status, to_dict(result))
+        except HTTPError as e:
+            self._send_error(e.status, str(e))
+        except PermissionError as e:
+            anonymous = self.headers.get("Authorization") is None
+            self._send_error(401 if anonymous else 403, str(e))
+        except (SoldOut, sqlite3.IntegrityError) as e:  # sold out, duplicate booking, ...
+            self._send_error(409, str(e))
+        except ValueError as e:
+            self._send_error(400, str(e))
+        except Exception as e:
+            self.log_error("%s %s failed: %r", method, self.path, e)
+            self._send_error(500, "Internal server error")
+        finally:
+            db.release_pooled()
+
+    def _match(self, method, path):
+        allowed = False
+        for route_method, pattern, handler in ROUTES:
+            m = pattern.match(path)
+            if m:
+                if route_method == method:
+                    return handler, m.groups()
+                allowed = True
+        raise HTTPError(405 if allowed else 404, f"No route for {method} {path}")
+
+    def _body(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except json.JSONDecodeError as e:
+            raise HTTPError(400, f"Body is not valid JSON: {e}")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        return body
+
+    def _login(self, svc):
+        header = self.headers.get("Authorization")
+        if header is None:
+            return
+        scheme, _, token = header.partition(" ")
+        try:
+            username, _, password = base64.b64decode(token).decode().partition(":")
+        except ValueError:
+            scheme = None
+        if scheme != "Basic":
+            raise HTTPError(401, "Use HTTP Basic authentication")
+        try:
+            svc.authenticate(username, password)
+        except PermissionError as e:
+            raise HTTPError(401, str(e))
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 401:
+            self.send_header("WWW-Authenticate", 'Basic realm="airline"')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status, message):
+        self._send_json(status, dict(error=message))
+
+    def _send_stream(self, status, rows):
+        """Write a JSON array in chunks of STREAM_BATCH rows as they come off the cursor."""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        separator = "["
+        batch = []
+        try:
+            for row in rows:
+                batch.append(separator + json.dumps(row._asdict(), default=str))
+                separator = ","
+                if len(batch) == STREAM_BATCH:
+                    self._write_chunk("".join(batch))
+                    batch = []
+        except Exception as e:
+            # headers are gone; drop the connection so the client sees a truncated body
+            self.log_error("stream %s failed: %r", self.path, e)
+            self.close_connection = True
+            return
+        batch.append("]" if separator == "," else "[]")
+        self._write_chunk("".join(batch))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text):
+        data = text.encode()
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer whose connections are handled on a fixed pool of worker threads.
+
+    A keep-alive connection occupies its worker until it goes idle for
+    IDLE_TIMEOUT seconds, so size `threads` to the expected concurrent clients.
+    """
+
+    def __init__(self, address, db_path: str = DB_PATH, threads: int = HTTP_THREADS, verbose: bool = False):
+        super().__init__(address, Handler)
+        self.db_path = db_path
+        self.threads = threads
+        self.verbose = verbose
+        self.pool: Optional[ThreadPoolExecutor] = None
+
+    def serve_forever(self, poll_interval=0.5):
+        # created here rather than in __init__ so pre-forked children get their own threads
+        self.pool = ThreadPoolExecutor(self.threads, thread_name_prefix="http")
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def serve(db_path: str = DB_PATH, host: str = HTTP_HOST, port: int = HTTP_PORT, threads: int = HTTP_THREADS,
+          processes: int = 1, verbose: bool = False) -> None:
+    """Serve the JSON API until interrupted.
+
+    With processes > 1 the listening socket is bound once and the process forks,
+    so every child accepts on the same port (SQLite WAL handles the concurrency).
+    """
+    db.enable_pooling()
+    server = PooledHTTPServer((host, port), db_path, threads, verbose)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))  # run the cleanup below
+    children = []
+    for _ in range(processes - 1):
+        pid = os.fork()
+        if pid == 0:
+            children = None
+            break
+        children.append(pid)
+    try:
+        if children is not None:
+            print(f"Serving {db_path} on http://{host}:{server.server_address[1]} "
+                  f"({processes} process(es) x {threads} threads)", flush=True)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        for pid in children or ():
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
@@ -1,24 +1,50 @@
-import os
-import hashlib
 from datetime import datetime
 from .dal import DAL
+from .pricing import Pricing
+from .seat_holds import SeatHoldManager
+from .reports import REPORTS, ParallelReports
+from .report_cache import ReportCache
+from .approx import ApproxAnalytics
+from .rollups import RevenueRollup
+from .forecast import DemandForecaster
+from .overbooking import OverbookingOptimizer
+from .backup import backup, restore, verify_backup
+from . import sharding
+from .cdc import ChangeFeed
+from .config import (BACKUP_PAGES_PER_STEP, BACKUP_SLEEP, CDC_BATCH_SIZE, CDC_POLL_INTERVAL,
+                     FLEET_MIN_TURN_MINUTES, AUTH_SESSION_TTL, NOTIFY_BATCH_SIZE, NOTIFY_MAX_ATTEMPTS,
+                     NOTIFY_RETRY_SECONDS)
+from .crew_scheduling import CrewScheduler
+from .auth import Authenticator
+from .booking_lifecycle import DEFAULT_HOLD_SECONDS, expire_holds
+from .crew_compliance import CrewCompliance, MAX_BLOCK_HOURS_7D, MIN_REST_HOURS
+from .fleet import FleetPlanner
+from .schedule import ScheduleSync
+from .notifications import NotificationPipeline, sink_for
 from .mongo_dal import MongoDAL  # <-- for Mongo hybrid
 
 
 class Services:
     def __init__(self, db_path="airline.db", mongo_uri=None, current_user_role="CUSTOMER"):
         self.dal = DAL(db_path)
+        self.pricing = Pricing(db_path)
+        self.seat_holds = SeatHoldManager(db_path)
+        self.changefeed = ChangeFeed(db_path)
+        self.report_cache = ReportCache(db_path)
+        self.approx = ApproxAnalytics(db_path)
+        self.rollup = RevenueRollup(db_path)
+        self.forecaster = DemandForecaster(db_path)
+        self.crew_scheduler = CrewScheduler(db_path)
         self.mongo = MongoDAL(mongo_uri) if mongo_uri else None
         self.current_role = current_user_role.upper() if current_user_role else "CUSTOMER"
+        self.current_user = None
+        self.auth = Authenticator(db_path)
 
     # ----------------------------
     # Helper: password hashing
     # ----------------------------
-    def _hash_password(self, password, salt=None):
-        if salt is None:
-            salt = os.urandom(16).hex()
-        pwd_hash = hashlib.sha256((password + salt).encode()).hexdigest()
-        return pwd_hash, salt
+    def _hash_password(self, password):
+        return self.auth.hash_password(password)
 
     def _require_role(self, *allowed_roles):
         """Ensure current user has one of the required roles."""
@@ -34,9 +60,13 @@ class Services:
         self._require_role("CUSTOMER", "ADMIN", "STAFF")
         return self.dal.create_passenger(name, email)
 
-    def get_passengers(self):
+    def get_passengers(self, stream=False):
         self._require_role("ADMIN", "STAFF")
-        return self.dal.list_passengers()
+        return self.dal.list_passengers(stream)
+
+    def find_passengers(self, query, limit=20):
+        self._require_role("ADMIN", "STAFF")
+        return self.dal.search_passengers(query, limit)
 
     def update_passenger(self, passenger_id, name=None, email=None):
         self._require_role("ADMIN", "STAFF")
@@ -92,8 +122,8 @@ class Services:
             raise ValueError("Departure time must be in the future")
         return self.dal.create_flight(code, origin, destination, departure, arrival, aircraft, price)
 
-    def get_flights(self):
-        return self.dal.list_flights()
+    def get_flights(self, stream=False):
+        return self.dal.list_flights(stream)
 
     def update_flight(self, flight_id, **kwargs):
         self._require_role("ADMIN", "STAFF")
@@ -110,21 +140,47 @@ class Services:
     # ----------------------------
     # Booking + Ticket Services
     # ----------------------------
-    def book(self, passenger_id, flight_id, ticket_class, price, seat_no=None):
+    def quote(self, flight_ids, ticket_class="ECONOMY"):
+        return self.pricing.quote(flight_ids, ticket_class)
+
+    def book(self, passenger_id, flight_id, ticket_class, price=None, seat_no=None):
         self._require_role("CUSTOMER", "ADMIN", "STAFF")
-        return self.dal.create_booking(passenger_id, flight_id, ticket_class, price, seat_no)
+        if self.current_role == "CUSTOMER":
+            price = None  # customers always pay the quoted fare
+        return self.seat_holds.book(passenger_id, flight_id, ticket_class, price, seat_no)
+
+    def itinerary(self, passenger_id, when=None):
+        # ticket numbers, seats and fares: as private as get_bookings, since users are not tied to passengers
+        self._require_role("ADMIN", "STAFF")
+        return self.dal.get_passenger_itinerary(passenger_id, when)
 
-    def get_bookings(self):
+    def get_bookings(self, stream=False):
         self._require_role("ADMIN", "STAFF")
-        return self.dal.list_bookings()
+        return self.dal.list_bookings(stream)
 
     def update_booking(self, booking_id, status=None, price=None):
         self._require_role("ADMIN", "STAFF")
         return self.dal.update_booking(booking_id, status, price)
 
+    def hold(self, passenger_id, flight_id, ticket_class, seat_no=None, hold_seconds=DEFAULT_HOLD_SECONDS):
+        self._require_role("CUSTOMER", "ADMIN", "STAFF")
+        return self.seat_holds.hold(passenger_id, flight_id, ticket_class, None, seat_no, hold_seconds)
+
+    def confirm_booking(self, booking_id):
+        self._require_role("CUSTOMER", "ADMIN", "STAFF")
+        return self.seat_holds.confirm(booking_id)
+
     def cancel_booking(self, booking_id):
         self._require_role("CUSTOMER", "ADMIN", "STAFF")
-        return self.dal.delete_booking(booking_id)
+        return self.seat_holds.release(booking_id)
+
+    def refund_booking(self, booking_id):
+        self._require_role("ADMIN", "STAFF")
+        return self.seat_holds.refund(booking_id)
+
+    def expire_holds(self):
+        self._require_role("ADMIN", "STAFF")
+        return expire_holds(self.dal.db_path)
 
     # ----------------------------
     # Crew Member Services
@@ -149,22 +205,112 @@ class Services:
     # ----------------------------
     def assign_crew(self, crew_member_id, flight_id, duty):
         self._require_role("ADMIN", "STAFF")
-        return self.dal.create_crew_assignment(crew_member_id, flight_id, duty)
+        return self.crew_scheduler.assign(crew_member_id, flight_id, duty)
+
+    def import_crew_roster(self, path):
+        self._require_role("ADMIN", "STAFF")
+        return self.crew_scheduler.import_roster_csv(path)
+
+    def crew_conflicts(self):
+        self._require_role("ADMIN", "STAFF")
+        return self.crew_scheduler.find_conflicts()
+
+    def check_crew_compliance(self, max_block_hours_7d=MAX_BLOCK_HOURS_7D, min_rest_hours=MIN_REST_HOURS,
+                              workers=None):
+        self._require_role("ADMIN", "STAFF")
+        return CrewCompliance(self.dal.db_path, max_block_hours_7d, min_rest_hours).check(workers)
 
     def get_crew_assignments(self):
         return self.dal.list_crew_assignments()
 
     def update_crew_assignment(self, assignment_id, crew_member_id=None, flight_id=None, duty=None):
         self._require_role("ADMIN", "STAFF")
-        return self.dal.update_crew_assignment(assignment_id, crew_member_id, flight_id, duty)
+        return self.crew_scheduler.update(assignment_id, crew_member_id, flight_id, duty)
 
     def delete_crew_assignment(self, assignment_id):
         self._require_role("ADMIN")
-        return self.dal.delete_crew_assignment(assignment_id)
+        return self.crew_scheduler.unassign(assignment_id)
+
+    # ----------------------------
+    # Fleet rotations
+    # ----------------------------
+    def fleet_check(self, start=None, end=None, aircraft_id=None, min_turn_minutes=FLEET_MIN_TURN_MINUTES):
+        self._require_role("ADMIN", "STAFF")
+        return FleetPlanner(self.dal.db_path, min_turn_minutes).check(start, end, aircraft_id)
+
+    def fleet_plan(self, start=None, end=None, apply=False, min_turn_minutes=FLEET_MIN_TURN_MINUTES):
+        """Proposed tail reassignments from start (default now); apply writes them to flight.aircraft_id."""
+        self._require_role("ADMIN", "STAFF")
+        if apply:
+            self._require_role("ADMIN")
+        return FleetPlanner(self.dal.db_path, min_turn_minutes).plan(start, end, apply)
+
+    # ----------------------------
+    # Schedule files
+    # ----------------------------
+    def export_schedule(self, path, start=None, end=None):
+        self._require_role("ADMIN", "STAFF")
+        return dict(exported=ScheduleSync(self.dal.db_path).export(path, start, end), file=path)
+
+    def sync_schedule(self, path, dry_run=False, delete=True, limit=50):
+        """Apply a full schedule file as a diff; dry_run only reports the change set."""
+        self._require_role("ADMIN", "STAFF")
+        if not dry_run:
+            self._require_role("ADMIN")
+        return ScheduleSync(self.dal.db_path).sync(path, dry_run, delete, limit)
+
+    # ----------------------------
+    # Passenger notifications
+    # ----------------------------
+    def notify(self, sink="file", deliver=True, batch_size=NOTIFY_BATCH_SIZE, max_attempts=NOTIFY_MAX_ATTEMPTS,
+               retry_seconds=NOTIFY_RETRY_SECONDS):
+        """Fan queued schedule changes out to booked passengers, then deliver what is due."""
+        self._require_role("ADMIN", "STAFF")
+        pipeline = NotificationPipeline(self.dal.db_path)
+        if not deliver:
+            return dict(fan_out=pipeline.fan_out())
+        return pipeline.run(sink_for(sink), batch_size=batch_size, max_attempts=max_attempts,
+                            retry_seconds=retry_seconds)
+
+    def notification_stats(self, retry_failed=False):
+        self._require_role("ADMIN", "STAFF")
+        if retry_failed:
+            self._require_role("ADMIN")
+        pipeline = NotificationPipeline(self.dal.db_path)
+        requeued = pipeline.retry_failed() if retry_failed else 0
+        return dict(pipeline.stats(), requeued=requeued)
 
     # ----------------------------
     # User Services (secure)
     # ----------------------------
+    def authenticate(self, username, password):
+        """Log in: on success the session takes the user's role."""
+        user = self.auth.authenticate(username, password)
+        if not user:
+            raise PermissionError("Invalid username or password")
+        self.current_user = user
+        self.current_role = user["role"]
+        return user
+
+    def login(self, ttl=AUTH_SESSION_TTL):
+        """Issue a session token for the logged-in user, for later calls to present instead of a password."""
+        if not self.current_user:
+            raise PermissionError("login needs --user and --password")
+        token, expires_at = self.auth.open_session(self.current_user["id"], ttl)
+        return dict(self.current_user, session=token, expires_at=expires_at)
+
+    def resume_session(self, token):
+        """Take the role of the user a session token was issued to."""
+        user = self.auth.session_user(token)
+        if not user:
+            raise PermissionError("Session expired or revoked; log in again")
+        self.current_user = user
+        self.current_role = user["role"]
+        return user
+
+    def logout(self, token):
+        return dict(revoked=self.auth.close_session(token))
+
     def add_user(self, username, password, role):
         self._require_role("ADMIN")
         pwd_hash, salt = self._hash_password(password)
@@ -174,8 +320,7 @@ class Services:
 
     def get_users(self):
         self._require_role("ADMIN")
-        users = self.dal.list_users()
-        return [{"id": u[0], "username": u[1], "role": u[2]} for u in users]
+        return self.dal.list_users()
 
     def update_user(self, user_id, username=None, password=None, role=None):
         self._require_role("ADMIN")
@@ -184,26 +329,148 @@ class Services:
             pwd_hash, salt = self._hash_password(password)
         if role:
             role = role.upper()
-        return self.dal.update_user(user_id, username, pwd_hash, salt, role)
+        updated = self.dal.update_user(user_id, username, pwd_hash, salt, role)
+        self.auth.cache.invalidate()  # drop cached logins for the old name/password/role
+        return updated
 
     def delete_user(self, user_id):
         self._require_role("ADMIN")
-        return self.dal.delete_user(user_id)
+        deleted = self.dal.delete_user(user_id)
+        self.auth.cache.invalidate()
+        return deleted
 
     # ----------------------------
     # Reports (Advanced SQL)
     # ----------------------------
     def top_passengers(self, limit=5):
         self._require_role("ADMIN", "STAFF")
-        return self.dal.query_top_passengers(limit)
+        return self.report_cache.run("top-passengers", limit=limit)
 
     def revenue_rankings(self, limit=5):
         self._require_role("ADMIN", "STAFF")
-        return self.dal.query_revenue_rankings(limit)
+        return self.report_cache.run("revenue-rankings", limit=limit)
 
     def route_load(self, limit=5):
         self._require_role("ADMIN", "STAFF")
-        return self.dal.query_route_load(limit)
+        return self.report_cache.run("route-load-factors", limit=limit)
+
+    def run_reports(self, names=None, limit=10, workers=None, shards=1):
+        """Run several reports at once on read-only connections in a process pool."""
+        self._require_role("ADMIN", "STAFF")
+        return ParallelReports(self.dal.db_path, workers, shards).run(names, limit)
+
+    def report(self, name, limit=10):
+        """Run one report in this process (no pool) through the result cache, e.g. per HTTP request."""
+        self._require_role("ADMIN", "STAFF")
+        if name not in REPORTS:
+            raise ValueError(f"Unknown report {name}")
+        return self.report_cache.run(name, **(dict(limit=limit) if REPORTS[name].limited else {}))
+
+    def report_cache_stats(self, clear=False):
+        self._require_role("ADMIN", "STAFF")
+        stats = self.report_cache.stats()
+        if clear:
+            self.report_cache.clear()
+        return stats
+
+    def approx_report(self, name, limit=10, month=None, by_month=True):
+        """Sketch-backed estimate of top-routes, top-passengers or distinct-passengers."""
+        self._require_role("ADMIN", "STAFF")
+        if name == "top-routes":
+            return self.approx.top_routes(limit)
+        if name == "top-passengers":
+            return self.approx.top_passengers(limit)
+        if name == "distinct-passengers":
+            return self.approx.distinct_passengers(limit, month, by_month)
+        raise ValueError(f"No approximate version of report {name}")
+
+    def sketch_stats(self, rebuild=False):
+        self._require_role("ADMIN", "STAFF")
+        if rebuild:
+            return self.approx.rebuild()
+        self.approx.refresh()
+        return self.approx.stats()
+
+    def revenue_series(self, granularity="month", start=None, end=None, ticket_class=None, flight_id=None,
+                       window=None, yoy=False, rebuild=False):
+        self._require_role("ADMIN", "STAFF")
+        if rebuild:
+            self.rollup.rebuild()
+        return self.rollup.series(granularity, start, end, ticket_class, flight_id, window, yoy)
+
+    def forecast(self, as_of=None, model="pickup", route=None, limit=None, backtest=False):
+        self._require_role("ADMIN", "STAFF")
+        if backtest:
+            return self.forecaster.backtest(as_of, model)
+        return self.forecaster.forecast(as_of, model, route, limit)
+
+    def overbooking(self, as_of=None, route=None, limit=None, risk=None, max_overbook=None, apply=False, clear=False):
+        """Recommended booking limits; apply stores them for the booking path, clear drops every stored limit."""
+        self._require_role("ADMIN", "STAFF")
+        tuning = {name: value for name, value in dict(risk=risk, max_overbook=max_overbook).items() if value is not None}
+        optimizer = OverbookingOptimizer(self.dal.db_path, **tuning)
+        if apply or clear:
+            self._require_role("ADMIN")
+            return dict(cleared=optimizer.clear()) if clear else optimizer.apply(as_of)
+        return optimizer.recommend(as_of, route, limit)
+
+    def report_speedup(self, names=None, limit=10, workers=None, shards=1):
+        self._require_role("ADMIN", "STAFF")
+        return ParallelReports(self.dal.db_path, workers, shards).speedup(names, limit)
+
+    # ----------------------------
+    # Sharding
+    # ----------------------------
+    def split_shards(self, root, count, key="region"):
+        self._require_role("ADMIN")
+        return sharding.split(self.dal.db_path, root, count, key)
+
+    def rebalance_shards(self, root, count=None, key=None):
+        self._require_role("ADMIN")
+        return sharding.rebalance(root, count, key)
+
+    def shard_status(self, root):
+        self._require_role("ADMIN", "STAFF")
+        return sharding.status(root)
+
+    def shard_reports(self, root, names=None, limit=10):
+        self._require_role("ADMIN", "STAFF")
+        return sharding.run_sharded_reports(root, names, limit)
+
+    # ----------------------------
+    # Backup / Restore
+    # ----------------------------
+    def backup(self, dest, pages=BACKUP_PAGES_PER_STEP, sleep=BACKUP_SLEEP, compress=None, verify=True):
+        self._require_role("ADMIN")
+        return backup(dest, self.dal.db_path, pages, sleep, compress, verify)
+
+    def verify_backup(self, path):
+        self._require_role("ADMIN", "STAFF")
+        return verify_backup(path)
+
+    def restore(self, path, pages=BACKUP_PAGES_PER_STEP, sleep=0.0, verify=True):
+        self._require_role("ADMIN")
+        result = restore(path, self.dal.db_path, pages, sleep, verify)
+        self.auth.cache.invalidate()  # users table was replaced
+        return result
+
+    # ----------------------------
+    # Change data capture
+    # ----------------------------
+    def changes(self, since=0, limit=CDC_BATCH_SIZE):
+        self._require_role("ADMIN", "STAFF")
+        return self.changefeed.read(since, limit)
+
+    def follow_changes(self, since=0, batch=CDC_BATCH_SIZE, interval=CDC_POLL_INTERVAL, consumer=None):
+        self._require_role("ADMIN", "STAFF")
+        return self.changefeed.follow(since, batch, interval, consumer)
+
+    def compact_changes(self, keep_seconds=0, max_age_seconds=None, retention_seconds=None):
+        """Compact the change log now; retention_seconds first changes the standing window (0: keep all)."""
+        self._require_role("ADMIN")
+        if retention_seconds is not None:
+            self.changefeed.set_retention(retention_seconds)
+        return self.changefeed.compact(keep_seconds, max_age_seconds)
 
     # ----------------------------
     # Loyalty (MongoDB)
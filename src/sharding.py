@@ -0,0 +1,614 @@
+import heapq
+import json
+import os
+import threading
+import zlib
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from operator import attrgetter
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+from .analytics import Analytics
+from .booking_lifecycle import BOOKED, HELD, DEFAULT_HOLD_SECONDS, hold_expiry
+from .cdc import drop_capture_triggers
+from .config import TICKET_BLOCK_SIZE
+from .dal import DAL
+from .db import apply_schema, bare_connect as connect, bulk_load, flight_range_filter
+from .records import PassengerBookings
+from .reports import REPORTS, merge
+from .ticketing import SequenceAllocator, allocator_for
+
+# A sharded database is a directory: catalog.db holds passengers, users, crew and
+# the flight directory; shard_NN.db hold flights with their bookings and tickets,
+# plus a copy of the reference tables so shard-local joins and triggers work.
+LAYOUT_FILE = "shards.json"
+CATALOG_FILE = "catalog.db"
+SHARD_KEYS = ("month", "region")
+REFERENCE_TABLES = ("airport", "aircraft")
+
+# Booking and ticket ids come from this catalog sequence so they are unique across shards
+ROW_ID_SEQUENCE = "shard_row_id"
+
+# Flights moved per transaction by rebalance()
+MOVE_BATCH = 200
+
+DIRECTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS flight_shard (
+  flight_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  code      TEXT NOT NULL UNIQUE,
+  shard     INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_flight_shard_shard ON flight_shard (shard);
+"""
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """Jump consistent hash: growing from n to n+1 buckets moves only 1/(n+1) of the keys."""
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * (1 << 31) / ((key >> 33) + 1))
+    return b
+
+
+class ShardLayout(NamedTuple):
+    key: str    # "month": departure YYYY-MM; "region": departure airport country
+    count: int
+
+    def shard_for(self, departure_time: str, country: str) -> int:
+        value = departure_time[:7] if self.key == "month" else country
+        return jump_hash(zlib.crc32(value.encode()), self.count)
+
+
+def is_sharded(path: str) -> bool:
+    return (Path(path) / LAYOUT_FILE).exists()
+
+
+def catalog_path(root: str) -> str:
+    return str(Path(root) / CATALOG_FILE)
+
+
+def shard_path(root: str, shard: int) -> str:
+    return str(Path(root) / f"shard_{shard:02d}.db")
+
+
+def load_layout(root: str) -> ShardLayout:
+    return ShardLayout(**json.loads((Path(root) / LAYOUT_FILE).read_text()))
+
+
+def save_layout(root: str, layout: ShardLayout) -> None:
+    if layout.key not in SHARD_KEYS:
+        raise ValueError(f"Unknown shard key {layout.key}; choose from {', '.join(SHARD_KEYS)}")
+    if layout.count < 1:
+        raise ValueError("A sharded database needs at least one shard")
+    path = Path(root) / LAYOUT_FILE
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(layout._asdict()))
+    os.replace(tmp, path)
+
+
+def _columns(conn, table: str) -> str:
+    return ", ".join(row[1] for row in conn.execute(f"PRAGMA main.table_info({table})"))
+
+
+def _countries(catalog: str) -> Dict[int, str]:
+    with connect(catalog) as conn:
+        return dict(conn.execute("SELECT id, country FROM airport"))
+
+
+def _init_shard(root: str, shard: int) -> str:
+    """Create a shard file with the full schema and the catalog's reference tables."""
+    path = shard_path(root, shard)
+    apply_schema(path)
+    conn = connect(path, timeout=30)
+    try:
+        conn.execute("ATTACH DATABASE ? AS cat", (catalog_path(root),))
+        for table in REFERENCE_TABLES:
+            cols = _columns(conn, table)
+            conn.execute(f"INSERT OR REPLACE INTO main.{table} ({cols}) SELECT {cols} FROM cat.{table}")
+        conn.commit()
+        conn.execute("DETACH DATABASE cat")
+    finally:
+        conn.close()
+    return path
+
+
+# Rows of a set of flights, children first for deletes (flight ids bound as JSON)
+_FLIGHT_ROWS = (
+    ("ticket", "booking_id IN (SELECT id FROM {db}.booking WHERE flight_id IN (SELECT value FROM json_each(?)))"),
+    ("booking", "flight_id IN (SELECT value FROM json_each(?))"),
+    ("seat_inventory", "flight_id IN (SELECT value FROM json_each(?))"),
+    ("fare_bucket", "flight_id IN (SELECT value FROM json_each(?))"),
+    ("flight", "id IN (SELECT value FROM json_each(?))"),
+)
+
+
+def _delete_flights(conn, ids: str, db: str = "main") -> None:
+    for table, where in _FLIGHT_ROWS:
+        conn.execute(f"DELETE FROM {db}.{table} WHERE {where.format(db=db)}", (ids,))
+
+
+def _copy_flights(conn, ids: str, source: str) -> None:
+    """Copy flights with their bookings and tickets from attached `source` into main.
+
+    fare_bucket and seat_inventory are rebuilt by the insert triggers.
+    """
+    _delete_flights(conn, ids)  # leftovers of an interrupted move
+    for table in ("flight", "booking", "ticket"):
+        where = dict(_FLIGHT_ROWS)[table].format(db=source)
+        cols = _columns(conn, table)
+        conn.execute(f"INSERT INTO main.{table} ({cols}) SELECT {cols} FROM {source}.{table} WHERE {where}", (ids,))
+
+
+def move_flights(root: str, flight_ids: List[int], source: int, target: int) -> int:
+    """Move flights (with bookings and tickets) between shards; returns how many moved.
+
+    The source shard's write lock is held from the copy until the rows are
+    deleted, so a booking racing the move either lands before the copy or finds
+    the flight gone and looks it up again in the directory.
+    """
+    src = connect(shard_path(root, source), timeout=30, isolation_level=None)
+    try:
+        src.execute("BEGIN IMMEDIATE")
+        ids = json.dumps([row[0] for row in src.execute(
+            "SELECT id FROM flight WHERE id IN (SELECT value FROM json_each(?))", (json.dumps(flight_ids),))])
+        moved = len(json.loads(ids))
+        if moved:
+            dst = connect(shard_path(root, target), timeout=30)
+            try:
+                dst.execute("ATTACH DATABASE ? AS src", (shard_path(root, source),))
+                _copy_flights(dst, ids, "src")
+                dst.commit()
+                dst.execute("DETACH DATABASE src")
+            finally:
+                dst.close()
+            with connect(catalog_path(root), timeout=30) as cat:
+                cat.execute("UPDATE flight_shard SET shard=? WHERE flight_id IN (SELECT value FROM json_each(?))",
+                            (target, ids))
+                cat.commit()
+            _delete_flights(src, ids)
+        src.execute("COMMIT")
+        return moved
+    finally:
+        if src.in_transaction:
+            src.execute("ROLLBACK")
+        src.close()
+
+
+def split(source_db: str, root: str, count: int, key: str = "region") -> Dict:
+    """Turn a single-file database into a sharded directory (the source is left untouched)."""
+    if is_sharded(root):
+        raise ValueError(f"{root} is already a sharded database")
+    layout = ShardLayout(key, count)
+    Path(root).mkdir(parents=True, exist_ok=True)
+    catalog = catalog_path(root)
+    with connect(source_db) as src, connect(catalog) as dst:
+        src.backup(dst)
+    with connect(catalog) as conn:
+        conn.executescript(DIRECTORY_SCHEMA)
+        countries = dict(conn.execute("SELECT id, country FROM airport"))
+        conn.executemany(
+            "INSERT INTO flight_shard (flight_id, code, shard) VALUES (?, ?, ?)",
+            ((fid, code, layout.shard_for(dep, countries[airport])) for fid, code, dep, airport in
+             conn.execute("SELECT id, code, departure_time, departure_airport_id FROM flight").fetchall())
+        )
+        conn.execute("""
+            INSERT INTO sequence (name, next_value)
+            SELECT ?, 1 + MAX((SELECT COALESCE(MAX(id), 0) FROM booking), (SELECT COALESCE(MAX(id), 0) FROM ticket))
+            ON CONFLICT (name) DO UPDATE SET next_value = MAX(next_value, excluded.next_value)
+        """, (ROW_ID_SEQUENCE,))
+        conn.commit()
+
+    for shard in range(count):
+        conn = connect(_init_shard(root, shard))
+        with bulk_load(conn):
+            drop_capture_triggers(conn)  # a split is not a change to the data
+            conn.execute("ATTACH DATABASE ? AS cat", (catalog,))
+            ids = json.dumps([row[0] for row in conn.execute(
+                "SELECT flight_id FROM cat.flight_shard WHERE shard=?", (shard,))])
+            _copy_flights(conn, ids, "cat")
+        conn.execute("DETACH DATABASE cat")
+        apply_schema(shard_path(root, shard))
+
+    conn = connect(catalog)
+    with bulk_load(conn):
+        drop_capture_triggers(conn)
+        _delete_flights(conn, json.dumps([row[0] for row in conn.execute("SELECT flight_id FROM flight_shard")]))
+    apply_schema(catalog)
+    conn.execute("VACUUM")
+    save_layout(root, layout)
+    return status(root)
+
+
+def rebalance(root: str, count: Optional[int] = None, key: Optional[str] = None,
+              batch: int = MOVE_BATCH) -> Dict:
+    """Re-shard to a new shard count and/or key, moving only flights whose shard changes.
+
+    The new layout is saved first so flights created meanwhile already go to
+    their final shard; processes pick it up on their next create_flight().
+    Shards beyond a reduced count are deleted once empty.
+    """
+    old = load_layout(root)
+    new = ShardLayout(key or old.key, count or old.count)
+    for shard in range(old.count, new.count):
+        _init_shard(root, shard)
+    save_layout(root, new)
+    countries = _countries(catalog_path(root))
+    moves = defaultdict(list)
+    for shard in range(max(old.count, new.count)):
+        if not Path(shard_path(root, shard)).exists():
+            continue
+        with connect(shard_path(root, shard)) as conn:
+            for flight_id, departure, airport in conn.execute(
+                    "SELECT id, departure_time, departure_airport_id FROM flight"):
+                target = new.shard_for(departure, countries[airport])
+                if target != shard:
+                    moves[(shard, target)].append(flight_id)
+    moved = 0
+    for (source, target), flight_ids in sorted(moves.items()):
+        for i in range(0, len(flight_ids), batch):
+            moved += move_flights(root, flight_ids[i:i + batch], source, target)
+    for shard in range(new.count, old.count):
+        with connect(shard_path(root, shard)) as conn:
+            left = conn.execute("SELECT COUNT(*) FROM flight").fetchone()[0]
+        if not left:
+            conn.close()
+            for suffix in ("", "-wal", "-shm"):
+                Path(shard_path(root, shard) + suffix).unlink(missing_ok=True)
+    result = status(root)
+    result.update(flights_moved=moved, previous=old._asdict())
+    return result
+
+
+def status(root: str) -> Dict:
+    layout = load_layout(root) if is_sharded(root) else None
+    shards = []
+    for shard in range(layout.count if layout else 0):
+        path = shard_path(root, shard)
+        with connect(path) as conn:
+            flights, bookings = conn.execute(
+                "SELECT (SELECT COUNT(*) FROM flight), (SELECT COUNT(*) FROM booking)").fetchone()
+        shards.append(dict(shard=shard, flights=flights, bookings=bookings, bytes=os.path.getsize(path)))
+    return dict(root=str(root), layout=layout._asdict() if layout else None, shards=shards)
+
+
+def _fan_out(targets: List, call: Callable) -> List:
+    """Run call(target) on every shard at once; SQLite releases the GIL while a query runs."""
+    if len(targets) == 1:
+        return [call(targets[0])]
+    with ThreadPoolExecutor(len(targets)) as pool:
+        return list(pool.map(call, targets))
+
+
+def _merge_report(targets: List, name: str, limit: Optional[int] = None, flight_range=None) -> List:
+    spec = REPORTS[name]
+    kwargs = dict(flight_range=flight_range)
+    if spec.limited:
+        # groups that can span shards need every partial group for the merge
+        kwargs["limit"] = -1 if spec.key else limit
+    return merge(name, _fan_out(targets, lambda t: getattr(t, spec.method)(**kwargs)), limit)
+
+
+class ShardedDAL(DAL):
+    """DAL over a sharded directory: flight, booking and ticket rows live in the shard
+    chosen by the layout's key; everything else stays in the catalog.
+
+    airport and aircraft writes are replicated to every shard. Flights are found
+    through the catalog's flight_shard directory; bookings and tickets by asking
+    each shard, which is one primary-key lookup per shard.
+    """
+
+    def __init__(self, root: str, read_only: bool = False):
+        super().__init__(catalog_path(root), read_only)
+        self.root = str(root)
+        self.row_ids = SequenceAllocator(self.db_path, TICKET_BLOCK_SIZE, ROW_ID_SEQUENCE)
+        self._shards: Dict[int, DAL] = {}
+        self._directory: Dict[int, int] = {}  # flight_id -> shard, checked on use by _book()
+        self._writers = threading.local()
+        self._layout_mtime = None
+        self._refresh_layout()
+
+    def _refresh_layout(self) -> ShardLayout:
+        mtime = os.stat(Path(self.root) / LAYOUT_FILE).st_mtime_ns
+        if mtime != self._layout_mtime:
+            self.layout, self._layout_mtime = load_layout(self.root), mtime
+        return self.layout
+
+    def shard(self, index: int) -> DAL:
+        dal = self._shards.get(index)
+        if dal is None:
+            dal = self._shards[index] = DAL(shard_path(self.root, index), self.read_only)
+        return dal
+
+    @property
+    def shards(self) -> List[DAL]:
+        return [self.shard(i) for i in range(self._refresh_layout().count)]
+
+    def flight_shard(self, flight_id, refresh=False) -> Optional[int]:
+        """The flight's shard, cached per process; refresh=True re-reads the catalog directory."""
+        if not refresh and flight_id in self._directory:
+            return self._directory[flight_id]
+        with connect(self.db_path) as conn:
+            row = conn.execute("SELECT shard FROM flight_shard WHERE flight_id=?", (flight_id,)).fetchone()
+        if row is None:
+            self._directory.pop(flight_id, None)
+            return None
+        shard = self._directory[flight_id] = row[0]
+        return shard
+
+    def _writer(self, shard: int):
+        """This thread's autocommit connection to a shard, kept open for bookings."""
+        conns = self._writers.__dict__.setdefault("conns", {})
+        conn = conns.get(shard)
+        if conn is None:
+            conn = conns[shard] = connect(shard_path(self.root, shard), timeout=30, isolation_level=None)
+        return conn
+
+    def _row_shard(self, sql, row_id) -> Optional[DAL]:
+        """The shard holding a booking/ticket: sql returns its flight_id, checked against the directory."""
+        for index, dal in enumerate(self.shards):
+            with connect(dal.db_path) as conn:
+                row = conn.execute(sql, (row_id,)).fetchone()
+            if row and index in (self.flight_shard(row[0]), self.flight_shard(row[0], refresh=True)):
+                return dal
+        return None
+
+    def _booking_shard(self, booking_id) -> Optional[DAL]:
+        return self._row_shard("SELECT flight_id FROM booking WHERE id=?", booking_id)
+
+    def _ticket_shard(self, ticket_id) -> Optional[DAL]:
+        return self._row_shard(
+            "SELECT b.flight_id FROM ticket t JOIN booking b ON b.id = t.booking_id WHERE t.id=?", ticket_id)
+
+    # ----------------------------
+    # Reference tables (replicated)
+    # ----------------------------
+    def _replicate(self, table, row_id):
+        with connect(self.db_path) as conn:
+            row = conn.execute(f"SELECT * FROM {table} WHERE id=?", (row_id,)).fetchone()
+        for dal in self.shards:
+            with connect(dal.db_path) as conn:
+                if row is None:
+                    conn.execute(f"DELETE FROM {table} WHERE id=?", (row_id,))
+                else:
+                    conn.execute(f"INSERT OR REPLACE INTO {table} VALUES ({', '.join('?' * len(row))})", row)
+                conn.commit()
+
+    def create_airport(self, code, name, city, country):
+        airport_id = super().create_airport(code, name, city, country)
+        self._replicate("airport", airport_id)
+        return airport_id
+
+    def update_airport(self, airport_id, code=None, name=None, city=None, country=None):
+        airport = super().update_airport(airport_id, code, name, city, country)
+        self._replicate("airport", airport_id)
+        return airport
+
+    def delete_airport(self, airport_id):
+        deleted = super().delete_airport(airport_id)
+        self._replicate("airport", airport_id)
+        return deleted
+
+    def create_aircraft(self, model, capacity):
+        aircraft_id = super().create_aircraft(model, capacity)
+        self._replicate("aircraft", aircraft_id)
+        return aircraft_id
+
+    def update_aircraft(self, aircraft_id, model=None, capacity=None):
+        aircraft = super().update_aircraft(aircraft_id, model, capacity)
+        self._replicate("aircraft", aircraft_id)
+        return aircraft
+
+    def delete_aircraft(self, aircraft_id):
+        deleted = super().delete_aircraft(aircraft_id)
+        self._replicate("aircraft", aircraft_id)
+        return deleted
+
+    # ----------------------------
+    # Flights (sharded)
+    # ----------------------------
+    def _shard_for(self, departure_time, departure_airport_id) -> int:
+        with connect(self.db_path) as conn:
+            row = conn.execute("SELECT country FROM airport WHERE id=?", (departure_airport_id,)).fetchone()
+        if not row:
+            raise ValueError(f"Airport {departure_airport_id} not found")
+        return self._refresh_layout().shard_for(departure_time, row[0])
+
+    def create_flight(self, code, departure_airport_id, arrival_airport_id, dep_time, arr_time, aircraft_id, base_price):
+        shard = self._shard_for(dep_time, departure_airport_id)
+        with connect(self.db_path) as conn:
+            # the directory row claims the id and the (globally unique) code
+            flight_id = conn.execute("INSERT INTO flight_shard (code, shard) VALUES (?, ?)", (code, shard)).lastrowid
+            conn.commit()
+        try:
+            with connect(self.shard(shard).db_path) as conn:
+                conn.execute(
+                    """INSERT INTO flight
+                       (id, code, departure_airport_id, arrival_airport_id, departure_time, arrival_time, aircraft_id, base_price)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (flight_id, code, departure_airport_id, arrival_airport_id, dep_time, arr_time, aircraft_id, base_price)
+                )
+                conn.commit()
+        except Exception:
+            with connect(self.db_path) as conn:
+                conn.execute("DELETE FROM flight_shard WHERE flight_id=?", (flight_id,))
+                conn.commit()
+            raise
+        self._directory[flight_id] = shard
+        return flight_id
+
+    def list_flights(self, stream=False):
+        rows = heapq.merge(*(dal.list_flights(stream=True) for dal in self.shards), key=attrgetter("id"))
+        return rows if stream else list(rows)
+
+    def update_flight(self, flight_id, code=None, departure_airport_id=None, arrival_airport_id=None,
+                      departure_time=None, arrival_time=None, aircraft_id=None, base_price=None):
+        shard = self.flight_shard(flight_id, refresh=True)
+        if shard is None:
+            return None
+        if code:
+            with connect(self.db_path) as conn:
+                conn.execute("UPDATE flight_shard SET code=? WHERE flight_id=?", (code, flight_id))
+                conn.commit()
+        flight = self.shard(shard).update_flight(flight_id, code, departure_airport_id, arrival_airport_id,
+                                                 departure_time, arrival_time, aircraft_id, base_price)
+        if flight:
+            target = self._shard_for(flight.departure_time, flight.departure_airport_id)
+            if target != shard:
+                move_flights(self.root, [flight_id], shard, target)
+                self._directory[flight_id] = target
+        return flight
+
+    def delete_flight(self, flight_id):
+        shard = self.flight_shard(flight_id, refresh=True)
+        self._directory.pop(flight_id, None)
+        if shard is None or not self.shard(shard).delete_flight(flight_id):
+            return False
+        with connect(self.db_path) as conn:
+            conn.execute("DELETE FROM flight_shard WHERE flight_id=?", (flight_id,))
+            conn.commit()
+        return True
+
+    # ----------------------------
+    # Bookings and tickets (in their flight's shard)
+    # ----------------------------
+    def create_booking(self, passenger_id, flight_id, ticket_class, price=None, seat_no=None):
+        return self._book(passenger_id, flight_id, ticket_class, price, seat_no, BOOKED)
+
+    def hold_booking(self, passenger_id, flight_id, ticket_class, price=None, seat_no=None,
+                     hold_seconds=DEFAULT_HOLD_SECONDS):
+        return self._book(passenger_id, flight_id, ticket_class, price, seat_no, HELD, hold_expiry(hold_seconds))
+
+    def _book(self, passenger_id, flight_id, ticket_class, price, seat_no, status, hold_expires_at=None):
+        booking_id, ticket_no = self.row_ids.next_value(), allocator_for(self.db_path).next()
+        for refresh in (False, True):  # a cached shard may be stale after a rebalance
+            shard = self.flight_shard(flight_id, refresh)
+            if shard is None:
+                break
+            conn = self._writer(shard)
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                if conn.execute("SELECT 1 FROM flight WHERE id=?", (flight_id,)).fetchone():
+                    self.shard(shard)._insert_booking(conn, passenger_id, flight_id, ticket_class, price, seat_no,
+                                                      status, hold_expires_at, ticket_no, booking_id)
+                    conn.execute("COMMIT")
+                    return booking_id
+            finally:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+        raise ValueError(f"Flight {flight_id} not found")
+
+    def list_bookings(self, stream=False):
+        rows = heapq.merge(*(dal.list_bookings(stream=True) for dal in self.shards), key=attrgetter("id"))
+        return rows if stream else list(rows)
+
+    def get_passenger_itinerary(self, passenger_id, when=None, now=None):
+        now = now or datetime.utcnow()
+        legs = [leg for part in _fan_out(self.shards, lambda dal: dal.get_passenger_itinerary(passenger_id, when, now))
+                for leg in part]
+        legs.sort(key=attrgetter("booking_id"))
+        legs.sort(key=attrgetter("departure_time"), reverse=when == "past")
+        return legs
+
+    def update_booking(self, booking_id, status=None, price=None):
+        dal = self._booking_shard(booking_id)
+        return dal.update_booking(booking_id, status, price) if dal else None
+
+    def delete_booking(self, booking_id):
+        dal = self._booking_shard(booking_id)
+        return dal.delete_booking(booking_id) if dal else False
+
+    def create_ticket(self, booking_id, ticket_no, seat_no, ticket_class):
+        dal = self._booking_shard(booking_id)
+        if dal is None:
+            raise ValueError(f"Booking {booking_id} not found")
+        ticket_id = self.row_ids.next_value()
+        with connect(dal.db_path) as conn:
+            conn.execute("INSERT INTO ticket (id, booking_id, ticket_no, seat_no, class) VALUES (?, ?, ?, ?, ?)",
+                         (ticket_id, booking_id, ticket_no or allocator_for(self.db_path).next(), seat_no,
+                          ticket_class))
+            conn.commit()
+        return ticket_id
+
+    def list_tickets(self, stream=False):
+        rows = heapq.merge(*(dal.list_tickets(stream=True) for dal in self.shards), key=attrgetter("id"))
+        return rows if stream else list(rows)
+
+    def update_ticket(self, ticket_id, ticket_no=None, seat_no=None, ticket_class=None):
+        dal = self._ticket_shard(ticket_id)
+        return dal.update_ticket(ticket_id, ticket_no, seat_no, ticket_class) if dal else None
+
+    def delete_ticket(self, ticket_id):
+        dal = self._ticket_shard(ticket_id)
+        return dal.delete_ticket(ticket_id) if dal else False
+
+    # ----------------------------
+    # Reports (fan out, then merge)
+    # ----------------------------
+    def top_passengers(self, limit=10, flight_range=None):
+        """Booking counts per passenger from every shard; names come from the catalog."""
+        in_range, params = flight_range_filter("flight_id", flight_range)
+
+        def counts(dal):
+            with dal._report_connection() as conn:
+                return conn.execute(f"""
+                    SELECT passenger_id, COUNT(*) FROM booking
+                    WHERE status = 'BOOKED' AND {in_range} GROUP BY passenger_id
+                """, params).fetchall()
+        totals = Counter()
+        for part in _fan_out(self.shards, counts):
+            for passenger_id, bookings in part:
+                totals[passenger_id] += bookings
+        top = totals.most_common(limit)
+        with self._report_connection() as conn:
+            names = {row[0]: row for row in conn.execute(
+                "SELECT id, name, email FROM passenger WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps([passenger_id for passenger_id, _ in top]),))}
+        return [PassengerBookings(*names[pid], bookings) for pid, bookings in top if pid in names]
+
+    def revenue_rankings(self, limit=10, flight_range=None):
+        return _merge_report(self.shards, "revenue-rankings", limit, flight_range)
+
+    def route_load_factors(self, limit=10, flight_range=None):
+        return _merge_report(self.shards, "route-load-factors", limit, flight_range)
+
+
+class ShardedAnalytics:
+    """Analytics over every shard, merged with the same rules as the parallel report runner."""
+
+    def __init__(self, root: str, read_only: bool = False):
+        self.root = str(root)
+        self.read_only = read_only
+
+    @property
+    def shards(self) -> List[Analytics]:
+        return [Analytics(shard_path(self.root, i), self.read_only) for i in range(load_layout(self.root).count)]
+
+    def top_routes(self, limit=5, flight_range=None):
+        return _merge_report(self.shards, "top-routes", limit, flight_range)
+
+    def revenue_by_month(self, flight_range=None):
+        return _merge_report(self.shards, "revenue-by-month", flight_range=flight_range)
+
+    def load_factor(self, flight_range=None):
+        return _merge_report(self.shards, "load-factor", flight_range=flight_range)
+
+    def revenue_by_flight(self, flight_range=None):
+        return _merge_report(self.shards, "revenue-by-flight", flight_range=flight_range)
+
+
+def run_sharded_reports(root: str, names: Optional[Iterable[str]] = None, limit: int = 10) -> Dict[str, List]:
+    """REPORTS over a sharded directory, each fanned out to every shard at once."""
+    names = list(names or REPORTS)
+    unknown = set(names) - set(REPORTS)
+    if unknown:
+        raise ValueError(f"Unknown report(s) {', '.join(sorted(unknown))}")
+    dal, analytics = ShardedDAL(root, read_only=True), ShardedAnalytics(root, read_only=True)
+    results = {}
+    for name in names:
+        spec = REPORTS[name]
+        target = dal if spec.source == "dal" else analytics
+        results[name] = getattr(target, spec.method)(**(dict(limit=limit) if spec.limited else {}))
+    return results
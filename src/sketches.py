@@ -0,0 +1,180 @@
+import hashlib
+import json
+import math
+import zlib
+from array import array
+from typing import Dict, Hashable, List, Optional, Tuple
+
+# Mergeable streaming summaries for the approximate reports (see approx.py).
+# Every sketch hashes keys with blake2b rather than hash(), so a sketch
+# persisted by one process means the same thing in the next.
+
+
+def hash64(key: Hashable) -> int:
+    return int.from_bytes(hashlib.blake2b(str(key).encode(), digest_size=8).digest(), "little")
+
+
+def pack_blob(header: Dict, payload: bytes) -> bytes:
+    return zlib.compress(json.dumps(header).encode() + b"\0" + payload)
+
+
+def unpack_blob(blob: bytes) -> Tuple[Dict, bytes]:
+    header, _, payload = zlib.decompress(blob).partition(b"\0")
+    return json.loads(header), payload
+
+
+class CountMinSketch:
+    """depth x width counters; estimate(key) over-counts by at most e/width * total with prob 1 - e^-depth.
+
+    Negative updates are allowed (a cancelled booking is -1) as long as no
+    key's true count goes below zero.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self.counts = array("q", bytes(8 * width * depth))
+
+    def _cells(self, key) -> List[int]:
+        h = hash64(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1  # double hashing: row i uses h1 + i*h2
+        return [row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, key, count: int = 1) -> int:
+        """Add count to key and return its new estimate."""
+        counts = self.counts
+        estimate = None
+        for cell in self._cells(key):
+            counts[cell] += count
+            if estimate is None or counts[cell] < estimate:
+                estimate = counts[cell]
+        self.total += count
+        return estimate
+
+    def estimate(self, key) -> int:
+        return min(self.counts[cell] for cell in self._cells(key))
+
+    def merge(self, other: "CountMinSketch") -> None:
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Count-Min sketches of different shapes cannot be merged")
+        counts = self.counts
+        for i, value in enumerate(other.counts):
+            if value:
+                counts[i] += value
+        self.total += other.total
+
+    def header(self) -> Dict:
+        return dict(width=self.width, depth=self.depth, total=self.total)
+
+    @classmethod
+    def restore(cls, header: Dict, payload: bytes) -> "CountMinSketch":
+        sketch = cls(header["width"], header["depth"])
+        sketch.total = header["total"]
+        sketch.counts = array("q")
+        sketch.counts.frombytes(payload)
+        return sketch
+
+    def to_bytes(self) -> bytes:
+        return pack_blob(self.header(), self.counts.tobytes())
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "CountMinSketch":
+        return cls.restore(*unpack_blob(blob))
+
+
+class HeavyHitters:
+    """Top-k by frequency: a Count-Min sketch plus the `capacity` keys with the highest estimates.
+
+    A key enters the candidate set when its estimate beats the smallest
+    candidate, so memory is fixed while the true heavy hitters stay tracked.
+    """
+
+    def __init__(self, capacity: int = 256, width: int = 2048, depth: int = 4):
+        self.capacity = capacity
+        self.sketch = CountMinSketch(width, depth)
+        self.candidates: Dict = {}
+        self._floor: Optional[int] = None  # smallest candidate estimate, recomputed lazily
+
+    def add(self, key, count: int = 1) -> None:
+        estimate = self.sketch.add(key, count)
+        candidates = self.candidates
+        if key in candidates:
+            candidates[key] = estimate
+            if count < 0:
+                self._floor = None
+        elif len(candidates) < self.capacity:
+            candidates[key] = estimate
+            self._floor = None
+        else:
+            if self._floor is None:
+                self._floor = min(candidates.values())
+            if estimate > self._floor:
+                del candidates[min(candidates, key=candidates.get)]
+                candidates[key] = estimate
+                self._floor = None
+
+    def top(self, k: int) -> List[Tuple[Hashable, int]]:
+        return sorted(self.candidates.items(), key=lambda kv: (-kv[1], str(kv[0])))[:k]
+
+    def merge(self, other: "HeavyHitters") -> None:
+        self.sketch.merge(other.sketch)
+        keys = set(self.candidates) | set(other.candidates)
+        ranked = sorted(((key, self.sketch.estimate(key)) for key in keys), key=lambda kv: -kv[1])
+        self.candidates = dict(ranked[:self.capacity])
+        self._floor = None
+
+    def to_bytes(self) -> bytes:
+        header = dict(self.sketch.header(), capacity=self.capacity, candidates=list(self.candidates.items()))
+        return pack_blob(header, self.sketch.counts.tobytes())
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "HeavyHitters":
+        header, payload = unpack_blob(blob)
+        hitters = cls(header["capacity"], header["width"], header["depth"])
+        hitters.sketch = CountMinSketch.restore(header, payload)
+        hitters.candidates = {key: estimate for key, estimate in header["candidates"]}
+        return hitters
+
+
+class HyperLogLog:
+    """Distinct-count estimate in 2**precision one-byte registers (std. error ~1.04 / sqrt(2**precision)).
+
+    Insert-only: a key cannot be removed once counted. Merging takes the
+    register-wise maximum, so the union of two HLLs is exact as an HLL.
+    """
+
+    def __init__(self, precision: int = 10, registers: Optional[bytes] = None):
+        if not 4 <= precision <= 16:
+            raise ValueError("HyperLogLog precision must be between 4 and 16")
+        self.precision = precision
+        self.registers = bytearray(registers if registers is not None else 1 << precision)
+        self._count: Optional[int] = None
+
+    def add(self, key) -> None:
+        h = hash64(key)
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1  # leading zeros + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            self._count = None
+
+    def count(self) -> int:
+        if self._count is None:
+            registers, m = self.registers, len(self.registers)
+            alpha = 0.7213 / (1 + 1.079 / m)
+            # registers hold small ranks, so a histogram via bytearray.count beats a per-register sum
+            harmonic = sum(registers.count(r) * 2.0 ** -r for r in range(max(registers) + 1))
+            estimate = alpha * m * m / harmonic
+            zeros = registers.count(0)
+            if estimate <= 2.5 * m and zeros:
+                estimate = m * math.log(m / zeros)  # linear counting for small cardinalities
+            self._count = round(estimate)
+        return self._count
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("HyperLogLogs of different precision cannot be merged")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        self._count = None
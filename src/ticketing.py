@@ -0,0 +1,87 @@
+import os
+import threading
+from typing import Dict, Tuple
+from .db import connect
+from .config import DB_PATH, TICKET_PREFIX, TICKET_BLOCK_SIZE
+
+SEQUENCE_NAME = "ticket_no"
+
+
+def check_digit(prefix: str, serial: int) -> int:
+    return int(f"{prefix}{serial:010d}") % 7
+
+
+def format_ticket_no(serial: int, prefix: str = TICKET_PREFIX) -> str:
+    """e.g. 999 0000001234 5 -> '99900000012345'."""
+    return f"{prefix}{serial:010d}{check_digit(prefix, serial)}"
+
+
+def valid_ticket_no(ticket_no: str, prefix: str = TICKET_PREFIX) -> bool:
+    if len(ticket_no) != len(prefix) + 11 or not ticket_no.isdigit() or not ticket_no.startswith(prefix):
+        return False
+    serial = int(ticket_no[len(prefix):-1])
+    return int(ticket_no[-1]) == check_digit(prefix, serial)
+
+
+def reserve_block(db_path: str, size: int, name: str = SEQUENCE_NAME) -> Tuple[int, int]:
+    """Atomically claim [start, end) from a named sequence."""
+    with connect(db_path) as conn:
+        end = conn.execute("""
+            INSERT INTO sequence (name, next_value) VALUES (?, 1 + ?)
+            ON CONFLICT (name) DO UPDATE SET next_value = next_value + excluded.next_value - 1
+            RETURNING next_value
+        """, (name, size)).fetchone()[0]
+        conn.commit()
+    return end - size, end
+
+
+class SequenceAllocator:
+    """Hands out integers from a named sequence, one block reserved per process.
+
+    One sequence UPDATE serves block_size values; values are unique across
+    processes without retries. An unused tail of a block is skipped when the
+    process exits, so values are dense but not gap-free.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, block_size: int = TICKET_BLOCK_SIZE, name: str = SEQUENCE_NAME):
+        self.db_path = db_path
+        self.block_size = block_size
+        self.name = name
+        self._next = self._end = 0
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def next_value(self) -> int:
+        with self._lock:
+            if self._pid != os.getpid():
+                # forked child: the parent's block is not ours to use
+                self._pid, self._next, self._end = os.getpid(), 0, 0
+            if self._next >= self._end:
+                self._next, self._end = reserve_block(self.db_path, self.block_size, self.name)
+            value = self._next
+            self._next += 1
+        return value
+
+
+class TicketNumberAllocator(SequenceAllocator):
+    """Ticket numbers from the ticket_no sequence (one UPDATE per TICKET_BLOCK_SIZE bookings)."""
+
+    def __init__(self, db_path: str = DB_PATH, block_size: int = TICKET_BLOCK_SIZE, prefix: str = TICKET_PREFIX):
+        super().__init__(db_path, block_size, SEQUENCE_NAME)
+        self.prefix = prefix
+
+    def next(self) -> str:
+        return format_ticket_no(self.next_value(), self.prefix)
+
+
+_allocators: Dict[str, TicketNumberAllocator] = {}
+_allocators_lock = threading.Lock()
+
+
+def allocator_for(db_path: str) -> TicketNumberAllocator:
+    """Process-wide allocator per database, shared by every DAL instance."""
+    with _allocators_lock:
+        allocator = _allocators.get(db_path)
+        if allocator is None:
+            allocator = _allocators[db_path] = TicketNumberAllocator(db_path)
+        return allocator
@@ -0,0 +1,68 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+from src.approx import ApproxAnalytics
+from src.dal import DAL
+from src.db import apply_schema
+
+
+def _setup(db_path):
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    dal.create_airport("AAA", "A", "A", "UK")
+    dal.create_airport("BBB", "B", "B", "UK")
+    dal.create_aircraft("Large", 200)
+    dal.create_flight("T1", 1, 2, "2030-01-01T08:00:00", "2030-01-01T10:00:00", 1, 100.0)
+    return dal
+
+
+def _book(dal, start, count):
+    for i in range(start, start + count):
+        dal.create_booking(dal.create_passenger(f"P{i}", f"p{i}@example.com"), 1, "ECONOMY", 100.0)
+
+
+def _pending(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM sketch_delta").fetchone()[0]
+
+
+def test_deltas_queue_only_once_sketches_exist():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "approx.db")
+        dal = _setup(db_path)
+        _book(dal, 0, 5)
+        assert _pending(db_path) == 0  # nobody has asked for an approx report yet
+
+        approx = ApproxAnalytics(db_path)
+        assert [r.bookings for r in approx.top_routes()] == [5]
+        _book(dal, 5, 3)
+        assert _pending(db_path) == 3
+        assert [r.bookings for r in approx.top_routes()] == [8]
+        assert _pending(db_path) == 0
+
+
+def test_unrefreshed_backlog_drops_the_sketches_and_the_next_report_rebuilds():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "approx.db")
+        dal = _setup(db_path)
+        _book(dal, 0, 4)
+        approx = ApproxAnalytics(db_path)
+        assert [r.bookings for r in approx.top_routes()] == [4]
+
+        with sqlite3.connect(db_path) as conn:  # a long stretch of writes nobody folds
+            conn.executemany("INSERT INTO sketch_delta (passenger_id, flight_id, delta) VALUES (1, 1, 1)",
+                             [()] * 101_000)
+            assert conn.execute("SELECT COUNT(*) FROM sketch").fetchone()[0] == 0
+        assert _pending(db_path) < 1000
+        _book(dal, 4, 2)
+        assert _pending(db_path) < 1000
+
+        # the same instance notices its sketches are gone and rebuilds from booking
+        assert [r.bookings for r in approx.top_routes()] == [6]
+        assert [r.bookings for r in ApproxAnalytics(db_path).top_routes()] == [6]
+
+
+if __name__ == "__main__":
+    test_deltas_queue_only_once_sketches_exist()
+    test_unrefreshed_backlog_drops_the_sketches_and_the_next_report_rebuilds()
+    print("Approx tests passed.")
@@ -0,0 +1,74 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+from src.auth import KDF, Authenticator, SessionCache
+from src.dal import DAL
+from src.db import apply_schema
+
+FAST = KDF("pbkdf2", iterations=1000)
+
+
+def _setup(db_path):
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    user_id = dal.create_user("ops", *FAST.hash("first"), "STAFF")
+    return dal, user_id
+
+
+def _sessions(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM user_session").fetchone()[0]
+
+
+def test_cached_login_follows_changes_made_elsewhere():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "auth.db")
+        dal, user_id = _setup(db_path)
+        # two workers of a pre-forked server: same database, separate caches
+        worker = Authenticator(db_path, FAST, cache=SessionCache())
+        other = Authenticator(db_path, FAST, cache=SessionCache())
+        assert worker.authenticate("ops", "first")["role"] == "STAFF"
+        assert worker.authenticate("ops", "first")
+        assert worker.cache.hits == 1
+
+        dal.update_user(user_id, role="ADMIN")
+        assert worker.authenticate("ops", "first")["role"] == "ADMIN"
+
+        new_hash, new_salt = other.hash_password("second")
+        dal.update_user(user_id, password_hash=new_hash, salt=new_salt)
+        assert worker.authenticate("ops", "first") is None
+        assert worker.authenticate("ops", "second")["id"] == user_id
+
+        dal.delete_user(user_id)
+        assert worker.authenticate("ops", "second") is None
+
+
+def test_session_tokens_outlive_the_process_until_revoked():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "auth.db")
+        dal, user_id = _setup(db_path)
+        token, _ = Authenticator(db_path, FAST).open_session(user_id)
+        later = Authenticator(db_path, FAST, cache=SessionCache())  # the next CLI call
+        assert later.session_user(token) == dict(id=user_id, username="ops", role="STAFF")
+        assert later.session_user("not-a-token") is None
+        assert later.session_user(later.open_session(user_id, ttl=-1)[0]) is None
+
+        dal.update_user(user_id, username="ops")  # nothing changed: sessions stay
+        assert later.session_user(token)
+        dal.update_user(user_id, role="ADMIN")
+        assert later.session_user(token) is None
+
+        token, _ = later.open_session(user_id)
+        assert later.close_session(token) and later.session_user(token) is None
+        token, _ = later.open_session(user_id)
+        later.open_session(user_id)
+        assert _sessions(db_path) == 2
+        dal.delete_user(user_id)
+        assert later.session_user(token) is None
+        assert _sessions(db_path) == 0
+
+
+if __name__ == "__main__":
+    test_cached_login_follows_changes_made_elsewhere()
+    test_session_tokens_outlive_the_process_until_revoked()
+    print("Auth tests passed.")
@@ -0,0 +1,73 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+import pytest
+from src.backup import VERIFY_BLOCK_PAGES, backup, restore, verify_backup
+from src.dal import DAL
+from src.db import apply_schema
+
+
+def _setup(db_path, passengers=3000):
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany("INSERT INTO passenger (name, email) VALUES (?, ?)",
+                         ((f"Passenger {i}", f"p{i}@example.com") for i in range(passengers)))
+    return dal
+
+
+def _passengers(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM passenger").fetchone()[0]
+
+
+def test_backup_verify_and_restore_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "live.db")
+        dal = _setup(db_path)
+        for name in ("plain.db", "packed.db.gz"):
+            dest = str(Path(tmp) / name)
+            manifest = backup(dest, db_path, pages=16)
+            assert manifest["tables"]["passenger"] == 3000 and manifest["quick_check"] == "ok"
+            assert len(manifest["blocks"]) == -(-manifest["bytes"] // (manifest["page_size"] * VERIFY_BLOCK_PAGES))
+            assert verify_backup(dest) == dict(backup=dest, sha256_ok=True, integrity_check="ok",
+                                               tables_ok=True, ok=True)
+
+            dal.create_passenger("Later", "later@example.com")
+            restored = restore(dest, db_path)
+            assert restored["tables"]["passenger"] == 3000 == _passengers(db_path)
+
+
+def test_corrupt_backups_are_reported_and_never_restored():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "live.db")
+        _setup(db_path, passengers=30000)
+        plain, packed = str(Path(tmp) / "plain.db"), str(Path(tmp) / "packed.db.gz")
+        manifest = backup(plain, db_path)
+        backup(packed, db_path)
+        page_size = manifest["page_size"]
+        assert manifest["bytes"] > page_size * VERIFY_BLOCK_PAGES * 2  # several blocks
+
+        with open(plain, "r+b") as f:  # one bad page in the second block
+            f.seek(page_size * (VERIFY_BLOCK_PAGES + 10))
+            f.write(b"\xff" * 64)
+        result = verify_backup(plain)
+        assert not result["ok"] and "integrity_check" not in result
+        assert result["bad_pages"] == [(VERIFY_BLOCK_PAGES + 1, 2 * VERIFY_BLOCK_PAGES)]
+
+        size = Path(packed).stat().st_size
+        with open(packed, "r+b") as f:  # truncated archive: the tail blocks cannot be read
+            f.truncate(size // 2)
+        result = verify_backup(packed)
+        assert not result["ok"] and result["bad_pages"][-1][1] == manifest["bytes"] // page_size
+
+        for dest in (plain, packed):
+            with pytest.raises(ValueError):
+                restore(dest, db_path)
+        assert _passengers(db_path) == 30000
+
+
+if __name__ == "__main__":
+    test_backup_verify_and_restore_round_trip()
+    test_corrupt_backups_are_reported_and_never_restored()
+    print("Backup tests passed.")
@@ -0,0 +1,88 @@
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+import pytest
+from src.booking_lifecycle import (BOOKED, CANCELLED, EXPIRED, HELD, TRANSITIONS, InvalidTransition,
+                                   expire_holds, transition)
+from src.dal import DAL
+from src.db import apply_schema, connect
+
+
+def _setup(db_path):
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    dal.create_airport("AAA", "A", "A", "UK")
+    dal.create_airport("BBB", "B", "B", "UK")
+    dal.create_aircraft("Test", 180)
+    flight_id = dal.create_flight("T1", 1, 2, "2030-01-01T08:00:00", "2030-01-01T10:00:00", 1, 100.0)
+    return dal, flight_id
+
+
+def _booking(conn, passenger_id, flight_id, status):
+    return conn.execute("INSERT INTO booking (passenger_id, flight_id, status, booked_at, price) "
+                        "VALUES (?, ?, ?, '2029-01-01T00:00:00', 100.0) RETURNING id",
+                        (passenger_id, flight_id, status)).fetchone()[0]
+
+
+def test_trigger_allows_exactly_the_transitions_table():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "lifecycle.db")
+        dal, flight_id = _setup(db_path)
+        pairs = [(old, new) for old in TRANSITIONS for new in TRANSITIONS if old != new]
+        passengers = [dal.create_passenger(old, f"{old}.{new}@example.com") for old, new in pairs]
+        with connect(db_path) as conn:
+            for (old, new), passenger_id in zip(pairs, passengers):
+                booking_id = _booking(conn, passenger_id, flight_id, old)
+                if new in TRANSITIONS[old]:
+                    conn.execute("UPDATE booking SET status=? WHERE id=?", (new, booking_id))
+                    assert transition(conn, booking_id, new) == new  # already there: a no-op
+                else:
+                    with pytest.raises(sqlite3.IntegrityError, match="invalid booking status transition"):
+                        conn.execute("UPDATE booking SET status=? WHERE id=?", (new, booking_id))
+                    with pytest.raises(InvalidTransition):
+                        transition(conn, booking_id, new)
+            conn.commit()
+
+
+def test_cancelled_booking_frees_the_passenger_to_rebook():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "lifecycle.db")
+        dal, flight_id = _setup(db_path)
+        passenger_id = dal.create_passenger("Again", "again@example.com")
+        first = dal.create_booking(passenger_id, flight_id, "ECONOMY", 100.0)
+        with pytest.raises(sqlite3.IntegrityError):
+            dal.create_booking(passenger_id, flight_id, "ECONOMY", 100.0)
+        with connect(db_path) as conn:
+            assert transition(conn, first, CANCELLED) == BOOKED
+            conn.commit()
+        second = dal.create_booking(passenger_id, flight_id, "ECONOMY", 100.0)
+        assert second != first
+
+
+def test_expire_holds_only_touches_lapsed_holds():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "lifecycle.db")
+        dal, flight_id = _setup(db_path)
+        lapsed = dal.hold_booking(dal.create_passenger("Late", "late@example.com"), flight_id, "ECONOMY",
+                                  100.0, hold_seconds=-1)
+        live = dal.hold_booking(dal.create_passenger("Live", "live@example.com"), flight_id, "ECONOMY",
+                                100.0, hold_seconds=600)
+        booked = dal.create_booking(dal.create_passenger("Paid", "paid@example.com"), flight_id, "ECONOMY", 100.0)
+        with connect(db_path) as conn:
+            with pytest.raises(InvalidTransition, match="expired"):
+                transition(conn, lapsed, BOOKED)
+
+        assert expire_holds(db_path) == 1
+        assert expire_holds(db_path) == 0
+        with connect(db_path) as conn:
+            status = dict(conn.execute("SELECT id, status FROM booking"))
+            assert status == {lapsed: EXPIRED, live: HELD, booked: BOOKED}
+        assert expire_holds(db_path, now=datetime.utcnow() + timedelta(hours=1)) == 1
+
+
+if __name__ == "__main__":
+    test_trigger_allows_exactly_the_transitions_table()
+    test_cancelled_booking_frees_the_passenger_to_rebook()
+    test_expire_holds_only_touches_lapsed_holds()
+    print("Booking lifecycle tests passed.")
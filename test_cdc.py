@@ -0,0 +1,71 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+import pytest
+from src.cdc import ChangeFeed, ChangeLogGap
+from src.db import apply_schema
+
+
+def _passengers(db_path, start, count):
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany("INSERT INTO passenger (name, email) VALUES (?, ?)",
+                         ((f"P{i}", f"p{i}@example.com") for i in range(start, start + count)))
+
+
+def _age(db_path, days):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE change_log SET changed_at = strftime('%Y-%m-%dT%H:%M:%f', 'now', ?)", (f"-{days} days",))
+
+
+def test_writes_prune_the_log_to_the_retention_window():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "cdc.db")
+        apply_schema(db_path)
+        feed = ChangeFeed(db_path)
+        assert feed.retention() == 7 * 86400
+
+        _passengers(db_path, 0, 500)
+        _age(db_path, 30)  # a month old, never read by anyone
+        _passengers(db_path, 500, 600)  # seq 1000 passes: the old entries go
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT MIN(seq), COUNT(*) FROM change_log").fetchone() == (501, 600)
+
+        feed.set_retention(0)  # keep everything
+        _age(db_path, 30)
+        _passengers(db_path, 1100, 1000)
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM change_log").fetchone()[0] == 1600
+        assert feed.compact(max_age_seconds=86400)["remaining"] == 1000
+
+
+def test_readers_behind_the_retained_log_see_the_gap():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "cdc.db")
+        apply_schema(db_path)
+        feed = ChangeFeed(db_path)
+        _passengers(db_path, 0, 10)
+        feed.commit("mailer", feed.read(0, limit=4)[-1].seq)
+        assert feed.position("mailer") == 4
+
+        _age(db_path, 30)
+        _passengers(db_path, 10, 5)
+        assert feed.compact()["first_seq"] == 11  # 5..10 went unread
+        with pytest.raises(ChangeLogGap) as gap:
+            feed.read(4)
+        assert gap.value.first_seq == 11
+        with pytest.raises(ChangeLogGap):
+            next(feed.follow(consumer="mailer", interval=0))
+        assert [c.seq for c in feed.read(10)] == [11, 12, 13, 14, 15]
+        assert feed.read(0)[0].seq == 11  # no position yet: start at the oldest entry
+
+        _age(db_path, 30)
+        feed.compact()  # everything pruned: positions before the next seq are gaps
+        assert feed.read(15) == []
+        with pytest.raises(ChangeLogGap):
+            feed.read(14)
+
+
+if __name__ == "__main__":
+    test_writes_prune_the_log_to_the_retention_window()
+    test_readers_behind_the_retained_log_see_the_gap()
+    print("Change log tests passed.")
@@ -0,0 +1,62 @@
+import tempfile
+from pathlib import Path
+import pytest
+from src.crew_scheduling import CrewScheduler, RosterConflict
+from src.dal import DAL
+from src.db import apply_schema
+
+
+def _setup(db_path):
+    """Flights 1 and 2 overlap; flight 3 is the next day. Crew members 1 and 2."""
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    dal.create_airport("AAA", "A", "A", "UK")
+    dal.create_airport("BBB", "B", "B", "UK")
+    dal.create_aircraft("Small", 100)
+    dal.create_flight("T1", 1, 2, "2030-01-01T08:00:00", "2030-01-01T10:00:00", 1, 100.0)
+    dal.create_flight("T2", 1, 2, "2030-01-01T09:00:00", "2030-01-01T11:00:00", 1, 100.0)
+    dal.create_flight("T3", 1, 2, "2030-01-02T09:00:00", "2030-01-02T11:00:00", 1, 100.0)
+    dal.create_crew_member("Pilot A", "PILOT")
+    dal.create_crew_member("Pilot B", "PILOT")
+    return dal
+
+
+def test_update_is_validated_against_the_new_roster():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "crew.db")
+        _setup(db_path)
+        crew = CrewScheduler(db_path)
+        crew.assign(1, 1, "CAPTAIN")
+        moved = crew.assign(2, 2, "CAPTAIN")
+        with pytest.raises(RosterConflict):
+            crew.update(moved, crew_member_id=1)
+        assert crew.update(moved, flight_id=3).flight_id == 3
+        assert crew.update(moved, crew_member_id=1).crew_member_id == 1
+        with pytest.raises(RosterConflict):
+            crew.assign(1, 2, "FIRST_OFFICER")
+        assert crew.update(12345, duty="X") is None
+
+
+def test_deletes_and_other_writers_invalidate_the_cached_rosters():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "crew.db")
+        dal = _setup(db_path)
+        crew = CrewScheduler(db_path)
+        first = crew.assign(1, 1, "CAPTAIN")
+        assert crew.unassign(first) and not crew.unassign(first)
+        crew.assign(1, 2, "CAPTAIN")  # flight 1 is no longer on the roster
+
+        assert crew.conflicts_for(2, 2) == []
+        dal.create_crew_assignment(2, 1, "CAPTAIN")  # e.g. another server worker or a CLI run
+        assert crew.conflicts_for(2, 2) == [1]
+
+        assert crew.conflicts_for(1, 1) == [2]
+        dal.update_flight(2, departure_time="2030-01-03T09:00:00", arrival_time="2030-01-03T11:00:00")
+        assert crew.conflicts_for(1, 1) == []
+        crew.assign(1, 1, "CAPTAIN")
+
+
+if __name__ == "__main__":
+    test_update_is_validated_against_the_new_roster()
+    test_deletes_and_other_writers_invalidate_the_cached_rosters()
+    print("Crew scheduling tests passed.")
@@ -0,0 +1,36 @@
+import tempfile
+from pathlib import Path
+import pytest
+from src.db import apply_schema, bulk_load, connect
+
+SETTINGS = ("synchronous", "cache_size", "temp_store", "mmap_size")
+
+
+def _settings(conn):
+    return {name: conn.execute(f"PRAGMA {name};").fetchone()[0] for name in SETTINGS}
+
+
+def test_failed_bulk_load_rolls_back_and_restores_settings():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bulk.db")
+        apply_schema(db_path)
+        conn = connect(db_path)
+        before = _settings(conn)
+        with pytest.raises(KeyError, match="missing"):
+            with bulk_load(conn):
+                conn.execute("INSERT INTO airport (code, name, city, country) VALUES ('AAA', 'A', 'A', 'UK')")
+                {}["missing"]
+        assert _settings(conn) == before
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM airport").fetchone()[0] == 0
+
+        with bulk_load(conn):
+            conn.execute("INSERT INTO airport (code, name, city, country) VALUES ('BBB', 'B', 'B', 'UK')")
+        assert _settings(conn) == before
+        assert conn.execute("SELECT COUNT(*) FROM airport").fetchone()[0] == 1
+        conn.close()
+
+
+if __name__ == "__main__":
+    test_failed_bulk_load_rolls_back_and_restores_settings()
+    print("Connection profile tests passed.")
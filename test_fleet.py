@@ -0,0 +1,48 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+from src.dal import DAL
+from src.db import apply_schema
+from src.fleet import FleetPlanner
+
+
+def _setup(db_path):
+    """Aircraft 1 is double-booked on a departed pair of legs and on an upcoming pair; aircraft 2 is idle."""
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    dal.create_airport("AAA", "A", "A", "UK")
+    dal.create_airport("BBB", "B", "B", "UK")
+    dal.create_aircraft("One", 100)
+    dal.create_aircraft("Two", 100)
+    for code, origin, dest, dep, arr in (("P1", 1, 2, "2020-01-01T08:00:00", "2020-01-01T10:00:00"),
+                                         ("P2", 2, 1, "2020-01-01T09:00:00", "2020-01-01T11:00:00"),
+                                         ("F1", 1, 2, "2040-01-01T08:00:00", "2040-01-01T10:00:00"),
+                                         ("F2", 1, 2, "2040-01-01T09:00:00", "2040-01-01T11:00:00")):
+        dal.create_flight(code, origin, dest, dep, arr, 1, 100.0)
+    return dal
+
+
+def _tails(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return dict(conn.execute("SELECT code, aircraft_id FROM flight"))
+
+
+def test_plan_never_moves_departed_legs():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "fleet.db")
+        _setup(db_path)
+        planner = FleetPlanner(db_path)
+        assert 2 in {issue.flight_id for issue in planner.check()}  # fleet-check still sees departed legs
+
+        for start in (None, "2000-01-01"):  # default, and an explicit --from in the past
+            result = planner.plan(start)
+            assert result["legs"] == 2
+            assert [c.code for c in result["changes"]] == ["F2"]
+
+        assert planner.plan(apply=True)["applied"]
+        assert _tails(db_path) == dict(P1=1, P2=1, F1=1, F2=2)
+
+
+if __name__ == "__main__":
+    test_plan_never_moves_departed_legs()
+    print("Fleet tests passed.")
@@ -0,0 +1,73 @@
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+import pytest
+from src.dal import DAL
+from src.db import apply_schema
+from src.forecast import CHECKPOINTS, DemandForecaster, checkpoint_index
+
+ROUTE = "AAA → BBB"
+
+
+def _setup(db_path):
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    dal.create_airport("AAA", "A", "A", "UK")
+    dal.create_airport("BBB", "B", "B", "UK")
+    dal.create_aircraft("Small", 10)
+    passengers = [dal.create_passenger(f"P{i}", f"p{i}@example.com") for i in range(10)]
+    return dal, passengers
+
+
+def _flight(dal, passengers, departure, days_out):
+    """A flight departing at `departure` with one booking made days_out[i] days before it."""
+    flight_id = dal.create_flight(f"T{departure[:10]}", 1, 2, departure, departure, 1, 100.0)
+    booked = []
+    for passenger_id, days in zip(passengers, days_out):
+        booked_at = datetime.fromisoformat(departure) - timedelta(days=days)
+        booked.append((booked_at.isoformat(sep=" "), dal.create_booking(passenger_id, flight_id, "ECONOMY", 100.0)))
+    with sqlite3.connect(dal.db_path) as conn:
+        conn.executemany("UPDATE booking SET booked_at = ? WHERE id = ?", booked)
+    return flight_id
+
+
+def test_curves_count_bookings_made_at_least_each_checkpoint_out():
+    assert checkpoint_index(-1) == 0 and checkpoint_index(0.5) == 0
+    assert CHECKPOINTS[checkpoint_index(30)] == 28 and checkpoint_index(1000) == len(CHECKPOINTS) - 1
+    with tempfile.TemporaryDirectory() as tmp:
+        dal, passengers = _setup(str(Path(tmp) / "forecast.db"))
+        flight_id = _flight(dal, passengers, "2030-02-01T12:00:00", (30, 10, 1))
+        with sqlite3.connect(dal.db_path) as conn:
+            curve = DemandForecaster._curves(conn, "2030-03-01T00:00:00", "1")[flight_id]
+            assert list(curve) == [3, 3, 2, 2, 2, 2, 2, 1, 1, 1] + [0] * 10
+            # bookings made after as_of are not seen yet
+            assert list(DemandForecaster._curves(conn, "2030-01-25T00:00:00", "1")[flight_id][:3]) == [2, 2, 2]
+
+
+def test_pickup_and_regression_scores_are_clamped():
+    with tempfile.TemporaryDirectory() as tmp:
+        dal, passengers = _setup(str(Path(tmp) / "forecast.db"))
+        # x bookings a fortnight out grow to 2x - 1 by departure
+        for x in range(1, 6):
+            _flight(dal, passengers, f"2030-01-0{x}T12:00:00", (20,) * x + (1,) * (x - 1))
+        upcoming = _flight(dal, passengers, "2030-02-08T12:00:00", (20,) * 4)
+        forecaster = DemandForecaster(dal.db_path)
+        assert forecaster.fit("2030-02-01")["modelled_routes"] == 1
+
+        flights = [(booked, "X", ROUTE, "2030-03-01", 7.5, booked, 10) for booked in (0, 4, 6)]
+        pickup = [f.forecast for f in forecaster.score(flights, "pickup")]
+        regression = [f.forecast for f in forecaster.score(flights, "regression")]
+        assert pickup == [2.0, 6.0, 8.0]  # plus the mean pickup of 2
+        assert regression == [0.0, 7.0, 10.0]  # 2x - 1, never below seats sold or above capacity
+
+        [forecast] = forecaster.forecast("2030-02-01", "regression")
+        assert (forecast.flight_id, forecast.booked, forecast.forecast, forecast.load_factor) == (upcoming, 4, 7.0, 0.7)
+        with pytest.raises(ValueError):
+            forecaster.score(flights, "naive")
+
+
+if __name__ == "__main__":
+    test_curves_count_bookings_made_at_least_each_checkpoint_out()
+    test_pickup_and_regression_scores_are_clamped()
+    print("Forecast tests passed.")
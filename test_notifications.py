@@ -0,0 +1,119 @@
+import json
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from src import notifications
+from src.config import NOTIFY_LEASE_SECONDS
+from src.dal import DAL
+from src.db import apply_schema
+from src.notifications import MemorySink, NotificationPipeline
+
+
+def _setup(db_path):
+    """Flight 1 with two booked passengers and a cancelled one; flight 2 with nobody booked."""
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    dal.create_airport("AAA", "A", "A", "UK")
+    dal.create_airport("BBB", "B", "B", "UK")
+    dal.create_aircraft("Large", 200)
+    dal.create_flight("T1", 1, 2, "2030-01-01T08:00:00", "2030-01-01T10:00:00", 1, 100.0)
+    dal.create_flight("T2", 2, 1, "2030-01-02T08:00:00", "2030-01-02T10:00:00", 1, 100.0)
+    for i in range(3):
+        booking_id = dal.create_booking(dal.create_passenger(f"P{i}", f"p{i}@example.com"), 1, "ECONOMY", 100.0)
+    dal.set_booking_status(booking_id, "CANCELLED")
+    return dal
+
+
+def _queued(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM schedule_change").fetchone()[0]
+
+
+def _payloads(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return [json.loads(p) for p, in conn.execute("SELECT payload FROM notification_outbox ORDER BY id")]
+
+
+@contextmanager
+def _clock():
+    """A controllable notifications._now()."""
+    now, real = [datetime(2030, 1, 1)], notifications._now
+    notifications._now = lambda: now[0]
+    try:
+        yield now
+    finally:
+        notifications._now = real
+
+
+def test_changes_coalesce_per_flight_and_fan_out_to_booked_passengers():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "notify.db")
+        dal = _setup(db_path)
+        for hour in range(9, 30):  # notify never runs: the queue still holds one row per flight
+            dal.update_flight(1, departure_time=f"2030-01-0{1 + hour // 24}T{hour % 24:02d}:00:00")
+        dal.update_flight(2, code="T2X")
+        dal.update_flight(2, code="T2")  # changed and changed back
+        assert _queued(db_path) == 2
+
+        pipeline = NotificationPipeline(db_path)
+        assert pipeline.fan_out() == dict(changes=2, flights=2, queued=2)
+        assert _queued(db_path) == 0 and pipeline.fan_out()["queued"] == 0
+        messages = _payloads(db_path)
+        assert {m["passenger"] for m in messages} == {"P0", "P1"}
+        assert messages[0]["before"]["departure_time"] == "2030-01-01T08:00:00"
+        assert messages[0]["after"]["departure_time"] == "2030-01-02T05:00:00"
+
+
+def test_deleted_flights_are_announced_as_cancelled():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "notify.db")
+        dal = _setup(db_path)
+        dal.update_flight(1, departure_time="2030-01-01T09:00:00")
+        dal.update_flight(2, departure_time="2030-01-02T09:00:00")
+        dal.delete_flight(1)  # DAL connections leave foreign keys off
+        dal.delete_flight(2)  # nobody booked: its queued change goes too
+        assert _queued(db_path) == 1
+
+        NotificationPipeline(db_path).fan_out()
+        messages = _payloads(db_path)
+        assert len(messages) == 2
+        assert {m["type"] for m in messages} == {"flight_cancelled"}
+        assert messages[0]["after"] is None and messages[0]["before"]["departure_time"] == "2030-01-01T08:00:00"
+
+
+def test_retries_back_off_then_fail_and_expired_leases_are_reclaimed():
+    with tempfile.TemporaryDirectory() as tmp, _clock() as clock:
+        db_path = str(Path(tmp) / "notify.db")
+        dal = _setup(db_path)
+        dal.update_flight(1, arrival_time="2030-01-01T11:00:00")
+        pipeline = NotificationPipeline(db_path)
+        pipeline.fan_out()
+
+        failing = MemorySink(fail_rate=1.0)
+        stats = pipeline.deliver(failing, max_attempts=3, retry_seconds=60)
+        assert (stats["retrying"], stats["failed"]) == (2, 0)
+        assert pipeline.deliver(failing, max_attempts=3, retry_seconds=60)["batches"] == 0  # not due yet
+        clock[0] += timedelta(seconds=60)
+        assert pipeline.deliver(failing, max_attempts=3, retry_seconds=60)["retrying"] == 2
+        clock[0] += timedelta(seconds=60)  # backoff doubled: 120s after the second attempt
+        assert pipeline.deliver(failing, max_attempts=3, retry_seconds=60)["batches"] == 0
+        clock[0] += timedelta(seconds=60)
+        assert pipeline.deliver(failing, max_attempts=3, retry_seconds=60)["failed"] == 2
+        assert pipeline.stats()["failed"] == 2
+
+        assert pipeline.retry_failed() == 2
+        assert len(pipeline._claim(10)) == 2  # a dispatcher that dies mid-send
+        sink = MemorySink()
+        assert pipeline.deliver(sink)["sent"] == 0
+        clock[0] += timedelta(seconds=NOTIFY_LEASE_SECONDS)
+        assert pipeline.deliver(sink)["sent"] == 2 and len(sink.sent) == 2
+        assert pipeline.stats()["sent"] == 2
+
+
+if __name__ == "__main__":
+    test_changes_coalesce_per_flight_and_fan_out_to_booked_passengers()
+    test_deleted_flights_are_announced_as_cancelled()
+    test_retries_back_off_then_fail_and_expired_leases_are_reclaimed()
+    print("Notification tests passed.")
@@ -0,0 +1,63 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+from src.dal import DAL
+from src.db import apply_schema
+from src.overbooking import booking_limit
+from src.seat_holds import SeatHoldManager, class_capacity
+
+
+def _setup(db_path):
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    dal.create_airport("AAA", "A", "A", "UK")
+    dal.create_airport("BBB", "B", "B", "UK")
+    dal.create_aircraft("Large", 300)
+    dal.create_aircraft("Small", 50)
+    dal.create_flight("T1", 1, 2, "2030-01-01T08:00:00", "2030-01-01T10:00:00", 1, 100.0)
+    return dal
+
+
+def _set_limit(db_path, limit):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("INSERT INTO overbooking_limit (flight_id, class, booking_limit) VALUES (1, 'ECONOMY', ?)",
+                     (limit,))
+
+
+def test_limit_above_capacity_only_for_unreliable_shows():
+    assert booking_limit(100, 1.0, 0.05, 0.2)[0] == 100
+    limit, risk, _ = booking_limit(100, 0.85, 0.05, 0.2)
+    assert 100 < limit <= 120 and risk <= 0.05
+
+
+def test_tail_swap_drops_the_limit():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "overbook.db")
+        dal = _setup(db_path)
+        holds = SeatHoldManager(db_path)
+        _set_limit(db_path, 260)
+        assert holds.available(1) == 260
+
+        dal.update_flight(1, aircraft_id=2)
+        assert holds.available(1) == class_capacity(50, "ECONOMY")
+        dal.update_flight(1, aircraft_id=2)  # no swap: nothing to drop
+        _set_limit(db_path, 45)
+        dal.update_flight(1, code="T1X")
+        assert holds.available(1) == 45
+
+
+def test_resizing_the_aircraft_drops_the_limit():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "overbook.db")
+        dal = _setup(db_path)
+        holds = SeatHoldManager(db_path)
+        _set_limit(db_path, 260)
+        dal.update_aircraft(1, capacity=200)
+        assert holds.available(1) == class_capacity(200, "ECONOMY")
+
+
+if __name__ == "__main__":
+    test_limit_above_capacity_only_for_unreliable_shows()
+    test_tail_swap_drops_the_limit()
+    test_resizing_the_aircraft_drops_the_limit()
+    print("Overbooking tests passed.")
@@ -0,0 +1,41 @@
+import tempfile
+from datetime import datetime
+from pathlib import Path
+import pytest
+from src.dal import DAL
+from src.db import apply_schema, connect
+from src.pricing import Pricing, quote_flight
+
+
+def _setup(db_path):
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    dal.create_airport("AAA", "A", "A", "UK")
+    dal.create_airport("BBB", "B", "B", "UK")
+    dal.create_aircraft("Test", 180)
+    departed = dal.create_flight("T0", 1, 2, "2020-01-01T08:00:00", "2020-01-01T10:00:00", 1, 100.0)
+    upcoming = dal.create_flight("T1", 1, 2, "2030-01-01T08:00:00", "2030-01-01T10:00:00", 1, 100.0)
+    return dal, departed, upcoming
+
+
+def test_departed_flights_are_not_quoted_or_sold():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "pricing.db")
+        dal, departed, upcoming = _setup(db_path)
+        now = datetime(2025, 6, 1)
+        pricing = Pricing(db_path)
+
+        assert [q["flight_id"] for q in pricing.quote([upcoming], now=now)] == [upcoming]
+        with pytest.raises(ValueError, match="departed"):
+            pricing.quote([upcoming, departed], now=now)
+        with connect(db_path) as conn:
+            with pytest.raises(ValueError, match="departed"):
+                quote_flight(conn, departed, "ECONOMY", now)
+        passenger_id = dal.create_passenger("Late", "late@example.com")
+        with pytest.raises(ValueError, match="departed"):
+            dal.create_booking(passenger_id, departed, "ECONOMY")
+
+
+if __name__ == "__main__":
+    test_departed_flights_are_not_quoted_or_sold()
+    print("Pricing tests passed.")
@@ -1,14 +1,13 @@
 import sqlite3
 from datetime import datetime
-import hashlib
-import os
+from src.auth import KDF
 
 DB_FILE = "airline.db"
 
 
-def hash_password(password: str, salt: bytes) -> bytes:
-    """Hash password with salt using SHA-256 (demo only, not production-safe)."""
-    return hashlib.sha256(salt + password.encode("utf-8")).digest()
+def hash_password(password: str):
+    """Hash password with the same KDF the services layer uses."""
+    return KDF().hash(password)
 
 
 def seed_data(conn):
@@ -125,16 +124,13 @@ def seed_data(conn):
     ])
 
     # Users (with password hashing demo)
-    salt1 = os.urandom(16)
-    salt2 = os.urandom(16)
-    salt3 = os.urandom(16)
     cur.executemany("""
     INSERT INTO user (username, password_hash, salt, role)
     VALUES (?, ?, ?, ?)
     """, [
-        ("admin", hash_password("admin123", salt1), salt1, "ADMIN"),
-        ("staff1", hash_password("staffpass", salt2), salt2, "STAFF"),
-        ("customer1", hash_password("custpass", salt3), salt3, "CUSTOMER"),
+        ("admin", *hash_password("admin123"), "ADMIN"),
+        ("staff1", *hash_password("staffpass"), "STAFF"),
+        ("customer1", *hash_password("custpass"), "CUSTOMER"),
     ])
 
     conn.commit()
@@ -0,0 +1,63 @@
+import tempfile
+from pathlib import Path
+from src.backup import backup, restore
+from src.dal import DAL
+from src.db import apply_schema
+from src.report_cache import ReportCache
+
+
+def _setup(db_path):
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    dal.create_airport("AAA", "A", "A", "UK")
+    dal.create_airport("BBB", "B", "B", "UK")
+    dal.create_aircraft("Test", 180)
+    dal.create_flight("T1", 1, 2, "2030-01-01T08:00:00", "2030-01-01T10:00:00", 1, 100.0)
+    dal.create_booking(dal.create_passenger("First", "first@example.com"), 1, "ECONOMY", 100.0)
+    return dal
+
+
+def _revenue(cache):
+    return [row.total_revenue for row in cache.run("revenue-rankings", limit=10)]
+
+
+def test_only_writes_to_a_reports_tables_invalidate_it():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "cache.db")
+        dal = _setup(db_path)
+        cache = ReportCache(db_path, path=None)
+        assert _revenue(cache) == [100.0]
+        assert _revenue(cache) == [100.0]
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        passenger_id = dal.create_passenger("Second", "second@example.com")  # revenue-rankings reads no passengers
+        assert _revenue(cache) == [100.0]
+        assert (cache.hits, cache.misses) == (2, 1)
+
+        dal.create_booking(passenger_id, 1, "ECONOMY", 50.0)
+        assert _revenue(cache) == [150.0]
+        assert (cache.hits, cache.misses, cache.stale) == (2, 2, 1)
+
+
+def test_restore_never_serves_results_from_another_history():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "cache.db")
+        snapshot = str(Path(tmp) / "snapshot.db")
+        dal = _setup(db_path)
+        backup(snapshot, db_path, sleep=0)
+        cache = ReportCache(db_path, path=None)
+
+        dal.create_booking(dal.create_passenger("Lost", "lost@example.com"), 1, "ECONOMY", 50.0)
+        assert _revenue(cache) == [150.0]
+
+        # the same number of booking writes after a restore leaves the booking counter where it was
+        restore(snapshot, db_path)
+        dal.create_booking(dal.create_passenger("Kept", "kept@example.com"), 1, "ECONOMY", 70.0)
+        assert _revenue(cache) == [170.0]
+        assert cache.stale == 1
+
+
+if __name__ == "__main__":
+    test_only_writes_to_a_reports_tables_invalidate_it()
+    test_restore_never_serves_results_from_another_history()
+    print("Report cache tests passed.")
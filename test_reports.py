@@ -0,0 +1,42 @@
+import tempfile
+from pathlib import Path
+from src.dal import DAL
+from src.db import apply_schema
+from src.reports import merge, run_report
+
+SHARDS = ((1, 3), (4, 6))
+
+
+def _setup(db_path):
+    """A books two flights in each shard; B and C book three flights in one shard each."""
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    dal.create_airport("AAA", "A", "A", "UK")
+    dal.create_airport("BBB", "B", "B", "UK")
+    dal.create_aircraft("Large", 200)
+    for day in range(1, 7):
+        dal.create_flight(f"T{day}", 1, 2, f"2030-01-0{day}T08:00:00", f"2030-01-0{day}T10:00:00", 1, 100.0)
+    for name, flights in (("A", (1, 2, 4, 5)), ("B", (1, 2, 3)), ("C", (4, 5, 6))):
+        passenger_id = dal.create_passenger(name, f"{name.lower()}@example.com")
+        for flight_id in flights:
+            dal.create_booking(passenger_id, flight_id, "ECONOMY", 100.0)
+    return dal
+
+
+def test_sharded_reports_merge_every_partial_group():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "reports.db")
+        _setup(db_path)
+        parts = [run_report(db_path, "top-passengers", limit=1, flight_range=bounds) for bounds in SHARDS]
+        assert [len(part) for part in parts] == [2, 2]  # limit=-1: no shard's top 1 includes A
+        merged = merge("top-passengers", parts, limit=1)
+        assert [(row.name, row.total_bookings) for row in merged] == [("A", 4)]
+        assert merged == run_report(db_path, "top-passengers", limit=1)
+
+        parts = [run_report(db_path, "top-routes", limit=5, flight_range=bounds) for bounds in SHARDS]
+        assert [row.bookings for row in merge("top-routes", parts, limit=5)] == [10]
+
+
+if __name__ == "__main__":
+    test_sharded_reports_merge_every_partial_group()
+    print("Report tests passed.")
@@ -0,0 +1,65 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+from src.dal import DAL
+from src.db import apply_schema
+from src.rollups import RevenueRollup
+
+
+def _setup(db_path):
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    dal.create_airport("AAA", "A", "A", "UK")
+    dal.create_airport("BBB", "B", "B", "UK")
+    dal.create_aircraft("Large", 200)
+    dal.create_flight("T1", 1, 2, "2030-01-01T08:00:00", "2030-01-01T10:00:00", 1, 100.0)
+    dal.create_flight("T2", 2, 1, "2030-01-02T08:00:00", "2030-01-02T10:00:00", 1, 100.0)
+    return dal
+
+
+def _rows(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return sorted(conn.execute("SELECT day, flight_id, class, ROUND(revenue, 2), bookings "
+                                   "FROM revenue_daily WHERE bookings <> 0"))
+
+
+def _ticket(db_path, booking_id):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT id FROM ticket WHERE booking_id = ?", (booking_id,)).fetchone()[0]
+
+
+def test_ticket_class_change_moves_the_revenue():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "rollup.db")
+        dal = _setup(db_path)
+        rollup = RevenueRollup(db_path)
+        booking_id = dal.create_booking(dal.create_passenger("A", "a@example.com"), 1, "ECONOMY", 120.0)
+        assert [p.revenue for p in rollup.series("day", ticket_class="ECONOMY")] == [120.0]
+
+        dal.update_ticket(_ticket(db_path, booking_id), ticket_class="FIRST")
+        assert [p.revenue for p in rollup.series("day", ticket_class="FIRST")] == [120.0]
+        assert [p.revenue for p in rollup.series("day", ticket_class="ECONOMY")] == [0.0]
+
+
+def test_triggers_agree_with_a_rebuild():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "rollup.db")
+        dal = _setup(db_path)
+        ids = [dal.create_booking(dal.create_passenger(f"P{i}", f"p{i}@example.com"), 1 + i % 2,
+                                  ("ECONOMY", "BUSINESS")[i % 2], 100.0 + i) for i in range(6)]
+        dal.update_ticket(_ticket(db_path, ids[0]), ticket_class="FIRST")
+        dal.update_booking(ids[1], price=50.0)
+        dal.set_booking_status(ids[2], "CANCELLED")
+        dal.update_ticket(_ticket(db_path, ids[2]), ticket_class="FIRST")  # not BOOKED: nothing to move
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("UPDATE booking SET flight_id = 2 WHERE id = ?", (ids[3],))
+            conn.execute("UPDATE ticket SET booking_id = ? WHERE id = ?", (ids[5], _ticket(db_path, ids[4])))
+        live = _rows(db_path)
+        RevenueRollup(db_path).rebuild()
+        assert live == _rows(db_path)
+
+
+if __name__ == "__main__":
+    test_ticket_class_change_moves_the_revenue()
+    test_triggers_agree_with_a_rebuild()
+    print("Rollup tests passed.")
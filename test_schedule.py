@@ -0,0 +1,42 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+from src.dal import DAL
+from src.db import apply_schema
+from src.schedule import ScheduleSync
+
+
+def _setup(db_path):
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    dal.create_airport("AAA", "A", "A", "UK")
+    dal.create_airport("BBB", "B", "B", "UK")
+    dal.create_aircraft("Small", 100)
+    # as add-flight stores them: minutes only, space separator
+    dal.create_flight("T1", 1, 2, "2027-01-01 10:00", "2027-01-01 12:00", 1, 100.0)
+    dal.create_flight("T2", 2, 1, "2027-01-01T14:00:00", "2027-01-01T16:00:00", 1, 100.0)
+    dal.create_flight("T3", 1, 2, "2027-01-02 10:00:00", "2027-01-02 12:00:00", 1, 100.0)
+    return dal
+
+
+def test_export_then_sync_of_an_unchanged_schedule_changes_nothing():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "schedule.db")
+        path = str(Path(tmp) / "schedule.csv")
+        _setup(db_path)
+        sync = ScheduleSync(db_path)
+        assert sync.export(path) == 3
+        with open(path, encoding="utf-8") as fh:
+            assert "2027-01-01T10:00:00,2027-01-01T12:00:00" in fh.read()
+
+        for dry_run in (True, False):
+            result = sync.sync(path, dry_run=dry_run)
+            assert (result["inserted"], result["updated"], result["deleted"]) == (0, 0, 0)
+            assert result["unchanged"] == 3 and result["changes"] == []
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM schedule_change").fetchone()[0] == 0
+
+
+if __name__ == "__main__":
+    test_export_then_sync_of_an_unchanged_schedule_changes_nothing()
+    print("Schedule tests passed.")
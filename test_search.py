@@ -0,0 +1,54 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+from src.dal import DAL, SEARCH_RANK_MAX
+from src.db import apply_schema
+
+
+def _setup(db_path):
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    for name, email in (("Sara Malik", "sara.malik@example.com"),
+                        ("Omar Khan", "omar.khan@example.com"),
+                        ("Malcolm Reid", "mal@example.org")):
+        dal.create_passenger(name, email)
+    return dal
+
+
+def _names(rows):
+    return sorted(row.name for row in rows)
+
+
+def test_every_word_matches_as_a_prefix():
+    with tempfile.TemporaryDirectory() as tmp:
+        dal = _setup(str(Path(tmp) / "search.db"))
+        assert _names(dal.search_passengers("sara mal")) == ["Sara Malik"]
+        assert _names(dal.search_passengers("mal")) == ["Malcolm Reid", "Sara Malik"]
+        assert _names(dal.search_passengers("omar.khan@ex")) == ["Omar Khan"]
+        assert dal.search_passengers("") == [] and dal.search_passengers("--") == []
+
+        dal.update_passenger(2, name="Omar Farouk")  # triggers keep the index in step
+        assert _names(dal.search_passengers("farou")) == ["Omar Farouk"]
+        dal.delete_passenger(1)
+        assert _names(dal.search_passengers("mal")) == ["Malcolm Reid"]
+
+
+def test_vague_queries_fall_back_to_id_order():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "search.db")
+        dal = _setup(db_path)
+        with sqlite3.connect(db_path) as conn:
+            conn.executemany("INSERT INTO passenger (name, email) VALUES (?, ?)",
+                             ((f"Omar {i}", f"omar{i}@example.com") for i in range(SEARCH_RANK_MAX - 1)))
+        dal.create_passenger("Omar Omar", "omar@omar.omar")  # the best match, added last
+        assert [row.id for row in dal.search_passengers("omar", limit=3)] == [2, 4, 5]
+
+        # one match fewer and the same query is bm25-ranked
+        dal.delete_passenger(4)
+        assert [row.name for row in dal.search_passengers("omar", limit=1)] == ["Omar Omar"]
+        assert len(dal.search_passengers("omar", limit=SEARCH_RANK_MAX + 5)) == SEARCH_RANK_MAX
+
+if __name__ == "__main__":
+    test_every_word_matches_as_a_prefix()
+    test_vague_queries_fall_back_to_id_order()
+    print("Search tests passed.")
@@ -0,0 +1,128 @@
+import sqlite3
+import tempfile
+from multiprocessing import get_context
+from pathlib import Path
+import pytest
+from src.dal import DAL
+from src.db import apply_schema
+from src.seat_holds import SeatHoldManager, SoldOut, class_capacity
+
+PROCESSES = 8
+ATTEMPTS_PER_PROCESS = 40
+
+def _setup(db_path, capacity=20):
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    dal.create_airport("AAA", "A", "A", "UK")
+    dal.create_airport("BBB", "B", "B", "UK")
+    dal.create_aircraft("Small", capacity)
+    dal.create_aircraft("Large", capacity * 2)
+    dal.create_flight("T1", 1, 2, "2030-01-01T08:00:00", "2030-01-01T10:00:00", 1, 100.0)
+    return dal
+
+
+def test_limit_follows_the_aircraft_flying_the_flight():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "holds.db")
+        dal = _setup(db_path)
+        holds = SeatHoldManager(db_path)
+        assert holds.available(1, "FIRST") == class_capacity(20, "FIRST") == 1
+        holds.book(dal.create_passenger("A", "a@example.com"), 1, "FIRST", 500.0)
+        assert holds.available(1, "FIRST") == 0
+
+        dal.update_flight(1, aircraft_id=2)  # e.g. fleet-plan --apply, from another process
+        assert holds.available(1, "FIRST") == class_capacity(40, "FIRST") - 1
+        holds.book(dal.create_passenger("B", "b@example.com"), 1, "FIRST", 500.0)
+
+        dal.update_flight(1, aircraft_id=1)
+        with pytest.raises(SoldOut):
+            holds.book(dal.create_passenger("C", "c@example.com"), 1, "FIRST", 500.0)
+
+
+def test_finishing_a_hold_clears_the_wheel_and_sold_out_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "holds.db")
+        dal = _setup(db_path)
+        holds = SeatHoldManager(db_path)
+        held = holds.hold(dal.create_passenger("A", "a@example.com"), 1, "FIRST", 500.0)
+        assert len(holds.wheel) == 1
+        with pytest.raises(SoldOut):
+            holds.hold(dal.create_passenger("B", "b@example.com"), 1, "FIRST", 500.0)
+
+        assert holds.release(held).status == "CANCELLED"
+        assert len(holds.wheel) == 0
+        booked = holds.book(dal.create_passenger("C", "c@example.com"), 1, "FIRST", 500.0)  # not cached sold out
+        assert holds.refund(booked).status == "REFUNDED"
+        assert holds.confirm(12345) is None
+
+
+def _hold_many(db_path, worker):
+    holds = SeatHoldManager(db_path)
+    held = 0
+    for i in range(ATTEMPTS_PER_PROCESS):
+        try:
+            booking_id = holds.hold(worker * ATTEMPTS_PER_PROCESS + i + 1, 1, "ECONOMY", 100.0)
+        except SoldOut:
+            continue
+        held += 1
+        if i % 5 == 0:
+            holds.release(booking_id)
+        else:
+            holds.confirm(booking_id)
+    return held
+
+
+def test_concurrent_holds_never_oversell_a_cabin():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "holds.db")
+        _setup(db_path, capacity=100)
+        with sqlite3.connect(db_path) as conn:
+            conn.executemany("INSERT INTO passenger (name, email) VALUES (?, ?)",
+                             ((f"P{i}", f"p{i}@example.com") for i in range(PROCESSES * ATTEMPTS_PER_PROCESS)))
+        with get_context("spawn").Pool(PROCESSES) as pool:
+            held = sum(pool.starmap(_hold_many, [(db_path, w) for w in range(PROCESSES)]))
+
+        conn = sqlite3.connect(db_path)
+        booked = conn.execute("SELECT COUNT(*) FROM booking WHERE status IN ('HELD','BOOKED')").fetchone()[0]
+        taken = conn.execute("SELECT taken FROM seat_inventory WHERE flight_id=1 AND class='ECONOMY'").fetchone()[0]
+        conn.close()
+        cabin = class_capacity(100, "ECONOMY")
+        assert held > cabin, "demand should exceed the cabin"
+        assert booked <= cabin, f"oversold: {booked} live bookings for a cabin of {cabin}"
+        assert taken == booked, "seat_inventory drifted from the bookings"
+
+
+def _inventory(db_path):
+    """(live seat_inventory rows, the same counts recomputed from booking and ticket)."""
+    with sqlite3.connect(db_path) as conn:
+        live = sorted(conn.execute("SELECT flight_id, class, taken FROM seat_inventory WHERE taken > 0"))
+        recount = sorted(conn.execute("""
+            SELECT b.flight_id, t.class, COUNT(*) FROM booking b JOIN ticket t ON t.booking_id = b.id
+            WHERE b.status IN ('HELD','BOOKED') GROUP BY 1, 2
+        """))
+    return live, recount
+
+
+def test_inventory_follows_ticket_and_booking_moves():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "holds.db")
+        dal = _setup(db_path)
+        dal.create_flight("T2", 2, 1, "2030-01-02T08:00:00", "2030-01-02T10:00:00", 1, 100.0)
+        ids = [dal.create_booking(dal.create_passenger(f"P{i}", f"p{i}@example.com"), 1, "ECONOMY", 100.0)
+               for i in range(4)]
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("UPDATE ticket SET class = 'FIRST' WHERE booking_id = ?", (ids[0],))
+            conn.execute("UPDATE booking SET flight_id = 2 WHERE id = ?", (ids[1],))
+            conn.execute("UPDATE booking SET flight_id = 2, status = 'CANCELLED' WHERE id = ?", (ids[2],))
+            conn.execute("UPDATE ticket SET booking_id = ? WHERE booking_id = ?", (ids[2], ids[3]))
+        live, recount = _inventory(db_path)
+        assert live == recount == [(1, "FIRST", 1), (2, "ECONOMY", 1)]
+        assert SeatHoldManager(db_path).available(1, "FIRST") == 0
+
+
+if __name__ == "__main__":
+    test_limit_follows_the_aircraft_flying_the_flight()
+    test_finishing_a_hold_clears_the_wheel_and_sold_out_cache()
+    test_concurrent_holds_never_oversell_a_cabin()
+    test_inventory_follows_ticket_and_booking_moves()
+    print("Seat hold tests passed.")
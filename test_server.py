@@ -0,0 +1,91 @@
+import base64
+import http.client
+import json
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+import pytest
+
+pytest.importorskip("pymongo")  # src.services imports the Mongo DAL
+
+from src.auth import KDF
+from src.dal import DAL
+from src.db import apply_schema
+from src.server import STREAM_BATCH, PooledHTTPServer
+
+FAST = KDF("pbkdf2", iterations=1000)
+PASSENGERS = STREAM_BATCH * 2 + 7
+
+
+def _setup(db_path):
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    dal.create_airport("AAA", "A", "A", "UK")
+    dal.create_airport("BBB", "B", "B", "UK")
+    dal.create_aircraft("Large", 200)
+    dal.create_flight("T1", 1, 2, "2030-01-01T08:00:00", "2030-01-01T10:00:00", 1, 100.0)
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany("INSERT INTO passenger (name, email) VALUES (?, ?)",
+                         ((f"P{i}", f"p{i}@example.com") for i in range(PASSENGERS)))
+    dal.create_user("ops", *FAST.hash("secret"), "STAFF")
+    dal.create_user("guest", *FAST.hash("secret"), "CUSTOMER")
+
+
+@contextmanager
+def _server():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "http.db")
+        _setup(db_path)
+        server = PooledHTTPServer(("127.0.0.1", 0), db_path, threads=2)
+        thread = threading.Thread(target=server.serve_forever, kwargs=dict(poll_interval=0.05), daemon=True)
+        thread.start()
+        try:
+            yield server.server_address[1]
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def _request(conn, method, path, user=None, body=None):
+    headers = {}
+    if user:
+        headers["Authorization"] = "Basic " + base64.b64encode(f"{user}:secret".encode()).decode()
+    if body is not None:
+        headers["Content-Type"] = "application/json"
+    conn.request(method, path, json.dumps(body) if body is not None else None, headers)
+    response = conn.getresponse()
+    return response, json.loads(response.read())
+
+
+def test_auth_conflicts_streaming_and_keep_alive():
+    with _server() as port:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        assert _request(conn, "GET", "/bookings")[0].status == 401
+        assert _request(conn, "GET", "/passengers/1/itinerary")[0].status == 401
+        assert _request(conn, "GET", "/bookings", user="guest")[0].status == 403
+        assert _request(conn, "GET", "/bookings", user="nobody")[0].status == 401
+
+        response, rows = _request(conn, "GET", "/passengers", user="ops")
+        assert response.status == 200 and response.getheader("Transfer-Encoding") == "chunked"
+        assert len(rows) == PASSENGERS and rows[0]["name"] == "P0"
+
+        # a request with a body, then another on the same connection
+        sock = conn.sock
+        booking = dict(passenger_id=1, flight_id=1, **{"class": "ECONOMY"})
+        response, created = _request(conn, "POST", "/bookings", body=booking)
+        assert response.status == 201 and created["booking_id"] == 1
+        response, health = _request(conn, "GET", "/health")
+        assert response.status == 200 and health["status"] == "ok"
+        assert conn.sock is sock
+
+        response, error = _request(conn, "POST", "/bookings", body=booking)
+        assert response.status == 409 and "error" in error
+        assert _request(conn, "GET", "/passengers/1/itinerary", user="ops")[0].status == 200
+        conn.close()
+
+
+if __name__ == "__main__":
+    test_auth_conflicts_streaming_and_keep_alive()
+    print("Server tests passed.")
@@ -0,0 +1,57 @@
+import tempfile
+from pathlib import Path
+from src.dal import DAL
+from src.datagen import generate
+from src.reports import REPORTS, run_report
+from src.sharding import ShardedDAL, rebalance, run_sharded_reports, split
+
+ALL_ROWS = 1_000_000  # larger than any report, so ties at a cut-off cannot pick different rows
+
+
+def _normalised(rows):
+    return sorted(tuple(round(v, 6) if isinstance(v, float) else v for v in row) for row in rows)
+
+
+def _assert_same_reports(single_db, root):
+    sharded = run_sharded_reports(root, limit=ALL_ROWS)
+    assert set(sharded) == set(REPORTS)
+    for name in REPORTS:
+        expected = run_report(single_db, name, limit=ALL_ROWS)
+        assert expected, f"{name} is empty; the test data does not exercise it"
+        assert _normalised(sharded[name]) == _normalised(expected), f"{name} differs when sharded"
+
+
+def test_sharded_reports_match_the_single_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        single_db = str(Path(tmp) / "single.db")
+        root = str(Path(tmp) / "shards")
+        generate(single_db, "3000", seed=7)
+
+        split(single_db, root, 3, "region")
+        _assert_same_reports(single_db, root)
+
+        assert rebalance(root, count=5, key="month")["flights_moved"] > 0
+        _assert_same_reports(single_db, root)
+        rebalance(root, count=2)
+        _assert_same_reports(single_db, root)
+
+
+def test_sharded_top_passengers_honours_the_flight_range():
+    with tempfile.TemporaryDirectory() as tmp:
+        single_db = str(Path(tmp) / "single.db")
+        root = str(Path(tmp) / "shards")
+        generate(single_db, "3000", seed=7)
+        split(single_db, root, 3, "month")
+
+        single, sharded = DAL(single_db), ShardedDAL(root)
+        everyone = _normalised(sharded.top_passengers(ALL_ROWS))
+        for flight_range in ((1, 10), (5, 5)):
+            expected = _normalised(single.top_passengers(ALL_ROWS, flight_range=flight_range))
+            assert expected and expected != everyone
+            assert _normalised(sharded.top_passengers(ALL_ROWS, flight_range=flight_range)) == expected
+
+
+if __name__ == "__main__":
+    test_sharded_reports_match_the_single_file()
+    test_sharded_top_passengers_honours_the_flight_range()
+    print("Sharding tests passed.")
@@ -0,0 +1,60 @@
+import os
+import sqlite3
+import tempfile
+from multiprocessing import get_context
+from pathlib import Path
+from src.dal import DAL
+from src.db import apply_schema
+from src.ticketing import TicketNumberAllocator, valid_ticket_no
+
+PROCESSES = 8
+BOOKINGS_PER_PROCESS = 200
+
+
+def _book_many(db_path, worker):
+    dal = DAL(db_path)
+    for i in range(BOOKINGS_PER_PROCESS):
+        passenger_id = dal.create_passenger(f"P{worker}-{i}", f"p{worker}.{i}@example.com")
+        dal.create_booking(passenger_id, 1, "ECONOMY", 100.0)
+    return os.getpid()
+
+
+def _setup(db_path):
+    apply_schema(db_path)
+    dal = DAL(db_path)
+    dal.create_airport("AAA", "A", "A", "UK")
+    dal.create_airport("BBB", "B", "B", "UK")
+    dal.create_aircraft("Test", 180)
+    dal.create_flight("T1", 1, 2, "2030-01-01T08:00:00", "2030-01-01T10:00:00", 1, 100.0)
+
+
+def test_concurrent_bookings_get_unique_ticket_numbers():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "tickets.db")
+        _setup(db_path)
+        with get_context("spawn").Pool(PROCESSES) as pool:
+            pool.starmap(_book_many, [(db_path, w) for w in range(PROCESSES)])
+
+        conn = sqlite3.connect(db_path)
+        numbers = [row[0] for row in conn.execute("SELECT ticket_no FROM ticket")]
+        conn.close()
+        assert len(numbers) == PROCESSES * BOOKINGS_PER_PROCESS
+        assert len(set(numbers)) == len(numbers), "ticket number collision"
+        assert all(valid_ticket_no(n) for n in numbers)
+
+
+def test_allocator_blocks_do_not_overlap():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "seq.db")
+        apply_schema(db_path)
+        a = TicketNumberAllocator(db_path, block_size=10)
+        b = TicketNumberAllocator(db_path, block_size=10)
+        issued = [a.next() for _ in range(25)] + [b.next() for _ in range(25)]
+        assert len(set(issued)) == 50
+        assert not valid_ticket_no(issued[0][:-1] + str((int(issued[0][-1]) + 1) % 10))
+
+
+if __name__ == "__main__":
+    test_allocator_blocks_do_not_overlap()
+    test_concurrent_bookings_get_unique_ticket_numbers()
+    print("Ticket number tests passed.")